@@ -11,7 +11,7 @@ https://docs.djangoproject.com/en/5.2/ref/settings/
 """
 import os
 from pathlib import Path
-from decouple import config
+from decouple import Csv, config
 
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -55,6 +55,7 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
+    'store.middleware.query_metrics.QueryMetricsMiddleware',  # Primero: cuenta también sesión/auth
     'django.contrib.sessions.middleware.SessionMiddleware',
     'corsheaders.middleware.CorsMiddleware',  # Debe estar antes de CommonMiddleware
     'django.middleware.common.CommonMiddleware',
@@ -63,6 +64,7 @@ MIDDLEWARE = [
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
     'store.middleware.session_separator.SessionTypeValidator',
+    'store.middleware.db_pool.PoolMetricsMiddleware',
 ]
 
 ROOT_URLCONF = 'ecommerce.urls'
@@ -71,8 +73,14 @@ TEMPLATES = [
     {
         'BACKEND': 'django.template.backends.django.DjangoTemplates',
         'DIRS': [BASE_DIR / "templates"],
-        'APP_DIRS': True,
         'OPTIONS': {
+            # Plantillas compiladas una sola vez por proceso (con DEBUG se recargan al editarlas)
+            'loaders': [
+                ('django.template.loaders.cached.Loader', [
+                    'django.template.loaders.filesystem.Loader',
+                    'django.template.loaders.app_directories.Loader',
+                ]),
+            ],
             'context_processors': [
                 'django.template.context_processors.debug',  # Para variable 'debug' en templates
                 'django.template.context_processors.request',
@@ -106,6 +114,49 @@ DATABASES = {
     }
 }
 
+# ───────────────────────────────────────────────────────────────
+# Reutilización de conexiones a PostgreSQL (DB_CONN_MODE)
+#   none       → una conexión nueva por request (comportamiento anterior)
+#   persistent → cada worker reutiliza su conexión DB_CONN_MAX_AGE segundos
+#   pool       → pool de psycopg por proceso (requiere psycopg[pool])
+# En ambos modos CONN_HEALTH_CHECKS descarta conexiones caídas antes de usarlas.
+# Comparar modos: python manage.py bench_db_conexiones
+# ───────────────────────────────────────────────────────────────
+DB_CONN_MODE = config('DB_CONN_MODE', default='persistent')
+DB_CONN_MAX_AGE = config('DB_CONN_MAX_AGE', default=60, cast=int)
+# Hilos por worker de gunicorn (gunicorn_config.py): un request simultáneo por hilo,
+# así que el pool de cada proceso nunca necesita más conexiones que hilos
+GUNICORN_THREADS = config('GUNICORN_THREADS', default=1, cast=int)
+# Servidor de gunicorn_config.py: wsgi (workers sync/gthread) | asgi (workers uvicorn,
+# las vistas async de Stripe no bloquean el proceso mientras esperan la respuesta)
+GUNICORN_MODO = config('GUNICORN_MODO', default='wsgi')
+# En ASGI un worker atiende muchos requests a la vez: conexiones máximas del pool por proceso
+DB_POOL_MAX_ASGI = config('DB_POOL_MAX_ASGI', default=10, cast=int)
+DB_POOL_OPCIONES = {
+    'min_size': 1,
+    'max_size': DB_POOL_MAX_ASGI if GUNICORN_MODO == 'asgi' else max(1, GUNICORN_THREADS),
+    # Segundos máximos esperando una conexión libre antes de fallar el request
+    'timeout': config('DB_POOL_TIMEOUT', default=10, cast=float),
+    'max_idle': 300,
+    'max_lifetime': 1800,
+}
+# Cada cuántos requests se registran las métricas del pool / reutilización
+DB_POOL_LOG_CADA = config('DB_POOL_LOG_CADA', default=500, cast=int)
+
+# Cabecera Server-Timing con consultas/duplicadas/tiempo en BD por request (no en producción)
+QUERY_METRICS = config('QUERY_METRICS', default=DEBUG, cast=bool)
+# Exceder un @query_budget lanza excepción en vez de solo registrar un WARNING (tests/CI)
+QUERY_BUDGET_ESTRICTO = config('QUERY_BUDGET_ESTRICTO', default=False, cast=bool)
+
+if DB_CONN_MODE == 'pool':
+    DATABASES['default']['OPTIONS']['pool'] = DB_POOL_OPCIONES
+    DATABASES['default']['CONN_HEALTH_CHECKS'] = True
+elif DB_CONN_MODE == 'persistent' and GUNICORN_MODO != 'asgi':
+    # En ASGI el código síncrono de cada request corre en un hilo distinto y las
+    # conexiones persistentes se acumularían por hilo: ahí usar DB_CONN_MODE=pool
+    DATABASES['default']['CONN_MAX_AGE'] = DB_CONN_MAX_AGE
+    DATABASES['default']['CONN_HEALTH_CHECKS'] = True
+
 # Para volver a SQLite (desarrollo individual), comenta lo anterior y descomenta:
 # DATABASES = {
 #     'default': {
@@ -159,6 +210,15 @@ STATICFILES_DIRS = [
     BASE_DIR / "static",  # <-- aquí estás apuntando a tu carpeta static/
 ]
 
+# Nombres con hash de contenido, JS/CSS minificados y variantes .gz/.br al hacer
+# collectstatic (store/utils/estaticos.py). Activar en producción; requiere correr
+# collectstatic antes de arrancar, porque {% static %} lee staticfiles.json.
+ESTATICOS_MANIFEST = config('ESTATICOS_MANIFEST', default=False, cast=bool)
+STATICFILES_BACKEND = (
+    'store.utils.estaticos.EstaticosComprimidos' if ESTATICOS_MANIFEST
+    else 'django.contrib.staticfiles.storage.StaticFilesStorage'
+)
+
 
 # ───────── Configuración de AWS S3 ──────────
 USE_S3 = config('USE_S3', default='False') == 'True'
@@ -204,7 +264,7 @@ if USE_S3:
             }
         },
         'staticfiles': {
-            'BACKEND': 'django.contrib.staticfiles.storage.StaticFilesStorage',
+            'BACKEND': STATICFILES_BACKEND,
         }
     }
     
@@ -222,13 +282,80 @@ else:
             'BACKEND': 'django.core.files.storage.FileSystemStorage',
         },
         'staticfiles': {
-            'BACKEND': 'django.contrib.staticfiles.storage.StaticFilesStorage',
+            'BACKEND': STATICFILES_BACKEND,
         }
     }
 
+# Subidas simultáneas al storage al crear/editar galerías (store/utils/galeria.py)
+GALERIA_UPLOAD_WORKERS = config('GALERIA_UPLOAD_WORKERS', default=4, cast=int)
+
 # STATIC_ROOT siempre debe estar definido (para collectstatic en producción)
 STATIC_ROOT = os.path.join(BASE_DIR, 'staticfiles')
 
+# ───────── Caché y fragmentos de plantilla ──────────
+# Debe ser compartida entre workers, el worker de Stripe y `manage.py` para que las
+# invalidaciones lleguen a todos: en producción CACHE_BACKEND=django.core.cache.backends.filebased.FileBasedCache
+# con CACHE_LOCATION=/home/ubuntu/n_wh_r/cache (o DatabaseCache / Redis). Nunca bajo /tmp ni
+# /var/tmp: los servicios systemd usan PrivateTmp. locmem = por proceso.
+CACHE_BACKEND = config('CACHE_BACKEND', default='django.core.cache.backends.locmem.LocMemCache')
+CACHES = {
+    'default': {
+        'BACKEND': CACHE_BACKEND,
+        'LOCATION': config('CACHE_LOCATION', default='nowhere'),
+        'OPTIONS': {'MAX_ENTRIES': config('CACHE_MAX_ENTRIES', default=20000, cast=int)},
+    }
+}
+# Tarjetas de producto, grillas de colección y header/footer renderizados (store/utils/fragmentos.py).
+# Por omisión solo con caché compartida: con locmem los sellos que renuevan las señales o los
+# comandos no llegan a los demás workers y servirían tarjetas viejas hasta FRAGMENTOS_TTL
+FRAGMENTOS_CACHE = config('FRAGMENTOS_CACHE', default=not CACHE_BACKEND.endswith('.LocMemCache'), cast=bool)
+# Segundos que vive un fragmento; las claves llevan sellos de versión, así que no hace falta expirar pronto
+FRAGMENTOS_TTL = config('FRAGMENTOS_TTL', default=60 * 60 * 24, cast=int)
+# Versión de plantillas en las claves (vacío = fecha de modificación más reciente de templates/)
+FRAGMENTOS_VERSION = config('FRAGMENTOS_VERSION', default='')
+
+# Stale-while-revalidate para cálculos caros del catálogo (store/utils/swr.py)
+# Un solo cálculo por clave en el cluster solo con Redis, Memcached o DatabaseCache: con locmem o
+# FileBasedCache el lock (cache.add) no es atómico entre procesos y se avisa al arrancar
+# Segundos que un valor se considera fresco; después se sirve viejo mientras se recalcula
+SWR_SUAVE = config('SWR_SUAVE', default=60, cast=int)
+# Segundos tras los que el valor desaparece y hay que calcularlo esperando
+SWR_DURO = config('SWR_DURO', default=60 * 15, cast=int)
+# Vida máxima del lock de cálculo (por si el worker muere a la mitad)
+SWR_LOCK_TTL = config('SWR_LOCK_TTL', default=30, cast=int)
+# Segundos que un request sin valor espera el cálculo de otro worker
+SWR_ESPERA = config('SWR_ESPERA', default=5, cast=float)
+# Recalcular los valores obsoletos en un hilo aparte (False: en el mismo request)
+SWR_SEGUNDO_PLANO = config('SWR_SEGUNDO_PLANO', default=True, cast=bool)
+# Hilos por proceso para esos recálculos
+SWR_WORKERS = config('SWR_WORKERS', default=2, cast=int)
+
+# ───────── Rollups de ventas (manage.py agregar_ventas) ──────────
+# Zona en la que se cortan los días de las ventas
+VENTAS_ZONA_HORARIA = config('VENTAS_ZONA_HORARIA', default='America/Mexico_City')
+# Segundos que se re-revisan antes de la marca (transacciones que confirmaron tarde)
+VENTAS_MARGEN_SEGUNDOS = config('VENTAS_MARGEN_SEGUNDOS', default=300, cast=int)
+
+# ───────── Alertas de stock (store/utils/alertas_stock.py) ──────────
+# Stock mínimo por talla antes de alertar, si la variante no define el suyo en umbrales_stock
+STOCK_UMBRAL_DEFAULT = config('STOCK_UMBRAL_DEFAULT', default=2, cast=int)
+# Destinatarios del resumen diario (manage.py resumen_alertas_stock), separados por comas
+STOCK_ALERTAS_EMAILS = config('STOCK_ALERTAS_EMAILS', default='', cast=Csv())
+
+# ───────── Analítica de búsquedas (store/utils/busquedas.py) ──────────
+# Registrar las búsquedas con texto y los clics en sus resultados
+BUSQUEDAS_LOG = config('BUSQUEDAS_LOG', default=True, cast=bool)
+# Escribir el buffer desde un hilo por proceso (False: en el request que llena el lote)
+BUSQUEDAS_ASYNC = config('BUSQUEDAS_ASYNC', default=True, cast=bool)
+# Registros que despiertan la escritura (y tamaño de cada bulk_create)
+BUSQUEDAS_LOTE = config('BUSQUEDAS_LOTE', default=200, cast=int)
+# Segundos máximos que un registro espera en memoria
+BUSQUEDAS_FLUSH_SEGUNDOS = config('BUSQUEDAS_FLUSH_SEGUNDOS', default=10, cast=float)
+# Tope del buffer por proceso; con la BD caída se descarta lo que pase de aquí
+BUSQUEDAS_BUFFER_MAX = config('BUSQUEDAS_BUFFER_MAX', default=10000, cast=int)
+# Días que se guardan búsquedas y clics (manage.py purgar_busquedas)
+BUSQUEDAS_RETENCION_DIAS = config('BUSQUEDAS_RETENCION_DIAS', default=90, cast=int)
+
 # ───────── Configuración de Sesiones Separadas ──────────
 CLIENT_SESSION_COOKIE_NAME = 'sessionid_cliente'
 ADMIN_SESSION_COOKIE_NAME = 'sessionid_admin'
@@ -305,6 +432,14 @@ TWILIO_AUTH_TOKEN     = config("TWILIO_AUTH_TOKEN")
 TWILIO_WHATSAPP_FROM  = config("TWILIO_WHATSAPP_FROM")
 TWILIO_ADMIN_PHONE    = config("TWILIO_ADMIN_PHONE")  # ← agrega esta variable al .env también
 
+# Despacho de WhatsApp en segundo plano (store/utils/whatsapp.py)
+WHATSAPP_TRANSPORT     = config("WHATSAPP_TRANSPORT", default="store.utils.whatsapp.TwilioTransport")
+WHATSAPP_ASYNC         = config("WHATSAPP_ASYNC", default=True, cast=bool)
+WHATSAPP_MAX_WORKERS   = config("WHATSAPP_MAX_WORKERS", default=2, cast=int)
+WHATSAPP_QUEUE_SIZE    = config("WHATSAPP_QUEUE_SIZE", default=1000, cast=int)
+WHATSAPP_MAX_RETRIES   = config("WHATSAPP_MAX_RETRIES", default=3, cast=int)
+WHATSAPP_RETRY_BACKOFF = config("WHATSAPP_RETRY_BACKOFF", default=1.0, cast=float)
+
 
 # ───────── Configuración Stripe (Pasarela de Pago) ──────────
 # Llave secreta (Secret Key) - para operaciones del servidor
@@ -313,6 +448,11 @@ STRIPE_SECRET_KEY = config("STRIPE_SECRET_KEY", default="")
 STRIPE_PUBLIC_KEY = config("STRIPE_PUBLIC_KEY", default="")
 # Webhook secret para validar firmas de eventos
 STRIPE_WEBHOOK_SECRET = config("STRIPE_WEBHOOK_SECRET", default="")
+# API alternativa (stripe-mock: http://localhost:12111) para pruebas; vacío = api.stripe.com
+STRIPE_API_BASE = config("STRIPE_API_BASE", default="")
+# Worker de eventos (manage.py procesar_eventos_stripe): reintentos y backoff base en segundos
+STRIPE_EVENTOS_MAX_INTENTOS = config("STRIPE_EVENTOS_MAX_INTENTOS", default=8, cast=int)
+STRIPE_EVENTOS_BACKOFF      = config("STRIPE_EVENTOS_BACKOFF", default=30, cast=float)
 
 
 # ───────── Configuración JWT ──────────
@@ -419,6 +559,16 @@ LOGGING = {
             'level': 'WARNING',
             'propagate': False,
         },
+        'store.middleware.query_metrics': {
+            'handlers': ['console'],
+            'level': 'WARNING',
+            'propagate': False,
+        },
+        'store.middleware.db_pool': {
+            'handlers': ['console'],
+            'level': 'INFO',
+            'propagate': False,
+        },
     },
 }
 
@@ -1,5 +1,6 @@
 # Configuración de Gunicorn para producción
 import multiprocessing
+import os
 
 # Bind: Puerto donde Gunicorn escucha (solo localhost)
 bind = "127.0.0.1:8000"
@@ -7,8 +8,27 @@ bind = "127.0.0.1:8000"
 # Workers: Número de procesos worker (2 * CPU cores + 1)
 workers = multiprocessing.cpu_count() * 2 + 1
 
+# Hilos por worker (GUNICORN_THREADS en .env). Con más de uno se usa gthread;
+# settings.py dimensiona el pool de BD (DB_CONN_MODE=pool) con este mismo valor,
+# así que el total de conexiones es workers × threads (revisar max_connections de PostgreSQL)
+threads = int(os.environ.get("GUNICORN_THREADS", 1))
+
+# Modo del servidor (GUNICORN_MODO en .env):
+#   wsgi → workers sync (o gthread con GUNICORN_THREADS > 1) sobre ecommerce.wsgi
+#   asgi → workers uvicorn sobre ecommerce.asgi: las vistas async (checkout y
+#          estado de pago con Stripe) esperan la red sin ocupar el proceso.
+#          Usar DB_CONN_MODE=pool (ver DB_POOL_MAX_ASGI en settings.py)
+# Comparar ambos a igual memoria: python manage.py bench_asgi
+modo = os.environ.get("GUNICORN_MODO", "wsgi")
+
+# Aplicación a servir (gunicorn.service no la pasa en la línea de comandos)
+wsgi_app = "ecommerce.asgi:application" if modo == "asgi" else "ecommerce.wsgi:application"
+
 # Worker class
-worker_class = "sync"
+if modo == "asgi":
+    worker_class = "uvicorn_worker.UvicornWorker"
+else:
+    worker_class = "gthread" if threads > 1 else "sync"
 
 # Timeout (segundos para esperar respuesta)
 timeout = 120
@@ -29,3 +49,13 @@ max_requests_jitter = 50
 
 # Preload para cargar la app antes de fork (ahorra memoria)
 preload_app = True
+
+
+def pre_fork(server, worker):
+    """Con preload_app los workers no deben heredar conexiones ni pools de BD del maestro"""
+    from django.db import connections
+
+    for conn in connections.all(initialized_only=True):
+        conn.close()
+        if getattr(conn, "pool", None) is not None:
+            conn.close_pool()
@@ -336,7 +336,7 @@ function createProductCard(producto) {
   card.innerHTML = `
     <div class="imagen-zoom">
       <a href="/producto/${producto.id}/?from=${genero}">
-        <img src="${producto.imagen || '/static/images/no-image.jpg'}" alt="${producto.nombre}">
+        <img src="${producto.imagen || '/static/images/no-image.jpg'}" ${producto.imagen_srcset ? `srcset="${producto.imagen_srcset}" sizes="(max-width: 600px) 50vw, 250px"` : ''} alt="${producto.nombre}">
       </a>
       <button class="wishlist-btn" aria-label="Añadir a favoritos" data-product-id="${producto.id}">
         <i class="fa-regular fa-heart"></i>
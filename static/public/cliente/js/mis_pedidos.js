@@ -18,12 +18,16 @@ function initPedidos() {
   cargarPedidos();
 }
 
-async function cargarPedidos() {
-  mostrarEstado('loading');
+// Cursor de la siguiente página del historial (null = no hay más)
+let siguienteCursor = null;
+
+async function cargarPedidos(cursor = null) {
+  if (!cursor) mostrarEstado('loading');
   
   try {
     const token = localStorage.getItem('access');
-    const response = await fetch('/api/cliente/ordenes/', {
+    const url = cursor ? `/api/cliente/ordenes/?cursor=${encodeURIComponent(cursor)}` : '/api/cliente/ordenes/';
+    const response = await fetch(url, {
       headers: {
         'Authorization': `Bearer ${token}`,
         'Content-Type': 'application/json'
@@ -42,12 +46,13 @@ async function cargarPedidos() {
       throw new Error(data.error || 'Error al cargar pedidos');
     }
     
-    if (data.ordenes.length === 0) {
+    if (data.ordenes.length === 0 && !cursor) {
       mostrarEstado('empty');
       return;
     }
     
-    renderPedidos(data.ordenes);
+    siguienteCursor = data.siguiente;
+    renderPedidos(data.ordenes, !!cursor);
     mostrarEstado('list');
     
   } catch (error) {
@@ -86,14 +91,27 @@ function mostrarEstado(estado) {
   }
 }
 
-function renderPedidos(ordenes) {
+function renderPedidos(ordenes, agregar = false) {
   const container = document.getElementById('pedidos-list');
-  container.innerHTML = '';
+  if (!agregar) container.innerHTML = '';
+  document.getElementById('btn-mas-pedidos')?.remove();
   
   ordenes.forEach(orden => {
     const card = crearOrdenCard(orden);
     container.appendChild(card);
   });
+
+  if (siguienteCursor) {
+    const boton = document.createElement('button');
+    boton.id = 'btn-mas-pedidos';
+    boton.className = 'btn-secondary';
+    boton.textContent = 'Ver pedidos anteriores';
+    boton.onclick = () => {
+      boton.disabled = true;
+      cargarPedidos(siguienteCursor);
+    };
+    container.appendChild(boton);
+  }
 }
 
 function crearOrdenCard(orden) {
@@ -109,9 +127,9 @@ function crearOrdenCard(orden) {
     };
   }
   
-  // Preparar productos preview (máx 4)
+  // Preparar productos preview (máx 4; el API solo manda las miniaturas)
   const productosPreview = orden.items?.slice(0, 4) || [];
-  const masProductos = (orden.items?.length || 0) > 4 ? (orden.items.length - 4) : 0;
+  const masProductos = Math.max((orden.total_lineas || 0) - productosPreview.length, 0);
   
   card.innerHTML = `
     <div class="orden-header">
@@ -173,7 +191,7 @@ function getStatusIcon(icon) {
   return icons[icon] || icons.info;
 }
 
-function verDetalle(ordenId) {
+async function verDetalle(ordenId) {
   // Buscar la orden en las cards
   const cards = document.querySelectorAll('.orden-card');
   let ordenData = null;
@@ -186,6 +204,19 @@ function verDetalle(ordenId) {
   });
   
   if (!ordenData) return;
+
+  // El historial solo trae el resumen: las líneas se piden al abrir el detalle
+  try {
+    const response = await fetch(`/orden/${ordenId}/`, {
+      headers: { 'Authorization': `Bearer ${localStorage.getItem('access')}` }
+    });
+    if (!response.ok) throw new Error('Error al cargar el pedido');
+    const detalle = await response.json();
+    ordenData.items = detalle.items.map(item => ({ ...item, producto_nombre: item.producto }));
+  } catch (error) {
+    console.error('Error:', error);
+    return;
+  }
   
   // Protección: asegurar que status_display existe
   if (!ordenData.status_display) {
@@ -723,7 +723,7 @@ export function setupHeaderPanels() {
       }
 
       try {
-        const res = await fetch('/api/cliente/ordenes/', {
+        const res = await fetch('/api/cliente/ordenes/?limite=3', {
           headers: { 'Authorization': `Bearer ${token}` }
         });
 
@@ -748,7 +748,7 @@ export function setupHeaderPanels() {
         });
 
         // Mostrar botÃ³n "Ver mÃ¡s" si hay mÃ¡s pedidos
-        if (ordenes.length > 3) {
+        if (data.siguiente) {
           verMasEl.style.display = 'block';
         }
 
@@ -783,8 +783,8 @@ export function setupHeaderPanels() {
               class="pedido-item-thumb">`
       ).join('');
       
-      if (items.length > 3) {
-        thumbsHTML += `<span class="pedido-items-more">+${items.length - 3}</span>`;
+      if ((orden.total_lineas || 0) > 3) {
+        thumbsHTML += `<span class="pedido-items-more">+${orden.total_lineas - 3}</span>`;
       }
 
       card.innerHTML = `
@@ -191,7 +191,8 @@ class SearchOverlay {
       const params = new URLSearchParams({
         q: query,
         per_page: 8,
-        disponibles: 'true'
+        disponibles: 'true',
+        origen: 'overlay'
       });
       
       const response = await fetch(`/api/search/?${params.toString()}`);
@@ -205,6 +206,8 @@ class SearchOverlay {
       // Verificar que la query no haya cambiado mientras cargaba
       if (query !== this.currentQuery) return;
       
+      this.busquedaId = data.busqueda_id || null;
+      
       if (data.productos.length === 0) {
         this.showNoResults();
       } else {
@@ -245,6 +248,7 @@ class SearchOverlay {
     card.href = link;
     card.className = 'search-product-card';
     card.style.animationDelay = `${index * 0.05}s`;
+    card.addEventListener('click', () => this.registrarClic(producto.id, index));
     
     card.innerHTML = `
       <div class="search-product-image">
@@ -263,6 +267,16 @@ class SearchOverlay {
     return card;
   }
   
+  registrarClic(productoId, posicion) {
+    // Analítica de búsquedas: no bloquea la navegación
+    if (!this.busquedaId || !navigator.sendBeacon) return;
+    const datos = new FormData();
+    datos.append('busqueda_id', this.busquedaId);
+    datos.append('producto_id', productoId);
+    datos.append('posicion', posicion);
+    navigator.sendBeacon('/api/search/clic/', datos);
+  }
+  
   goToSearchPage() {
     if (this.currentQuery.length >= this.minChars) {
       window.location.href = `/coleccion/todo/?q=${encodeURIComponent(this.currentQuery)}`;
@@ -350,7 +350,7 @@ export function initWishlist({
   const buildCards = (prods, inCart = new Set()) => prods.map(p => `
     <div class="wishlist-item" data-id="${p.id}">
       <div class="wishlist-img-col">
-        <img src="${p.imagen}" alt="${p.nombre}" onerror="this.src='/static/images/placeholder.png'">
+        <img src="${p.imagen}" ${p.imagen_srcset ? `srcset="${p.imagen_srcset}" sizes="(max-width: 600px) 50vw, 250px"` : ''} alt="${p.nombre}" onerror="this.src='/static/images/placeholder.png'">
       </div>
       <div class="wishlist-info-col">
         <h4 class="nombre">${p.nombre}</h4>
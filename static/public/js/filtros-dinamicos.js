@@ -314,7 +314,7 @@
       card.className = 'producto-card';
 
       card.innerHTML = `
-        <img src="${p.imagen || '/static/images/placeholder.png'}" alt="${p.nombre}" />
+        <img src="${p.imagen || '/static/images/placeholder.png'}" ${p.imagen_srcset ? `srcset="${p.imagen_srcset}" sizes="(max-width: 600px) 50vw, 250px"` : ''} alt="${p.nombre}" />
         <h3>${p.nombre}</h3>
         <p class="precio">$${p.precio}</p>
         ${p.en_oferta ? '<span class="oferta-badge">EN OFERTA</span>' : ''}
@@ -555,6 +555,7 @@
         <div class="thumb">
           <a href="/producto/${p.id}/?from=${state.genero}">
             <img src="${p.imagen || 'https://via.placeholder.com/250?text=Sin+Imagen'}" 
+                 ${p.imagen_srcset ? `srcset="${p.imagen_srcset}" sizes="(max-width: 600px) 50vw, 250px"` : ''}
                  alt="${p.nombre}" 
                  loading="lazy">
           </a>
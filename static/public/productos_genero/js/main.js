@@ -86,3 +86,22 @@ window.addEventListener('load', () => {
   window.addEventListener('scroll', onScrollProductos, { passive: true });
   onScrollProductos();
 })();
+
+// 6. Clics en resultados de búsqueda (analítica, /api/search/clic/)
+(() => {
+  const busquedaId = window.COLECCION_DATA?.busqueda_id;
+  const grid = document.getElementById('productos-grid');
+  if (!busquedaId || !grid || !navigator.sendBeacon) return;
+
+  grid.addEventListener('click', e => {
+    const link = e.target.closest('a[href*="/producto/"]');
+    const match = link?.getAttribute('href').match(/\/producto\/(\d+)/);
+    if (!match) return;
+    const cards = Array.from(grid.querySelectorAll('.producto-card'));
+    const datos = new FormData();
+    datos.append('busqueda_id', busquedaId);
+    datos.append('producto_id', match[1]);
+    datos.append('posicion', cards.indexOf(link.closest('.producto-card')));
+    navigator.sendBeacon('/api/search/clic/', datos);
+  });
+})();
@@ -1,6 +1,20 @@
+import logging
+
 from django.apps import AppConfig
+from django.conf import settings
 
 
 class StoreConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'store'
+
+    def ready(self):
+        # Sellos de los fragmentos cacheados y alertas de stock (store/signals.py)
+        from store import signals  # noqa: F401
+
+        # El single-flight de store/utils/swr.py necesita un cache.add atómico entre procesos
+        if not settings.DEBUG:
+            from store.utils.swr import comprobar_backend
+            aviso = comprobar_backend()
+            if aviso:
+                logging.getLogger('store.utils.swr').warning(aviso)
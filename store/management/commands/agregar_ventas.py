@@ -0,0 +1,49 @@
+"""
+Management command para actualizar los rollups diarios de ventas
+
+Recalcula los días (hora de VENTAS_ZONA_HORARIA) con órdenes creadas o
+modificadas desde la última corrida (ver store/utils/ventas.py). Pensado
+para cron cada pocos minutos; la primera corrida reconstruye todo.
+
+Uso:
+    python manage.py agregar_ventas
+    python manage.py agregar_ventas --desde 2026-01-01   # tras borrar o corregir órdenes
+    python manage.py agregar_ventas --completo
+"""
+
+import time
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+
+from store.utils.ventas import agregar
+
+
+class Command(BaseCommand):
+    help = 'Actualiza las tablas de ventas diarias con las órdenes nuevas o modificadas'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--desde',
+            help='Recalcular desde este día local, YYYY-MM-DD (default: desde la última corrida)',
+        )
+        parser.add_argument(
+            '--completo',
+            action='store_true',
+            help='Vaciar los rollups y reconstruirlos con todas las órdenes',
+        )
+
+    def handle(self, *args, **options):
+        desde = None
+        if options['desde']:
+            try:
+                desde = date.fromisoformat(options['desde'])
+            except ValueError:
+                raise CommandError(f"--desde inválido: {options['desde']} (formato YYYY-MM-DD)")
+
+        t0 = time.perf_counter()
+        resultado = agregar(desde=desde, completo=options['completo'])
+        self.stdout.write(self.style.SUCCESS(
+            f"✅ {resultado.ordenes} órdenes → {resultado.dias} días, {resultado.filas} filas "
+            f"en {time.perf_counter() - t0:.2f}s (procesado hasta {resultado.procesado_hasta:%Y-%m-%d %H:%M:%S} UTC)"
+        ))
@@ -0,0 +1,200 @@
+"""
+Management command que compara el despliegue WSGI (sync) contra ASGI (uvicorn)
+
+Levanta gunicorn con gunicorn_config.py en cada modo, con el mismo número de
+workers (misma app precargada ≈ misma memoria; se reporta el RSS medido de
+todos los procesos para confirmarlo), apuntando Stripe a un servidor falso
+con latencia fija (store/utils/stripe_falso.py). Luego corre la misma mezcla
+de replay_carga en ambos: recorridos de catálogo más consultas de estado de
+pago, que esperan a Stripe. Reporta req/s, p50/p99 y errores por modo.
+
+Crea (o actualiza) el cliente `bench_asgi` en la BD configurada para poder
+consultar el estado de pago: correr en local o staging, no en producción.
+El modo asgi requiere `uvicorn-worker` instalado.
+
+Uso:
+    python manage.py bench_asgi
+    python manage.py bench_asgi --workers 3 --usuarios 60 --duracion 30 --latencia-stripe 0.4
+    python manage.py bench_asgi --modos asgi --json bench_asgi.json
+"""
+
+import json
+import os
+import shutil
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+import requests
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from store.models import Cliente
+from store.utils.replay import ESCENARIOS_BASE, Escenario, Paso, ejecutar
+from store.utils.stripe_falso import ServidorStripeFalso
+
+MODOS = ('wsgi', 'asgi')
+USUARIO = 'bench_asgi'
+PASSWORD = 'bench-asgi-local'
+
+ESTADO_PAGO = Escenario('estado_pago', 40, [
+    Paso('GET', '/pago/session-status/?session_id=cs_bench_{producto_id}',
+         headers={'Authorization': 'Bearer {access}'}, endpoint='GET /pago/session-status/'),
+], requiere_login=True)
+
+
+def rss_mb(pid):
+    """RSS total en MB del proceso `pid` y sus hijos (Linux, /proc)."""
+    total_kb = 0
+    pendientes = [pid]
+    while pendientes:
+        actual = pendientes.pop()
+        try:
+            for linea in Path(f'/proc/{actual}/status').read_text().splitlines():
+                if linea.startswith('VmRSS:'):
+                    total_kb += int(linea.split()[1])
+            for tarea in Path(f'/proc/{actual}/task').iterdir():
+                pendientes += [int(h) for h in (tarea / 'children').read_text().split()]
+        except (FileNotFoundError, ProcessLookupError):
+            continue
+    return round(total_kb / 1024, 1)
+
+
+class Command(BaseCommand):
+    help = 'Compara gunicorn sync contra uvicorn (ASGI) a igual número de workers con Stripe lento simulado'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--modos',
+            default=','.join(MODOS),
+            help='Modos a comparar separados por coma (default: wsgi,asgi)',
+        )
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=2,
+            help='Workers de gunicorn en cada modo (default: 2)',
+        )
+        parser.add_argument(
+            '--usuarios',
+            type=int,
+            default=40,
+            help='Usuarios virtuales simultáneos (default: 40)',
+        )
+        parser.add_argument(
+            '--duracion',
+            type=float,
+            default=20,
+            help='Segundos de carga por modo (default: 20)',
+        )
+        parser.add_argument(
+            '--latencia-stripe',
+            type=float,
+            default=0.3,
+            help='Segundos que tarda cada llamada a la API falsa de Stripe (default: 0.3)',
+        )
+        parser.add_argument(
+            '--puerto',
+            type=int,
+            default=8100,
+            help='Puerto local para gunicorn (default: 8100)',
+        )
+        parser.add_argument(
+            '--json',
+            help='Guardar los reportes completos en este archivo',
+        )
+
+    def handle(self, *args, **options):
+        modos = [m.strip() for m in options['modos'].split(',') if m.strip()]
+        if set(modos) - set(MODOS):
+            raise CommandError(f'--modos admite: {", ".join(MODOS)}')
+        gunicorn = shutil.which('gunicorn')
+        if not gunicorn:
+            raise CommandError('gunicorn no está instalado en este entorno')
+
+        cliente, _ = Cliente.objects.get_or_create(
+            username=USUARIO, defaults={'nombre': 'Bench ASGI', 'correo': f'{USUARIO}@example.com'}
+        )
+        cliente.set_password(PASSWORD)
+        cliente.email_verified = True
+        cliente.save()
+
+        escenarios = [e for e in ESCENARIOS_BASE if e.nombre not in ('agregar_carrito', 'checkout')]
+        escenarios.append(ESTADO_PAGO)
+        base = f'http://127.0.0.1:{options["puerto"]}'
+
+        resultados = {}
+        with ServidorStripeFalso(latencia=options['latencia_stripe']) as falso:
+            for modo in modos:
+                self.stdout.write(self.style.WARNING(
+                    f'\n[{modo}] {options["workers"]} workers, {options["usuarios"]} usuarios, '
+                    f'{options["duracion"]:.0f}s, Stripe {options["latencia_stripe"] * 1000:.0f}ms'
+                ))
+                proceso = self._arrancar(gunicorn, modo, options, falso.url)
+                try:
+                    self._esperar(base, proceso)
+                    reporte = ejecutar(
+                        base, escenarios, usuarios=options['usuarios'],
+                        duracion=options['duracion'], login=(USUARIO, PASSWORD), semilla=1,
+                    )
+                    reporte['rss_mb'] = rss_mb(proceso.pid)
+                finally:
+                    proceso.terminate()
+                    proceso.wait(timeout=30)
+                resultados[modo] = reporte
+
+        self._imprimir(resultados)
+        if options['json']:
+            with open(options['json'], 'w', encoding='utf-8') as fh:
+                json.dump(resultados, fh, indent=2, ensure_ascii=False)
+            self.stdout.write(f'Reportes en {options["json"]}')
+
+    def _arrancar(self, gunicorn, modo, options, stripe_url):
+        entorno = {
+            **os.environ,
+            'GUNICORN_MODO': modo,
+            'STRIPE_API_BASE': stripe_url,
+            'STRIPE_SECRET_KEY': settings.STRIPE_SECRET_KEY or 'sk_test_bench',
+        }
+        # En ASGI las conexiones persistentes se desactivan: medir con pool en PostgreSQL
+        if modo == 'asgi' and settings.DATABASES['default']['ENGINE'].endswith('postgresql'):
+            entorno['DB_CONN_MODE'] = 'pool'
+        comando = [
+            gunicorn, '--config', str(Path(settings.BASE_DIR) / 'gunicorn_config.py'),
+            '--bind', f'127.0.0.1:{options["puerto"]}', '--workers', str(options['workers']),
+            '--access-logfile', '/dev/null', '--error-logfile', '-', '--log-level', 'warning',
+        ]
+        return subprocess.Popen(comando, cwd=settings.BASE_DIR, env=entorno, stdout=sys.stderr)
+
+    def _esperar(self, base, proceso, limite=60):
+        fin = time.monotonic() + limite
+        while time.monotonic() < fin:
+            if proceso.poll() is not None:
+                raise CommandError(f'gunicorn terminó al arrancar (código {proceso.returncode})')
+            try:
+                if requests.get(f'{base}/api/productos/', timeout=5).ok:
+                    return
+            except requests.RequestException:
+                pass
+            time.sleep(0.5)
+        raise CommandError(f'{base} no respondió en {limite}s')
+
+    def _imprimir(self, resultados):
+        self.stdout.write(
+            f'\n{"modo":<6} {"RSS MB":>8} {"req/s":>8} {"p50":>8} {"p99":>8} {"err%":>6}'
+            f' {"estado_pago p99":>16}'
+        )
+        for modo, reporte in resultados.items():
+            total = reporte['total']
+            pago = reporte['endpoints'].get('GET /pago/session-status/', {})
+            self.stdout.write(
+                f'{modo:<6} {reporte["rss_mb"]:>8} {total["rps"]:>8} {total["p50_ms"]:>8} '
+                f'{total["p99_ms"]:>8} {total["errores_pct"]:>6} {pago.get("p99_ms", "-"):>16}'
+            )
+        if len(resultados) == 2:
+            wsgi, asgi = resultados['wsgi']['total'], resultados['asgi']['total']
+            self.stdout.write(self.style.SUCCESS(
+                f'\n✅ ASGI: {asgi["rps"] / (wsgi["rps"] or 1):.1f}× req/s con '
+                f'{resultados["asgi"]["rss_mb"]} MB frente a {resultados["wsgi"]["rss_mb"]} MB en WSGI'
+            ))
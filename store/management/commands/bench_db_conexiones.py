@@ -0,0 +1,132 @@
+"""
+Management command para medir el costo de conexión por request según DB_CONN_MODE
+
+Simula el ciclo de un request (close_old_connections al inicio y al final,
+igual que request_started/request_finished) alrededor de una consulta
+barata, con una conexión independiente por modo, y reporta la latencia
+p50/p95 y cuántas conexiones nuevas se abrieron.
+
+Uso:
+    python manage.py bench_db_conexiones
+    python manage.py bench_db_conexiones --requests 2000 --modos none,persistent,pool
+    python manage.py bench_db_conexiones --consulta "SELECT id FROM store_producto LIMIT 20"
+"""
+
+import copy
+import statistics
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+from django.db.backends.signals import connection_created
+from django.db.utils import load_backend
+
+MODOS = ('none', 'persistent', 'pool')
+
+
+def ajustes_modo(base, modo):
+    """Copia de settings_dict de la BD con la política de conexión de `modo`."""
+    ajustes = copy.deepcopy(base)
+    ajustes['OPTIONS'].pop('pool', None)
+    ajustes['CONN_MAX_AGE'] = 0
+    ajustes['CONN_HEALTH_CHECKS'] = modo != 'none'
+    if modo == 'persistent':
+        ajustes['CONN_MAX_AGE'] = settings.DB_CONN_MAX_AGE
+    elif modo == 'pool':
+        ajustes['OPTIONS']['pool'] = dict(settings.DB_POOL_OPCIONES)
+    return ajustes
+
+
+def medir(ajustes, alias, requests, consulta):
+    """Latencias en ms por request y número de conexiones abiertas."""
+    conexion = load_backend(ajustes['ENGINE']).DatabaseWrapper(ajustes, alias)
+    nuevas = []
+
+    def contar(sender, connection, **kwargs):
+        if connection.alias == alias:
+            nuevas.append(1)
+
+    connection_created.connect(contar, weak=False)
+    latencias = []
+    try:
+        for _ in range(requests):
+            inicio = time.perf_counter()
+            conexion.close_if_unusable_or_obsolete()
+            with conexion.cursor() as cursor:
+                cursor.execute(consulta)
+                cursor.fetchall()
+            conexion.close_if_unusable_or_obsolete()
+            latencias.append((time.perf_counter() - inicio) * 1000)
+    finally:
+        connection_created.disconnect(contar)
+        conexion.close()
+        if getattr(conexion, 'pool', None) is not None:
+            conexion.close_pool()
+    return latencias, len(nuevas)
+
+
+class Command(BaseCommand):
+    help = 'Compara la latencia por request con conexiones nuevas, persistentes o con pool'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--requests',
+            type=int,
+            default=500,
+            help='Requests simulados por modo (default: 500)',
+        )
+        parser.add_argument(
+            '--modos',
+            default=','.join(MODOS),
+            help='Modos a comparar separados por coma (default: none,persistent,pool)',
+        )
+        parser.add_argument(
+            '--consulta',
+            default='SELECT 1',
+            help='Consulta ejecutada en cada request (default: SELECT 1)',
+        )
+        parser.add_argument(
+            '--database',
+            default='default',
+            help='Alias de la base de datos (default: default)',
+        )
+
+    def handle(self, *args, **options):
+        modos = [m.strip() for m in options['modos'].split(',') if m.strip()]
+        invalidos = set(modos) - set(MODOS)
+        if invalidos:
+            raise CommandError(f'Modos no válidos: {", ".join(sorted(invalidos))}')
+
+        base = connections[options['database']].settings_dict
+        self.stdout.write(
+            f'Motor: {base["ENGINE"]} | modo actual: {settings.DB_CONN_MODE} | '
+            f'{options["requests"]} requests por modo\n'
+        )
+
+        resultados = {}
+        for modo in modos:
+            if modo == 'pool' and 'postgresql' not in base['ENGINE']:
+                self.stdout.write(self.style.WARNING('  pool: solo disponible con PostgreSQL, se omite'))
+                continue
+            try:
+                latencias, nuevas = medir(
+                    ajustes_modo(base, modo), f'bench_{modo}', options['requests'], options['consulta']
+                )
+            except Exception as e:
+                self.stdout.write(self.style.ERROR(f'  {modo}: {e}'))
+                continue
+            resultados[modo] = statistics.median(latencias)
+            p95 = statistics.quantiles(latencias, n=20)[-1] if len(latencias) > 1 else latencias[0]
+            self.stdout.write(
+                f'  {modo:<11} p50={resultados[modo]:7.2f}ms  p95={p95:7.2f}ms  '
+                f'media={statistics.mean(latencias):7.2f}ms  conexiones_nuevas={nuevas}'
+            )
+
+        if 'none' in resultados:
+            for modo, p50 in resultados.items():
+                if modo != 'none' and p50:
+                    self.stdout.write(self.style.SUCCESS(
+                        f'✅ {modo}: {resultados["none"] - p50:.2f}ms menos por request '
+                        f'({resultados["none"] / p50:.1f}x)'
+                    ))
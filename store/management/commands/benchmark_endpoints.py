@@ -0,0 +1,151 @@
+"""
+Management command que mide los endpoints más usados a varios tamaños de catálogo
+
+Por defecto crea una base de datos temporal (como `manage.py test`), la
+llena con seed_catalog hasta cada tamaño de --escalas y pide cada endpoint
+con el cliente de pruebas de Django, registrando p50/p95, consultas SQL y
+memoria pico (ver store/utils/benchmark.py). El resultado se guarda en JSON
+y, con --baseline, se compara: si hay regresiones el comando termina con error.
+
+Uso:
+    python manage.py benchmark_endpoints --escalas 100,1000 --guardar-baseline
+    python manage.py benchmark_endpoints --escalas 100,1000 --baseline benchmarks/baseline.json
+    python manage.py benchmark_endpoints --bd-actual --escalas 500   # sobre la BD configurada
+"""
+
+import json
+import platform
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import setup_test_environment, teardown_test_environment
+from django.utils import timezone
+
+from store.utils.benchmark import comparar, ejecutar
+
+BASELINE = Path(settings.BASE_DIR) / 'benchmarks' / 'baseline.json'
+
+
+class Command(BaseCommand):
+    help = 'Mide latencia, consultas y memoria de los endpoints principales y compara contra una línea base'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--escalas',
+            default='100,1000',
+            help='Tamaños de catálogo (productos) separados por coma (default: 100,1000)',
+        )
+        parser.add_argument(
+            '--variants-per',
+            type=int,
+            default=3,
+            help='Variantes por producto del catálogo generado (default: 3)',
+        )
+        parser.add_argument(
+            '--ordenes-por-producto',
+            type=int,
+            default=2,
+            help='Órdenes generadas por cada producto nuevo (default: 2)',
+        )
+        parser.add_argument(
+            '--repeticiones',
+            type=int,
+            default=20,
+            help='Requests medidos por endpoint (default: 20)',
+        )
+        parser.add_argument(
+            '--salida',
+            default='benchmarks/ultimo.json',
+            help='Archivo JSON de resultados (default: benchmarks/ultimo.json)',
+        )
+        parser.add_argument(
+            '--baseline',
+            default=str(BASELINE),
+            help='Línea base contra la cual comparar (default: benchmarks/baseline.json)',
+        )
+        parser.add_argument(
+            '--guardar-baseline',
+            action='store_true',
+            help='Guardar este resultado como nueva línea base',
+        )
+        parser.add_argument(
+            '--tolerancia',
+            type=float,
+            default=0.25,
+            help='Aumento permitido de p95 y memoria antes de marcar regresión (default: 0.25)',
+        )
+        parser.add_argument(
+            '--bd-actual',
+            action='store_true',
+            help='Usar la base de datos configurada en vez de una temporal (agrega datos sintéticos)',
+        )
+
+    def handle(self, *args, **options):
+        try:
+            escalas = sorted({int(e) for e in options['escalas'].split(',') if e.strip()})
+        except ValueError:
+            raise CommandError('--escalas debe ser una lista de enteros, ej: 100,1000')
+
+        setup_test_environment()
+        nombre_original = None
+        if not options['bd_actual']:
+            nombre_original = connection.settings_dict['NAME']
+            connection.creation.create_test_db(verbosity=0, autoclobber=True)
+        try:
+            resultados = ejecutar(
+                escalas,
+                variantes_por=options['variants_per'],
+                ordenes_por_producto=options['ordenes_por_producto'],
+                repeticiones=options['repeticiones'],
+                progreso=self._progreso,
+            )
+        finally:
+            if nombre_original is not None:
+                connection.creation.destroy_test_db(nombre_original, verbosity=0)
+            teardown_test_environment()
+
+        reporte = {
+            'meta': {
+                'fecha': timezone.now().isoformat(),
+                'motor': connection.vendor,
+                'python': platform.python_version(),
+                'repeticiones': options['repeticiones'],
+                'variantes_por_producto': options['variants_per'],
+            },
+            'resultados': resultados,
+        }
+        self._guardar(options['salida'], reporte)
+        if options['guardar_baseline']:
+            self._guardar(options['baseline'], reporte)
+            self.stdout.write(self.style.SUCCESS(f'✅ Línea base guardada en {options["baseline"]}'))
+            return
+
+        baseline = Path(options['baseline'])
+        if not baseline.exists():
+            self.stdout.write(self.style.WARNING(
+                f'Sin línea base en {baseline}: usa --guardar-baseline para crearla'
+            ))
+            return
+
+        anterior = json.loads(baseline.read_text())
+        regresiones = comparar(resultados, anterior['resultados'], tolerancia=options['tolerancia'])
+        if regresiones:
+            for regresion in regresiones:
+                self.stdout.write(self.style.ERROR(f'  ✗ {regresion}'))
+            raise CommandError(f'{len(regresiones)} regresiones contra {baseline}')
+        self.stdout.write(self.style.SUCCESS(f'✅ Sin regresiones contra {baseline}'))
+
+    def _progreso(self, escala, nombre, m):
+        self.stdout.write(
+            f'  [{escala:>6}] {nombre:<18} p50={m["p50_ms"]:8.2f}ms  p95={m["p95_ms"]:8.2f}ms  '
+            f'queries={m["queries"]:>3} (dup {m["duplicadas"]})  pico={m["pico_kb"]:8.1f}KB  '
+            f'HTTP {m["status"]}'
+        )
+
+    def _guardar(self, ruta, reporte):
+        ruta = Path(ruta)
+        ruta.parent.mkdir(parents=True, exist_ok=True)
+        ruta.write_text(json.dumps(reporte, indent=2, ensure_ascii=False))
+        self.stdout.write(f'Resultados en {ruta}')
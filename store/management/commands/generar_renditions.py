@@ -0,0 +1,124 @@
+"""
+Management command para generar renditions (WebP/AVIF) de imágenes existentes
+
+Procesa en paralelo con un pool de procesos (el redimensionado es CPU).
+Por defecto solo toma las imágenes que aún no tienen renditions.
+
+Uso:
+    python manage.py generar_renditions
+    python manage.py generar_renditions --workers 8
+    python manage.py generar_renditions --workers 1     # en este proceso, sin pool
+    python manage.py generar_renditions --todas          # regenerar todas
+    python manage.py generar_renditions --productos 1 2 3
+"""
+
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from django.core.management.base import BaseCommand
+from django.db import connections
+
+from store.models import VarianteImagen
+from store.utils.fragmentos import invalidar_catalogo
+
+
+def _inicializar_worker():
+    # Con el método "spawn" (macOS/Windows) el hijo arranca sin Django
+    import django
+    from django.apps import apps
+    if not apps.ready:
+        django.setup()
+
+
+def _procesar(imagen_id):
+    """Corre en el proceso hijo. Retorna (id, archivos generados, error)."""
+    from store.models import VarianteImagen
+    from store.utils.renditions import construir_srcsets, generar_renditions
+
+    try:
+        img = VarianteImagen.objects.get(pk=imagen_id)
+        renditions = generar_renditions(img.imagen.name, img.imagen.storage)
+        VarianteImagen.objects.filter(pk=imagen_id).update(
+            renditions=renditions,
+            srcsets_cache=construir_srcsets(renditions, img.imagen.storage),
+        )
+        return imagen_id, sum(len(v) for v in renditions.values()), None
+    except Exception as e:
+        return imagen_id, 0, str(e)
+
+
+class Command(BaseCommand):
+    help = 'Genera renditions responsivas (WebP/AVIF) para imágenes de galería existentes'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=os.cpu_count() or 2,
+            help='Procesos en paralelo; 1 = en este mismo proceso (default: núcleos de CPU)',
+        )
+        parser.add_argument(
+            '--todas',
+            action='store_true',
+            help='Regenerar también las imágenes que ya tienen renditions',
+        )
+        parser.add_argument(
+            '--productos',
+            nargs='+',
+            type=int,
+            help='Limitar a las imágenes de estos productos',
+        )
+
+    def handle(self, *args, **options):
+        qs = VarianteImagen.objects.exclude(imagen='')
+        if not options['todas']:
+            qs = qs.filter(renditions={})
+        if options['productos']:
+            qs = qs.filter(variante__producto_id__in=options['productos'])
+
+        ids = list(qs.order_by('id').values_list('id', flat=True))
+        if not ids:
+            self.stdout.write(self.style.SUCCESS('✅ No hay imágenes pendientes'))
+            return
+
+        workers = max(1, options['workers'])
+        self.stdout.write(self.style.WARNING(
+            f'Generando renditions de {len(ids)} imágenes con {workers} procesos...'
+        ))
+
+        ok = archivos = 0
+        errores = []
+        for n, (imagen_id, generados, error) in enumerate(self._resultados(ids, workers), start=1):
+            if error:
+                errores.append((imagen_id, error))
+            else:
+                ok += 1
+                archivos += generados
+            if n % 50 == 0 or n == len(ids):
+                self.stdout.write(f'  {n}/{len(ids)} procesadas')
+
+        if ok:
+            invalidar_catalogo()  # update() no dispara señales; las tarjetas llevan los srcset
+
+        self.stdout.write(self.style.SUCCESS(
+            f'✅ Completado:\n'
+            f'   - Imágenes procesadas: {ok}\n'
+            f'   - Archivos generados: {archivos}\n'
+            f'   - Errores: {len(errores)}'
+        ))
+        for imagen_id, error in errores[:20]:
+            self.stdout.write(self.style.ERROR(f'  - VarianteImagen #{imagen_id}: {error}'))
+
+    def _resultados(self, ids, workers):
+        """(id, archivos generados, error) de cada imagen, en el orden en que terminan."""
+        if workers == 1:
+            for imagen_id in ids:
+                yield _procesar(imagen_id)
+            return
+
+        # Los hijos (fork) no deben heredar la conexión abierta del padre
+        connections.close_all()
+        with ProcessPoolExecutor(max_workers=workers, initializer=_inicializar_worker) as pool:
+            futuros = [pool.submit(_procesar, imagen_id) for imagen_id in ids]
+            for futuro in as_completed(futuros):
+                yield futuro.result()
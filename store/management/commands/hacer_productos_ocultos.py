@@ -8,6 +8,7 @@ Uso:
 
 from django.core.management.base import BaseCommand
 from store.models import Producto
+from store.utils.fragmentos import invalidar_catalogo
 
 
 class Command(BaseCommand):
@@ -67,6 +68,7 @@ class Command(BaseCommand):
         
         # Actualizar todos a bodega=True
         actualizados = productos.update(bodega=True)
+        invalidar_catalogo()  # update() no dispara señales
 
         self.stdout.write(
             self.style.SUCCESS(
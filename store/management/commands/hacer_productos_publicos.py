@@ -8,6 +8,7 @@ Uso:
 
 from django.core.management.base import BaseCommand
 from store.models import Producto
+from store.utils.fragmentos import invalidar_catalogo
 
 
 class Command(BaseCommand):
@@ -46,6 +47,7 @@ class Command(BaseCommand):
         
         # Actualizar todos a bodega=False
         actualizados = productos.update(bodega=False)
+        invalidar_catalogo()  # update() no dispara señales
 
         self.stdout.write(
             self.style.SUCCESS(
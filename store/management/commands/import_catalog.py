@@ -0,0 +1,108 @@
+"""
+Management command que importa un catálogo de proveedor en bloque
+
+Reemplaza a ecommerce/insertarProductos.py (un POST por producto a
+/api/productos/crear/): lee un CSV, JSONL o XLSX con una fila por variante,
+valida el archivo completo y hace upsert de categorías, subcategorías,
+productos y variantes con bulk_create/bulk_update por lotes
+(ver store/utils/importacion.py para las columnas).
+
+Los productos nuevos quedan en bodega (ocultos) salvo con --publicar.
+Es idempotente: volver a correrlo con el mismo archivo actualiza por SKU
+y solo sube imágenes a variantes que aún no tienen galería.
+
+Uso:
+    python manage.py import_catalog proveedor.csv
+    python manage.py import_catalog proveedor.xlsx --imagenes /ruta/fotos --publicar
+    python manage.py import_catalog proveedor.jsonl --validar
+    python manage.py import_catalog proveedor.csv --lote 2000 --workers 8
+"""
+
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from store.utils.importacion import ImportacionError, importar, leer_filas, validar
+
+MAX_ERRORES = 30
+
+
+class Command(BaseCommand):
+    help = 'Importa productos y variantes desde CSV, JSONL o XLSX con inserciones en bloque'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'archivo',
+            help='Archivo .csv, .jsonl o .xlsx con una fila por variante',
+        )
+        parser.add_argument(
+            '--imagenes',
+            help='Directorio con las imágenes nombradas en la columna `imagenes`',
+        )
+        parser.add_argument(
+            '--lote',
+            type=int,
+            default=1000,
+            help='Productos por transacción (default: 1000)',
+        )
+        parser.add_argument(
+            '--workers',
+            type=int,
+            help='Subidas de imágenes simultáneas (default: GALERIA_UPLOAD_WORKERS)',
+        )
+        parser.add_argument(
+            '--publicar',
+            action='store_true',
+            help='Crear los productos nuevos visibles en la tienda (bodega=False)',
+        )
+        parser.add_argument(
+            '--validar',
+            action='store_true',
+            help='Solo validar el archivo, sin escribir en la base de datos',
+        )
+
+    def handle(self, *args, **options):
+        inicio = time.perf_counter()
+        try:
+            filas = leer_filas(options['archivo'])
+            productos = validar(filas, options['imagenes'])
+        except FileNotFoundError as e:
+            raise CommandError(f'No existe el archivo: {e.filename}')
+        except ImportacionError as e:
+            for error in e.errores[:MAX_ERRORES]:
+                self.stderr.write(f'  {error}')
+            if len(e.errores) > MAX_ERRORES:
+                self.stderr.write(f'  ... y {len(e.errores) - MAX_ERRORES} más')
+            raise CommandError(f'Archivo inválido: {len(e.errores)} errores, no se importó nada')
+
+        variantes = sum(len(p.variantes) for p in productos)
+        self.stdout.write(
+            f'{len(filas)} filas válidas: {len(productos)} productos, {variantes} variantes '
+            f'({time.perf_counter() - inicio:.1f}s)'
+        )
+        if options['validar']:
+            self.stdout.write(self.style.SUCCESS('✅ Archivo válido (no se escribió nada)'))
+            return
+
+        def progreso(hechos, total, conteos):
+            self.stdout.write(
+                f'  {hechos}/{total} productos · +{conteos["productos_creados"]} '
+                f'~{conteos["productos_actualizados"]} productos, +{conteos["variantes_creadas"]} '
+                f'~{conteos["variantes_actualizadas"]} variantes, {conteos["imagenes"]} imágenes '
+                f'({conteos["segundos"]:.1f}s)'
+            )
+
+        totales = importar(
+            productos, lote=options['lote'], publicar=options['publicar'],
+            dir_imagenes=options['imagenes'], workers=options['workers'], progreso=progreso,
+        )
+        if totales['errores_imagenes']:
+            self.stdout.write(self.style.WARNING(
+                f'{totales["errores_imagenes"]} lotes sin imágenes (ver log); se pueden reintentar con el mismo comando'
+            ))
+        self.stdout.write(self.style.SUCCESS(
+            f'✅ {totales["productos_creados"]} productos creados, {totales["productos_actualizados"]} actualizados '
+            f'({totales["productos_sin_cambios"]} sin cambios), {totales["variantes_creadas"]} variantes creadas, '
+            f'{totales["variantes_actualizadas"]} actualizadas ({totales["variantes_sin_cambios"]} sin cambios), '
+            f'{totales["imagenes"]} imágenes en {time.perf_counter() - inicio:.1f}s'
+        ))
@@ -0,0 +1,49 @@
+"""
+Management command que muestra las métricas de la caché stale-while-revalidate
+
+Lee los contadores que store/utils/swr.py suma en la caché compartida:
+respuestas frescas, obsoletas (servidas mientras se recalculaban), fallos,
+recálculos, requests que esperaron el cálculo de otro worker y errores.
+
+Uso:
+    python manage.py metricas_swr
+    python manage.py metricas_swr --nombres filtros coleccion
+    python manage.py metricas_swr --reiniciar
+"""
+
+from django.core.management.base import BaseCommand
+
+from store.utils.swr import EVENTOS, metricas, reiniciar_metricas
+
+# Nombres usados con @swr_cache / @cache_swr en las vistas
+NOMBRES = ('filtros', 'coleccion')
+
+
+class Command(BaseCommand):
+    help = 'Muestra los contadores de aciertos, valores obsoletos y recálculos de la caché SWR'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--nombres',
+            nargs='+',
+            default=list(NOMBRES),
+            help='Cachés a mostrar (default: filtros coleccion)',
+        )
+        parser.add_argument(
+            '--reiniciar',
+            action='store_true',
+            help='Poner los contadores en cero después de mostrarlos',
+        )
+
+    def handle(self, *args, **options):
+        nombres = options['nombres']
+        self.stdout.write(f'{"caché":<12}' + ''.join(f'{e:>11}' for e in EVENTOS) + f'{"acierto%":>10}')
+        for nombre, contadores in metricas(nombres).items():
+            servidas = contadores['fresco'] + contadores['obsoleto'] + contadores['fallo']
+            acierto = 100 * (contadores['fresco'] + contadores['obsoleto']) / servidas if servidas else 0
+            self.stdout.write(
+                f'{nombre:<12}' + ''.join(f'{contadores[e]:>11}' for e in EVENTOS) + f'{acierto:>9.1f}%'
+            )
+        if options['reiniciar']:
+            reiniciar_metricas(nombres)
+            self.stdout.write(self.style.SUCCESS('✅ Contadores reiniciados'))
@@ -0,0 +1,97 @@
+"""
+Management command que precalienta la caché de fragmentos de plantilla
+
+Renderiza la home y las primeras páginas de cada colección (sin filtros)
+llamando directamente a las vistas, de modo que las grillas, el header/footer
+y las tarjetas de esos productos queden en la caché compartida antes de
+recibir tráfico (ver store/utils/fragmentos.py). Con --todas también
+renderiza la tarjeta de cada producto público.
+
+Correr después de cada deploy (las claves llevan la versión de las plantillas)
+y después de cargas masivas del catálogo.
+
+Uso:
+    python manage.py precalentar_fragmentos
+    python manage.py precalentar_fragmentos --paginas 5
+    python manage.py precalentar_fragmentos --todas
+"""
+
+import time
+
+from django.conf import settings
+from django.contrib.auth.models import AnonymousUser
+from django.contrib.sessions.backends.db import SessionStore
+from django.core.management.base import BaseCommand, CommandError
+from django.template import engines
+from django.test import RequestFactory
+
+from store.models import Producto
+from store.utils.fragmentos import preparar_tarjetas
+from store.views.views import genero_view, index
+
+COLECCIONES = ('dama', 'caballero', 'todo')
+SECCIONES = {'Mujer': 'dama', 'Hombre': 'caballero', 'Unisex': 'caballero'}
+LOTE = 200
+
+# Mismo nombre y vary_on que la tarjeta de productos_genero.html: misma clave
+TARJETA = (
+    "{% load fragmentos %}{% fragmento 'tarjeta' p.id p.version_fragmento seccion %}"
+    "{% include 'public/includes/tarjeta_producto.html' %}{% endfragmento %}"
+)
+
+
+class Command(BaseCommand):
+    help = 'Renderiza la home, las colecciones y las tarjetas de producto para llenar la caché de fragmentos'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--paginas',
+            type=int,
+            default=3,
+            help='Páginas de cada colección a renderizar (default: 3)',
+        )
+        parser.add_argument(
+            '--todas',
+            action='store_true',
+            help='Renderizar además la tarjeta de cada producto público',
+        )
+
+    def handle(self, *args, **options):
+        if not settings.FRAGMENTOS_CACHE:
+            raise CommandError('FRAGMENTOS_CACHE está desactivado: no hay nada que precalentar')
+
+        if settings.CACHES['default']['BACKEND'].endswith('LocMemCache'):
+            self.stdout.write(self.style.WARNING(
+                'CACHE_BACKEND es locmem: los workers de gunicorn no verán lo que se precaliente aquí'
+            ))
+
+        inicio = time.perf_counter()
+        fabrica = RequestFactory()
+        rutas = [('/', index, {})]
+        for genero in COLECCIONES:
+            for pagina in range(1, options['paginas'] + 1):
+                sufijo = f'?pagina={pagina}' if pagina > 1 else ''
+                rutas.append((f'/coleccion/{genero}/{sufijo}', genero_view, {'genero': genero}))
+
+        for ruta, vista, kwargs in rutas:
+            request = fabrica.get(ruta)
+            request.session = SessionStore()
+            request.user = AnonymousUser()
+            response = vista(request, **kwargs)
+            self.stdout.write(f'  {response.status_code} {ruta}')
+
+        tarjetas = 0
+        if options['todas']:
+            plantilla = engines['django'].from_string(TARJETA)
+            publicos = (Producto.objects.filter(bodega=False)
+                        .select_related('categoria')
+                        .prefetch_related('variantes', 'variantes__imagenes')
+                        .order_by('id'))
+            for desde in range(0, publicos.count(), LOTE):
+                for p in preparar_tarjetas(publicos[desde:desde + LOTE]):
+                    plantilla.render({'p': p, 'seccion': SECCIONES.get(p.genero, 'caballero')})
+                    tarjetas += 1
+
+        self.stdout.write(self.style.SUCCESS(
+            f'✅ {len(rutas)} páginas y {tarjetas} tarjetas renderizadas en {time.perf_counter() - inicio:.1f}s'
+        ))
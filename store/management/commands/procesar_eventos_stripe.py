@@ -0,0 +1,85 @@
+"""
+Management command (worker) que aplica los eventos de Stripe encolados
+
+El webhook solo guarda los eventos en StripeEvento; este comando los
+procesa en orden por orden/PaymentIntent, con reintentos y dead-letter
+(ver store/utils/stripe_eventos.py). En producción corre como servicio
+(stripe_eventos.service) con --loop.
+
+Uso:
+    python manage.py procesar_eventos_stripe                 # una pasada
+    python manage.py procesar_eventos_stripe --loop          # worker continuo
+    python manage.py procesar_eventos_stripe --loop --intervalo 2
+    python manage.py procesar_eventos_stripe --reintentar-muertos
+"""
+
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from store.models import StripeEvento
+from store.utils.stripe_eventos import procesar_pendientes
+
+
+class Command(BaseCommand):
+    help = 'Procesa los eventos de Stripe pendientes de la bandeja de entrada'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--loop',
+            action='store_true',
+            help='Seguir corriendo y revisar la bandeja cada --intervalo segundos',
+        )
+        parser.add_argument(
+            '--intervalo',
+            type=float,
+            default=1.0,
+            help='Segundos entre pasadas en modo --loop (default: 1)',
+        )
+        parser.add_argument(
+            '--limite',
+            type=int,
+            default=100,
+            help='Eventos máximos por pasada (default: 100)',
+        )
+        parser.add_argument(
+            '--reintentar-muertos',
+            action='store_true',
+            help='Regresar a pendiente los eventos muertos antes de procesar',
+        )
+
+    def handle(self, *args, **options):
+        if options['reintentar_muertos']:
+            revividos = StripeEvento.objects.filter(estado='muerto').update(
+                estado='pendiente', intentos=0, proximo_intento=None
+            )
+            self.stdout.write(self.style.WARNING(f'♻️  {revividos} eventos muertos regresados a pendiente'))
+
+        if not options['loop']:
+            resultados = procesar_pendientes(options['limite'])
+            self._resumen(resultados)
+            return
+
+        self.stdout.write(self.style.SUCCESS('🔁 Worker de eventos Stripe iniciado (Ctrl+C para salir)'))
+        try:
+            while True:
+                # Igual que en un request: no reutilizar conexiones caídas o viejas
+                close_old_connections()
+                resultados = procesar_pendientes(options['limite'])
+                if resultados:
+                    self._resumen(resultados)
+                # Si la pasada llenó el límite hay más trabajo: no esperar
+                procesados = sum(v for k, v in resultados.items() if k != 'en_espera')
+                if procesados < options['limite']:
+                    time.sleep(options['intervalo'])
+        except KeyboardInterrupt:
+            self.stdout.write('Worker detenido')
+
+    def _resumen(self, resultados):
+        self.stdout.write(self.style.SUCCESS(
+            f"✅ Procesados: {resultados.get('procesado', 0)} | "
+            f"Error (reintento): {resultados.get('error', 0)} | "
+            f"Muertos: {resultados.get('muerto', 0)} | "
+            f"En espera: {resultados.get('en_espera', 0)}"
+        ))
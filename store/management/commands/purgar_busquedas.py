@@ -0,0 +1,35 @@
+"""
+Management command para aplicar la retención de la analítica de búsquedas
+
+Borra por lotes las búsquedas y clics más antiguos que --dias
+(ver store/utils/busquedas.py). Pensado para cron diario.
+
+Uso:
+    python manage.py purgar_busquedas
+    python manage.py purgar_busquedas --dias 30
+"""
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from store.utils.busquedas import purgar
+
+
+class Command(BaseCommand):
+    help = 'Borra las búsquedas y clics registrados fuera del periodo de retención'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--dias',
+            type=int,
+            default=settings.BUSQUEDAS_RETENCION_DIAS,
+            help=f'Días que se conservan (default: BUSQUEDAS_RETENCION_DIAS = {settings.BUSQUEDAS_RETENCION_DIAS})',
+        )
+
+    def handle(self, *args, **options):
+        if options['dias'] < 1:
+            raise CommandError('--dias debe ser al menos 1')
+        busquedas, clics = purgar(options['dias'])
+        self.stdout.write(self.style.SUCCESS(
+            f"✅ {busquedas} búsquedas y {clics} clics de hace más de {options['dias']} días borrados"
+        ))
@@ -0,0 +1,78 @@
+"""
+Management command para reconciliar en lote las órdenes atascadas con Stripe
+
+Busca órdenes en pendiente_pago (o procesando sin stock reducido) con más
+de --minutos de antigüedad, consulta Stripe con un pool de hilos acotado
+y aplica los cambios de estado y stock en bloque
+(ver store/utils/stripe_reconciliacion.py).
+
+Uso:
+    python manage.py reconcile_stripe --dry-run
+    python manage.py reconcile_stripe --minutos 60 --workers 16
+    python manage.py reconcile_stripe --listar         # API de listado en vez de N retrieve
+    STRIPE_API_BASE=http://localhost:12111 python manage.py reconcile_stripe   # stripe-mock
+"""
+
+import time
+
+from django.core.management.base import BaseCommand
+
+from store.utils.stripe_reconciliacion import consultar_stripe, ordenes_atascadas, reconciliar
+
+
+class Command(BaseCommand):
+    help = 'Reconcilia con Stripe las órdenes que siguen pendientes de confirmar'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--minutos',
+            type=int,
+            default=30,
+            help='Antigüedad mínima de la orden en minutos (default: 30)',
+        )
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=8,
+            help='Consultas simultáneas a Stripe (default: 8)',
+        )
+        parser.add_argument(
+            '--limite',
+            type=int,
+            help='Máximo de órdenes a revisar',
+        )
+        parser.add_argument(
+            '--listar',
+            action='store_true',
+            help='Traer las sesiones con Session.list paginado en lugar de un retrieve por orden',
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Mostrar los cambios sin aplicarlos',
+        )
+
+    def handle(self, *args, **options):
+        ordenes = ordenes_atascadas(options['minutos'], options['limite'])
+        if not ordenes:
+            self.stdout.write(self.style.SUCCESS('✅ No hay órdenes atascadas'))
+            return
+
+        self.stdout.write(self.style.WARNING(
+            f'Consultando {len(ordenes)} órdenes en Stripe con {options["workers"]} hilos...'
+        ))
+        inicio = time.monotonic()
+        datos = consultar_stripe(ordenes, workers=options['workers'], listar=options['listar'])
+        cambios = reconciliar(ordenes, datos, dry_run=options['dry_run'])
+
+        for cambio in cambios:
+            stock = ' (+ reducir stock)' if cambio.reducir_stock else ''
+            self.stdout.write(f'  Orden #{cambio.orden_id}: {cambio.anterior} → {cambio.nuevo}{stock}')
+
+        verbo = 'se aplicarían' if options['dry_run'] else 'aplicados'
+        self.stdout.write(self.style.SUCCESS(
+            f'✅ Reconciliación en {time.monotonic() - inicio:.1f}s:\n'
+            f'   - Órdenes revisadas: {len(ordenes)}\n'
+            f'   - Sin respuesta de Stripe: {len(ordenes) - len(datos)}\n'
+            f'   - Cambios {verbo}: {len(cambios)}'
+        ))
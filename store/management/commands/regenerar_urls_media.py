@@ -0,0 +1,78 @@
+"""
+Management command para recalcular las URLs públicas precalculadas de imágenes
+
+Las URLs de imagen (y los srcset de las renditions) se guardan en la BD al
+subir cada archivo (ver ImagenConUrl en store/models.py), igual que las
+miniaturas del resumen de cada orden (Orden.miniaturas). Ejecutar este
+comando después de cambiar MEDIA_URL, USE_S3 o el dominio de CloudFront.
+
+Uso:
+    python manage.py regenerar_urls_media
+    python manage.py regenerar_urls_media --dry-run
+    python manage.py regenerar_urls_media --modelos VarianteImagen Categoria
+"""
+
+from django.core.management.base import BaseCommand
+
+from store.models import Categoria, Orden, Subcategoria, Variante, VarianteImagen
+from store.utils.fragmentos import invalidar_catalogo
+
+MODELOS = {m.__name__: m for m in (Categoria, Subcategoria, Variante, VarianteImagen, Orden)}
+LOTE = 500
+
+
+class Command(BaseCommand):
+    help = 'Recalcula en bloque las URLs de imagen precalculadas (tras cambiar MEDIA_URL/CloudFront)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--modelos',
+            nargs='+',
+            choices=list(MODELOS),
+            default=list(MODELOS),
+            help='Modelos a recalcular (default: todos)',
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Solo contar cuántas filas cambiarían',
+        )
+
+    def handle(self, *args, **options):
+        total = 0
+        for nombre in options['modelos']:
+            modelo = MODELOS[nombre]
+            actualizadas = self._regenerar(modelo, options['dry_run'])
+            total += actualizadas
+            self.stdout.write(f'  {nombre}: {actualizadas} filas con URL distinta')
+
+        if total and not options['dry_run']:
+            invalidar_catalogo()  # bulk_update no dispara señales; las tarjetas llevan las URLs
+
+        verbo = 'cambiarían' if options['dry_run'] else 'actualizadas'
+        self.stdout.write(self.style.SUCCESS(f'✅ {total} filas {verbo}'))
+
+    def _regenerar(self, modelo, dry_run):
+        pendientes, actualizadas, campos = [], 0, set()
+        for obj in modelo.objects.order_by('pk').iterator(chunk_size=LOTE):
+            cambios = {
+                campo: valor for campo, valor in obj.calcular_urls().items()
+                if getattr(obj, campo) != valor
+            }
+            if not cambios:
+                continue
+            for campo, valor in cambios.items():
+                setattr(obj, campo, valor)
+            campos.update(cambios)
+            pendientes.append(obj)
+            if len(pendientes) >= LOTE:
+                actualizadas += self._guardar(modelo, pendientes, campos, dry_run)
+                pendientes, campos = [], set()
+        if pendientes:
+            actualizadas += self._guardar(modelo, pendientes, campos, dry_run)
+        return actualizadas
+
+    def _guardar(self, modelo, objs, campos, dry_run):
+        if not dry_run:
+            modelo.objects.bulk_update(objs, sorted(campos))
+        return len(objs)
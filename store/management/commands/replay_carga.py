@@ -0,0 +1,178 @@
+"""
+Management command que reproduce tráfico realista contra un servidor corriendo
+
+Mezcla escenarios ponderados (recorridos de la tienda, colecciones .http o
+un access log de nginx) con N usuarios virtuales en paralelo y reporta por
+endpoint: requests/s, percentiles, histograma de latencias y % de errores
+(ver store/utils/replay.py). Sirve para dimensionar workers/threads de
+gunicorn y validar cambios de rendimiento con tráfico parecido al real.
+
+El checkout crea Checkout Sessions: levantar stripe-mock y arrancar el
+servidor con STRIPE_API_BASE=http://localhost:12111.
+
+Uso:
+    python manage.py replay_carga --base http://127.0.0.1:8000 --usuarios 20 --duracion 60
+    python manage.py replay_carga --cliente seed_000001:password --pesos checkout=5
+    python manage.py replay_carga --http app.http --http test_security.http --sin-base
+    python manage.py replay_carga --log /var/log/nginx/nowheremx_access.log --sin-base --json carga.json
+"""
+
+import copy
+import json
+
+import requests
+from django.core.management.base import BaseCommand, CommandError
+
+from store.utils.replay import ESCENARIOS_BASE, desde_access_log, desde_http, ejecutar
+
+
+class Command(BaseCommand):
+    help = 'Reproduce escenarios de tráfico ponderados contra un servidor y reporta latencias y errores'
+    requires_system_checks = []
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--base',
+            default='http://127.0.0.1:8000',
+            help='URL del servidor (default: http://127.0.0.1:8000, el gunicorn local)',
+        )
+        parser.add_argument(
+            '--usuarios',
+            type=int,
+            default=10,
+            help='Usuarios virtuales simultáneos (default: 10)',
+        )
+        parser.add_argument(
+            '--duracion',
+            type=float,
+            default=30,
+            help='Segundos de carga (default: 30)',
+        )
+        parser.add_argument(
+            '--iteraciones',
+            type=int,
+            help='Escenarios por usuario en vez de --duracion',
+        )
+        parser.add_argument(
+            '--pausa',
+            type=float,
+            default=0.0,
+            help='Pausa media entre escenarios por usuario, en segundos (default: 0)',
+        )
+        parser.add_argument(
+            '--http',
+            action='append',
+            default=[],
+            help='Colección .http a incluir (repetible)',
+        )
+        parser.add_argument(
+            '--log',
+            action='append',
+            default=[],
+            help='Access log de nginx (formato combined) a incluir (repetible)',
+        )
+        parser.add_argument(
+            '--sin-base',
+            action='store_true',
+            help='No incluir los recorridos predefinidos de la tienda',
+        )
+        parser.add_argument(
+            '--pesos',
+            default='',
+            help='Ajustar pesos: "checkout=5,buscar=0"',
+        )
+        parser.add_argument(
+            '--incluir-escritura',
+            action='store_true',
+            help='Incluir POST/PUT/DELETE de .http y logs (¡modifican datos!)',
+        )
+        parser.add_argument(
+            '--cliente',
+            help='usuario:contraseña de un cliente para el escenario de checkout',
+        )
+        parser.add_argument(
+            '--semilla',
+            type=int,
+            help='Semilla para repetir la misma secuencia de escenarios',
+        )
+        parser.add_argument(
+            '--json',
+            help='Guardar el reporte completo en este archivo',
+        )
+
+    def handle(self, *args, **options):
+        escenarios = [] if options['sin_base'] else copy.deepcopy(ESCENARIOS_BASE)
+        for ruta in options['http']:
+            with open(ruta, encoding='utf-8') as fh:
+                escenarios += desde_http(fh.read(), options['incluir_escritura'])
+        for ruta in options['log']:
+            with open(ruta, encoding='utf-8', errors='replace') as fh:
+                escenarios += desde_access_log(fh, options['incluir_escritura'])
+
+        for ajuste in filter(None, options['pesos'].split(',')):
+            nombre, _, peso = ajuste.partition('=')
+            coincide = [e for e in escenarios if e.nombre == nombre.strip()]
+            if not coincide:
+                raise CommandError(f'Escenario desconocido en --pesos: {nombre}')
+            for escenario in coincide:
+                escenario.peso = float(peso)
+        escenarios = [e for e in escenarios if e.peso > 0]
+
+        login = None
+        if options['cliente']:
+            usuario, _, password = options['cliente'].partition(':')
+            login = (usuario, password)
+        elif any(e.requiere_login for e in escenarios):
+            self.stdout.write(self.style.WARNING('Sin --cliente: se omite el escenario de checkout'))
+
+        total = sum(e.peso for e in escenarios) or 1
+        self.stdout.write(f'Escenarios ({len(escenarios)}):')
+        for escenario in sorted(escenarios, key=lambda e: -e.peso)[:15]:
+            self.stdout.write(f'  {escenario.peso / total:6.1%}  {escenario.nombre}')
+        limite = f'{options["iteraciones"]} escenarios c/u' if options['iteraciones'] else f'{options["duracion"]:.0f}s'
+        self.stdout.write(self.style.WARNING(
+            f'\nCargando {options["base"]} con {options["usuarios"]} usuarios ({limite})...'
+        ))
+
+        try:
+            reporte = ejecutar(
+                options['base'], escenarios,
+                usuarios=options['usuarios'], duracion=options['duracion'],
+                iteraciones=options['iteraciones'], pausa=options['pausa'],
+                login=login, semilla=options['semilla'],
+            )
+        except ValueError as e:
+            raise CommandError(str(e))
+        except requests.RequestException as e:
+            raise CommandError(f'No se pudo cargar el catálogo de {options["base"]}: {e}')
+
+        self._imprimir(reporte)
+        if options['json']:
+            with open(options['json'], 'w', encoding='utf-8') as fh:
+                json.dump(reporte, fh, indent=2, ensure_ascii=False)
+            self.stdout.write(f'Reporte en {options["json"]}')
+
+    def _imprimir(self, reporte):
+        self.stdout.write(
+            f'\n{"endpoint":<48} {"req":>6} {"rps":>7} {"p50":>7} {"p90":>7} {"p99":>7} {"err%":>6} {"4xx":>5}'
+        )
+        for endpoint, m in reporte['endpoints'].items():
+            estilo = self.style.ERROR if m['errores_pct'] else (lambda x: x)
+            self.stdout.write(estilo(
+                f'{endpoint[:48]:<48} {m["requests"]:>6} {m["rps"]:>7} {m["p50_ms"]:>7} '
+                f'{m["p90_ms"]:>7} {m["p99_ms"]:>7} {m["errores_pct"]:>6} {m["http_4xx"]:>5}'
+            ))
+
+        total = reporte['total']
+        if not total:
+            return
+        self.stdout.write('\nLatencia (todas las respuestas):')
+        mayor = max(total['histograma'].values())
+        for cubeta, n in total['histograma'].items():
+            self.stdout.write(f'  {cubeta + "ms":>9} {"█" * max(1, round(40 * n / mayor))} {n}')
+
+        estilo = self.style.ERROR if total['errores_pct'] else self.style.SUCCESS
+        self.stdout.write(estilo(
+            f'\n✅ {total["requests"]} requests en {reporte["duracion_s"]}s: {total["rps"]} req/s | '
+            f'p50 {total["p50_ms"]}ms | p99 {total["p99_ms"]}ms | errores {total["errores_pct"]}%'
+        ))
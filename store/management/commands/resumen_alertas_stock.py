@@ -0,0 +1,100 @@
+"""
+Management command para enviar el resumen diario de alertas de stock
+
+Manda por correo a STOCK_ALERTAS_EMAILS las tallas agotadas y con stock
+bajo (ver store/utils/alertas_stock.py), marcando las nuevas desde el
+resumen anterior. Pensado para cron una vez al día.
+
+Uso:
+    python manage.py resumen_alertas_stock
+    python manage.py resumen_alertas_stock --dry-run      # imprimir sin enviar
+    python manage.py resumen_alertas_stock --recalcular   # revisar todo el catálogo antes
+"""
+
+from django.conf import settings
+from django.core.mail import send_mail
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from store.models import MarcaAgregacion
+from store.utils.alertas_stock import recalcular_todo, resumen
+
+MARCA = 'alertas_stock_resumen'
+
+
+def _linea(alerta, nuevas):
+    variante = alerta.variante
+    nueva = ' (nueva)' if alerta.pk in nuevas else ''
+    sku = f" [{variante.sku}]" if variante.sku else ''
+    return (
+        f"- {variante.producto.nombre} · {variante.color}{sku} · Talla {alerta.talla}: "
+        f"{alerta.stock} (mínimo {alerta.umbral}){nueva}"
+    )
+
+
+class Command(BaseCommand):
+    help = 'Envía por correo el resumen de tallas agotadas y con stock bajo'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Imprimir el resumen sin enviarlo',
+        )
+        parser.add_argument(
+            '--recalcular',
+            action='store_true',
+            help='Reconstruir las alertas revisando todas las variantes antes de enviar',
+        )
+
+    def handle(self, *args, **options):
+        if options['recalcular']:
+            activas = recalcular_todo()
+            self.stdout.write(f"Alertas recalculadas: {activas}")
+
+        marca, _ = MarcaAgregacion.objects.get_or_create(nombre=MARCA)
+        inicio = timezone.now()
+        datos = resumen(desde=marca.procesado_hasta)
+        nuevas = {a.pk for a in datos['nuevas']}
+
+        if not datos['agotadas'] and not datos['bajas']:
+            self.stdout.write(self.style.SUCCESS('✅ Sin alertas de stock'))
+            if not options['dry_run']:
+                marca.procesado_hasta = inicio
+                marca.save(update_fields=['procesado_hasta', 'actualizado_at'])
+            return
+
+        partes = [f"RESUMEN DE STOCK - {timezone.localdate():%Y-%m-%d}", ""]
+        for titulo, alertas in (('AGOTADAS', datos['agotadas']), ('STOCK BAJO', datos['bajas'])):
+            if alertas:
+                partes.append(f"{titulo} ({len(alertas)}):")
+                partes.extend(_linea(a, nuevas) for a in alertas)
+                partes.append("")
+        mensaje = "\n".join(partes)
+        asunto = (
+            f"Stock: {len(datos['agotadas'])} agotadas, {len(datos['bajas'])} bajas "
+            f"({len(nuevas)} nuevas)"
+        )
+
+        if options['dry_run']:
+            self.stdout.write(f"{asunto}\n\n{mensaje}")
+            return
+
+        destinatarios = settings.STOCK_ALERTAS_EMAILS
+        if not destinatarios:
+            raise CommandError('STOCK_ALERTAS_EMAILS está vacío: no hay a quién enviar el resumen')
+        try:
+            send_mail(
+                subject=asunto,
+                message=mensaje,
+                from_email=getattr(settings, 'DEFAULT_FROM_EMAIL', 'noreply@nowhere.com'),
+                recipient_list=list(destinatarios),
+                fail_silently=False,
+            )
+        except Exception as e:
+            # La marca no avanza: el siguiente resumen vuelve a señalar estas como nuevas
+            raise CommandError(f'No se pudo enviar el resumen: {e}')
+
+        marca.procesado_hasta = inicio
+        marca.save(update_fields=['procesado_hasta', 'actualizado_at'])
+        self.stdout.write(self.style.SUCCESS(f'✅ Resumen enviado a {len(destinatarios)} destinatarios: {asunto}'))
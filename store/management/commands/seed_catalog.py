@@ -0,0 +1,78 @@
+"""
+Management command que genera un catálogo sintético para pruebas de carga
+
+Crea en bloque categorías/subcategorías, productos con variantes, tallas,
+galería de imágenes, clientes con wishlist y órdenes con detalle
+(ver store/utils/catalogo_sintetico.py). Es acumulativo: cada corrida
+agrega más filas; --limpiar borra solo lo generado.
+
+Uso:
+    python manage.py seed_catalog --products 1000 --variants-per 3 --orders 5000
+    python manage.py seed_catalog --products 100 --semilla 7
+    python manage.py seed_catalog --limpiar
+"""
+
+import time
+
+from django.core.management.base import BaseCommand
+
+from store.utils.catalogo_sintetico import generar_catalogo, limpiar_catalogo
+
+
+class Command(BaseCommand):
+    help = 'Genera productos, variantes, imágenes y órdenes sintéticas en bloque'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--products',
+            type=int,
+            default=100,
+            help='Productos a crear (default: 100)',
+        )
+        parser.add_argument(
+            '--variants-per',
+            type=int,
+            default=3,
+            help='Variantes (colores) por producto (default: 3)',
+        )
+        parser.add_argument(
+            '--orders',
+            type=int,
+            default=0,
+            help='Órdenes a crear (default: 0)',
+        )
+        parser.add_argument(
+            '--clientes',
+            type=int,
+            help='Clientes a crear para las órdenes (default: orders / 5)',
+        )
+        parser.add_argument(
+            '--semilla',
+            type=int,
+            default=42,
+            help='Semilla del generador para resultados repetibles (default: 42)',
+        )
+        parser.add_argument(
+            '--limpiar',
+            action='store_true',
+            help='Borrar el catálogo sintético en lugar de generarlo',
+        )
+
+    def handle(self, *args, **options):
+        if options['limpiar']:
+            borrados = limpiar_catalogo()
+            self.stdout.write(self.style.SUCCESS(f'✅ {borrados} filas del catálogo sintético borradas'))
+            return
+
+        inicio = time.monotonic()
+        creados = generar_catalogo(
+            productos=options['products'],
+            variantes_por=options['variants_per'],
+            ordenes=options['orders'],
+            clientes=options['clientes'],
+            semilla=options['semilla'],
+        )
+        detalle = '\n'.join(f'   - {modelo.capitalize()}: {n}' for modelo, n in creados.items())
+        self.stdout.write(self.style.SUCCESS(
+            f'✅ Catálogo sintético generado en {time.monotonic() - inicio:.1f}s:\n{detalle}'
+        ))
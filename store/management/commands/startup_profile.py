@@ -0,0 +1,175 @@
+"""
+Management command para medir el costo de arranque (tiempo de import y RSS)
+
+Arranca un intérprete limpio con `-X importtime`, ejecuta django.setup()
+y después importa los módulos indicados (por defecto el ROOT_URLCONF, que
+es lo que carga el primer request de cada worker). Reporta:
+  - tiempo y memoria residente de cada etapa,
+  - los módulos más lentos de importar,
+  - qué SDKs de terceros quedaron cargados (deberían cargarse en su primer uso).
+
+Uso:
+    python manage.py startup_profile
+    python manage.py startup_profile --modulos store.urls store.views.payment --top 30
+    python manage.py startup_profile --json > arranque.json
+"""
+
+import json
+import os
+import subprocess
+import sys
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+
+# SDKs que no deberían cargarse al arrancar (ver store/utils/clients.py)
+SDKS_PEREZOSOS = ['stripe', 'twilio', 'boto3', 'botocore', 'PIL.Image']
+
+MARCA = '__STARTUP_PROFILE__'
+
+# Script que corre en el proceso hijo
+SCRIPT_HIJO = r'''
+import importlib, json, sys, time
+
+def rss_kb():
+    try:
+        with open('/proc/self/status') as fh:
+            for linea in fh:
+                if linea.startswith('VmRSS:'):
+                    return int(linea.split()[1])
+    except OSError:
+        pass
+    import resource
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss // 1024 if sys.platform == 'darwin' else rss
+
+etapas = []
+def medir(nombre, fn):
+    rss0, t0 = rss_kb(), time.perf_counter()
+    fn()
+    etapas.append({
+        'etapa': nombre,
+        'ms': round((time.perf_counter() - t0) * 1000, 1),
+        'rss_kb': rss_kb(),
+        'delta_rss_kb': rss_kb() - rss0,
+    })
+
+etapas.append({'etapa': 'interprete', 'ms': 0.0, 'rss_kb': rss_kb(), 'delta_rss_kb': 0})
+import django
+medir('django.setup()', django.setup)
+for modulo in MODULOS:
+    medir(modulo, lambda m=modulo: importlib.import_module(m))
+
+sdks = {nombre: nombre in sys.modules for nombre in SDKS}
+print(MARCA + json.dumps({'etapas': etapas, 'sdks': sdks}))
+'''
+
+
+def parsear_importtime(stderr):
+    """
+    Convierte la salida de `-X importtime` en una lista de
+    {'modulo', 'self_us', 'acumulado_us'}.
+    """
+    filas = []
+    for linea in stderr.splitlines():
+        if not linea.startswith('import time:'):
+            continue
+        partes = linea[len('import time:'):].split('|')
+        if len(partes) != 3:
+            continue
+        try:
+            self_us = int(partes[0].strip())
+            acumulado_us = int(partes[1].strip())
+        except ValueError:
+            continue  # encabezado
+        filas.append({
+            'modulo': partes[2].strip(),
+            'self_us': self_us,
+            'acumulado_us': acumulado_us,
+        })
+    return filas
+
+
+class Command(BaseCommand):
+    help = 'Reporta el tiempo de import y la memoria residente del arranque de la app'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--modulos',
+            nargs='+',
+            help='Módulos a importar después de django.setup() (default: ROOT_URLCONF)',
+        )
+        parser.add_argument(
+            '--top',
+            type=int,
+            default=20,
+            help='Cantidad de módulos más lentos a mostrar (default: 20)',
+        )
+        parser.add_argument(
+            '--json',
+            action='store_true',
+            help='Imprime el resultado como JSON',
+        )
+
+    def handle(self, *args, **options):
+        modulos = options.get('modulos') or [settings.ROOT_URLCONF]
+
+        script = (
+            f'MODULOS = {modulos!r}\nSDKS = {SDKS_PEREZOSOS!r}\nMARCA = {MARCA!r}\n'
+            + SCRIPT_HIJO
+        )
+        env = os.environ.copy()
+        env['PYTHONPATH'] = os.pathsep.join(p for p in sys.path if p)
+
+        proceso = subprocess.run(
+            [sys.executable, '-X', 'importtime', '-c', script],
+            cwd=str(settings.BASE_DIR),
+            env=env,
+            capture_output=True,
+            text=True,
+        )
+
+        linea = next(
+            (l for l in proceso.stdout.splitlines() if l.startswith(MARCA)), None
+        )
+        if proceso.returncode != 0 or linea is None:
+            errores = [l for l in proceso.stderr.splitlines() if not l.startswith('import time:')]
+            raise CommandError('El proceso de medición falló:\n' + '\n'.join(errores[-20:]))
+
+        resultado = json.loads(linea[len(MARCA):])
+        imports = parsear_importtime(proceso.stderr)
+        lentos = sorted(imports, key=lambda f: f['acumulado_us'], reverse=True)[:options['top']]
+        resultado['mas_lentos'] = lentos
+        resultado['total_modulos'] = len(imports)
+
+        if options['json']:
+            self.stdout.write(json.dumps(resultado, indent=2))
+            return
+
+        self._imprimir(resultado)
+
+    def _imprimir(self, resultado):
+        self.stdout.write(self.style.SUCCESS('⏱️  Etapas de arranque'))
+        self.stdout.write(f"   {'etapa':<40} {'ms':>9} {'RSS MB':>9} {'Δ MB':>8}")
+        for etapa in resultado['etapas']:
+            self.stdout.write(
+                f"   {etapa['etapa']:<40} {etapa['ms']:>9.1f} "
+                f"{etapa['rss_kb'] / 1024:>9.1f} {etapa['delta_rss_kb'] / 1024:>8.1f}"
+            )
+
+        self.stdout.write(self.style.SUCCESS(
+            f"\n🐢 Módulos más lentos (acumulado) de {resultado['total_modulos']} importados"
+        ))
+        for fila in resultado['mas_lentos']:
+            self.stdout.write(
+                f"   {fila['acumulado_us'] / 1000:>9.1f} ms  "
+                f"(propio {fila['self_us'] / 1000:>7.1f} ms)  {fila['modulo']}"
+            )
+
+        self.stdout.write(self.style.SUCCESS('\n📦 SDKs de terceros'))
+        for nombre, cargado in resultado['sdks'].items():
+            if cargado:
+                self.stdout.write(self.style.WARNING(f'   ⚠️  {nombre}: cargado en el arranque'))
+            else:
+                self.stdout.write(f'   ✅ {nombre}: diferido hasta su primer uso')
@@ -0,0 +1,161 @@
+"""
+Management command para sincronizar media entre S3 y disco local
+
+Descarga (pull) o sube (push) solo los archivos que cambiaron, en paralelo
+y con descargas reanudables (ver store/utils/s3sync.py).
+
+Uso:
+    python manage.py sync_media --dry-run                  # qué se transferiría
+    python manage.py sync_media                            # S3 media/ → MEDIA_ROOT
+    python manage.py sync_media --delete --workers 32      # espejo exacto
+    python manage.py sync_media push --bucket nuevo-bucket # sembrar un bucket
+    python manage.py sync_media --prefijo static/ --destino static
+    python manage.py sync_media --endpoint-url http://localhost:9000   # MinIO
+"""
+
+import time
+from pathlib import Path
+
+from decouple import config
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from store.utils.clients import get_s3_client
+from store.utils.s3sync import sincronizar
+
+
+def _mb(n):
+    return f'{n / (1024 * 1024):.2f} MB'
+
+
+class Command(BaseCommand):
+    help = 'Sincroniza incrementalmente la media entre S3 y una carpeta local'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'direccion',
+            nargs='?',
+            choices=['pull', 'push'],
+            default='pull',
+            help='pull: S3 → local (default); push: local → S3',
+        )
+        parser.add_argument(
+            '--bucket',
+            help='Bucket (default: AWS_STORAGE_BUCKET_NAME)',
+        )
+        parser.add_argument(
+            '--prefijo',
+            help='Prefijo en el bucket (default: AWS_LOCATION, "media")',
+        )
+        parser.add_argument(
+            '--destino',
+            help='Carpeta local (default: MEDIA_ROOT o BASE_DIR/media)',
+        )
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=16,
+            help='Transferencias simultáneas (default: 16)',
+        )
+        parser.add_argument(
+            '--delete',
+            action='store_true',
+            help='Borrar en el destino lo que ya no existe en el origen',
+        )
+        parser.add_argument(
+            '--checksum',
+            action='store_true',
+            help='Comparar MD5 contra el ETag en lugar de la fecha de modificación',
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Solo mostrar qué se transferiría y cuántos bytes',
+        )
+        parser.add_argument(
+            '--endpoint-url',
+            help='Endpoint S3 alternativo (MinIO, moto) para pruebas locales',
+        )
+
+    def handle(self, *args, **options):
+        direccion = options['direccion']
+        # Con USE_S3=False los AWS_* no están en settings: leerlos del .env
+        bucket = (
+            options['bucket']
+            or getattr(settings, 'AWS_STORAGE_BUCKET_NAME', None)
+            or config('AWS_STORAGE_BUCKET_NAME', default='')
+        )
+        if not bucket:
+            raise CommandError('Indica --bucket o define AWS_STORAGE_BUCKET_NAME')
+        prefijo = options['prefijo']
+        if prefijo is None:
+            prefijo = getattr(settings, 'AWS_LOCATION', 'media')
+        destino = Path(
+            options['destino'] or settings.MEDIA_ROOT or Path(settings.BASE_DIR) / 'media'
+        )
+
+        from botocore.config import Config
+        from botocore.exceptions import BotoCoreError, ClientError
+        workers = max(1, options['workers'])
+        credenciales = {
+            opcion: config(variable, default=None)
+            for opcion, variable in (
+                ('aws_access_key_id', 'AWS_ACCESS_KEY_ID'),
+                ('aws_secret_access_key', 'AWS_SECRET_ACCESS_KEY'),
+                ('region_name', 'AWS_S3_REGION_NAME'),
+            )
+        }
+        client = get_s3_client(
+            options['endpoint_url'],
+            config=Config(max_pool_connections=workers),
+            **{k: v for k, v in credenciales.items() if v},
+        )
+
+        flecha = f's3://{bucket}/{prefijo} → {destino}' if direccion == 'pull' \
+            else f'{destino} → s3://{bucket}/{prefijo}'
+        self.stdout.write(self.style.WARNING(f'🔄 {direccion}: {flecha}'))
+
+        inicio = time.monotonic()
+        try:
+            plan, resultado = sincronizar(
+                client, bucket, prefijo, destino,
+                direccion=direccion,
+                workers=workers,
+                borrar=options['delete'],
+                checksum=options['checksum'],
+                dry_run=options['dry_run'],
+                progreso=self._progreso,
+            )
+        except (BotoCoreError, ClientError) as e:
+            raise CommandError(f'Error accediendo a S3: {e}')
+
+        if resultado is None:
+            self.stdout.write(self.style.SUCCESS(
+                f'🔍 Dry run:\n'
+                f'   - Por transferir: {len(plan.copiar)} archivos ({_mb(plan.bytes_a_copiar)})\n'
+                f'   - Sin cambios: {plan.omitidos}\n'
+                f'   - Por borrar: {len(plan.borrar)}'
+            ))
+            for obj in plan.copiar[:20]:
+                self.stdout.write(f'  ↕ {obj.ruta} ({_mb(obj.tamano)})')
+            for ruta in plan.borrar[:20]:
+                self.stdout.write(f'  ✗ {ruta}')
+            return
+
+        segundos = time.monotonic() - inicio
+        self.stdout.write(self.style.SUCCESS(
+            f'✅ Sincronización completada en {segundos:.1f}s:\n'
+            f'   - Transferidos: {resultado.copiados} ({_mb(resultado.bytes_copiados)}, '
+            f'{resultado.reanudados} reanudados)\n'
+            f'   - Sin cambios: {plan.omitidos}\n'
+            f'   - Borrados: {resultado.borrados}\n'
+            f'   - Errores: {len(resultado.errores)}'
+        ))
+        for ruta, error in resultado.errores[:20]:
+            self.stdout.write(self.style.ERROR(f'  - {ruta}: {error}'))
+        if resultado.errores:
+            raise CommandError(f'{len(resultado.errores)} archivos con error; vuelve a ejecutar para reintentar')
+
+    def _progreso(self, resultado, total):
+        if resultado.copiados % 100 == 0 or resultado.copiados == total:
+            self.stdout.write(f'  {resultado.copiados}/{total} ({_mb(resultado.bytes_copiados)})')
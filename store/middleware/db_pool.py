@@ -0,0 +1,91 @@
+"""
+Métricas de conexiones a la base de datos por proceso
+
+Cada DB_POOL_LOG_CADA requests registra cuántas conexiones nuevas se
+abrieron (con DB_CONN_MODE=persistent/pool deberían ser casi cero) y, si
+hay pool de psycopg, sus conexiones abiertas, utilización y tiempo de espera por
+conexión desde el último registro.
+
+Con pool, connection_created se emite en cada préstamo del pool y no en cada
+conexión real: las conexiones nuevas salen entonces de `connections_num`
+de las estadísticas del pool.
+"""
+import logging
+import os
+
+from django.conf import settings
+from django.db import connection
+from django.db.backends.signals import connection_created
+from django.utils.deprecation import MiddlewareMixin
+
+logger = logging.getLogger(__name__)
+
+_conexiones_nuevas = 0
+
+
+def _contar_conexion(sender, connection, **kwargs):
+    global _conexiones_nuevas
+    if getattr(connection, 'pool', None) is None:
+        _conexiones_nuevas += 1
+
+
+connection_created.connect(_contar_conexion, dispatch_uid='db_pool_contar_conexion')
+
+
+def metricas_pool(pool):
+    """Estadísticas del pool desde la última llamada (pop_stats reinicia los contadores)."""
+    stats = pool.pop_stats()
+    peticiones = stats.get('requests_num', 0)
+    abiertas = stats.get('pool_size', 0)
+    en_uso = abiertas - stats.get('pool_available', 0)
+    return {
+        'nuevas': stats.get('connections_num', 0),
+        'abiertas': abiertas,
+        'max': stats.get('pool_max', pool.max_size),
+        'en_uso': en_uso,
+        'utilizacion': en_uso / pool.max_size if pool.max_size else 0,
+        'esperando': stats.get('requests_waiting', 0),
+        'peticiones': peticiones,
+        'espera_ms': stats.get('requests_wait_ms', 0) / peticiones if peticiones else 0,
+        'timeouts': stats.get('requests_errors', 0),
+    }
+
+
+class PoolMetricsMiddleware(MiddlewareMixin):
+    """Registra periódicamente la reutilización de conexiones y el estado del pool"""
+
+    def __init__(self, get_response=None):
+        super().__init__(get_response)
+        self.requests = 0
+        self.cada = getattr(settings, 'DB_POOL_LOG_CADA', 500)
+
+    def process_response(self, request, response):
+        self.requests += 1
+        if self.cada and self.requests >= self.cada:
+            self.registrar()
+        return response
+
+    def registrar(self):
+        global _conexiones_nuevas
+        nivel = logging.INFO
+        detalle_pool = ''
+        nuevas = _conexiones_nuevas
+
+        pool = getattr(connection, 'pool', None)
+        if pool is not None:
+            m = metricas_pool(pool)
+            nuevas = m['nuevas']
+            detalle_pool = (
+                f" pool={m['en_uso']}/{m['abiertas']} (max {m['max']}, {m['utilizacion']:.0%})"
+                f" esperando={m['esperando']} espera_media={m['espera_ms']:.1f}ms"
+                f" timeouts={m['timeouts']}"
+            )
+            if m['timeouts'] or m['esperando']:
+                nivel = logging.WARNING
+
+        logger.log(
+            nivel,
+            f"[DB] pid={os.getpid()} requests={self.requests} conexiones_nuevas={nuevas}{detalle_pool}",
+        )
+        self.requests = 0
+        _conexiones_nuevas = 0
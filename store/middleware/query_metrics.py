@@ -0,0 +1,72 @@
+"""
+Conteo de consultas SQL por vista
+
+Cuenta las consultas, las duplicadas y el tiempo en BD de cada request.
+Con QUERY_METRICS (por defecto = DEBUG) lo expone en la cabecera
+Server-Timing, visible en la pestaña Network del navegador.
+
+Las vistas con @query_budget(n) se comparan contra su presupuesto: si lo
+exceden se registra un WARNING y, con QUERY_BUDGET_ESTRICTO (tests), se
+lanza PresupuestoQueriesExcedido para que el test falle.
+
+Bajo ASGI (GUNICORN_MODO=asgi) el ORM corre en hilos de sync_to_async a los
+que no llega el execute_wrapper: ahí el middleware solo deja pasar el
+request sin contar, para no forzar a toda la pila a un hilo síncrono.
+El conteo sigue activo en WSGI, que es donde corren los tests.
+"""
+import logging
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.db import connection
+
+from store.utils.query_metrics import MetricasQueries, PresupuestoQueriesExcedido
+
+logger = logging.getLogger(__name__)
+
+
+class QueryMetricsMiddleware:
+    """Mide las consultas de cada request y aplica los presupuestos por vista"""
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.get_response(request)
+
+        metricas = MetricasQueries()
+        with connection.execute_wrapper(metricas):
+            response = self.get_response(request)
+
+        if getattr(settings, 'QUERY_METRICS', False):
+            response['Server-Timing'] = metricas.server_timing()
+
+        presupuesto = getattr(request, '_query_budget', None)
+        if presupuesto is not None and metricas.total > presupuesto:
+            vista = getattr(request, '_query_budget_vista', request.path)
+            mensaje = (
+                f"{vista}: {metricas.total} consultas (presupuesto {presupuesto}, "
+                f"{metricas.duplicadas} duplicadas)"
+            )
+            repetidas = metricas.repetidas()
+            if repetidas:
+                sql, veces = repetidas[0]
+                mensaje += f" — más repetida ×{veces}: {sql[:200]}"
+            if getattr(settings, 'QUERY_BUDGET_ESTRICTO', False):
+                raise PresupuestoQueriesExcedido(mensaje)
+            logger.warning(f"[QUERY BUDGET] {mensaje}")
+
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        presupuesto = getattr(view_func, 'query_budget', None)
+        if presupuesto is not None:
+            request._query_budget = presupuesto
+            request._query_budget_vista = f'{view_func.__module__}.{view_func.__name__}'
+        return None
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.8 on 2026-10-19 12:52
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('store', '0018_producto_bodega'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='varianteimagen',
+            name='renditions',
+            field=models.JSONField(blank=True, default=dict, help_text='Versiones redimensionadas: {"webp": {"400": "ruta"}, "avif": {...}} (ver store/utils/renditions.py)'),
+        ),
+    ]
@@ -0,0 +1,38 @@
+# Generated by Django 5.2.8 on 2026-10-19 13:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('store', '0019_varianteimagen_renditions'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='categoria',
+            name='imagen_url_cache',
+            field=models.CharField(blank=True, default='', editable=False, help_text='URL pública de la imagen precalculada al guardar', max_length=500),
+        ),
+        migrations.AddField(
+            model_name='subcategoria',
+            name='imagen_url_cache',
+            field=models.CharField(blank=True, default='', editable=False, help_text='URL pública de la imagen precalculada al guardar', max_length=500),
+        ),
+        migrations.AddField(
+            model_name='variante',
+            name='imagen_url_cache',
+            field=models.CharField(blank=True, default='', editable=False, help_text='URL pública de la imagen precalculada al guardar', max_length=500),
+        ),
+        migrations.AddField(
+            model_name='varianteimagen',
+            name='imagen_url_cache',
+            field=models.CharField(blank=True, default='', editable=False, help_text='URL pública de la imagen precalculada al guardar', max_length=500),
+        ),
+        migrations.AddField(
+            model_name='varianteimagen',
+            name='srcsets_cache',
+            field=models.JSONField(blank=True, default=dict, editable=False, help_text='srcset precalculado por formato: {"webp": "url 200w, ...", "avif": "..."}'),
+        ),
+    ]
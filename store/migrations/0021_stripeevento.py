@@ -0,0 +1,36 @@
+# Generated by Django 5.2.8 on 2026-10-19 13:02
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('store', '0020_imagen_url_cache'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StripeEvento',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('event_id', models.CharField(max_length=255, unique=True)),
+                ('tipo', models.CharField(db_index=True, max_length=100)),
+                ('clave_orden', models.CharField(blank=True, db_index=True, default='', help_text='PaymentIntent (o Session) al que pertenece; los eventos de una misma clave se procesan en orden', max_length=255)),
+                ('payload', models.JSONField()),
+                ('creado_stripe', models.DateTimeField(help_text='Campo "created" del evento en Stripe')),
+                ('estado', models.CharField(choices=[('pendiente', 'Pendiente'), ('procesado', 'Procesado'), ('error', 'Error (se reintentará)'), ('muerto', 'Muerto (intentos agotados)')], default='pendiente', max_length=20)),
+                ('intentos', models.PositiveIntegerField(default=0)),
+                ('ultimo_error', models.TextField(blank=True, default='')),
+                ('proximo_intento', models.DateTimeField(blank=True, null=True)),
+                ('recibido_at', models.DateTimeField(auto_now_add=True)),
+                ('procesado_at', models.DateTimeField(blank=True, null=True)),
+            ],
+            options={
+                'verbose_name': 'Evento de Stripe',
+                'verbose_name_plural': 'Eventos de Stripe',
+                'ordering': ['creado_stripe', 'id'],
+                'indexes': [models.Index(fields=['estado', 'creado_stripe'], name='store_strip_estado_ae6f29_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,31 @@
+# Generated by Django 5.2.8 on 2026-10-19 13:40
+
+from django.db import migrations
+
+
+def normalizar_skus(apps, schema_editor):
+    """
+    Antes del índice único: SKU vacío → NULL y los repetidos (salvo el más
+    antiguo) reciben el sufijo -<id> para poder corregirlos a mano.
+    """
+    Variante = apps.get_model('store', 'Variante')
+    Variante.objects.filter(sku__regex=r'^\s*$').update(sku=None)
+    vistos = set()
+    for variante in Variante.objects.exclude(sku=None).order_by('id').only('id', 'sku'):
+        sku = variante.sku.strip()
+        if sku in vistos:
+            sku = f'{sku}-{variante.id}'
+        vistos.add(sku)
+        if sku != variante.sku:
+            Variante.objects.filter(pk=variante.pk).update(sku=sku)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('store', '0021_stripeevento'),
+    ]
+
+    operations = [
+        migrations.RunPython(normalizar_skus, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,34 @@
+# Generated by Django 5.2.8 on 2026-10-19 13:40
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('store', '0022_normalizar_skus'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='variante',
+            name='sku',
+            field=models.CharField(blank=True, help_text='Código interno o UPC (ej: NIKE-AIR-38-BLK). Único; vacío se guarda como NULL', max_length=100, null=True, unique=True),
+        ),
+        migrations.CreateModel(
+            name='CodigoBarras',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('codigo', models.CharField(help_text='UPC/EAN tal como lo lee el escáner', max_length=64, unique=True)),
+                ('talla', models.CharField(max_length=20)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('variante', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='codigos', to='store.variante')),
+            ],
+            options={
+                'verbose_name': 'Código de barras',
+                'verbose_name_plural': 'Códigos de barras',
+                'constraints': [models.UniqueConstraint(fields=('variante', 'talla'), name='unique_codigo_variante_talla')],
+            },
+        ),
+    ]
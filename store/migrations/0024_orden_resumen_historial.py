@@ -0,0 +1,91 @@
+# Generated by Django 5.2.8 on 2026-10-19 13:43
+
+from django.db import migrations, models
+
+LOTE = 500
+MINIATURAS = 4
+
+
+def resumir_ordenes(apps, schema_editor):
+    """Rellena el resumen de las órdenes existentes (misma lógica que Orden.actualizar_resumen)."""
+    Orden = apps.get_model('store', 'Orden')
+    OrdenDetalle = apps.get_model('store', 'OrdenDetalle')
+    VarianteImagen = apps.get_model('store', 'VarianteImagen')
+
+    ids = list(Orden.objects.order_by('id').values_list('id', flat=True))
+    for inicio in range(0, len(ids), LOTE):
+        lote = ids[inicio:inicio + LOTE]
+        detalles = {}
+        for d in OrdenDetalle.objects.filter(order_id__in=lote).select_related('variante__producto').order_by('id'):
+            detalles.setdefault(d.order_id, []).append(d)
+
+        primeros = {}
+        for orden_id, lineas in detalles.items():
+            elegidos = []
+            for d in lineas:
+                if len(elegidos) == MINIATURAS:
+                    break
+                if all(e.variante_id != d.variante_id for e in elegidos):
+                    elegidos.append(d)
+            primeros[orden_id] = elegidos
+
+        todos = [d for elegidos in primeros.values() for d in elegidos]
+        imagenes = {}
+        galeria = VarianteImagen.objects.filter(
+            models.Q(variante_id__in={d.variante_id for d in todos})
+            | models.Q(
+                variante__producto_id__in={d.variante.producto_id for d in todos},
+                variante__es_variante_principal=True,
+            )
+        ).select_related('variante').order_by('orden', 'id')
+        for img in galeria:
+            if img.imagen:
+                url = img.imagen_url_cache or img.imagen.url
+                imagenes.setdefault(img.variante_id, url)
+                if img.variante.es_variante_principal:
+                    imagenes.setdefault(('producto', img.variante.producto_id), url)
+
+        ordenes = list(Orden.objects.filter(id__in=lote))
+        for orden in ordenes:
+            lineas = detalles.get(orden.id, [])
+            orden.total_piezas = sum(d.cantidad for d in lineas)
+            orden.total_lineas = len(lineas)
+            orden.miniaturas = [
+                {
+                    'producto_nombre': d.variante.producto.nombre,
+                    'imagen': imagenes.get(d.variante_id) or imagenes.get(('producto', d.variante.producto_id), ''),
+                    'cantidad': d.cantidad,
+                }
+                for d in primeros.get(orden.id, [])
+            ]
+        Orden.objects.bulk_update(ordenes, ['total_piezas', 'total_lineas', 'miniaturas'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('store', '0023_variante_sku_unico_codigobarras'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='orden',
+            name='miniaturas',
+            field=models.JSONField(blank=True, default=list, help_text='Primeros productos: [{"producto_nombre", "imagen", "cantidad"}] (máx. MINIATURAS)'),
+        ),
+        migrations.AddField(
+            model_name='orden',
+            name='total_lineas',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='orden',
+            name='total_piezas',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddIndex(
+            model_name='orden',
+            index=models.Index(fields=['cliente', '-created_at', '-id'], name='orden_cliente_fecha_idx'),
+        ),
+        migrations.RunPython(resumir_ordenes, migrations.RunPython.noop),
+    ]
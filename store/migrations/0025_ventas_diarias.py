@@ -0,0 +1,56 @@
+# Generated by Django 5.2.8 on 2026-10-19 13:47
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def updated_at_desde_creacion(apps, schema_editor):
+    """Las órdenes existentes toman su fecha de creación como última modificación."""
+    Orden = apps.get_model('store', 'Orden')
+    Orden.objects.update(updated_at=models.F('created_at'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('store', '0024_orden_resumen_historial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MarcaAgregacion',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('nombre', models.CharField(max_length=50, unique=True)),
+                ('procesado_hasta', models.DateTimeField(blank=True, null=True)),
+                ('actualizado_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+        migrations.AddField(
+            model_name='orden',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, db_index=True),
+        ),
+        migrations.CreateModel(
+            name='VentaDiaria',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('dia', models.DateField()),
+                ('talla', models.CharField(max_length=20)),
+                ('status', models.CharField(max_length=50)),
+                ('unidades', models.IntegerField(default=0)),
+                ('ingresos', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('ordenes', models.PositiveIntegerField(default=0, help_text='Órdenes distintas en el grupo')),
+                ('categoria', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='store.categoria')),
+                ('producto', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='store.producto')),
+                ('variante', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='store.variante')),
+            ],
+            options={
+                'verbose_name': 'Venta diaria',
+                'verbose_name_plural': 'Ventas diarias',
+                'indexes': [models.Index(fields=['producto', 'dia'], name='venta_producto_dia_idx'), models.Index(fields=['categoria', 'dia'], name='venta_categoria_dia_idx')],
+                'constraints': [models.UniqueConstraint(fields=('dia', 'variante', 'talla', 'status'), name='unique_venta_diaria')],
+            },
+        ),
+        migrations.RunPython(updated_at_desde_creacion, migrations.RunPython.noop),
+    ]
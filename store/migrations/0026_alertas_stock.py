@@ -0,0 +1,67 @@
+# Generated by Django 5.2.8 on 2026-10-19 13:51
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+LOTE = 1000
+
+
+def alertas_iniciales(apps, schema_editor):
+    """Única revisión completa: de aquí en adelante solo se evalúan las tallas que cambian."""
+    Variante = apps.get_model('store', 'Variante')
+    AlertaStock = apps.get_model('store', 'AlertaStock')
+    default = getattr(settings, 'STOCK_UMBRAL_DEFAULT', 2)
+
+    ultimo = 0
+    while True:
+        bloque = list(
+            Variante.objects.filter(pk__gt=ultimo).order_by('pk').only('id', 'tallas_stock')[:LOTE]
+        )
+        if not bloque:
+            return
+        alertas = []
+        for variante in bloque:
+            for talla, stock in (variante.tallas_stock or {}).items():
+                if stock <= 0:
+                    alertas.append(AlertaStock(variante_id=variante.id, talla=talla, estado='agotado', stock=stock, umbral=default))
+                elif stock <= default:
+                    alertas.append(AlertaStock(variante_id=variante.id, talla=talla, estado='bajo', stock=stock, umbral=default))
+        AlertaStock.objects.bulk_create(alertas)
+        ultimo = bloque[-1].pk
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('store', '0025_ventas_diarias'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='variante',
+            name='umbrales_stock',
+            field=models.JSONField(blank=True, default=dict, help_text='Dict de talla→stock mínimo antes de alertar. Sin talla: STOCK_UMBRAL_DEFAULT'),
+        ),
+        migrations.CreateModel(
+            name='AlertaStock',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('talla', models.CharField(max_length=20)),
+                ('estado', models.CharField(choices=[('agotado', 'Agotado'), ('bajo', 'Stock bajo')], max_length=10)),
+                ('stock', models.IntegerField()),
+                ('umbral', models.PositiveIntegerField()),
+                ('creada_at', models.DateTimeField(auto_now_add=True)),
+                ('actualizada_at', models.DateTimeField(auto_now=True)),
+                ('variante', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='alertas_stock', to='store.variante')),
+            ],
+            options={
+                'verbose_name': 'Alerta de stock',
+                'verbose_name_plural': 'Alertas de stock',
+                'ordering': ['stock', 'creada_at'],
+                'indexes': [models.Index(fields=['estado', 'stock'], name='alerta_estado_stock_idx')],
+                'constraints': [models.UniqueConstraint(fields=('variante', 'talla'), name='unique_alerta_variante_talla')],
+            },
+        ),
+        migrations.RunPython(alertas_iniciales, migrations.RunPython.noop),
+    ]
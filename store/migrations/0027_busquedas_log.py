@@ -0,0 +1,41 @@
+# Generated by Django 5.2.8 on 2026-10-19 13:53
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('store', '0026_alertas_stock'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='BusquedaClic',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('token', models.CharField(db_index=True, max_length=32)),
+                ('posicion', models.PositiveSmallIntegerField(blank=True, null=True)),
+                ('created_at', models.DateTimeField(db_index=True, default=django.utils.timezone.now)),
+                ('producto', models.ForeignKey(db_constraint=False, on_delete=django.db.models.deletion.DO_NOTHING, related_name='+', to='store.producto')),
+            ],
+        ),
+        migrations.CreateModel(
+            name='BusquedaLog',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('token', models.CharField(help_text='busqueda_id devuelto al cliente para medir clics', max_length=32, unique=True)),
+                ('consulta', models.CharField(help_text='Texto normalizado: minúsculas, sin acentos ni espacios repetidos', max_length=200)),
+                ('origen', models.CharField(default='api', max_length=20)),
+                ('filtros', models.JSONField(blank=True, default=dict)),
+                ('resultados', models.PositiveIntegerField()),
+                ('latencia_ms', models.PositiveIntegerField()),
+                ('created_at', models.DateTimeField(default=django.utils.timezone.now)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['created_at'], name='busqueda_fecha_idx'), models.Index(fields=['consulta', 'created_at'], name='busqueda_consulta_idx')],
+            },
+        ),
+    ]
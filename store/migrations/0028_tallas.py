@@ -0,0 +1,53 @@
+# Generated by Django 5.2.8 on 2026-10-19 13:58
+
+from django.db import migrations, models
+
+LOTE = 1000
+
+
+def tallas_existentes(apps, schema_editor):
+    """Registra las claves que ya hay en tallas_stock; las nuevas las agrega la señal de Variante."""
+    from store.utils.tallas import CLAVE_MAX, clasificar
+
+    Variante = apps.get_model('store', 'Variante')
+    Talla = apps.get_model('store', 'Talla')
+    claves = set()
+    ultimo = 0
+    while True:
+        bloque = list(
+            Variante.objects.filter(pk__gt=ultimo).order_by('pk').only('id', 'tallas_stock')[:LOTE]
+        )
+        if not bloque:
+            break
+        for variante in bloque:
+            claves.update(c for c in (variante.tallas_stock or {}) if 0 < len(c) <= CLAVE_MAX)
+        ultimo = bloque[-1].pk
+    Talla.objects.bulk_create(
+        [Talla(clave=c, **vars(clasificar(c))) for c in sorted(claves)],
+        batch_size=LOTE,
+        ignore_conflicts=True,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('store', '0027_busquedas_log'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Talla',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('clave', models.CharField(help_text='Clave tal como aparece en tallas_stock', max_length=20, unique=True)),
+                ('etiqueta', models.CharField(help_text='Ej: "25.5", "XL", "Única"', max_length=20)),
+                ('sistema', models.CharField(choices=[('calzado_mx', 'Calzado MX'), ('ropa', 'Ropa (letras)'), ('unica', 'Talla única'), ('otro', 'Otro')], max_length=12)),
+                ('rango', models.PositiveIntegerField(db_index=True, help_text='Orden entre tallas: menor primero')),
+            ],
+            options={
+                'ordering': ['rango', 'etiqueta'],
+            },
+        ),
+        migrations.RunPython(tallas_existentes, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,45 @@
+# Generated by Django 5.2.8 on 2026-10-19 14:11
+
+from django.db import migrations, models
+
+LOTE = 500
+
+
+def archivo_de_miniaturas(apps, schema_editor):
+    """
+    Agrega el nombre del archivo a las miniaturas existentes, buscando su URL
+    entre las imágenes de la galería; las que no aparezcan se quedan como están.
+    """
+    Orden = apps.get_model('store', 'Orden')
+    VarianteImagen = apps.get_model('store', 'VarianteImagen')
+
+    archivos = {}
+    for img in VarianteImagen.objects.exclude(imagen='').only('imagen', 'imagen_url_cache').iterator(chunk_size=LOTE):
+        archivos.setdefault(img.imagen_url_cache or img.imagen.url, img.imagen.name)
+
+    pendientes = []
+    for orden in Orden.objects.exclude(miniaturas=[]).only('id', 'miniaturas').iterator(chunk_size=LOTE):
+        for miniatura in orden.miniaturas:
+            miniatura.setdefault('archivo', archivos.get(miniatura.get('imagen'), ''))
+        pendientes.append(orden)
+        if len(pendientes) >= LOTE:
+            Orden.objects.bulk_update(pendientes, ['miniaturas'])
+            pendientes = []
+    if pendientes:
+        Orden.objects.bulk_update(pendientes, ['miniaturas'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('store', '0028_tallas'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='orden',
+            name='miniaturas',
+            field=models.JSONField(blank=True, default=list, help_text='Primeros productos: [{"producto_nombre", "imagen", "archivo", "cantidad"}] (máx. MINIATURAS)'),
+        ),
+        migrations.RunPython(archivo_de_miniaturas, migrations.RunPython.noop),
+    ]
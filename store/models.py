@@ -1,5 +1,6 @@
 from django.db import models
 from django.contrib.auth.models import AbstractBaseUser, BaseUserManager
+from django.utils import timezone
 from django.utils.text import slugify
 import os
 
@@ -142,7 +143,51 @@ class Usuario(models.Model):
 # Categorías y Productos
 # ——————————————————————————————————————
 
-class Categoria(models.Model):
+class ImagenConUrl(models.Model):
+    """
+    Guarda la URL pública de `imagen` cada vez que se guarda el modelo, para
+    que los listados no construyan la URL en el storage por cada imagen
+    (con S3 cada `.url` pasa por django-storages).
+
+    Si cambia MEDIA_URL o el dominio de CloudFront:
+        python manage.py regenerar_urls_media
+    """
+    imagen_url_cache = models.CharField(
+        max_length=500,
+        blank=True,
+        default='',
+        editable=False,
+        help_text="URL pública de la imagen precalculada al guardar"
+    )
+
+    class Meta:
+        abstract = True
+
+    @property
+    def imagen_url(self):
+        """URL pública de la imagen ('' si no hay)."""
+        if self.imagen_url_cache:
+            return self.imagen_url_cache
+        return self.imagen.url if self.imagen else ''
+
+    def calcular_urls(self):
+        """Valores actuales de los campos de URL precalculados."""
+        return {'imagen_url_cache': self.imagen.url if self.imagen else ''}
+
+    def save(self, *args, **kwargs):
+        super().save(*args, **kwargs)
+        # El nombre final del archivo se conoce hasta después de guardarlo
+        cambios = {
+            campo: valor for campo, valor in self.calcular_urls().items()
+            if getattr(self, campo) != valor
+        }
+        if cambios:
+            for campo, valor in cambios.items():
+                setattr(self, campo, valor)
+            type(self).objects.filter(pk=self.pk).update(**cambios)
+
+
+class Categoria(ImagenConUrl):
     nombre = models.CharField(max_length=255)
     imagen = models.ImageField(upload_to='categorias/', blank=True, null=True)
 
@@ -150,7 +195,7 @@ class Categoria(models.Model):
         return self.nombre
 
 
-class Subcategoria(models.Model):
+class Subcategoria(ImagenConUrl):
     """
     Subcategoría para filtrar productos dentro de una categoría específica.
     Permite filtros como: Por género (Dama, Caballero), Por marca, Por promoción, etc.
@@ -228,7 +273,16 @@ class Producto(models.Model):
         Retorna la variante principal del producto.
         La variante principal es la que tiene es_variante_principal=True.
         Si no existe, retorna la primera variante por orden de creación.
+
+        Si las variantes ya vienen de prefetch_related('variantes') se
+        resuelve en memoria, sin consultas extra por producto.
         """
+        prefetch = getattr(self, '_prefetched_objects_cache', {})
+        if 'variantes' in prefetch:
+            variantes = list(prefetch['variantes'])
+            principal = next((v for v in variantes if v.es_variante_principal), None)
+            return principal or min(variantes, key=lambda v: v.id, default=None)
+
         variante = self.variantes.filter(es_variante_principal=True).first()
         if not variante:
             variante = self.variantes.order_by('id').first()
@@ -239,7 +293,7 @@ class Producto(models.Model):
 # Sistema de variantes simplificado (moda/calzado)
 # ——————————————————————————————————————
 
-class Variante(models.Model):
+class Variante(ImagenConUrl):
     """
     Variante de producto con talla, color, imagen y atributos extras en JSON.
     Optimizado para e-commerce de moda, calzado y accesorios.
@@ -259,7 +313,8 @@ class Variante(models.Model):
         max_length=100, 
         blank=True, 
         null=True,
-        help_text="Código interno o UPC (ej: NIKE-AIR-38-BLK)"
+        unique=True,
+        help_text="Código interno o UPC (ej: NIKE-AIR-38-BLK). Único; vacío se guarda como NULL"
     )
     
     # 1 variante = 1 color, con múltiples tallas y stock en JSON
@@ -274,6 +329,11 @@ class Variante(models.Model):
         blank=True,
         help_text='Dict de talla→stock. Ej: {"38": 5, "39": 3, "40": 0}'
     )
+    umbrales_stock = models.JSONField(
+        default=dict,
+        blank=True,
+        help_text='Dict de talla→stock mínimo antes de alertar. Sin talla: STOCK_UMBRAL_DEFAULT'
+    )
     
     # Imagen específica de la variante (legacy, preferir VarianteImagen)
     imagen = models.ImageField(
@@ -346,6 +406,34 @@ class Variante(models.Model):
         """Indica si hay stock disponible en alguna talla"""
         return self.stock_total_variante > 0
     
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instancia = super().from_db(db, field_names, values)
+        # Copia del stock leído: las alertas solo revisan las tallas que cambian
+        if 'tallas_stock' in field_names and 'umbrales_stock' in field_names:
+            instancia._stock_cargado = (dict(instancia.tallas_stock or {}), dict(instancia.umbrales_stock or {}))
+        return instancia
+
+    def tallas_modificadas(self):
+        """
+        Tallas cuyo stock o umbral cambió desde que se leyó la variante
+        (todas si es nueva o se cargó sin esos campos).
+        """
+        tallas = set(self.tallas_stock or {}) | set(self.umbrales_stock or {})
+        cargado = getattr(self, '_stock_cargado', None)
+        if cargado is None:
+            return tallas
+        stock, umbrales = cargado
+        return {
+            t for t in tallas | set(stock)
+            if (self.tallas_stock or {}).get(t) != stock.get(t) or (self.umbrales_stock or {}).get(t) != umbrales.get(t)
+        }
+
+    def save(self, *args, **kwargs):
+        # '' rompería el índice único: sin SKU se guarda NULL
+        self.sku = (self.sku or '').strip() or None
+        super().save(*args, **kwargs)
+
     def stock_de_talla(self, talla):
         """Retorna el stock de una talla específica"""
         return self.tallas_stock.get(str(talla), 0)
@@ -391,7 +479,87 @@ class Variante(models.Model):
         return f'variantes/var-{self.producto_id}-{self.id}-{color_clean}-{producto_slug}{ext}'
 
 
-class VarianteImagen(models.Model):
+class CodigoBarras(models.Model):
+    """
+    Código de barras (UPC/EAN) de una talla de una variante.
+    El escáner del inventario lo resuelve con store/utils/escaneo.py.
+    """
+    codigo = models.CharField(max_length=64, unique=True, help_text="UPC/EAN tal como lo lee el escáner")
+    variante = models.ForeignKey(Variante, on_delete=models.CASCADE, related_name='codigos')
+    talla = models.CharField(max_length=20)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        verbose_name = 'Código de barras'
+        verbose_name_plural = 'Códigos de barras'
+        constraints = [
+            models.UniqueConstraint(fields=['variante', 'talla'], name='unique_codigo_variante_talla'),
+        ]
+
+    def __str__(self):
+        return f"{self.codigo} → {self.variante} talla {self.talla}"
+
+
+class AlertaStock(models.Model):
+    """
+    Talla agotada o con stock en su umbral de reorden. Solo existe mientras
+    dura la alerta: store/utils/alertas_stock.py la crea, actualiza o borra
+    cada vez que cambia el stock de esa talla.
+    """
+    ESTADOS = [
+        ('agotado', 'Agotado'),
+        ('bajo', 'Stock bajo'),
+    ]
+
+    variante       = models.ForeignKey(Variante, on_delete=models.CASCADE, related_name='alertas_stock')
+    talla          = models.CharField(max_length=20)
+    estado         = models.CharField(max_length=10, choices=ESTADOS)
+    stock          = models.IntegerField()
+    umbral         = models.PositiveIntegerField()
+    creada_at      = models.DateTimeField(auto_now_add=True)
+    actualizada_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ['stock', 'creada_at']
+        verbose_name = 'Alerta de stock'
+        verbose_name_plural = 'Alertas de stock'
+        constraints = [
+            models.UniqueConstraint(fields=['variante', 'talla'], name='unique_alerta_variante_talla'),
+        ]
+        indexes = [
+            models.Index(fields=['estado', 'stock'], name='alerta_estado_stock_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.variante_id}/{self.talla}: {self.estado} ({self.stock})"
+
+
+class Talla(models.Model):
+    """
+    Diccionario de tallas: cada clave cruda de Variante.tallas_stock con su
+    etiqueta normalizada, su sistema y un rango entero para ordenar. Se llena
+    solo al guardar variantes (store/utils/tallas.py).
+    """
+    SISTEMAS = [
+        ('calzado_mx', 'Calzado MX'),
+        ('ropa', 'Ropa (letras)'),
+        ('unica', 'Talla única'),
+        ('otro', 'Otro'),
+    ]
+
+    clave    = models.CharField(max_length=20, unique=True, help_text='Clave tal como aparece en tallas_stock')
+    etiqueta = models.CharField(max_length=20, help_text='Ej: "25.5", "XL", "Única"')
+    sistema  = models.CharField(max_length=12, choices=SISTEMAS)
+    rango    = models.PositiveIntegerField(db_index=True, help_text='Orden entre tallas: menor primero')
+
+    class Meta:
+        ordering = ['rango', 'etiqueta']
+
+    def __str__(self):
+        return f"{self.clave} → {self.etiqueta} ({self.sistema}, {self.rango})"
+
+
+class VarianteImagen(ImagenConUrl):
     """
     Galería de imágenes para el carrusel de cada variante.
     Carrusel de máximo 5 imágenes por variante (combinación talla/color).
@@ -405,6 +573,17 @@ class VarianteImagen(models.Model):
         help_text="Imagen de la variante desde diferentes ángulos"
     )
     orden = models.PositiveIntegerField(default=0, help_text="Orden de aparición en el carrusel (1-5)")
+    renditions = models.JSONField(
+        default=dict,
+        blank=True,
+        help_text='Versiones redimensionadas: {"webp": {"400": "ruta"}, "avif": {...}} (ver store/utils/renditions.py)'
+    )
+    srcsets_cache = models.JSONField(
+        default=dict,
+        blank=True,
+        editable=False,
+        help_text='srcset precalculado por formato: {"webp": "url 200w, ...", "avif": "..."}'
+    )
     created_at = models.DateTimeField(auto_now_add=True)
 
     class Meta:
@@ -463,12 +642,35 @@ class VarianteImagen(models.Model):
         self.clean()
         super().save(*args, **kwargs)
     
+    def srcset(self, formato='webp'):
+        """Atributo srcset con las renditions del formato dado ('' si no hay)"""
+        if self.srcsets_cache:
+            return self.srcsets_cache.get(formato, '')
+        from store.utils.renditions import construir_srcset
+        return construir_srcset(self.renditions, formato, self.imagen.storage)
+
+    def calcular_urls(self):
+        from store.utils.renditions import construir_srcsets
+        urls = super().calcular_urls()
+        urls['srcsets_cache'] = construir_srcsets(self.renditions, self.imagen.storage)
+        return urls
+    
+    @property
+    def srcset_webp(self):
+        return self.srcset('webp')
+    
+    @property
+    def srcset_avif(self):
+        return self.srcset('avif')
+    
     def delete(self, *args, **kwargs):
         # ✅ IMPORTANTE: Eliminar el archivo físico ANTES de borrar el registro
         # Esto evita que archivos huérfanos permanezcan en el servidor
         # y previene colisiones de nombres cuando se reutilizan números de orden
         if self.imagen:
             try:
+                from store.utils.renditions import eliminar_renditions
+                eliminar_renditions(self.renditions, self.imagen.storage)
                 self.imagen.delete(save=False)
             except Exception as e:
                 print(f"Error eliminando archivo físico de VarianteImagen: {e}")
@@ -529,10 +731,88 @@ class Orden(models.Model):
     stripe_session_id   = models.CharField(max_length=255, blank=True, null=True)
     stripe_payment_intent = models.CharField(max_length=255, blank=True, null=True)
     stock_reducido      = models.BooleanField(default=False, help_text='Indica si ya se redujo el stock del inventario')
+    # Resumen para el historial del cliente (ver actualizar_resumen)
+    total_piezas        = models.PositiveIntegerField(default=0)
+    total_lineas        = models.PositiveIntegerField(default=0)
+    miniaturas          = models.JSONField(
+        default=list,
+        blank=True,
+        help_text='Primeros productos: [{"producto_nombre", "imagen", "archivo", "cantidad"}] (máx. MINIATURAS)'
+    )
     created_at          = models.DateTimeField(auto_now_add=True)
+    # Cualquier cambio (estado, líneas) la vuelve a meter en los rollups de ventas
+    updated_at          = models.DateTimeField(auto_now=True, db_index=True)
+
+    MINIATURAS = 4
+
+    class Meta:
+        indexes = [
+            # Historial del cliente paginado por cursor (created_at, id)
+            models.Index(fields=['cliente', '-created_at', '-id'], name='orden_cliente_fecha_idx'),
+        ]
 
     def __str__(self):
         return f"Orden #{self.id} - {self.cliente.username}"
+
+    @property
+    def imagen_portada(self):
+        return self.miniaturas[0]['imagen'] if self.miniaturas else ''
+
+    def calcular_urls(self):
+        """
+        Miniaturas con la URL actual de cada `archivo`; como ImagenConUrl,
+        para que `regenerar_urls_media` las actualice tras cambiar USE_S3 o el dominio.
+        """
+        storage = VarianteImagen._meta.get_field('imagen').storage
+        return {'miniaturas': [
+            {**m, 'imagen': storage.url(m['archivo'])} if m.get('archivo') else m
+            for m in self.miniaturas
+        ]}
+
+    def actualizar_resumen(self):
+        """
+        Guarda piezas, líneas y miniaturas de los primeros productos para que
+        el historial del cliente no recorra los detalles de cada orden.
+        Se llama al crear la orden (3 consultas sin importar cuántas líneas tenga).
+        """
+        detalles = list(self.detalles.select_related('variante__producto').order_by('id'))
+        primeros = []
+        for detalle in detalles:
+            if len(primeros) == self.MINIATURAS:
+                break
+            if all(d.variante_id != detalle.variante_id for d in primeros):
+                primeros.append(detalle)
+
+        # Imagen de la variante comprada o, si no tiene, la de la principal del producto
+        imagenes = {}
+        galeria = VarianteImagen.objects.filter(
+            models.Q(variante_id__in=[d.variante_id for d in primeros])
+            | models.Q(
+                variante__producto_id__in=[d.variante.producto_id for d in primeros],
+                variante__es_variante_principal=True,
+            )
+        ).select_related('variante').order_by('orden', 'id')
+        for img in galeria:
+            if img.imagen:
+                imagen = (img.imagen_url, img.imagen.name)
+                imagenes.setdefault(img.variante_id, imagen)
+                if img.variante.es_variante_principal:
+                    imagenes.setdefault(('producto', img.variante.producto_id), imagen)
+
+        self.total_piezas = sum(d.cantidad for d in detalles)
+        self.total_lineas = len(detalles)
+        self.miniaturas = []
+        for d in primeros:
+            imagen, archivo = (
+                imagenes.get(d.variante_id) or imagenes.get(('producto', d.variante.producto_id)) or ('', '')
+            )
+            self.miniaturas.append({
+                'producto_nombre': d.variante.producto.nombre,
+                'imagen': imagen,
+                'archivo': archivo,
+                'cantidad': d.cantidad,
+            })
+        self.save(update_fields=['total_piezas', 'total_lineas', 'miniaturas'])
     
     def reducir_stock_orden(self):
         """
@@ -588,6 +868,134 @@ class OrdenDetalle(models.Model):
         return f"{self.cantidad}×{self.variante} (Talla: {self.talla}) en Orden #{self.order.id}"
 
 
+class StripeEvento(models.Model):
+    """
+    Bandeja de entrada de webhooks de Stripe.
+
+    El webhook solo verifica la firma y guarda el evento aquí (event_id es
+    único: los reintentos de Stripe no se duplican). El comando
+    `procesar_eventos_stripe` los aplica en orden por `clave_orden`, con
+    reintentos y estado 'muerto' tras agotar los intentos.
+    """
+    ESTADOS = [
+        ('pendiente', 'Pendiente'),
+        ('procesado', 'Procesado'),
+        ('error', 'Error (se reintentará)'),
+        ('muerto', 'Muerto (intentos agotados)'),
+    ]
+
+    event_id       = models.CharField(max_length=255, unique=True)
+    tipo           = models.CharField(max_length=100, db_index=True)
+    clave_orden    = models.CharField(
+        max_length=255, blank=True, default='', db_index=True,
+        help_text='PaymentIntent (o Session) al que pertenece; los eventos de una misma clave se procesan en orden'
+    )
+    payload        = models.JSONField()
+    creado_stripe  = models.DateTimeField(help_text='Campo "created" del evento en Stripe')
+    estado         = models.CharField(max_length=20, choices=ESTADOS, default='pendiente')
+    intentos       = models.PositiveIntegerField(default=0)
+    ultimo_error   = models.TextField(blank=True, default='')
+    proximo_intento = models.DateTimeField(null=True, blank=True)
+    recibido_at    = models.DateTimeField(auto_now_add=True)
+    procesado_at   = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ['creado_stripe', 'id']
+        verbose_name = 'Evento de Stripe'
+        verbose_name_plural = 'Eventos de Stripe'
+        indexes = [
+            models.Index(fields=['estado', 'creado_stripe']),
+        ]
+
+    def __str__(self):
+        return f"{self.event_id} ({self.tipo}) - {self.estado}"
+
+
+# ——————————————————————————————————————
+# Analítica de ventas (rollups diarios)
+# ——————————————————————————————————————
+
+class VentaDiaria(models.Model):
+    """
+    Unidades e ingresos de un día local (VENTAS_ZONA_HORARIA) por variante,
+    talla y estado de la orden. Producto y categoría van desnormalizados para
+    agrupar sin JOIN. Solo la escribe store/utils/ventas.py (comando
+    `agregar_ventas`), que recalcula días completos.
+    """
+    dia        = models.DateField()
+    producto   = models.ForeignKey(Producto, on_delete=models.CASCADE, related_name='+')
+    variante   = models.ForeignKey(Variante, on_delete=models.CASCADE, related_name='+')
+    talla      = models.CharField(max_length=20)
+    categoria  = models.ForeignKey(Categoria, on_delete=models.CASCADE, related_name='+')
+    status     = models.CharField(max_length=50)
+    unidades   = models.IntegerField(default=0)
+    ingresos   = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    ordenes    = models.PositiveIntegerField(default=0, help_text='Órdenes distintas en el grupo')
+
+    class Meta:
+        verbose_name = 'Venta diaria'
+        verbose_name_plural = 'Ventas diarias'
+        constraints = [
+            models.UniqueConstraint(fields=['dia', 'variante', 'talla', 'status'], name='unique_venta_diaria'),
+        ]
+        indexes = [
+            models.Index(fields=['producto', 'dia'], name='venta_producto_dia_idx'),
+            models.Index(fields=['categoria', 'dia'], name='venta_categoria_dia_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.dia} {self.variante_id}/{self.talla} ({self.status}): {self.unidades}"
+
+
+class MarcaAgregacion(models.Model):
+    """Marca de agua de un proceso incremental: rollups de ventas, resumen de alertas de stock."""
+    nombre          = models.CharField(max_length=50, unique=True)
+    procesado_hasta = models.DateTimeField(null=True, blank=True)
+    actualizado_at  = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.nombre}: {self.procesado_hasta}"
+
+
+# ——————————————————————————————————————
+# Analítica de búsquedas
+# ——————————————————————————————————————
+
+class BusquedaLog(models.Model):
+    """
+    Una búsqueda con texto (página 1). Se escriben en lote desde el buffer
+    de store/utils/busquedas.py, nunca una por request.
+    """
+    token      = models.CharField(max_length=32, unique=True, help_text='busqueda_id devuelto al cliente para medir clics')
+    consulta   = models.CharField(max_length=200, help_text='Texto normalizado: minúsculas, sin acentos ni espacios repetidos')
+    origen     = models.CharField(max_length=20, default='api')
+    filtros    = models.JSONField(default=dict, blank=True)
+    resultados = models.PositiveIntegerField()
+    latencia_ms = models.PositiveIntegerField()
+    created_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['created_at'], name='busqueda_fecha_idx'),
+            models.Index(fields=['consulta', 'created_at'], name='busqueda_consulta_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.consulta} ({self.resultados})"
+
+
+class BusquedaClic(models.Model):
+    """Clic en un resultado; se une a BusquedaLog por token (pueden llegar en otro lote)."""
+    token      = models.CharField(max_length=32, db_index=True)
+    # Sin constraint: un clic a un producto recién borrado no debe tumbar el lote
+    producto   = models.ForeignKey(Producto, on_delete=models.DO_NOTHING, db_constraint=False, related_name='+')
+    posicion   = models.PositiveSmallIntegerField(null=True, blank=True)
+    created_at = models.DateTimeField(default=timezone.now, db_index=True)
+
+    def __str__(self):
+        return f"{self.token} → {self.producto_id}"
+
+
 # ——————————————————————————————————————
 # Contacto de clientes
 # ——————————————————————————————————————
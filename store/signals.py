@@ -0,0 +1,53 @@
+"""
+Señales del catálogo: renuevan los sellos de versión de los fragmentos
+cacheados (ver store/utils/fragmentos.py), evalúan las alertas de stock
+de las tallas modificadas (store/utils/alertas_stock.py) y registran las
+tallas nuevas en el diccionario (store/utils/tallas.py). Se conectan en
+StoreConfig.ready().
+"""
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import receiver
+
+from store.models import Categoria, Producto, Subcategoria, Variante, VarianteImagen
+from store.utils.alertas_stock import evaluar_variantes
+from store.utils.fragmentos import invalidar, invalidar_producto
+from store.utils.tallas import asegurar
+
+
+@receiver([post_save, post_delete], sender=Producto)
+def _producto_cambiado(sender, instance, **kwargs):
+    invalidar_producto(instance.pk)
+
+
+@receiver([post_save, post_delete], sender=Variante)
+def _variante_cambiada(sender, instance, **kwargs):
+    invalidar_producto(instance.producto_id)
+
+
+@receiver(post_save, sender=Variante)
+def _alertas_stock(sender, instance, created, **kwargs):
+    evaluar_variantes([instance], creadas=created)
+
+
+@receiver(post_save, sender=Variante)
+def _tallas_nuevas(sender, instance, **kwargs):
+    asegurar(instance.tallas_stock or {})
+
+
+@receiver([post_save, post_delete], sender=VarianteImagen)
+def _imagen_cambiada(sender, instance, **kwargs):
+    producto_id = Variante.objects.filter(pk=instance.variante_id).values_list('producto_id', flat=True).first()
+    if producto_id:
+        invalidar_producto(producto_id)
+
+
+@receiver([post_save, post_delete], sender=Categoria)
+@receiver([post_save, post_delete], sender=Subcategoria)
+def _categoria_cambiada(sender, **kwargs):
+    invalidar('categorias', 'catalogo')
+
+
+@receiver(m2m_changed, sender=Producto.subcategorias.through)
+def _subcategorias_producto(sender, action, **kwargs):
+    if action.startswith('post_'):
+        invalidar('catalogo')
@@ -0,0 +1,49 @@
+"""
+{% fragmento %}: como {% cache %} de Django, pero con el timeout de settings
+y la versión de las plantillas incluida en la clave (ver store/utils/fragmentos.py).
+
+    {% load fragmentos %}
+    {% fragmento 'tarjeta' p.id p.version_fragmento seccion %}
+      ...
+    {% endfragmento %}
+"""
+from django import template
+from django.conf import settings
+from django.core.cache import cache
+from django.core.cache.utils import make_template_fragment_key
+
+from store.utils.fragmentos import version_plantillas
+
+register = template.Library()
+
+
+class FragmentoNode(template.Node):
+    def __init__(self, nodelist, nombre, vary_on):
+        self.nodelist = nodelist
+        self.nombre = nombre
+        self.vary_on = vary_on
+
+    def render(self, context):
+        if not settings.FRAGMENTOS_CACHE:
+            return self.nodelist.render(context)
+        vary_on = [version_plantillas(), *(v.resolve(context) for v in self.vary_on)]
+        clave = make_template_fragment_key(self.nombre.resolve(context), vary_on)
+        html = cache.get(clave)
+        if html is None:
+            html = self.nodelist.render(context)
+            cache.set(clave, html, settings.FRAGMENTOS_TTL)
+        return html
+
+
+@register.tag('fragmento')
+def do_fragmento(parser, token):
+    bits = token.split_contents()
+    if len(bits) < 2:
+        raise template.TemplateSyntaxError("'fragmento' requiere al menos el nombre del fragmento")
+    nodelist = parser.parse(('endfragmento',))
+    parser.delete_first_token()
+    return FragmentoNode(
+        nodelist,
+        parser.compile_filter(bits[1]),
+        [parser.compile_filter(b) for b in bits[2:]],
+    )
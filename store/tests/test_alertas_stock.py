@@ -0,0 +1,100 @@
+"""
+Tests de las alertas de stock bajo / agotado
+Ejecutar con: pytest store/tests/test_alertas_stock.py
+"""
+
+import json
+from io import StringIO
+
+from django.core import mail
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+
+from store.models import AlertaStock, Categoria, Cliente, Orden, OrdenDetalle, Producto, Usuario, Variante
+
+
+def _alertas():
+    return dict(
+        ((talla, (estado, stock)) for talla, estado, stock in
+         AlertaStock.objects.values_list('talla', 'estado', 'stock'))
+    )
+
+
+@override_settings(STOCK_UMBRAL_DEFAULT=2, STOCK_ALERTAS_EMAILS=['almacen@nowhere.com'])
+class AlertasStockTest(TestCase):
+    """SUITE: alertas de stock incrementales, /inventario/api/alertas/ y resumen diario"""
+
+    def setUp(self):
+        usuario = Usuario.objects.create(username='almacen', password='x', role='inventario')
+        sesion = self.client.session
+        sesion['inventario_user_id'] = usuario.id
+        sesion.save()
+
+        categoria = Categoria.objects.create(nombre='Tenis')
+        self.producto = Producto.objects.create(nombre='Runner', descripcion='x', precio=100, categoria=categoria)
+        self.variante = Variante.objects.create(
+            producto=self.producto, color='Negro', sku='RUN-NEG', tallas_stock={'26': 5, '27': 1, '28': 9}
+        )
+
+    def test_01_solo_se_evaluan_las_tallas_que_cambian(self):
+        """✅ Alta, reducir/aumentar stock, pedido surtido, lote y umbrales mantienen la lista al día"""
+        self.assertEqual(_alertas(), {'27': ('bajo', 1)})
+
+        variante = Variante.objects.get(pk=self.variante.pk)
+        variante.color = 'Negro mate'
+        with self.assertNumQueries(1):  # sin cambios de stock: solo el UPDATE
+            variante.save()
+
+        variante.reducir_stock('26', 5)
+        self.assertEqual(_alertas(), {'26': ('agotado', 0), '27': ('bajo', 1)})
+        variante.aumentar_stock('27', 10)
+        self.assertEqual(_alertas(), {'26': ('agotado', 0)})
+
+        # Pedido surtido → reducir_stock_orden
+        cliente = Cliente.objects.create(username='c', correo='', nombre='C')
+        orden = Orden.objects.create(cliente=cliente, total_amount=100, status='pagado')
+        OrdenDetalle.objects.create(order=orden, variante=variante, talla='28', cantidad=8, precio_unitario=100)
+        orden.reducir_stock_orden()
+        self.assertEqual(_alertas(), {'26': ('agotado', 0), '28': ('bajo', 1)})
+
+        # Lote del inventario (bulk_update, sin señales)
+        respuesta = self.client.post('/inventario/api/stock/lote/', json.dumps({'entradas': [
+            {'variante_id': variante.id, 'talla': '26', 'stock': 12},
+            {'variante_id': variante.id, 'talla': '27', 'delta': -10},
+        ]}), content_type='application/json')
+        self.assertEqual(respuesta.status_code, 200)
+        self.assertEqual(_alertas(), {'27': ('bajo', 1), '28': ('bajo', 1)})
+
+        # Umbral propio de la talla 26
+        respuesta = self.client.post(f'/inventario/api/umbrales/{variante.id}/', json.dumps(
+            {'umbrales': {'26': 12, '28': 0}}
+        ), content_type='application/json')
+        self.assertEqual(respuesta.status_code, 200)
+        self.assertEqual(_alertas(), {'26': ('bajo', 12), '27': ('bajo', 1)})
+        self.assertEqual(
+            self.client.post(f'/inventario/api/umbrales/{variante.id}/', json.dumps(
+                {'umbrales': {'99': 1}}
+            ), content_type='application/json').status_code,
+            400,
+        )
+
+    def test_02_panel_y_resumen_diario(self):
+        """✅ El panel lista agotadas primero; el resumen marca nuevas y no repite tras enviarse"""
+        Variante.objects.create(producto=self.producto, color='Blanco', tallas_stock={'26': 0})
+
+        datos = self.client.get('/inventario/api/alertas/').json()
+        self.assertEqual(datos['totales'], {'agotado': 1, 'bajo': 1})
+        self.assertEqual([(a['estado'], a['talla']) for a in datos['alertas']], [('agotado', '26'), ('bajo', '27')])
+        self.assertEqual(datos['alertas'][1]['variante']['sku'], 'RUN-NEG')
+        solo_bajo = self.client.get('/inventario/api/alertas/', {'estado': 'bajo'}).json()['alertas']
+        self.assertEqual(len(solo_bajo), 1)
+        self.assertEqual(self.client.get('/inventario/api/alertas/', {'estado': 'x'}).status_code, 400)
+
+        call_command('resumen_alertas_stock', stdout=StringIO())
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertEqual(mail.outbox[0].to, ['almacen@nowhere.com'])
+        self.assertIn('1 agotadas, 1 bajas (2 nuevas)', mail.outbox[0].subject)
+        self.assertIn('Runner · Negro [RUN-NEG] · Talla 27: 1 (mínimo 2) (nueva)', mail.outbox[0].body)
+
+        call_command('resumen_alertas_stock', stdout=StringIO())
+        self.assertIn('(0 nuevas)', mail.outbox[1].subject)
@@ -0,0 +1,77 @@
+"""
+Tests de las vistas async de Stripe (despliegue ASGI)
+Ejecutar con: pytest store/tests/test_asgi.py
+"""
+
+import asyncio
+import json
+import time
+from decimal import Decimal
+
+from django.test import TestCase, override_settings
+
+from store.models import Carrito, CarritoProducto, Categoria, Cliente, Orden, Producto, Usuario, Variante
+from store.utils.clients import cerrar_stripe_async
+from store.utils.jwt_helpers import generate_access_token
+from store.utils.stripe_falso import ServidorStripeFalso
+
+
+class VistasAsyncStripeTest(TestCase):
+    """SUITE: checkout y estado de pago con cliente HTTP async"""
+
+    def setUp(self):
+        self.falso = ServidorStripeFalso(latencia=0.2).__enter__()
+        self.addCleanup(self.falso.__exit__, None, None, None)
+        ajustes = override_settings(STRIPE_API_BASE=self.falso.url, STRIPE_SECRET_KEY='sk_test_falso')
+        ajustes.enable()
+        self.addCleanup(ajustes.disable)
+
+        self.cliente = Cliente.objects.create(username='asgi_test', correo='a@example.com', nombre='A')
+        categoria = Categoria.objects.create(nombre='Calzado')
+        producto = Producto.objects.create(nombre='Tenis', descripcion='x', precio=Decimal('250'), categoria=categoria)
+        variante = Variante.objects.create(producto=producto, color='Negro', tallas_stock={'27': 5})
+        self.carrito = Carrito.objects.create(cliente=self.cliente, status='activo')
+        CarritoProducto.objects.create(carrito=self.carrito, variante=variante, talla='27', cantidad=2)
+        self.auth = {'Authorization': f'Bearer {generate_access_token(self.cliente.id, "cliente")}'}
+
+    def test_01_checkout_y_sincronizar(self):
+        """✅ Crea la sesión con el cliente async, registra la orden y el admin la sincroniza"""
+        response = self.client.post(
+            '/pago/crear-checkout/', data=json.dumps({'carrito_id': self.carrito.id}),
+            content_type='application/json', headers=self.auth,
+        )
+        self.assertEqual(response.status_code, 200, response.content)
+        session_id = response.json()['session_id']
+        self.assertIn('POST /v1/checkout/sessions', [f'POST {p}' for p in self.falso.peticiones])
+
+        orden = Orden.objects.get(stripe_session_id=session_id)
+        self.assertEqual(orden.status, 'pendiente_pago')
+        self.assertEqual(orden.detalles.count(), 1)
+        self.carrito.refresh_from_db()
+        self.assertEqual(self.carrito.status, 'vacio')
+
+        verificada = self.client.get(f'/pago/verificar-orden/?session_id={session_id}', headers=self.auth).json()
+        self.assertEqual((verificada['orden_id'], verificada['detalles_count']), (orden.id, 1))
+
+        self.falso.sesiones[session_id]['payment_status'] = 'paid'
+        admin = Usuario.objects.create(username='admin_asgi', role='admin')
+        token = generate_access_token(admin.id, 'admin')
+        sync = self.client.post(
+            f'/pago/sincronizar/?orden_id={orden.id}', headers={'Authorization': f'Bearer {token}'}
+        ).json()
+        self.assertEqual(sync['status_nuevo'], 'procesando')
+        self.assertEqual(self.client.post(f'/pago/sincronizar/?orden_id={orden.id}').status_code, 401)
+
+    @override_settings(GUNICORN_MODO='asgi')
+    async def test_02_esperas_a_stripe_se_solapan(self):
+        """✅ En modo ASGI 5 consultas de estado comparten cliente y tardan como una, no como cinco"""
+        inicio = time.perf_counter()
+        respuestas = await asyncio.gather(*[
+            self.async_client.get(f'/pago/session-status/?session_id=cs_test_{n}', headers=self.auth)
+            for n in range(5)
+        ])
+        duracion = time.perf_counter() - inicio
+        await cerrar_stripe_async()
+
+        self.assertEqual([r.json()['status'] for r in respuestas], ['open'] * 5)
+        self.assertLess(duracion, 5 * self.falso.latencia * 0.6)
@@ -0,0 +1,60 @@
+"""
+Tests del catálogo sintético y del benchmark de endpoints
+Ejecutar con: pytest store/tests/test_benchmark.py
+"""
+
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase
+
+from store.models import Categoria, Cliente, Orden, OrdenDetalle, Producto, VarianteImagen
+from store.utils.benchmark import ENDPOINTS, comparar, ejecutar
+from store.utils.catalogo_sintetico import generar_catalogo, limpiar_catalogo
+
+
+class CatalogoSinteticoTest(TestCase):
+    """SUITE: seed_catalog + benchmark_endpoints"""
+
+    def test_01_genera_y_limpia_en_bloque(self):
+        """✅ seed_catalog crea productos, variantes, galería y órdenes; --limpiar los borra"""
+        call_command('seed_catalog', products=6, variants_per=2, orders=12, stdout=StringIO())
+
+        self.assertEqual(Producto.objects.count(), 6)
+        self.assertEqual(VarianteImagen.objects.count(), 6 * 2 * 3)
+        self.assertFalse(VarianteImagen.objects.filter(imagen_url_cache='').exists())
+        self.assertTrue(all(p.subcategorias.exists() for p in Producto.objects.all()))
+        self.assertEqual(Orden.objects.count(), 12)
+        self.assertTrue(OrdenDetalle.objects.exists())
+        # Miniaturas del historial como las de actualizar_resumen()
+        orden = Orden.objects.order_by('id').first()
+        self.assertEqual(len(orden.miniaturas), min(orden.total_lineas, Orden.MINIATURAS))
+        primera = orden.detalles.select_related('variante__producto').order_by('id').first()
+        portada = primera.variante.imagenes.order_by('orden', 'id').first()
+        self.assertEqual(orden.miniaturas[0], {
+            'producto_nombre': primera.variante.producto.nombre, 'imagen': portada.imagen_url,
+            'archivo': portada.imagen.name, 'cantidad': primera.cantidad,
+        })
+
+        # Acumulativo y sin chocar nombres
+        generar_catalogo(productos=4, variantes_por=1)
+        self.assertEqual(Producto.objects.values('nombre').distinct().count(), 10)
+
+        limpiar_catalogo()
+        self.assertFalse(Producto.objects.exists())
+        self.assertFalse(Cliente.objects.exists())
+        self.assertFalse(Categoria.objects.exists())
+
+    def test_02_mide_endpoints_y_detecta_regresiones(self):
+        """✅ Todos los endpoints responden 200 y comparar() marca más queries o más latencia"""
+        resultados = ejecutar([3], variantes_por=1, ordenes_por_producto=1, repeticiones=2)
+
+        self.assertEqual(set(resultados['3']), set(ENDPOINTS))
+        for nombre, m in resultados['3'].items():
+            self.assertEqual(m['status'], 200, nombre)
+
+        base = {'3': {'catalogo': {'queries': 3, 'p95_ms': 10.0, 'pico_kb': 100.0}}}
+        igual = {'3': {'catalogo': {'queries': 3, 'p95_ms': 10.5, 'pico_kb': 110.0}}}
+        peor = {'3': {'catalogo': {'queries': 4, 'p95_ms': 30.0, 'pico_kb': 100.0}}}
+        self.assertEqual(comparar(igual, base), [])
+        self.assertEqual(len(comparar(peor, base)), 2)
@@ -0,0 +1,92 @@
+"""
+Tests del registro y la analítica de búsquedas
+Ejecutar con: pytest store/tests/test_busquedas.py
+"""
+
+from datetime import timedelta
+from io import StringIO
+
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from store.models import BusquedaClic, BusquedaLog, Categoria, Producto, Usuario, Variante
+from store.utils import busquedas
+from store.utils.jwt_helpers import generate_access_token
+
+
+@override_settings(BUSQUEDAS_LOG=True, BUSQUEDAS_ASYNC=False, BUSQUEDAS_LOTE=1000, BUSQUEDAS_RETENCION_DIAS=90)
+class BusquedasTest(TestCase):
+    """SUITE: registro en lote de /api/search/ y /coleccion/, clics y /api/admin/busquedas/"""
+
+    def setUp(self):
+        busquedas.vaciar()
+        categoria = Categoria.objects.create(nombre='Tenis')
+        self.producto = Producto.objects.create(
+            nombre='Runner Nike', marca='Nike', descripcion='x', precio=100, categoria=categoria, genero='Unisex'
+        )
+        Variante.objects.create(producto=self.producto, color='Negro', tallas_stock={'26': 3})
+
+    def test_01_registro_sin_insert_en_el_request(self):
+        """✅ La búsqueda y el clic solo van al buffer; vaciar() los escribe normalizados"""
+        with CaptureQueriesContext(connection) as consultas:
+            datos = self.client.get('/api/search/', {'q': '  RUNNER ', 'marca': 'Nike', 'origen': 'overlay'}).json()
+            vacia = self.client.get('/api/search/', {'q': '  Sandálias   ROJAS!'}).json()
+            self.client.get('/coleccion/todo/', {'q': 'Nike'})
+            self.client.get('/api/search/', {'q': 'nike', 'page': 2})
+            clic = self.client.post('/api/search/clic/', {
+                'busqueda_id': datos['busqueda_id'], 'producto_id': self.producto.id, 'posicion': 0,
+            })
+        self.assertEqual(clic.status_code, 204)
+        self.assertFalse([c for c in consultas.captured_queries if c['sql'].startswith('INSERT')])
+        self.assertFalse(BusquedaLog.objects.exists())
+
+        self.assertEqual(busquedas.vaciar(), (3, 1))
+        registro = BusquedaLog.objects.get(token=datos['busqueda_id'])
+        self.assertEqual(
+            (registro.consulta, registro.origen, registro.resultados, registro.filtros),
+            ('runner', 'overlay', 1, {'marca': 'Nike'}),
+        )
+        vacia = BusquedaLog.objects.get(token=vacia['busqueda_id'])
+        self.assertEqual((vacia.consulta, vacia.resultados), ('sandalias rojas', 0))
+        self.assertEqual(BusquedaLog.objects.get(origen='coleccion').consulta, 'nike')
+        self.assertEqual(BusquedaClic.objects.get().producto_id, self.producto.id)
+
+        self.assertEqual(self.client.post('/api/search/clic/', {'busqueda_id': 'x', 'producto_id': 1}).status_code, 400)
+        for producto_id in (0, 2 ** 63):
+            clic = {'busqueda_id': datos['busqueda_id'], 'producto_id': producto_id}
+            self.assertEqual(self.client.post('/api/search/clic/', clic).status_code, 400)
+        self.assertEqual(busquedas.vaciar(), (0, 0))
+
+    def test_02_analitica_admin_y_retencion(self):
+        """✅ Top con CTR, consultas sin resultados y purga por antigüedad"""
+        tokens = [busquedas.registrar('nike', resultados=5, latencia_ms=10) for _ in range(4)]
+        busquedas.registrar('sandalias', resultados=0, latencia_ms=30)
+        busquedas.registrar('Sandalias', resultados=0, latencia_ms=50)
+        busquedas.registrar('botas', resultados=2, latencia_ms=20)
+        busquedas.registrar_clic(tokens[0], self.producto.id, 0)
+        busquedas.registrar_clic(tokens[0], self.producto.id, 0)
+        busquedas.registrar_clic(tokens[1], self.producto.id, 1)
+        busquedas.vaciar()
+
+        admin = Usuario.objects.create(username='admin', password='x', role='admin')
+        auth = {'Authorization': f'Bearer {generate_access_token(admin.id, "admin")}'}
+        with override_settings(QUERY_BUDGET_ESTRICTO=True):
+            top = self.client.get('/api/admin/busquedas/top/', {'n': 2}, headers=auth).json()['consultas']
+            ceros = self.client.get('/api/admin/busquedas/sin-resultados/', headers=auth).json()['consultas']
+        self.assertEqual(
+            [(c['consulta'], c['busquedas'], c['con_clic'], c['ctr']) for c in top],
+            [('nike', 4, 2, 0.5), ('sandalias', 2, 0, 0.0)],
+        )
+        self.assertEqual(top[1]['latencia_ms_promedio'], 40.0)
+        self.assertEqual([(c['consulta'], c['busquedas']) for c in ceros], [('sandalias', 2)])
+        self.assertEqual(self.client.get('/api/admin/busquedas/top/', {'dias': 365}, headers=auth).status_code, 400)
+
+        BusquedaLog.objects.filter(consulta='nike').update(created_at=timezone.now() - timedelta(days=91))
+        BusquedaClic.objects.update(created_at=timezone.now() - timedelta(days=91))
+        salida = StringIO()
+        call_command('purgar_busquedas', stdout=salida)
+        self.assertIn('4 búsquedas y 3 clics', salida.getvalue())
+        self.assertEqual(BusquedaLog.objects.count(), 3)
@@ -0,0 +1,59 @@
+"""
+Tests de reutilización de conexiones a la BD (DB_CONN_MODE)
+Ejecutar con: pytest store/tests/test_db_conexiones.py
+"""
+
+import os
+import tempfile
+from io import StringIO
+from unittest import mock
+
+from django.core.management import call_command
+from django.db import connection
+from django.http import HttpResponse
+from django.test import RequestFactory, TestCase, override_settings
+
+from store.management.commands.bench_db_conexiones import ajustes_modo, medir
+from store.middleware.db_pool import PoolMetricsMiddleware, _contar_conexion
+
+
+class ConexionesBDTest(TestCase):
+    """SUITE: bench_db_conexiones + métricas del pool"""
+
+    def test_01_persistente_reutiliza_la_conexion(self):
+        """✅ Sin reutilización se abre una conexión por request; persistente abre una sola"""
+        with tempfile.TemporaryDirectory() as tmp:
+            base = dict(connection.settings_dict, NAME=os.path.join(tmp, 'bench.sqlite3'))
+            _, sin_reuso = medir(ajustes_modo(base, 'none'), 'bench_none', 10, 'SELECT 1')
+            _, persistente = medir(ajustes_modo(base, 'persistent'), 'bench_persistent', 10, 'SELECT 1')
+
+        self.assertEqual((sin_reuso, persistente), (10, 1))
+
+        salida = StringIO()
+        call_command('bench_db_conexiones', requests=5, modos='none,pool', stdout=salida)
+        self.assertIn('pool: solo disponible con PostgreSQL', salida.getvalue())
+
+    @override_settings(DB_POOL_LOG_CADA=2)
+    def test_02_middleware_registra_metricas_del_pool(self):
+        """✅ Cada N requests se registran utilización, espera y conexiones reales del pool; con requests esperando es WARNING"""
+        pool = mock.Mock(max_size=4)
+        pool.pop_stats.return_value = {
+            'pool_size': 4, 'pool_available': 1, 'pool_max': 4,
+            'requests_num': 10, 'requests_wait_ms': 50, 'requests_waiting': 2, 'connections_num': 1,
+        }
+        middleware = PoolMetricsMiddleware(lambda request: HttpResponse())
+        request = RequestFactory().get('/')
+
+        with mock.patch('store.middleware.db_pool.connection', mock.Mock(pool=pool)), \
+                self.assertLogs('store.middleware.db_pool', level='INFO') as logs:
+            middleware(request)
+            pool.pop_stats.assert_not_called()
+            # Un préstamo del pool emite connection_created pero no es una conexión nueva
+            _contar_conexion(sender=None, connection=mock.Mock(pool=pool))
+            middleware(request)
+
+        self.assertEqual(len(logs.records), 1)
+        self.assertEqual(logs.records[0].levelname, 'WARNING')
+        self.assertIn('pool=3/4 (max 4, 75%)', logs.output[0])
+        self.assertIn('espera_media=5.0ms', logs.output[0])
+        self.assertIn('conexiones_nuevas=1 ', logs.output[0])
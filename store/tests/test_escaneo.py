@@ -0,0 +1,69 @@
+"""
+Tests del escáner de códigos de barras / SKU del inventario
+Ejecutar con: pytest store/tests/test_escaneo.py
+"""
+
+import json
+
+from django.db import IntegrityError, transaction
+from django.test import TestCase
+
+from store.models import Categoria, CodigoBarras, Producto, Usuario, Variante
+
+
+class EscaneoTest(TestCase):
+    """SUITE: /inventario/api/escanear/ y /inventario/api/codigos/"""
+
+    def setUp(self):
+        usuario = Usuario.objects.create(username='almacen', password='x', role='inventario')
+        sesion = self.client.session
+        sesion['inventario_user_id'] = usuario.id
+        sesion.save()
+
+        categoria = Categoria.objects.create(nombre='Tenis')
+        self.producto = Producto.objects.create(
+            nombre='Runner', marca='Nike', descripcion='x', precio=100, categoria=categoria, genero='Unisex'
+        )
+        self.variante = Variante.objects.create(
+            producto=self.producto, color='Negro', sku='RUN-NEG', tallas_stock={'26': 4, '27': 1}
+        )
+        CodigoBarras.objects.create(codigo='7501000000026', variante=self.variante, talla='26')
+
+    def test_01_resuelve_codigo_y_sku_en_una_consulta(self):
+        """✅ Código de barras → talla con su stock; SKU → variante completa; desconocido → 404"""
+        with self.assertNumQueries(3):  # sesión + usuario + búsqueda
+            respuesta = self.client.get('/inventario/api/escanear/', {'codigo': ' 7501000000026 '})
+        datos = respuesta.json()
+        self.assertEqual((datos['tipo'], datos['talla'], datos['stock']), ('codigo_barras', '26', 4))
+        self.assertEqual(datos['producto']['nombre'], 'Runner')
+        self.assertEqual(datos['variante']['id'], self.variante.id)
+
+        datos = self.client.get('/inventario/api/escanear/', {'codigo': 'RUN-NEG'}).json()
+        self.assertEqual((datos['tipo'], datos['talla'], datos['stock']), ('sku', None, 5))
+
+        self.assertEqual(self.client.get('/inventario/api/escanear/', {'codigo': 'NADA'}).status_code, 404)
+
+    def test_02_unicidad_de_sku_y_codigos(self):
+        """✅ SKU único (vacío = NULL); un código no puede apuntar a dos tallas ni pisar un SKU"""
+        sin_sku = [
+            Variante.objects.create(producto=self.producto, color=f'Color {n}', sku=' ') for n in range(2)
+        ]
+        self.assertEqual([v.sku for v in sin_sku], [None, None])
+        with transaction.atomic(), self.assertRaises(IntegrityError):
+            Variante.objects.create(producto=self.producto, color='Rojo', sku='RUN-NEG')
+
+        def asignar(codigo, talla):
+            return self.client.post('/inventario/api/codigos/', json.dumps(
+                {'codigo': codigo, 'variante_id': self.variante.id, 'talla': talla}
+            ), content_type='application/json')
+
+        self.assertEqual(asignar('7501000000027', '27').status_code, 200)
+        self.assertEqual(asignar('7501000000026', '27').status_code, 409)
+        self.assertEqual(asignar('RUN-NEG', '27').status_code, 409)
+        self.assertEqual(asignar('7501000000099', '99').status_code, 400)
+        # Reasignar la talla reemplaza su código
+        self.assertEqual(asignar('7501000000127', '27').status_code, 200)
+        self.assertEqual(
+            dict(CodigoBarras.objects.values_list('talla', 'codigo')),
+            {'26': '7501000000026', '27': '7501000000127'},
+        )
@@ -0,0 +1,105 @@
+"""
+Tests del pipeline de estáticos (hash, minificado y precompresión)
+Ejecutar con: pytest store/tests/test_estaticos.py
+"""
+
+import gzip
+import json
+import os
+import tempfile
+
+from django.core.management import call_command
+from django.template import engines
+from django.test import SimpleTestCase, override_settings
+
+from store.utils.estaticos import brotli
+
+CSS_BASE = """
+/* Estilos de la grilla */
+@import url('/static/tienda/css/media\\ queries.css');
+
+.grilla {
+    display: grid;
+    background: url("../img/fondo.svg");
+}
+""" + '\n'.join(f'.col-{n} {{ width: {n}0%; }}' for n in range(60))
+
+JS = """
+// Comentario que no debe llegar al navegador
+function sumar(a, b) {
+    return a + b;   /* suma */
+}
+const url = `https://example.com/${sumar(1, 2)}`;
+""" * 20
+
+
+class PipelineEstaticosTest(SimpleTestCase):
+    """SUITE: collectstatic con EstaticosComprimidos"""
+
+    def setUp(self):
+        fuente = tempfile.TemporaryDirectory()
+        destino = tempfile.TemporaryDirectory()
+        self.addCleanup(fuente.cleanup)
+        self.addCleanup(destino.cleanup)
+        self.destino = destino.name
+
+        archivos = {
+            'tienda/css/base.css': CSS_BASE,
+            'tienda/css/media queries.css': '@media (max-width: 600px) { .grilla { display: block; } }',
+            'tienda/img/fondo.svg': '<svg xmlns="http://www.w3.org/2000/svg"></svg>',
+            'tienda/js/app.js': JS,
+        }
+        for nombre, contenido in archivos.items():
+            ruta = os.path.join(fuente.name, nombre)
+            os.makedirs(os.path.dirname(ruta), exist_ok=True)
+            with open(ruta, 'w', encoding='utf-8') as fh:
+                fh.write(contenido)
+
+        ajustes = override_settings(
+            STATICFILES_DIRS=[fuente.name],
+            STATICFILES_FINDERS=['django.contrib.staticfiles.finders.FileSystemFinder'],
+            STATIC_ROOT=destino.name,
+            STORAGES={
+                'default': {'BACKEND': 'django.core.files.storage.FileSystemStorage'},
+                'staticfiles': {'BACKEND': 'store.utils.estaticos.EstaticosComprimidos'},
+            },
+        )
+        ajustes.enable()
+        self.addCleanup(ajustes.disable)
+        call_command('collectstatic', interactive=False, verbosity=0)
+
+        with open(os.path.join(self.destino, 'staticfiles.json'), encoding='utf-8') as fh:
+            self.manifest = json.load(fh)['paths']
+
+    def _leer(self, nombre):
+        with open(os.path.join(self.destino, nombre), 'rb') as fh:
+            return fh.read()
+
+    def test_01_hash_minificado_y_referencias(self):
+        """✅ Nombres con hash, JS/CSS sin comentarios y url()/@import apuntando a los hasheados"""
+        css = self.manifest['tienda/css/base.css']
+        self.assertRegex(css, r'^tienda/css/base\.[0-9a-f]{12}\.css$')
+
+        contenido = self._leer(css).decode()
+        self.assertNotIn('Estilos de la grilla', contenido)
+        self.assertIn(self.manifest['tienda/img/fondo.svg'].split('/')[-1], contenido)
+        self.assertIn(self.manifest['tienda/css/media queries.css'].replace(' ', '%20'), contenido)
+
+        js = self._leer(self.manifest['tienda/js/app.js']).decode()
+        self.assertNotIn('Comentario', js)
+        self.assertIn("`https://example.com/${sumar(1, 2)}`", js)  # template literal intacto
+        self.assertLess(len(js), len(JS) * 0.7)
+
+        html = engines['django'].from_string("{% load static %}{% static 'tienda/js/app.js' %}").render({})
+        self.assertEqual(html, '/static/' + self.manifest['tienda/js/app.js'])
+
+    def test_02_variantes_precomprimidas(self):
+        """✅ Cada JS/CSS hasheado tiene su .gz (y .br) con el mismo contenido; los diminutos no"""
+        for original in ('tienda/css/base.css', 'tienda/js/app.js'):
+            nombre = self.manifest[original]
+            self.assertEqual(gzip.decompress(self._leer(nombre + '.gz')), self._leer(nombre))
+            if brotli is not None:
+                self.assertEqual(brotli.decompress(self._leer(nombre + '.br')), self._leer(nombre))
+
+        svg = self.manifest['tienda/img/fondo.svg']
+        self.assertFalse(os.path.exists(os.path.join(self.destino, svg + '.gz')))
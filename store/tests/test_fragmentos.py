@@ -0,0 +1,61 @@
+"""
+Tests de la caché de fragmentos de plantilla (tarjetas y grillas)
+Ejecutar con: pytest store/tests/test_fragmentos.py
+"""
+
+import re
+
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+
+from store.models import Producto
+from store.utils.catalogo_sintetico import generar_catalogo
+
+COLECCION = '/coleccion/todo/'
+
+
+@override_settings(SWR_SEGUNDO_PLANO=False, FRAGMENTOS_CACHE=True)
+class FragmentosColeccionTest(TestCase):
+    """SUITE: grilla de colección cacheada e invalidada por señales"""
+
+    def setUp(self):
+        cache.clear()
+        generar_catalogo(productos=24, variantes_por=1)
+
+    def _render(self, ruta=COLECCION):
+        response = self.client.get(ruta)
+        self.assertEqual(response.status_code, 200)
+        plantillas = [t.name for t in response.templates]
+        # Sin el token CSRF, que cambia en cada respuesta
+        return re.sub(r'[A-Za-z0-9]{64}', '', response.content.decode()), plantillas
+
+    def test_01_segunda_visita_sale_de_cache(self):
+        """✅ La grilla cacheada es idéntica a la renderizada sin caché y no vuelve a renderizar tarjetas"""
+        tarjeta = 'public/includes/tarjeta_producto.html'
+        with override_settings(FRAGMENTOS_CACHE=False):
+            sin_cache, plantillas_sin_cache = self._render()
+        primera, _ = self._render()
+        segunda, plantillas_cache = self._render()
+
+        self.assertEqual(primera, segunda)
+        self.assertEqual(sin_cache, segunda)
+        self.assertEqual(segunda.count('class="producto-card"'), Producto.objects.filter(bodega=False).count())
+        self.assertIn(tarjeta, plantillas_sin_cache)
+        self.assertNotIn(tarjeta, plantillas_cache)
+
+    def test_02_guardar_producto_invalida_su_tarjeta(self):
+        """✅ Al editar u ocultar un producto su tarjeta y la grilla se regeneran"""
+        self._render()
+        publicos = Producto.objects.filter(bodega=False).count()
+        producto = Producto.objects.filter(bodega=False).order_by('-created_at').first()
+        producto.nombre = 'Tenis Renombrado'
+        producto.save()
+
+        html, _ = self._render()
+        self.assertIn('Tenis Renombrado', html)
+
+        producto.bodega = True
+        producto.save()
+        html, _ = self._render()
+        self.assertNotIn('Tenis Renombrado', html)
+        self.assertEqual(html.count('class="producto-card"'), publicos - 1)
@@ -0,0 +1,113 @@
+"""
+Tests de la ingesta paralela de galerías
+Ejecutar con: pytest store/tests/test_galeria.py
+"""
+
+import io
+import shutil
+import tempfile
+from unittest import mock
+
+from django.core.files.storage import default_storage
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import TestCase, override_settings
+from PIL import Image
+
+from store.models import Categoria, Cliente, Orden, OrdenDetalle, Producto, Variante, VarianteImagen
+from store.utils.galeria import GaleriaError, LimiteImagenesError, ingestar_galerias
+
+
+def imagen_png(nombre, ancho=500):
+    buffer = io.BytesIO()
+    Image.new('RGB', (ancho, ancho // 2), 'red').save(buffer, format='PNG')
+    return SimpleUploadedFile(nombre, buffer.getvalue(), content_type='image/png')
+
+
+class IngestaGaleriaTest(TestCase):
+    """SUITE: ingestar_galerias"""
+
+    def setUp(self):
+        self.media = tempfile.mkdtemp()
+        self.override = override_settings(MEDIA_ROOT=self.media, GALERIA_UPLOAD_WORKERS=3)
+        self.override.enable()
+        categoria = Categoria.objects.create(nombre='Tenis')
+        producto = Producto.objects.create(
+            nombre='Runner', descripcion='x', precio=100, categoria=categoria, genero='unisex'
+        )
+        self.variante = Variante.objects.create(
+            producto=producto, color='Negro', tallas_stock={'26': 1}, precio=100
+        )
+
+    def tearDown(self):
+        self.override.disable()
+        shutil.rmtree(self.media, ignore_errors=True)
+
+    def test_01_sube_y_crea_en_bloque(self):
+        """✅ Sube todas las imágenes y crea las filas con orden y renditions"""
+        archivos = [imagen_png(f'imagen-{n}.png') for n in range(1, 4)]
+        creadas = ingestar_galerias([(self.variante, archivos, 1)])
+
+        self.assertEqual(len(creadas), 3)
+        imagenes = list(self.variante.imagenes.order_by('orden'))
+        self.assertEqual([img.orden for img in imagenes], [1, 2, 3])
+        for img in imagenes:
+            self.assertTrue(default_storage.exists(img.imagen.name))
+            self.assertIn('400', img.renditions['webp'])
+
+    def test_02_limite_se_valida_antes_de_subir(self):
+        """✅ Superar MAX_IMAGENES falla sin escribir archivos"""
+        VarianteImagen.objects.bulk_create([
+            VarianteImagen(variante=self.variante, imagen=f'x/{n}.png', orden=n) for n in range(1, 5)
+        ])
+        archivos = [imagen_png('a.png'), imagen_png('b.png')]
+
+        with self.assertRaises(LimiteImagenesError):
+            ingestar_galerias([(self.variante, archivos, 5)])
+        self.assertEqual(self.variante.imagenes.count(), 4)
+        self.assertFalse(default_storage.exists('variantes'))
+
+    def test_03_fallo_de_subida_limpia_archivos(self):
+        """✅ Si una subida falla no queda ninguna fila ni archivo"""
+        guardar = default_storage.save
+
+        def guardar_o_fallar(nombre, contenido, *args, **kwargs):
+            if 'imagen-2' in nombre:
+                raise ConnectionError('S3 no responde')
+            return guardar(nombre, contenido, *args, **kwargs)
+
+        archivos = [imagen_png(f'imagen-{n}.png') for n in range(1, 4)]
+        with mock.patch.object(default_storage, 'save', side_effect=guardar_o_fallar):
+            with self.assertRaises(GaleriaError):
+                ingestar_galerias([(self.variante, archivos, 1)])
+
+        self.assertFalse(self.variante.imagenes.exists())
+        _, archivos_restantes = default_storage.listdir(
+            f'variantes/var-{self.variante.producto_id}-{self.variante.id}-negro'
+        )
+        self.assertEqual(archivos_restantes, [])
+
+    def test_04_urls_precalculadas(self):
+        """✅ Las URLs públicas quedan guardadas y regenerar_urls_media las actualiza"""
+        from django.core.management import call_command
+
+        creada = ingestar_galerias([(self.variante, [imagen_png('imagen-1.png')], 1)])[0]
+        img = VarianteImagen.objects.get(pk=creada.pk)
+        self.assertEqual(img.imagen_url_cache, default_storage.url(img.imagen.name))
+        self.assertIn('400w', img.srcsets_cache['webp'])
+
+        categoria = Categoria.objects.create(nombre='Bolsas', imagen=imagen_png('bolsa.png'))
+        self.assertTrue(categoria.imagen_url_cache.startswith('/media/categorias/'))
+
+        cliente = Cliente.objects.create(username='g', correo='', nombre='G')
+        orden = Orden.objects.create(cliente=cliente, total_amount=100, status='pagado')
+        OrdenDetalle.objects.create(order=orden, variante=self.variante, talla='26', cantidad=1, precio_unitario=100)
+        orden.actualizar_resumen()
+        self.assertEqual(orden.imagen_portada, img.imagen_url)
+
+        with override_settings(MEDIA_URL='https://cdn.example.com/media/'):
+            call_command('regenerar_urls_media', stdout=io.StringIO())
+            img.refresh_from_db()
+            self.assertTrue(img.imagen_url.startswith('https://cdn.example.com/media/variantes/'))
+            self.assertIn('https://cdn.example.com/', img.srcset('webp'))
+            orden.refresh_from_db()
+            self.assertEqual(orden.imagen_portada, f'https://cdn.example.com/media/{img.imagen.name}')
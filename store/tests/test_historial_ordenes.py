@@ -0,0 +1,90 @@
+"""
+Tests del historial de órdenes del cliente (resumen precalculado y cursor)
+Ejecutar con: pytest store/tests/test_historial_ordenes.py
+"""
+
+from datetime import timedelta
+from decimal import Decimal
+
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from store.models import Categoria, Cliente, Orden, Producto, Variante, VarianteImagen
+from store.utils.jwt_helpers import generate_access_token
+from store.views.payment import _crear_orden_local
+
+URL = '/api/cliente/ordenes/'
+
+
+@override_settings(QUERY_BUDGET_ESTRICTO=True)
+class HistorialOrdenesTest(TestCase):
+    """SUITE: GET /api/cliente/ordenes/"""
+
+    def setUp(self):
+        self.cliente = Cliente.objects.create(username='mayorista', correo='', nombre='M')
+        self.auth = {'Authorization': f'Bearer {generate_access_token(self.cliente.id, "cliente")}'}
+        categoria = Categoria.objects.create(nombre='Tenis')
+        self.variantes = []
+        for n in range(6):
+            producto = Producto.objects.create(
+                nombre=f'Tenis {n}', descripcion='x', precio=Decimal('100'), categoria=categoria
+            )
+            principal = Variante.objects.create(
+                producto=producto, color='Negro', tallas_stock={'26': 9}, es_variante_principal=True
+            )
+            VarianteImagen.objects.create(variante=principal, imagen=f'variantes/{n}-negro.jpg', orden=1)
+            self.variantes.append(Variante.objects.create(producto=producto, color='Blanco', tallas_stock={'26': 9}))
+        VarianteImagen.objects.create(variante=self.variantes[0], imagen='variantes/0-blanco.jpg', orden=1)
+
+    def _orden(self, lineas):
+        items = [
+            {'variante': v, 'producto': v.producto, 'cantidad': 2, 'precio_unitario': Decimal('100'), 'talla': '26'}
+            for v in lineas
+        ]
+        return _crear_orden_local(None, self.cliente, 200 * 100 * len(items), items)
+
+    def test_01_resumen_guardado_al_crear(self):
+        """✅ Piezas, líneas y miniaturas (imagen propia o la de la variante principal) quedan en la orden"""
+        orden = Orden.objects.get(id=self._orden(self.variantes).id)
+        self.assertEqual((orden.total_piezas, orden.total_lineas), (12, 6))
+        self.assertEqual(len(orden.miniaturas), Orden.MINIATURAS)
+        self.assertEqual(orden.miniaturas[0], {
+            'producto_nombre': 'Tenis 0', 'imagen': '/media/variantes/0-blanco.jpg',
+            'archivo': 'variantes/0-blanco.jpg', 'cantidad': 2,
+        })
+        self.assertEqual(orden.miniaturas[1]['imagen'], '/media/variantes/1-negro.jpg')
+        self.assertEqual(orden.imagen_portada, '/media/variantes/0-blanco.jpg')
+
+        datos = self.client.get(URL, headers=self.auth).json()['ordenes'][0]
+        self.assertEqual((datos['total_items'], datos['total_lineas'], len(datos['items'])), (12, 6, 4))
+
+        detalle = self.client.get(f'/orden/{orden.id}/', headers=self.auth).json()
+        self.assertEqual(len(detalle['items']), 6)
+        self.assertEqual(detalle['items'][0]['producto_imagen'], '/media/variantes/0-blanco.jpg')
+
+    def test_02_paginado_por_cursor(self):
+        """✅ Páginas sin huecos ni repetidos (también con fechas empatadas) y consultas fijas"""
+        otro = Cliente.objects.create(username='otro', correo='', nombre='O')
+        Orden.objects.create(cliente=otro, total_amount=1, status='pendiente')
+        ids = [self._orden(self.variantes[:1 + n % 6]).id for n in range(23)]
+        ahora = timezone.now()
+        for n, orden_id in enumerate(ids):
+            # Grupos de tres órdenes con la misma fecha
+            Orden.objects.filter(id=orden_id).update(created_at=ahora - timedelta(hours=n // 3))
+
+        vistos, cursor, paginas = [], None, 0
+        while True:
+            params = {'limite': 10, **({'cursor': cursor} if cursor else {})}
+            respuesta = self.client.get(URL, params, headers=self.auth)  # @query_budget(3) estricto
+            self.assertEqual(respuesta.status_code, 200)
+            datos = respuesta.json()
+            vistos += [o['id'] for o in datos['ordenes']]
+            paginas += 1
+            cursor = datos['siguiente']
+            if not cursor:
+                break
+
+        self.assertEqual(paginas, 3)
+        esperado = sorted(ids, key=lambda i: (-(ids.index(i) // 3), i), reverse=True)
+        self.assertEqual(vistos, esperado)
+        self.assertEqual(self.client.get(URL, {'cursor': 'x'}, headers=self.auth).status_code, 400)
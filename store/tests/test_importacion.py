@@ -0,0 +1,122 @@
+"""
+Tests de la importación masiva del catálogo (manage.py import_catalog)
+Ejecutar con: pytest store/tests/test_importacion.py
+"""
+
+import csv
+import io
+import json
+import os
+import shutil
+import tempfile
+
+from django.core.management import CommandError, call_command
+from django.test import TestCase, override_settings
+from PIL import Image
+
+from store.models import Categoria, Producto, Subcategoria, Variante, VarianteImagen
+
+COLUMNAS = ['sku', 'producto', 'marca', 'categoria', 'subcategorias', 'genero',
+            'precio', 'color', 'tallas', 'imagenes']
+
+
+class ImportCatalogTest(TestCase):
+    """SUITE: import_catalog con CSV y JSONL"""
+
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.media = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.tmp, ignore_errors=True)
+        self.addCleanup(shutil.rmtree, self.media, ignore_errors=True)
+        ajustes = override_settings(MEDIA_ROOT=self.media, GALERIA_UPLOAD_WORKERS=2)
+        ajustes.enable()
+        self.addCleanup(ajustes.disable)
+
+        self.fotos = os.path.join(self.tmp, 'fotos')
+        os.makedirs(self.fotos)
+        for nombre in ('air-negro-1.png', 'air-negro-2.png'):
+            Image.new('RGB', (300, 150), 'black').save(os.path.join(self.fotos, nombre))
+
+    def _csv(self, filas, nombre='catalogo.csv'):
+        ruta = os.path.join(self.tmp, nombre)
+        with open(ruta, 'w', newline='', encoding='utf-8') as fh:
+            escritor = csv.DictWriter(fh, fieldnames=COLUMNAS)
+            escritor.writeheader()
+            escritor.writerows(filas)
+        return ruta
+
+    def _importar(self, ruta, *args):
+        salida = io.StringIO()
+        call_command('import_catalog', ruta, *args, stdout=salida, stderr=salida)
+        return salida.getvalue()
+
+    def test_01_crea_y_reimporta_por_sku(self):
+        """✅ Crea categorías, productos, variantes e imágenes; reimportar actualiza sin duplicar"""
+        filas = [
+            {'sku': 'AIR-N', 'producto': 'Air Max', 'marca': 'Nike', 'categoria': 'Tenis',
+             'subcategorias': 'Running|Casual', 'genero': 'H', 'precio': '1,999.00', 'color': 'Negro',
+             'tallas': '26:3|27:1', 'imagenes': 'air-negro-1.png|air-negro-2.png'},
+            {'sku': 'AIR-B', 'producto': 'Air Max', 'marca': 'Nike', 'categoria': 'Tenis',
+             'subcategorias': 'Running', 'genero': 'H', 'precio': '1999', 'color': 'Blanco',
+             'tallas': '26:2'},
+        ] + [
+            {'sku': f'BOT-{n}', 'producto': f'Botín {n}', 'categoria': 'Botas',
+             'genero': 'Dama', 'precio': '850', 'color': 'Café', 'tallas': '24:1'}
+            for n in range(5)
+        ]
+        salida = self._importar(self._csv(filas), '--imagenes', self.fotos, '--lote', '2')
+        self.assertIn('4/6 productos', salida)
+        self.assertIn('✅ 6 productos creados', salida)
+
+        air = Producto.objects.get(nombre='Air Max', marca='Nike')
+        self.assertTrue(air.bodega)
+        self.assertEqual((air.genero, str(air.precio)), ('Hombre', '1999.00'))
+        self.assertEqual(set(air.subcategorias.values_list('nombre', flat=True)), {'Running', 'Casual'})
+        negra = Variante.objects.get(sku='AIR-N')
+        self.assertTrue(negra.es_variante_principal)
+        self.assertFalse(Variante.objects.get(sku='AIR-B').es_variante_principal)
+        self.assertEqual(negra.tallas_stock, {'26': 3, '27': 1})
+        self.assertEqual(list(negra.imagenes.values_list('orden', flat=True)), [1, 2])
+        self.assertEqual(Subcategoria.objects.count(), 2)
+
+        # El proveedor cambia stock y precio; una fila nueva en JSONL
+        filas[0]['tallas'] = '26:0|27:5'
+        filas[2]['precio'] = '900'
+        ruta = os.path.join(self.tmp, 'catalogo.jsonl')
+        with open(ruta, 'w', encoding='utf-8') as fh:
+            for fila in filas + [{'sku': 'AIR-R', 'producto': 'Air Max', 'marca': 'Nike',
+                                  'categoria': 'Tenis', 'precio': '1999', 'color': 'Rojo'}]:
+                fh.write(json.dumps(fila) + '\n')
+        salida = self._importar(ruta, '--imagenes', self.fotos)
+        self.assertIn('0 productos creados, 1 actualizados (5 sin cambios), '
+                      '1 variantes creadas, 1 actualizadas (6 sin cambios), 0 imágenes', salida)
+
+        self.assertEqual(Producto.objects.count(), 6)
+        self.assertEqual(Categoria.objects.count(), 2)
+        self.assertEqual(VarianteImagen.objects.count(), 2)
+        self.assertEqual(Variante.objects.get(sku='AIR-N').tallas_stock, {'26': 0, '27': 5})
+        self.assertEqual(str(Producto.objects.get(nombre='Botín 0').precio), '900.00')
+        self.assertFalse(Variante.objects.get(sku='AIR-R').es_variante_principal)
+
+    def test_02_archivo_invalido_no_escribe_nada(self):
+        """✅ Reporta todos los errores con su línea y no toca la base de datos"""
+        filas = [
+            {'sku': 'A-1', 'producto': 'Sandalia', 'categoria': 'Sandalias', 'precio': '500', 'tallas': '23:1'},
+            {'sku': 'A-1', 'producto': 'Sandalia', 'categoria': 'Sandalias', 'precio': '500'},
+            {'sku': 'A-2', 'producto': 'Sandalia', 'categoria': 'Sandalias', 'precio': 'gratis'},
+            {'sku': 'A-3', 'producto': 'Sandalia', 'categoria': 'Sandalias', 'precio': '500', 'tallas': '23:-1'},
+            {'sku': 'A-4', 'producto': '', 'categoria': 'Sandalias', 'precio': '500'},
+            {'sku': 'A-5', 'producto': 'Sandalia', 'categoria': 'Sandalias', 'precio': '500',
+             'imagenes': 'no-existe.png'},
+        ]
+        salida = io.StringIO()
+        with self.assertRaisesMessage(CommandError, '5 errores'):
+            call_command('import_catalog', self._csv(filas), '--imagenes', self.fotos, stderr=salida)
+
+        errores = salida.getvalue()
+        for esperado in ('línea 3: SKU A-1 repetido', 'línea 4: precio no es un número',
+                         'línea 5: stock negativo', 'línea 6: faltan producto',
+                         'línea 7: no existe la imagen no-existe.png'):
+            self.assertIn(esperado, errores)
+        self.assertFalse(Categoria.objects.exists())
+        self.assertFalse(Producto.objects.exists())
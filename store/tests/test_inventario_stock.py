@@ -0,0 +1,87 @@
+"""
+Tests de la actualización de stock en lote del inventario
+Ejecutar con: pytest store/tests/test_inventario_stock.py
+"""
+
+import json
+
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+
+from store.models import Categoria, Producto, Usuario, Variante
+
+URL = '/inventario/api/stock/lote/'
+
+
+class StockLoteTest(TestCase):
+    """SUITE: POST /inventario/api/stock/lote/"""
+
+    def setUp(self):
+        usuario = Usuario.objects.create(username='almacen', password='x', role='inventario')
+        sesion = self.client.session
+        sesion['inventario_user_id'] = usuario.id
+        sesion.save()
+
+        categoria = Categoria.objects.create(nombre='Tenis')
+        producto = Producto.objects.create(
+            nombre='Runner', descripcion='x', precio=100, categoria=categoria, genero='Unisex'
+        )
+        self.variantes = [
+            Variante.objects.create(producto=producto, color=f'Color {n}', tallas_stock={'26': 5, '27': 2})
+            for n in range(20)
+        ]
+
+    def _enviar(self, entradas, **extra):
+        return self.client.post(URL, json.dumps({'entradas': entradas, **extra}), content_type='application/json')
+
+    def test_01_fijar_y_ajustar_en_una_transaccion(self):
+        """✅ stock fija y delta ajusta; 40 entradas con consultas constantes y resultado por fila"""
+        entradas = []
+        for v in self.variantes:
+            entradas += [
+                {'variante_id': v.id, 'talla': '26', 'stock': 3},
+                {'variante_id': v.id, 'talla': '27', 'delta': -1},
+            ]
+        entradas.append({'variante_id': self.variantes[0].id, 'talla': '28', 'stock': '4'})
+
+        with CaptureQueriesContext(connection) as consultas:
+            respuesta = self._enviar(entradas)
+        self.assertEqual(respuesta.status_code, 200)
+        datos = respuesta.json()
+        self.assertEqual((datos['aplicadas'], datos['errores']), (41, 0))
+        self.assertEqual(datos['resultados'][1], {
+            'indice': 1, 'ok': True, 'variante_id': self.variantes[0].id,
+            'talla': '27', 'anterior': 2, 'stock': 1,
+        })
+        self.assertLess(len(consultas), 15)
+
+        self.assertEqual(Variante.objects.get(id=self.variantes[0].id).tallas_stock, {'26': 3, '27': 1, '28': 4})
+        self.assertEqual(Variante.objects.get(id=self.variantes[5].id).tallas_stock, {'26': 3, '27': 1})
+
+    def test_02_errores_cancelan_o_se_omiten_con_parcial(self):
+        """✅ Una entrada inválida cancela el lote; con parcial=true se aplican las válidas"""
+        v = self.variantes[0]
+        entradas = [
+            {'variante_id': v.id, 'talla': '26', 'delta': 1},
+            {'variante_id': v.id, 'talla': '27', 'delta': -3},
+            {'variante_id': 999999, 'talla': '26', 'stock': 1},
+            {'variante_id': v.id, 'talla': '26', 'stock': -1},
+            {'variante_id': v.id, 'talla': '30', 'delta': 1},
+        ]
+        respuesta = self._enviar(entradas)
+        self.assertEqual(respuesta.status_code, 400)
+        resultados = respuesta.json()['resultados']
+        self.assertEqual([r['ok'] for r in resultados], [True, False, False, False, False])
+        self.assertIn('negativo', resultados[1]['error'])
+        self.assertEqual(resultados[2]['error'], 'Variante no encontrada')
+        self.assertEqual(Variante.objects.get(id=v.id).tallas_stock, {'26': 5, '27': 2})
+
+        respuesta = self._enviar(entradas, parcial=True)
+        self.assertEqual(respuesta.status_code, 200)
+        self.assertEqual(respuesta.json()['aplicadas'], 1)
+        self.assertEqual(Variante.objects.get(id=v.id).tallas_stock, {'26': 6, '27': 2})
+
+        self.client.session.flush()
+        self.client.cookies.clear()
+        self.assertEqual(self._enviar(entradas).status_code, 401)
@@ -0,0 +1,136 @@
+"""
+Tests de presupuesto de consultas SQL en los endpoints más usados
+Ejecutar con: pytest store/tests/test_query_budget.py
+"""
+
+from decimal import Decimal
+
+from django.test import TestCase, override_settings
+
+from store.models import (
+    Carrito, CarritoProducto, Categoria, Cliente, Orden, OrdenDetalle, Producto, Usuario,
+    Variante, VarianteImagen, Wishlist,
+)
+from store.utils.query_metrics import PresupuestoQueriesExcedido, contar_queries
+from store.views.decorators import query_budget
+
+
+@override_settings(QUERY_BUDGET_ESTRICTO=True, QUERY_METRICS=True)
+class QueryBudgetTest(TestCase):
+    """SUITE: consultas por endpoint (no deben crecer con el número de filas)"""
+
+    def setUp(self):
+        self.categoria = Categoria.objects.create(nombre='Calzado')
+        self.cliente = Cliente.objects.create(username='qb_test', correo='', nombre='QB')
+        self.admin = Usuario.objects.create(username='qb_admin', password='x', role='admin')
+        self.wishlist = Wishlist.objects.create(cliente=self.cliente)
+        self.carrito = Carrito.objects.create(cliente=self.cliente, status='activo')
+        self.orden = Orden.objects.create(
+            carrito=self.carrito, cliente=self.cliente, total_amount=Decimal('100'), status='pendiente'
+        )
+        self.productos = []
+
+    def crear_productos(self, n):
+        """Agrega `n` productos con dos variantes e imágenes al carrito, la wishlist y la orden."""
+        for _ in range(n):
+            producto = Producto.objects.create(
+                nombre=f'Tenis {len(self.productos)}', descripcion='x', precio=Decimal('100'),
+                categoria=self.categoria,
+            )
+            self.productos.append(producto)
+            for color, principal in (('Negro', True), ('Blanco', False)):
+                variante = Variante.objects.create(
+                    producto=producto, color=color, tallas_stock={'27': 5}, es_variante_principal=principal
+                )
+                VarianteImagen.objects.create(variante=variante, imagen=f'variantes/{variante.id}.jpg')
+            CarritoProducto.objects.create(carrito=self.carrito, variante=variante, talla='27', cantidad=1)
+            OrdenDetalle.objects.create(
+                order=self.orden, variante=variante, talla='27', cantidad=1, precio_unitario=Decimal('100')
+            )
+            self.wishlist.productos.add(producto)
+
+    def queries(self, url, n_extra=4):
+        """Consultas de `url` con pocos y con más productos; deben ser las mismas."""
+        with contar_queries() as pocos:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        self.crear_productos(n_extra)
+        with contar_queries() as muchos:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('Server-Timing', response)
+        self.assertEqual(pocos.total, muchos.total, muchos.repetidas())
+        return muchos
+
+    def test_01_catalogo_y_wishlist(self):
+        """✅ /api/productos/ y la wishlist completa no hacen N+1"""
+        self.crear_productos(2)
+        session = self.client.session
+        session['cliente_id'] = self.cliente.id
+        session.save()
+
+        self.queries('/api/productos/')
+        self.queries(f'/wishlist/{self.cliente.id}/?full=true')
+        self.queries(f'/producto/{self.productos[0].id}/')
+
+    def test_02_carrito_y_ordenes(self):
+        """✅ El detalle del carrito y el listado de órdenes del admin no hacen N+1"""
+        self.crear_productos(2)
+        session = self.client.session
+        session['dashboard_user_id'] = self.admin.id
+        session.save()
+        self.carrito.session_key = session.session_key
+        self.carrito.cliente = None
+        self.carrito.save()
+
+        self.queries('/api/carrito/guest/')
+        self.queries('/api/admin/ordenes/')
+
+    def test_03_presupuesto_excedido_falla_el_test(self):
+        """✅ Una vista que supera su @query_budget lanza PresupuestoQueriesExcedido y señala el N+1"""
+        from django.http import JsonResponse
+        from django.test import RequestFactory
+
+        from store.middleware.query_metrics import QueryMetricsMiddleware
+
+        @query_budget(1)
+        def vista(request):
+            return JsonResponse({'n': [p.variantes.count() for p in Producto.objects.all()]})
+
+        self.crear_productos(2)
+        request = RequestFactory().get('/')
+        middleware = QueryMetricsMiddleware(lambda r: vista(r))
+        middleware.process_view(request, vista, (), {})
+
+        with self.assertRaises(PresupuestoQueriesExcedido) as error:
+            middleware(request)
+        self.assertIn('presupuesto 1', str(error.exception))
+        # Mismo SQL con distinto producto_id: cuenta como repetida aunque los parámetros cambien
+        self.assertIn('más repetida ×2', str(error.exception))
+
+    def test_04_crear_orden_no_crece_con_las_lineas(self):
+        """✅ Checkout de Stripe y finalizar_compra insertan todas las líneas de la orden en bloque"""
+        from store.views.orden import crear_orden_desde_payload
+        from store.views.payment import _calcular_items_carrito, _crear_orden_local
+
+        def crear_ordenes():
+            _, total, items, _ = _calcular_items_carrito(self.carrito)
+            otro_carrito = Carrito.objects.create(cliente=self.cliente, status='activo')
+            with contar_queries() as consultas:
+                orden = _crear_orden_local(self.carrito, self.cliente, total, items)
+                crear_orden_desde_payload({
+                    'carrito_id': otro_carrito.id,
+                    'total_amount': total / 100,
+                    'items': [
+                        {'variante_id': i['variante'].id, 'cantidad': i['cantidad'],
+                         'precio_unitario': i['precio_unitario'], 'talla': i['talla']}
+                        for i in items
+                    ],
+                })
+            self.assertEqual(orden.detalles.count(), len(items))
+            return consultas.total
+
+        self.crear_productos(2)
+        pocas = crear_ordenes()
+        self.crear_productos(50)
+        self.assertEqual(crear_ordenes(), pocas)
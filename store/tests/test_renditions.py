@@ -0,0 +1,71 @@
+"""
+Tests de las renditions responsivas (WebP/AVIF) de la galería
+Ejecutar con: pytest store/tests/test_renditions.py
+"""
+
+import io
+import shutil
+import tempfile
+
+from django.core.files.storage import default_storage
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from PIL import Image
+
+from store.models import Categoria, Producto, Variante, VarianteImagen
+from store.utils.renditions import formatos_disponibles, generar_renditions
+
+
+def imagen_png(nombre, ancho):
+    buffer = io.BytesIO()
+    Image.new('RGB', (ancho, ancho // 2), 'blue').save(buffer, format='PNG')
+    return SimpleUploadedFile(nombre, buffer.getvalue(), content_type='image/png')
+
+
+class RenditionsTest(TestCase):
+    """SUITE: generar_renditions y `manage.py generar_renditions`"""
+
+    def setUp(self):
+        self.media = tempfile.mkdtemp()
+        self.override = override_settings(MEDIA_ROOT=self.media)
+        self.override.enable()
+
+    def tearDown(self):
+        self.override.disable()
+        shutil.rmtree(self.media, ignore_errors=True)
+
+    def test_01_genera_anchos_sin_agrandar(self):
+        """✅ Cada formato disponible en los anchos menores al original; una imagen chica conserva su ancho"""
+        nombre = default_storage.save('variantes/prueba/imagen-1.png', imagen_png('imagen-1.png', 500))
+        renditions = generar_renditions(nombre)
+
+        self.assertEqual(set(renditions), set(formatos_disponibles()))
+        self.assertEqual(renditions['webp'], {
+            '200': 'variantes/prueba/imagen-1-200w.webp',
+            '400': 'variantes/prueba/imagen-1-400w.webp',
+        })
+        with default_storage.open(renditions['webp']['400'], 'rb') as fh, Image.open(fh) as reducida:
+            self.assertEqual((reducida.format, reducida.size), ('WEBP', (400, 200)))
+
+        chica = default_storage.save('variantes/prueba/chica.png', imagen_png('chica.png', 150))
+        self.assertEqual(list(generar_renditions(chica)['webp']), ['150'])
+
+    def test_02_comando_rellena_imagenes_existentes(self):
+        """✅ generar_renditions procesa las imágenes sin renditions y guarda sus srcset"""
+        categoria = Categoria.objects.create(nombre='Tenis')
+        producto = Producto.objects.create(nombre='Runner', descripcion='x', precio=100, categoria=categoria)
+        variante = Variante.objects.create(producto=producto, color='Negro', tallas_stock={'26': 1})
+        imagen = VarianteImagen.objects.create(variante=variante, imagen=imagen_png('imagen-1.png', 900), orden=1)
+        self.assertEqual(imagen.renditions, {})
+
+        salida = io.StringIO()
+        call_command('generar_renditions', workers=1, stdout=salida)
+        imagen.refresh_from_db()
+        self.assertEqual(sorted(imagen.renditions['webp'], key=int), ['200', '400', '800'])
+        self.assertTrue(default_storage.exists(imagen.renditions['webp']['800']))
+        self.assertIn('800w', imagen.srcsets_cache['webp'])
+        self.assertIn('Imágenes procesadas: 1', salida.getvalue())
+
+        call_command('generar_renditions', workers=1, stdout=salida)
+        self.assertIn('No hay imágenes pendientes', salida.getvalue())
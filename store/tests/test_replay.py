@@ -0,0 +1,57 @@
+"""
+Tests del replay de carga HTTP
+Ejecutar con: pytest store/tests/test_replay.py
+"""
+
+from django.test import LiveServerTestCase, SimpleTestCase
+
+from store.utils.catalogo_sintetico import generar_catalogo
+from store.utils.replay import ESCENARIOS_BASE, desde_access_log, desde_http, ejecutar
+
+HTTP = """
+@baseUrl = http://localhost:8000
+
+### Productos
+GET {{baseUrl}}/api/productos/
+
+### Login
+POST {{baseUrl}}/auth/login_client/
+Content-Type: application/json
+
+{"username": "demo", "password": "x"}
+"""
+
+LOG = [
+    '1.2.3.4 - - [19/Oct/2026:10:00:00 +0000] "GET /producto/12/ HTTP/1.1" 200 512 "-" "ua"',
+    '1.2.3.4 - - [19/Oct/2026:10:00:01 +0000] "GET /producto/7/ HTTP/1.1" 200 512 "-" "ua"',
+    '1.2.3.4 - - [19/Oct/2026:10:00:02 +0000] "GET /api/productos/?page=2 HTTP/1.1" 200 90 "-" "ua"',
+    '1.2.3.4 - - [19/Oct/2026:10:00:03 +0000] "GET /static/css/app.css HTTP/1.1" 200 10 "-" "ua"',
+    '1.2.3.4 - - [19/Oct/2026:10:00:04 +0000] "POST /api/carrito/create/3/ HTTP/1.1" 201 10 "-" "ua"',
+]
+
+
+class FuentesReplayTest(SimpleTestCase):
+    """SUITE: colecciones .http y access logs"""
+
+    def test_01_http_y_log_a_escenarios(self):
+        """✅ Sustituye variables, omite escrituras y pondera el log por apariciones"""
+        escenarios = desde_http(HTTP)
+        self.assertEqual([e.nombre for e in escenarios], ['http:GET /api/productos/'])
+        self.assertEqual(escenarios[0].pasos[0].ruta, '/api/productos/')
+        self.assertEqual(len(desde_http(HTTP, incluir_escritura=True)), 2)
+
+        pesos = {e.nombre: e.peso for e in desde_access_log(LOG)}
+        self.assertEqual(pesos, {'log:GET /producto/{id}/': 2, 'log:GET /api/productos/': 1})
+
+
+class ReplayServidorTest(LiveServerTestCase):
+    """SUITE: replay_carga contra un servidor real"""
+
+    def test_01_recorridos_base_sin_errores(self):
+        """✅ Los recorridos predefinidos corren contra el catálogo sin respuestas 5xx"""
+        generar_catalogo(productos=4, variantes_por=1)
+
+        reporte = ejecutar(self.live_server_url, ESCENARIOS_BASE, usuarios=1, iteraciones=12, semilla=3)
+
+        self.assertGreater(reporte['total']['requests'], 12)
+        self.assertEqual(reporte['total']['errores_pct'], 0, reporte['endpoints'])
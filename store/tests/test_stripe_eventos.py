@@ -0,0 +1,164 @@
+"""
+Tests de la bandeja de eventos de Stripe
+Ejecutar con: pytest store/tests/test_stripe_eventos.py
+"""
+
+import json
+from decimal import Decimal
+from unittest import mock
+
+from django.test import TestCase, override_settings
+
+from store.models import (
+    Carrito, CarritoProducto, Categoria, Cliente, Orden, OrdenDetalle, Producto, StripeEvento, Variante,
+)
+from store.utils.stripe_eventos import HANDLERS, procesar_pendientes
+
+
+def evento(event_id, tipo, obj, created=1_700_000_000):
+    return {'id': event_id, 'type': tipo, 'created': created, 'data': {'object': obj}}
+
+
+@override_settings(STRIPE_WEBHOOK_SECRET='', STRIPE_EVENTOS_MAX_INTENTOS=2, STRIPE_EVENTOS_BACKOFF=0)
+class StripeEventosTest(TestCase):
+    """SUITE: webhook → bandeja → worker"""
+
+    def setUp(self):
+        cliente = Cliente.objects.create(username='st_test', correo='', nombre='ST')
+        categoria = Categoria.objects.create(nombre='Calzado')
+        producto = Producto.objects.create(
+            nombre='Tenis', descripcion='x', precio=Decimal('100'), categoria=categoria
+        )
+        self.variante = Variante.objects.create(producto=producto, color='Negro', tallas_stock={'27': 5})
+        carrito = Carrito.objects.create(cliente=cliente, status='activo')
+        CarritoProducto.objects.create(carrito=carrito, variante=self.variante, talla='27', cantidad=2)
+        self.orden = Orden.objects.create(
+            carrito=carrito, cliente=cliente, total_amount=Decimal('200'),
+            status='pendiente_pago', payment_method='stripe', stripe_session_id='cs_1',
+        )
+        OrdenDetalle.objects.create(
+            order=self.orden, variante=self.variante, talla='27', cantidad=2, precio_unitario=Decimal('100')
+        )
+
+    def post(self, event):
+        return self.client.post('/pago/webhook/stripe/', data=json.dumps(event), content_type='application/json')
+
+    def test_01_webhook_solo_encola_y_es_idempotente(self):
+        """✅ El webhook no toca la orden y un reintento de Stripe no duplica el evento"""
+        ev = evento('evt_1', 'checkout.session.completed',
+                    {'id': 'cs_1', 'payment_intent': 'pi_1', 'payment_status': 'paid'})
+        self.assertFalse(self.post(ev).json()['duplicado'])
+        self.assertTrue(self.post(ev).json()['duplicado'])
+
+        self.assertEqual(StripeEvento.objects.count(), 1)
+        self.assertEqual(StripeEvento.objects.get().clave_orden, 'pi_1')
+        self.orden.refresh_from_db()
+        self.assertEqual(self.orden.status, 'pendiente_pago')
+
+    def test_02_worker_aplica_el_pago_una_vez(self):
+        """✅ El worker marca la orden y reduce stock una vez aunque llegue también payment_intent.succeeded"""
+        self.post(evento('evt_1', 'checkout.session.completed',
+                         {'id': 'cs_1', 'payment_intent': 'pi_1', 'payment_status': 'paid'}))
+        self.post(evento('evt_2', 'payment_intent.succeeded', {'id': 'pi_1'}, created=1_700_000_001))
+
+        with mock.patch('store.views.payment._enviar_email_confirmacion') as correo, \
+                self.captureOnCommitCallbacks(execute=True):
+            self.assertEqual(procesar_pendientes()['procesado'], 2)
+        self.assertEqual(procesar_pendientes(), {})
+        correo.assert_called_once()
+
+        self.orden.refresh_from_db()
+        self.variante.refresh_from_db()
+        self.assertEqual(self.orden.status, 'pagado')
+        self.assertEqual(self.orden.stripe_payment_intent, 'pi_1')
+        self.assertEqual(self.variante.tallas_stock['27'], 3)
+
+    def test_03_reintentos_orden_y_dead_letter(self):
+        """✅ Un evento que falla bloquea a los posteriores de su orden hasta morir"""
+        self.orden.stripe_payment_intent = 'pi_1'
+        self.orden.save()
+        self.post(evento('evt_1', 'payment_intent.succeeded', {'id': 'pi_1'}, created=1))
+        self.post(evento('evt_2', 'charge.refunded', {'id': 'ch_1', 'payment_intent': 'pi_1'}, created=2))
+
+        falla = mock.Mock(side_effect=RuntimeError('BD caída'))
+        with mock.patch.dict(HANDLERS, {'payment_intent.succeeded': falla}):
+            primera = procesar_pendientes()
+            self.assertEqual((primera['error'], primera['en_espera']), (1, 1))
+            segunda = procesar_pendientes()
+            self.assertEqual(segunda['muerto'], 1)
+
+        # Muerto el primero, el reembolso ya puede aplicarse
+        self.assertEqual(StripeEvento.objects.get(event_id='evt_1').estado, 'muerto')
+        self.assertEqual(StripeEvento.objects.get(event_id='evt_2').estado, 'procesado')
+        self.orden.refresh_from_db()
+        self.assertEqual(self.orden.status, 'reembolsado')
+
+
+class ReconcileStripeTest(TestCase):
+    """SUITE: reconcile_stripe (transiciones en lote)"""
+
+    def setUp(self):
+        self.cliente = Cliente.objects.create(username='rc_test', correo='', nombre='RC')
+        categoria = Categoria.objects.create(nombre='Calzado')
+        producto = Producto.objects.create(
+            nombre='Tenis', descripcion='x', precio=Decimal('100'), categoria=categoria
+        )
+        self.variante = Variante.objects.create(producto=producto, color='Negro', tallas_stock={'27': 5})
+
+    def orden(self, **kwargs):
+        orden = Orden.objects.create(
+            cliente=self.cliente, total_amount=Decimal('100'), status='pendiente_pago',
+            payment_method='stripe', **kwargs
+        )
+        OrdenDetalle.objects.create(
+            order=orden, variante=self.variante, talla='27', cantidad=1, precio_unitario=Decimal('100')
+        )
+        return orden
+
+    def test_01_aplica_transiciones_en_bloque(self):
+        """✅ Pagadas reducen stock, expiradas se cancelan y las que siguen igual no cambian"""
+        from store.utils.stripe_reconciliacion import reconciliar
+
+        pagada = self.orden(stripe_session_id='cs_pagada')
+        expirada = self.orden(stripe_session_id='cs_expirada')
+        sin_cambio = self.orden(stripe_session_id='cs_abierta')
+        por_pi = self.orden(stripe_payment_intent='pi_ok')
+        datos = {
+            pagada.id: ('session', {'payment_status': 'paid', 'status': 'complete', 'payment_intent': 'pi_1'}),
+            expirada.id: ('session', {'payment_status': 'unpaid', 'status': 'expired'}),
+            sin_cambio.id: ('session', {'payment_status': 'unpaid', 'status': 'open'}),
+            por_pi.id: ('payment_intent', {'status': 'succeeded'}),
+        }
+
+        cambios = reconciliar([pagada, expirada, sin_cambio, por_pi], datos)
+
+        self.assertEqual(len(cambios), 3)
+        estados = dict(Orden.objects.values_list('id', 'status'))
+        self.assertEqual(estados[pagada.id], 'procesando')
+        self.assertEqual(estados[expirada.id], 'cancelado')
+        self.assertEqual(estados[sin_cambio.id], 'pendiente_pago')
+        self.assertEqual(estados[por_pi.id], 'pagado')
+        self.assertEqual(Orden.objects.get(pk=pagada.pk).stripe_payment_intent, 'pi_1')
+        self.variante.refresh_from_db()
+        self.assertEqual(self.variante.tallas_stock['27'], 3)
+
+    def test_02_no_pisa_lo_que_escribio_el_worker(self):
+        """✅ Una lectura vieja no revierte el estado ni reduce stock o manda correo dos veces"""
+        from store.utils.stripe_reconciliacion import reconciliar
+
+        orden = self.orden(stripe_payment_intent='pi_ok')
+        leida = Orden.objects.get(pk=orden.pk)
+        # El worker de eventos la marca pagada y reduce stock mientras se consultaba Stripe
+        Orden.objects.filter(pk=orden.pk).update(status='pagado', stock_reducido=True)
+        datos = {orden.id: ('payment_intent', {'status': 'processing'})}
+
+        with mock.patch('store.views.payment._enviar_email_confirmacion') as correo, \
+                self.captureOnCommitCallbacks(execute=True):
+            cambios = reconciliar([leida], datos)
+            pagada = reconciliar([leida], {orden.id: ('payment_intent', {'status': 'succeeded'})})
+
+        self.assertEqual((cambios, pagada), ([], []))
+        self.assertEqual(Orden.objects.get(pk=orden.pk).status, 'pagado')
+        self.variante.refresh_from_db()
+        self.assertEqual(self.variante.tallas_stock['27'], 5)
+        correo.assert_not_called()
@@ -0,0 +1,109 @@
+"""
+Tests de la caché stale-while-revalidate (store/utils/swr.py)
+Ejecutar con: pytest store/tests/test_swr.py
+"""
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.cache import cache
+from django.test import SimpleTestCase, TestCase, override_settings
+
+from store.models import Producto
+from store.utils import swr
+from store.utils.catalogo_sintetico import generar_catalogo
+
+
+class CalculoLento:
+    """Función cara de prueba: cuenta sus llamadas y tarda `demora` segundos."""
+
+    def __init__(self, demora=0.2):
+        self.demora = demora
+        self.llamadas = 0
+        self._lock = threading.Lock()
+
+    def __call__(self):
+        with self._lock:
+            self.llamadas += 1
+            n = self.llamadas
+        time.sleep(self.demora)
+        return f'valor {n}'
+
+
+def en_paralelo(funcion, veces):
+    with ThreadPoolExecutor(max_workers=veces) as pool:
+        return list(pool.map(lambda _: funcion(), range(veces)))
+
+
+class SingleFlightTest(SimpleTestCase):
+    """SUITE: un solo cálculo por clave con requests simultáneos"""
+
+    def setUp(self):
+        cache.clear()
+
+    def test_01_fallo_concurrente_calcula_una_vez(self):
+        """✅ 8 requests sin valor en caché: uno calcula, los demás esperan su resultado"""
+        calcular = CalculoLento()
+        resultados = en_paralelo(lambda: swr.obtener('prueba', 'k', calcular, sellos=()), 8)
+
+        self.assertEqual(calcular.llamadas, 1)
+        self.assertEqual({valor for valor, _ in resultados}, {'valor 1'})
+        m = swr.metricas(['prueba'])['prueba']
+        self.assertEqual((m['fallo'], m['recalculo'], m['espera']), (8, 1, 7))
+
+    def test_02_obsoleto_se_sirve_mientras_se_recalcula(self):
+        """✅ Vencido el TTL suave todos reciben el valor viejo al instante y se recalcula una vez"""
+        calcular = CalculoLento(demora=0.3)
+        swr.obtener('prueba', 'k', calcular, suave=0, sellos=())
+
+        inicio = time.perf_counter()
+        resultados = en_paralelo(lambda: swr.obtener('prueba', 'k', calcular, suave=0, sellos=()), 8)
+        self.assertLess(time.perf_counter() - inicio, calcular.demora)
+        self.assertEqual(resultados, [('valor 1', 'obsoleto')] * 8)
+
+        self.assertEqual(swr.metricas(['prueba'])['prueba']['obsoleto'], 8)
+
+        time.sleep(calcular.demora + 0.2)
+        self.assertEqual(calcular.llamadas, 2)
+        valor, _ = swr.obtener('prueba', 'k', calcular, sellos=())
+        self.assertEqual(valor, 'valor 2')
+
+    def test_03_avisa_si_el_backend_no_tiene_lock_entre_procesos(self):
+        """✅ locmem y FileBasedCache generan el aviso de arranque; DatabaseCache no"""
+        for backend, avisa in (
+            ('django.core.cache.backends.locmem.LocMemCache', True),
+            ('django.core.cache.backends.filebased.FileBasedCache', True),
+            ('django.core.cache.backends.db.DatabaseCache', False),
+        ):
+            with self.subTest(backend=backend), override_settings(CACHES={'default': {'BACKEND': backend}}):
+                self.assertEqual(swr.comprobar_backend() is not None, avisa)
+
+
+@override_settings(SWR_SEGUNDO_PLANO=False)
+class VistaFiltrosSWRTest(TestCase):
+    """SUITE: @swr_cache en /api/filtros-disponibles/"""
+
+    def setUp(self):
+        cache.clear()
+        generar_catalogo(productos=6, variantes_por=1)
+
+    def test_01_estados_y_cambio_de_catalogo(self):
+        """✅ fallo → fresco; editar un producto lo vuelve obsoleto y la siguiente ya trae el cambio"""
+        url = '/api/filtros-disponibles/'
+        primera = self.client.get(url)
+        self.assertEqual(primera['X-Cache-SWR'], 'fallo')
+        segunda = self.client.get(url)
+        self.assertEqual(segunda['X-Cache-SWR'], 'fresco')
+        self.assertEqual(primera.json(), segunda.json())
+
+        producto = Producto.objects.filter(bodega=False).first()
+        producto.marca = 'Marca Nueva SWR'
+        producto.save()
+
+        obsoleta = self.client.get(url)
+        self.assertEqual(obsoleta['X-Cache-SWR'], 'obsoleto')
+        self.assertEqual(obsoleta.json(), primera.json())
+        actual = self.client.get(url)
+        self.assertEqual(actual['X-Cache-SWR'], 'fresco')
+        self.assertIn('Marca Nueva SWR', actual.content.decode())
@@ -0,0 +1,70 @@
+"""
+Tests del diccionario canónico de tallas
+Ejecutar con: pytest store/tests/test_tallas.py
+"""
+
+from django.core.cache import cache
+from django.test import TestCase
+
+from store.models import Categoria, Producto, Talla, Variante
+from store.utils import tallas
+
+
+class TallasTest(TestCase):
+    """SUITE: diccionario de tallas y orden por rango en detalle, búsqueda, filtros y wishlist"""
+
+    def setUp(self):
+        cache.clear()
+        tallas._registradas.clear()
+        categoria = Categoria.objects.create(nombre='Ropa')
+        self.producto = Producto.objects.create(
+            nombre='Playera básica', descripcion='x', precio=100, categoria=categoria, genero='Unisex',
+            bodega=False,
+        )
+        self.variante = Variante.objects.create(
+            producto=self.producto, color='Blanco',
+            tallas_stock={'XL': 1, 'm': 2, 'CH': 3, '2XL': 1, 'UNICA': 4},
+        )
+        Variante.objects.create(producto=self.producto, color='Negro', tallas_stock={'26': 1, '25.5': 2, '8': 1})
+
+    def test_01_diccionario_se_llena_al_guardar(self):
+        """✅ Cada clave nueva queda con etiqueta, sistema y rango; las conocidas no consultan la base"""
+        filas = {t.clave: (t.etiqueta, t.sistema) for t in Talla.objects.all()}
+        self.assertEqual(filas['m'], ('M', 'ropa'))
+        self.assertEqual(filas['CH'], ('S', 'ropa'))
+        self.assertEqual(filas['2XL'], ('XXL', 'ropa'))
+        self.assertEqual(filas['25.5'], ('25.5', 'calzado_mx'))
+        self.assertEqual(filas['UNICA'], ('Única', 'unica'))
+        self.assertEqual(
+            list(Talla.objects.values_list('clave', flat=True)),
+            ['8', '25.5', '26', 'CH', 'm', 'XL', '2XL', 'UNICA'],
+        )
+
+        variante = Variante.objects.get(pk=self.variante.pk)
+        variante.color = 'Hueso'
+        with self.assertNumQueries(1):  # solo el UPDATE
+            variante.save()
+        variante.aumentar_stock('S', 1)  # 'S' y 'CH' son la misma talla, pero la clave es nueva
+        self.assertTrue(Talla.objects.filter(clave='S', rango=tallas.clasificar('CH').rango).exists())
+
+    def test_02_endpoints_ordenan_por_rango(self):
+        """✅ Detalle, búsqueda, filtros y wishlist devuelven el mismo orden y filtran por etiqueta"""
+        orden = ['8', '25.5', '26', 'CH', 'm', 'XL', '2XL']
+
+        detalle = self.client.get(f'/producto/{self.producto.id}/')
+        self.assertEqual(detalle.context['tallas'], orden + ['UNICA'])
+
+        busqueda = self.client.get('/api/search/', {'q': 'playera'}).json()
+        self.assertEqual(busqueda['productos'][0]['tallas_disponibles'], orden + ['UNICA'])
+        self.assertEqual(self.client.get('/api/search/filters/').json()['tallas'], orden)
+        self.assertEqual(self.client.get('/api/filtros-disponibles/').json()['filtros']['tallas'], orden)
+        self.assertEqual(self.client.get(f'/api/productos/{self.producto.id}/').json()['tallas'], orden + ['UNICA'])
+
+        # 'M' encuentra la clave 'm' y 's' la clave 'CH'
+        self.assertEqual(len(self.client.get('/api/search/', {'tallas': 'M'}).json()['productos']), 1)
+        filtrados = self.client.get('/api/productos-filtrados/', {'tallas': 's'}).json()
+        self.assertEqual([p['id'] for p in filtrados['productos']], [self.producto.id])
+        self.assertFalse(self.client.get('/api/productos-filtrados/', {'tallas': 'XS'}).json()['productos'])
+        coleccion = self.client.get('/coleccion/todo/', {'tallas': 'ch', 'ajax': 1}).json()
+        self.assertEqual([p['id'] for p in coleccion['productos']], [self.producto.id])
+        self.assertFalse(self.client.get('/coleccion/todo/', {'tallas': 'XS', 'ajax': 1}).json()['productos'])
@@ -0,0 +1,118 @@
+"""
+Tests de los rollups diarios de ventas y su API admin
+Ejecutar con: pytest store/tests/test_ventas.py
+"""
+
+from datetime import date, datetime, timezone as dt_timezone
+from decimal import Decimal
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+
+from store.models import Categoria, Cliente, Orden, OrdenDetalle, Producto, Usuario, Variante, VentaDiaria
+from store.utils.jwt_helpers import generate_access_token
+from store.utils.ventas import agregar
+
+
+def _utc(*args):
+    return datetime(*args, tzinfo=dt_timezone.utc)
+
+
+@override_settings(VENTAS_ZONA_HORARIA='America/Mexico_City', VENTAS_MARGEN_SEGUNDOS=0, QUERY_BUDGET_ESTRICTO=True)
+class VentasDiariasTest(TestCase):
+    """SUITE: agregar_ventas y /api/admin/ventas/"""
+
+    def setUp(self):
+        self.cliente = Cliente.objects.create(username='comprador', correo='', nombre='C')
+        self.tenis = Categoria.objects.create(nombre='Tenis')
+        self.botas = Categoria.objects.create(nombre='Botas')
+        self.runner = Variante.objects.create(
+            producto=Producto.objects.create(nombre='Runner', descripcion='x', precio=100, categoria=self.tenis),
+            color='Negro', tallas_stock={'26': 50, '27': 50},
+        )
+        self.bota = Variante.objects.create(
+            producto=Producto.objects.create(nombre='Bota', descripcion='x', precio=300, categoria=self.botas),
+            color='Café', tallas_stock={'27': 50},
+        )
+
+    def _orden(self, creada, status, lineas):
+        orden = Orden.objects.create(cliente=self.cliente, total_amount=0, status=status)
+        OrdenDetalle.objects.bulk_create([
+            OrdenDetalle(order=orden, variante=v, talla=talla, cantidad=cantidad, precio_unitario=precio)
+            for v, talla, cantidad, precio in lineas
+        ])
+        Orden.objects.filter(id=orden.id).update(created_at=creada)
+        return orden
+
+    def _filas(self):
+        return sorted(VentaDiaria.objects.values_list('dia', 'status', 'talla', 'unidades', 'ingresos'))
+
+    def test_01_incremental_y_dias_de_ciudad_de_mexico(self):
+        """✅ 03:00 UTC cuenta para el día anterior en CDMX; solo se recalculan los días modificados"""
+        self._orden(_utc(2026, 3, 10, 3), 'pagado', [(self.runner, '26', 2, Decimal('100'))])
+        pendiente = self._orden(_utc(2026, 3, 10, 12), 'pendiente_pago', [(self.runner, '27', 1, Decimal('100'))])
+
+        resultado = agregar()
+        self.assertEqual((resultado.ordenes, resultado.dias), (2, 2))
+        self.assertEqual(self._filas(), [
+            (date(2026, 3, 9), 'pagado', '26', 2, Decimal('200.00')),
+            (date(2026, 3, 10), 'pendiente_pago', '27', 1, Decimal('100.00')),
+        ])
+
+        # Sin cambios no se toca nada
+        self.assertEqual(agregar().ordenes, 0)
+
+        # El pago mueve la línea de estado; el día 9 no se recalcula
+        pendiente.status = 'pagado'
+        pendiente.save(update_fields=['status', 'updated_at'])
+        resultado = agregar()
+        self.assertEqual((resultado.ordenes, resultado.dias), (1, 1))
+        esperado = [
+            (date(2026, 3, 9), 'pagado', '26', 2, Decimal('200.00')),
+            (date(2026, 3, 10), 'pagado', '27', 1, Decimal('100.00')),
+        ]
+        self.assertEqual(self._filas(), esperado)
+
+        # Borrar no deja rastro en updated_at: --desde recalcula
+        pendiente.delete()
+        call_command('agregar_ventas', '--desde', '2026-03-10', stdout=StringIO())
+        self.assertEqual(self._filas(), esperado[:1])
+
+    def test_02_api_serie_y_top(self):
+        """✅ Serie con días en cero y top-N por producto/talla, en consultas fijas"""
+        self._orden(_utc(2026, 3, 1, 18), 'pagado', [
+            (self.runner, '26', 3, Decimal('100')), (self.bota, '27', 1, Decimal('300')),
+        ])
+        self._orden(_utc(2026, 3, 3, 18), 'entregado', [(self.runner, '27', 1, Decimal('100'))])
+        self._orden(_utc(2026, 3, 3, 19), 'cancelado', [(self.bota, '27', 5, Decimal('300'))])
+        agregar()
+
+        admin = Usuario.objects.create(username='admin', password='x', role='admin')
+        auth = {'Authorization': f'Bearer {generate_access_token(admin.id, "admin")}'}
+        rango = {'desde': '2026-03-01', 'hasta': '2026-03-03'}
+
+        datos = self.client.get('/api/admin/ventas/serie/', rango, headers=auth).json()
+        self.assertEqual(
+            [(p['dia'], p['unidades'], p['ingresos']) for p in datos['serie']],
+            [('2026-03-01', 4, 600.0), ('2026-03-02', 0, 0.0), ('2026-03-03', 1, 100.0)],
+        )
+        self.assertEqual(datos['totales'], {'unidades': 5, 'ingresos': 700.0})
+        self.assertEqual(datos['zona_horaria'], 'America/Mexico_City')
+
+        datos = self.client.get(
+            '/api/admin/ventas/serie/', {**rango, 'status': 'todos', 'categoria': self.botas.id}, headers=auth
+        ).json()
+        self.assertEqual(datos['totales'], {'unidades': 6, 'ingresos': 1800.0})
+
+        datos = self.client.get('/api/admin/ventas/top/', {**rango, 'n': 1}, headers=auth).json()
+        self.assertEqual(
+            [(t['producto_id'], t['producto__nombre'], t['unidades']) for t in datos['top']],
+            [(self.runner.producto_id, 'Runner', 4)],
+        )
+        datos = self.client.get('/api/admin/ventas/top/', {**rango, 'por': 'talla', 'orden': 'unidades'}, headers=auth).json()
+        self.assertEqual([(t['talla'], t['unidades']) for t in datos['top']], [('26', 3), ('27', 2)])
+
+        self.assertEqual(self.client.get('/api/admin/ventas/top/', {'por': 'color'}, headers=auth).status_code, 400)
+        self.assertEqual(self.client.get('/api/admin/ventas/serie/', {'desde': '03/01'}, headers=auth).status_code, 400)
+        self.assertEqual(self.client.get('/api/admin/ventas/serie/').status_code, 401)
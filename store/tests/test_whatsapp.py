@@ -0,0 +1,104 @@
+"""
+Tests del despacho asíncrono de WhatsApp
+Ejecutar con: pytest store/tests/test_whatsapp.py
+"""
+
+from decimal import Decimal
+
+from django.test import SimpleTestCase, TestCase, override_settings
+
+from store.models import Carrito, CarritoProducto, Categoria, Cliente, Orden, Producto, Variante
+from store.utils.jwt_helpers import generate_access_token
+from store.utils.whatsapp import (
+    LocmemTransport, WhatsAppDispatcher, WhatsAppMessage, _transports,
+)
+
+
+class FallaDosVecesTransport:
+    """Transporte que falla en los dos primeros intentos"""
+    llamadas = 0
+
+    def send(self, message):
+        FallaDosVecesTransport.llamadas += 1
+        if FallaDosVecesTransport.llamadas <= 2:
+            raise ConnectionError("Twilio no responde")
+        return "SMok"
+
+
+LOCMEM = 'store.utils.whatsapp.LocmemTransport'
+FALLA = 'tests.falla_dos_veces'
+
+
+@override_settings(WHATSAPP_TRANSPORT=LOCMEM, WHATSAPP_RETRY_BACKOFF=0)
+class WhatsAppDispatcherTest(SimpleTestCase):
+    """SUITE: Dispatcher de WhatsApp"""
+
+    def setUp(self):
+        LocmemTransport.outbox = []
+
+    def test_01_encola_y_envia_en_segundo_plano(self):
+        """✅ En modo asíncrono el mensaje llega al transporte tras flush()"""
+        d = WhatsAppDispatcher()
+        self.assertTrue(d.enqueue(WhatsAppMessage(to='+5210000000000', body='hola')))
+        self.assertTrue(d.flush(timeout=5))
+        self.assertEqual(len(LocmemTransport.outbox), 1)
+        self.assertEqual(LocmemTransport.outbox[0].body, 'hola')
+
+    @override_settings(WHATSAPP_MAX_WORKERS=3)
+    def test_02_concurrencia_acotada(self):
+        """✅ Se arranca exactamente WHATSAPP_MAX_WORKERS hilos por proceso"""
+        d = WhatsAppDispatcher()
+        for i in range(10):
+            d.enqueue(WhatsAppMessage(to='+5210000000000', body=str(i)))
+        d.flush(timeout=5)
+        self.assertEqual(len(d._threads), 3)
+        self.assertEqual(len(LocmemTransport.outbox), 10)
+
+    @override_settings(WHATSAPP_TRANSPORT=FALLA,
+                       WHATSAPP_MAX_RETRIES=3)
+    def test_03_reintenta_hasta_exito(self):
+        """✅ Un error transitorio se reintenta"""
+        FallaDosVecesTransport.llamadas = 0
+        _transports[FALLA] = FallaDosVecesTransport()
+        message = WhatsAppMessage(to='+5210000000000', body='hola')
+        self.assertEqual(WhatsAppDispatcher().deliver(message), 'SMok')
+        self.assertEqual(message.intentos, 3)
+
+    @override_settings(WHATSAPP_TRANSPORT=FALLA,
+                       WHATSAPP_MAX_RETRIES=1)
+    def test_04_se_rinde_tras_max_reintentos(self):
+        """❌ Sin éxito tras WHATSAPP_MAX_RETRIES el mensaje se descarta"""
+        FallaDosVecesTransport.llamadas = 0
+        _transports[FALLA] = FallaDosVecesTransport()
+        message = WhatsAppMessage(to='+5210000000000', body='hola')
+        self.assertIsNone(WhatsAppDispatcher().deliver(message))
+        self.assertEqual(message.intentos, 2)
+
+
+@override_settings(WHATSAPP_TRANSPORT=LOCMEM, WHATSAPP_ASYNC=False)
+class FinalizarCompraWhatsAppTest(TestCase):
+    """SUITE: finalizar_compra delega el WhatsApp al dispatcher"""
+
+    def setUp(self):
+        LocmemTransport.outbox = []
+        self.cliente = Cliente.objects.create(username='wa_test', correo='wa@test.com', nombre='WA')
+        categoria = Categoria.objects.create(nombre='Calzado')
+        producto = Producto.objects.create(
+            nombre='Tenis', descripcion='x', precio=Decimal('100'), categoria=categoria
+        )
+        variante = Variante.objects.create(producto=producto, color='Negro', tallas_stock={'27': 5})
+        self.carrito = Carrito.objects.create(cliente=self.cliente, status='activo')
+        CarritoProducto.objects.create(carrito=self.carrito, variante=variante, talla='27', cantidad=2)
+        self.token = generate_access_token(self.cliente.id, 'cliente')
+
+    def test_01_orden_creada_y_mensaje_encolado(self):
+        """✅ La orden se guarda y el mensaje pasa por el transporte configurado"""
+        response = self.client.post(
+            f'/ordenar/{self.carrito.id}/enviar/',
+            content_type='application/json',
+            HTTP_AUTHORIZATION=f'Bearer {self.token}',
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(Orden.objects.filter(carrito=self.carrito).exists())
+        self.assertEqual(len(LocmemTransport.outbox), 1)
+        self.assertIn('Pedido #', LocmemTransport.outbox[0].body)
@@ -60,6 +60,10 @@ from .views.orden import (
     get_all_ordenes, cambiar_estado_orden, get_ordenes_cliente
 )
 
+# ─────────── Analítica de ventas y búsquedas (Admin) ───────────
+from .views.ventas import ventas_serie, ventas_top
+from .views.busquedas import busquedas_top, busquedas_sin_resultados
+
 # ─────────── Pago (Stripe) ───────────
 from .views.payment import (
     mostrar_formulario_pago_stripe, webhook_stripe,
@@ -82,7 +86,7 @@ from .views.views import (
 
 # ─────────── Búsqueda y Filtros ───────────
 from .views.search import (
-    search_products, get_filter_options, search_page
+    search_products, get_filter_options, search_page, registrar_clic_busqueda
 )
 
 # ─────────── Filtros Dinámicos ───────────
@@ -94,7 +98,9 @@ from .views.api_filtros import (
 from .views.inventario import (
     inventario_login_page, inventario_login, inventario_panel,
     inventario_crear_producto, inventario_categorias,
-    inventario_api_update_stock, inventario_api_delete_variante,
+    inventario_api_update_stock, inventario_api_update_stock_lote, inventario_api_delete_variante,
+    inventario_api_escanear, inventario_api_asignar_codigo,
+    inventario_api_alertas, inventario_api_umbrales,
     inventario_api_data, inventario_api_producto_detalle,
 )
 
@@ -148,6 +154,7 @@ urlpatterns = [
     path("api/subcategorias-por-categoria/<int:categoria_id>/", get_subcategorias_por_categoria, name="get_subcategorias_por_categoria"),
     path("api/search/",                search_products,     name="search_products"),
     path("api/search/filters/",        get_filter_options,  name="filter_options"),
+    path("api/search/clic/",           registrar_clic_busqueda, name="registrar_clic_busqueda"),
     path("api/filtros-disponibles/",   get_filtros_disponibles, name="filtros_disponibles"),
     path("api/productos-filtrados/",   get_productos_filtrados, name="productos_filtrados"),
 
@@ -226,6 +233,14 @@ urlpatterns = [
     # ---------- API Órdenes (Admin) ----------
     path("api/admin/ordenes/",                         get_all_ordenes,      name="api_get_all_ordenes"),
     path("api/admin/ordenes/<int:id>/estado/",         cambiar_estado_orden, name="api_cambiar_estado_orden"),
+
+    # ---------- API Ventas (Admin, rollups diarios) ----------
+    path("api/admin/ventas/serie/",                    ventas_serie,         name="api_ventas_serie"),
+    path("api/admin/ventas/top/",                      ventas_top,           name="api_ventas_top"),
+
+    # ---------- API Búsquedas (Admin, analítica) ----------
+    path("api/admin/busquedas/top/",                   busquedas_top,            name="api_busquedas_top"),
+    path("api/admin/busquedas/sin-resultados/",        busquedas_sin_resultados, name="api_busquedas_sin_resultados"),
     
     # ---------- API Órdenes (Cliente) ----------
     path("api/cliente/ordenes/",                       get_ordenes_cliente,  name="api_get_ordenes_cliente"),
@@ -251,6 +266,11 @@ urlpatterns = [
     path("inventario/crear/",                               inventario_crear_producto,     name="inventario_crear_producto"),
     path("inventario/categorias/",                          inventario_categorias,         name="inventario_categorias"),
     path("inventario/api/stock/<int:variante_id>/",         inventario_api_update_stock,    name="inventario_api_update_stock"),
+    path("inventario/api/stock/lote/",                      inventario_api_update_stock_lote, name="inventario_api_update_stock_lote"),
+    path("inventario/api/escanear/",                        inventario_api_escanear,       name="inventario_api_escanear"),
+    path("inventario/api/codigos/",                         inventario_api_asignar_codigo, name="inventario_api_asignar_codigo"),
+    path("inventario/api/alertas/",                         inventario_api_alertas,        name="inventario_api_alertas"),
+    path("inventario/api/umbrales/<int:variante_id>/",      inventario_api_umbrales,       name="inventario_api_umbrales"),
     path("inventario/api/variante/<int:variante_id>/",      inventario_api_delete_variante, name="inventario_api_delete_variante"),
     path("inventario/api/data/",                            inventario_api_data,           name="inventario_api_data"),
     path("inventario/api/producto/<int:producto_id>/",      inventario_api_producto_detalle, name="inventario_api_producto_detalle"),
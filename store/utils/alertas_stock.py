@@ -0,0 +1,136 @@
+"""
+Alertas de stock bajo y agotado
+===============================
+
+AlertaStock guarda solo las tallas en alerta:
+
+    stock <= 0        → 'agotado'
+    stock <= umbral   → 'bajo'   (umbral: Variante.umbrales_stock[talla]
+                                  o STOCK_UMBRAL_DEFAULT)
+
+No se recorre el catálogo: Variante.from_db guarda una copia del stock
+leído y, al guardar, solo se evalúan las tallas que cambiaron
+(Variante.tallas_modificadas). Un guardado sin cambios de stock no hace
+ninguna consulta; uno con cambios hace una lectura de las alertas de esas
+tallas y un upsert y/o un DELETE.
+
+    Variante.save() / reducir_stock() / aumentar_stock()  → señal post_save
+    bulk_update (lote de inventario, import_catalog)     → evaluar_variantes() explícito
+
+El resumen diario lo arma resumen() para `manage.py resumen_alertas_stock`.
+"""
+from django.conf import settings
+
+from store.models import AlertaStock, Variante
+
+
+def umbral_de(variante, talla):
+    umbral = (variante.umbrales_stock or {}).get(talla)
+    return int(umbral) if umbral is not None else settings.STOCK_UMBRAL_DEFAULT
+
+
+def estado_de(stock, umbral):
+    """'agotado', 'bajo' o None si la talla no está en alerta (o ya no existe)."""
+    if stock is None:
+        return None
+    if stock <= 0:
+        return 'agotado'
+    if stock <= umbral:
+        return 'bajo'
+    return None
+
+
+def evaluar_variantes(variantes, creadas=False):
+    """
+    Crea, actualiza o borra las alertas de las tallas modificadas de cada
+    variante. `creadas=True` evita leer alertas que aún no pueden existir.
+    Retorna (alertas activas escritas, alertas resueltas).
+    """
+    tallas = {}
+    for variante in variantes:
+        modificadas = variante.tallas_modificadas()
+        variante._stock_cargado = (dict(variante.tallas_stock or {}), dict(variante.umbrales_stock or {}))
+        if modificadas:
+            tallas[variante.pk] = (variante, modificadas)
+    if not tallas:
+        return 0, 0
+
+    existentes = {}
+    if not creadas:
+        for alerta in AlertaStock.objects.filter(
+            variante_id__in=tallas,
+            talla__in={t for _, modificadas in tallas.values() for t in modificadas},
+        ):
+            existentes[(alerta.variante_id, alerta.talla)] = alerta
+
+    escribir, resueltas = [], []
+    for variante_id, (variante, modificadas) in tallas.items():
+        for talla in modificadas:
+            stock = (variante.tallas_stock or {}).get(talla)
+            umbral = umbral_de(variante, talla)
+            estado = estado_de(stock, umbral)
+            actual = existentes.get((variante_id, talla))
+            if estado is None:
+                if actual is not None:
+                    resueltas.append(actual.pk)
+            elif actual is None or (actual.estado, actual.stock, actual.umbral) != (estado, stock, umbral):
+                escribir.append(AlertaStock(
+                    variante_id=variante_id, talla=talla, estado=estado, stock=stock, umbral=umbral,
+                ))
+
+    if escribir:
+        AlertaStock.objects.bulk_create(
+            escribir,
+            update_conflicts=True,
+            unique_fields=['variante', 'talla'],
+            update_fields=['estado', 'stock', 'umbral', 'actualizada_at'],
+        )
+    if resueltas:
+        AlertaStock.objects.filter(pk__in=resueltas).delete()
+    return len(escribir), len(resueltas)
+
+
+def recalcular_todo(lote=1000):
+    """Revisa todas las variantes (reparación tras cargas masivas sin evaluar_variantes)."""
+    AlertaStock.objects.all().delete()
+    activas = 0
+    variantes = Variante.objects.only('id', 'tallas_stock', 'umbrales_stock').order_by('pk')
+    ultimo = 0
+    while True:
+        bloque = list(variantes.filter(pk__gt=ultimo)[:lote])
+        if not bloque:
+            return activas
+        for variante in bloque:
+            variante._stock_cargado = None
+        activas += evaluar_variantes(bloque, creadas=True)[0]
+        ultimo = bloque[-1].pk
+
+
+def alerta_a_dict(alerta):
+    variante = alerta.variante
+    return {
+        "id": alerta.id,
+        "estado": alerta.estado,
+        "talla": alerta.talla,
+        "stock": alerta.stock,
+        "umbral": alerta.umbral,
+        "desde": alerta.creada_at.isoformat(),
+        "producto": {"id": variante.producto_id, "nombre": variante.producto.nombre},
+        "variante": {"id": variante.id, "sku": variante.sku or "", "color": variante.color or "N/A"},
+    }
+
+
+def resumen(desde=None):
+    """
+    Alertas activas para el correo diario, separadas por estado, y cuáles
+    son nuevas desde `desde` (el resumen anterior).
+    """
+    alertas = list(
+        AlertaStock.objects.select_related('variante__producto').order_by('stock', 'creada_at')
+    )
+    nuevas = [a for a in alertas if desde is None or a.creada_at >= desde]
+    return {
+        "agotadas": [a for a in alertas if a.estado == 'agotado'],
+        "bajas": [a for a in alertas if a.estado == 'bajo'],
+        "nuevas": nuevas,
+    }
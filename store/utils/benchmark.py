@@ -0,0 +1,153 @@
+"""
+Benchmark de los endpoints más usados con el cliente de pruebas de Django
+=========================================================================
+
+Para cada tamaño de catálogo (generado con store/utils/catalogo_sintetico.py)
+pide cada endpoint `repeticiones` veces y registra:
+
+    p50_ms / p95_ms   latencia del request completo (middleware incluido)
+    queries           consultas SQL del request (y cuántas duplicadas)
+    pico_kb           memoria Python máxima asignada durante el request (tracemalloc)
+
+`comparar()` contrasta un resultado contra una línea base guardada y
+regresa las regresiones: más consultas que antes, o latencia/memoria por
+encima de la tolerancia. Lo usa `manage.py benchmark_endpoints`.
+"""
+import statistics
+import time
+import tracemalloc
+
+from django.test import Client, override_settings
+
+from store.models import Carrito, CarritoProducto, Cliente, Producto, Variante
+from store.utils.catalogo_sintetico import PREFIJO, generar_catalogo, usuario_admin
+from store.utils.query_metrics import contar_queries
+
+# nombre → plantilla de URL (se completa con el contexto de preparar())
+ENDPOINTS = {
+    'catalogo': '/api/productos/',
+    'detalle_producto': '/producto/{producto_id}/',
+    'busqueda': '/api/search/?q={marca}',
+    'filtros': '/api/search/filters/',
+    'carrito_invitado': '/api/carrito/guest/',
+    'wishlist': '/wishlist/{cliente_id}/?full=true',
+    'ordenes_admin': '/api/admin/ordenes/',
+}
+
+
+def preparar(client):
+    """Sesión con admin y cliente sintéticos y un carrito de invitado con 5 piezas."""
+    cliente = Cliente.objects.filter(username__startswith='seed_').first()
+    if cliente is None:
+        cliente = Cliente.objects.create(username='seed_bench', nombre='Bench')
+    producto = (
+        Producto.objects.filter(categoria__nombre__startswith=PREFIJO, bodega=False)
+        .order_by('id').first()
+    )
+
+    session = client.session
+    session['dashboard_user_id'] = usuario_admin().id
+    session['cliente_id'] = cliente.id
+    session.save()
+
+    carrito, _ = Carrito.objects.get_or_create(
+        session_key=session.session_key, cliente=None, defaults={'status': 'activo'}
+    )
+    if not carrito.items.exists():
+        variantes = Variante.objects.filter(producto__categoria__nombre__startswith=PREFIJO)[:5]
+        CarritoProducto.objects.bulk_create([
+            CarritoProducto(carrito=carrito, variante=v, talla=next(iter(v.tallas_stock), 'UNICA'))
+            for v in variantes
+        ])
+    return {
+        'producto_id': producto.id if producto else 0,
+        'marca': producto.marca if producto else '',
+        'cliente_id': cliente.id,
+    }
+
+
+def _percentil(valores, p):
+    if len(valores) < 2:
+        return valores[0]
+    return statistics.quantiles(valores, n=100, method='inclusive')[p - 1]
+
+
+def medir(client, url, repeticiones=20):
+    """Latencia, consultas y memoria pico de `url` (tras un request de calentamiento)."""
+    response = client.get(url)
+    tiempos = []
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        client.get(url)
+        tiempos.append((time.perf_counter() - inicio) * 1000)
+
+    with contar_queries() as metricas:
+        client.get(url)
+
+    tracemalloc.start()
+    try:
+        client.get(url)
+        _, pico = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return {
+        'status': response.status_code,
+        'p50_ms': round(statistics.median(tiempos), 2),
+        'p95_ms': round(_percentil(tiempos, 95), 2),
+        'queries': metricas.total,
+        'duplicadas': metricas.duplicadas,
+        'pico_kb': round(pico / 1024, 1),
+    }
+
+
+def ejecutar(escalas, variantes_por=3, ordenes_por_producto=2, repeticiones=20, progreso=None):
+    """
+    Hace crecer el catálogo sintético hasta cada tamaño (escala) y mide los endpoints.
+    Retorna {str(escala): {endpoint: métricas}}.
+    """
+    resultados = {}
+    actuales = Producto.objects.filter(categoria__nombre__startswith=PREFIJO).count()
+    for escala in sorted(escalas):
+        faltan = escala - actuales
+        if faltan > 0:
+            generar_catalogo(
+                productos=faltan, variantes_por=variantes_por,
+                ordenes=faltan * ordenes_por_producto, semilla=escala,
+            )
+            actuales = escala
+
+        client = Client()
+        contexto = preparar(client)
+        resultados[str(escala)] = {}
+        # El tráfico sintético no entra a la analítica de búsquedas
+        with override_settings(BUSQUEDAS_LOG=False):
+            for nombre, plantilla in ENDPOINTS.items():
+                metricas = medir(client, plantilla.format(**contexto), repeticiones)
+                resultados[str(escala)][nombre] = metricas
+                if progreso:
+                    progreso(escala, nombre, metricas)
+    return resultados
+
+
+def comparar(actual, baseline, tolerancia=0.25, margen_ms=1.0):
+    """
+    Regresiones de `actual` frente a `baseline` (mismo formato que ejecutar()).
+    Consultas: cualquier aumento. Latencia p95 y memoria: más de `tolerancia`
+    (proporción) y, para la latencia, más de `margen_ms` absolutos (ruido).
+    """
+    regresiones = []
+    for escala, endpoints in actual.items():
+        for nombre, m in endpoints.items():
+            base = baseline.get(escala, {}).get(nombre)
+            if not base:
+                continue
+            etiqueta = f'{nombre} @ {escala}'
+            if m['queries'] > base['queries']:
+                regresiones.append(f"{etiqueta}: queries {base['queries']} → {m['queries']}")
+            if (m['p95_ms'] > base['p95_ms'] * (1 + tolerancia)
+                    and m['p95_ms'] - base['p95_ms'] > margen_ms):
+                regresiones.append(f"{etiqueta}: p95 {base['p95_ms']}ms → {m['p95_ms']}ms")
+            if m['pico_kb'] > base['pico_kb'] * (1 + tolerancia):
+                regresiones.append(f"{etiqueta}: memoria {base['pico_kb']}KB → {m['pico_kb']}KB")
+    return regresiones
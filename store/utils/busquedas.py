@@ -0,0 +1,231 @@
+"""
+Registro y analítica de búsquedas
+=================================
+
+search_products (/api/search/) y genero_view (/coleccion/<genero>/?q=)
+registran cada búsqueda con texto: consulta normalizada, filtros,
+resultados y latencia. Los clics en resultados llegan por
+/api/search/clic/ con el `busqueda_id` que devolvió la búsqueda.
+
+Nada se inserta en el request: los registros van a un buffer en memoria
+por proceso y un hilo daemon los escribe con bulk_create cada
+BUSQUEDAS_FLUSH_SEGUNDOS o al juntar BUSQUEDAS_LOTE. Si el buffer llega a
+BUSQUEDAS_BUFFER_MAX se descartan registros (es analítica, no pedidos).
+
+    registrar() / registrar_clic()  → buffer (sin consultas SQL)
+    vaciar()                        → escribe lo pendiente (tests, apagado)
+    top_consultas() / sin_resultados() → endpoints admin
+    purgar()                        → retención, `manage.py purgar_busquedas`
+
+Con BUSQUEDAS_ASYNC=False no hay hilo: el buffer se escribe al llenar un
+lote en el mismo request (o al llamar vaciar()).
+"""
+import atexit
+import logging
+import os
+import re
+import threading
+import unicodedata
+import uuid
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import connections
+from django.db.models import Avg, Count, Exists, Max, OuterRef, Q
+from django.utils import timezone
+
+from store.models import BusquedaClic, BusquedaLog
+
+logger = logging.getLogger(__name__)
+
+CONSULTA_MAX = 200
+LOTE_BORRADO = 5000
+
+
+# Orígenes aceptados en ?origen= (el resto se registra como 'api')
+ORIGENES = ('api', 'overlay', 'busqueda', 'coleccion')
+
+
+def filtros_de(query, claves):
+    """Filtros no vacíos del request que acompañaron a la búsqueda."""
+    return {clave: query[clave] for clave in claves if query.get(clave, '').strip()}
+
+
+def normalizar(texto):
+    """'  Tenis  NÍKE Air!' → 'tenis nike air'"""
+    texto = unicodedata.normalize('NFKD', texto or '')
+    texto = ''.join(c for c in texto if not unicodedata.combining(c)).lower()
+    texto = re.sub(r'[^\w\s.\-]', ' ', texto)
+    return ' '.join(texto.split())[:CONSULTA_MAX]
+
+
+class BufferBusquedas:
+    """
+    Buffer en memoria con un hilo que lo vacía periódicamente.
+
+    Como WhatsAppDispatcher, el hilo se arranca con el primer registro de
+    cada proceso (los hilos del maestro de gunicorn no pasan a los workers).
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._despertar = threading.Event()
+        self._pid = None
+        self._hilo = None
+        self._busquedas = []
+        self._clics = []
+        self.descartados = 0
+
+    # ── Configuración ─────────────────────────────────────────
+    @property
+    def asincrono(self):
+        return getattr(settings, 'BUSQUEDAS_ASYNC', True)
+
+    @property
+    def lote(self):
+        return max(1, int(getattr(settings, 'BUSQUEDAS_LOTE', 200)))
+
+    @property
+    def maximo(self):
+        return int(getattr(settings, 'BUSQUEDAS_BUFFER_MAX', 10000))
+
+    # ── Ciclo de vida ─────────────────────────────────────────
+    def _asegurar_hilo(self):
+        if self._pid == os.getpid() and self._hilo is not None:
+            return
+        with self._lock:
+            if self._pid == os.getpid() and self._hilo is not None:
+                return
+            self._pid = os.getpid()
+            # Lo heredado del maestro tras fork se escribiría dos veces
+            self._busquedas, self._clics = [], []
+            self._hilo = threading.Thread(target=self._ciclo, name='busquedas-log', daemon=True)
+            self._hilo.start()
+
+    def _ciclo(self):
+        while True:
+            self._despertar.wait(float(getattr(settings, 'BUSQUEDAS_FLUSH_SEGUNDOS', 10)))
+            self._despertar.clear()
+            if not self.asincrono:
+                continue
+            try:
+                self.vaciar()
+            finally:
+                connections.close_all()
+
+    def _agregar(self, lista, registro):
+        if self.asincrono:
+            self._asegurar_hilo()
+        with self._lock:
+            if len(self._busquedas) + len(self._clics) >= self.maximo:
+                self.descartados += 1
+                return
+            lista.append(registro)
+            lleno = len(self._busquedas) + len(self._clics) >= self.lote
+        if lleno:
+            if self.asincrono:
+                self._despertar.set()
+            else:
+                self.vaciar()
+
+    # ── API ───────────────────────────────────────────────────
+    def registrar(self, consulta, resultados, latencia_ms, filtros=None, origen='api'):
+        """Encola una búsqueda. Retorna su token (busqueda_id) o None si no se registra."""
+        consulta = normalizar(consulta)
+        if not consulta or not getattr(settings, 'BUSQUEDAS_LOG', True):
+            return None
+        token = uuid.uuid4().hex
+        self._agregar(self._busquedas, BusquedaLog(
+            token=token,
+            consulta=consulta,
+            origen=origen,
+            filtros=filtros or {},
+            resultados=max(0, int(resultados)),
+            latencia_ms=max(0, round(latencia_ms)),
+            created_at=timezone.now(),
+        ))
+        return token
+
+    def registrar_clic(self, token, producto_id, posicion=None):
+        if not getattr(settings, 'BUSQUEDAS_LOG', True):
+            return
+        self._agregar(self._clics, BusquedaClic(
+            token=token, producto_id=producto_id, posicion=posicion, created_at=timezone.now(),
+        ))
+
+    def vaciar(self):
+        """Escribe lo pendiente en dos bulk_create. Retorna (búsquedas, clics) escritos."""
+        with self._lock:
+            busquedas, self._busquedas = self._busquedas, []
+            clics, self._clics = self._clics, []
+        if not busquedas and not clics:
+            return 0, 0
+        try:
+            BusquedaLog.objects.bulk_create(busquedas, batch_size=self.lote)
+            BusquedaClic.objects.bulk_create(clics, batch_size=self.lote)
+        except Exception:
+            logger.exception('Búsquedas: no se pudo escribir un lote (%s búsquedas, %s clics)', len(busquedas), len(clics))
+            return 0, 0
+        return len(busquedas), len(clics)
+
+
+buffer = BufferBusquedas()
+registrar = buffer.registrar
+registrar_clic = buffer.registrar_clic
+vaciar = buffer.vaciar
+atexit.register(vaciar)
+
+
+# ───────────────────────────────────────────────
+# Analítica (endpoints admin)
+# ───────────────────────────────────────────────
+
+def top_consultas(desde, n=20):
+    """Consultas más buscadas con resultados promedio, latencia y tasa de clics."""
+    con_clic = Exists(BusquedaClic.objects.filter(token=OuterRef('token')))
+    filas = (
+        BusquedaLog.objects.filter(created_at__gte=desde)
+        .values('consulta')
+        .annotate(
+            busquedas=Count('id'),
+            con_clic=Count('id', filter=con_clic),
+            resultados_promedio=Avg('resultados'),
+            latencia_ms_promedio=Avg('latencia_ms'),
+            sin_resultados=Count('id', filter=Q(resultados=0)),
+        )
+        .order_by('-busquedas', 'consulta')[:n]
+    )
+    return [
+        {
+            **fila,
+            'resultados_promedio': round(fila['resultados_promedio'], 1),
+            'latencia_ms_promedio': round(fila['latencia_ms_promedio'], 1),
+            'ctr': round(fila['con_clic'] / fila['busquedas'], 3),
+        }
+        for fila in filas
+    ]
+
+
+def sin_resultados(desde, n=20):
+    """Consultas que no devolvieron nada: candidatas a sinónimos o a catálogo nuevo."""
+    return list(
+        BusquedaLog.objects.filter(created_at__gte=desde, resultados=0)
+        .values('consulta')
+        .annotate(busquedas=Count('id'), ultima=Max('created_at'))
+        .order_by('-busquedas', '-ultima')[:n]
+    )
+
+
+def purgar(dias):
+    """Borra búsquedas y clics de hace más de `dias` días, por lotes. Retorna (búsquedas, clics)."""
+    limite = timezone.now() - timedelta(days=dias)
+    borrados = []
+    for modelo in (BusquedaLog, BusquedaClic):
+        total = 0
+        while True:
+            ids = list(modelo.objects.filter(created_at__lt=limite).values_list('id', flat=True)[:LOTE_BORRADO])
+            if not ids:
+                break
+            total += modelo.objects.filter(id__in=ids).delete()[0]
+        borrados.append(total)
+    return tuple(borrados)
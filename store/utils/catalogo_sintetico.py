@@ -0,0 +1,227 @@
+"""
+Catálogo sintético para pruebas de carga y benchmarks
+=====================================================
+
+Genera en bloque (bulk_create) datos con la forma de la tienda real:
+categorías por género con subcategorías de marca, productos con variantes
+de color y tallas con stock, galería de imágenes, clientes con wishlist y
+órdenes con detalle repartidas en los últimos meses.
+
+Todo lo generado lleva el prefijo PREFIJO ("Seed" en categorías, "seed_"
+en usernames) para poder borrarlo con `limpiar_catalogo()` sin tocar datos
+reales. Con la misma `semilla` el resultado es el mismo.
+
+Lo usan `manage.py seed_catalog` y `manage.py benchmark_endpoints`.
+"""
+import random
+from datetime import timedelta
+from decimal import Decimal
+
+from django.db import transaction
+from django.utils import timezone
+
+from store.models import (
+    Categoria, Cliente, Orden, OrdenDetalle, Producto, Subcategoria, Usuario,
+    Variante, VarianteImagen, Wishlist,
+)
+from store.utils.fragmentos import invalidar_catalogo
+
+PREFIJO = 'Seed'
+
+CATEGORIAS = {
+    'Caballero': ('Hombre', [str(t) for t in range(25, 31)]),
+    'Dama': ('Mujer', [str(t) for t in range(22, 27)]),
+    'Unisex': ('Unisex', ['CH', 'M', 'G', 'EG']),
+}
+MARCAS = ['Nike', 'Adidas', 'Puma', 'New Balance', 'Vans', 'Converse', 'Reebok', 'Asics']
+MODELOS = ['Air', 'Runner', 'Classic', 'Retro', 'Court', 'Trail', 'Street', 'Pro', 'Low', 'High']
+COLORES = ['Negro', 'Blanco', 'Rojo', 'Azul', 'Gris', 'Verde', 'Beige', 'Rosa']
+STATUS_ORDEN = ['pagado', 'procesando', 'enviado', 'entregado', 'cancelado', 'pendiente_pago']
+IMAGENES_POR_VARIANTE = 3
+LOTE = 1000
+
+
+def _categorias():
+    """Categorías y subcategorías (marca) del catálogo sintético, creándolas si faltan."""
+    categorias = {}
+    for nombre, (genero, tallas) in CATEGORIAS.items():
+        categoria, _ = Categoria.objects.get_or_create(nombre=f'{PREFIJO} {nombre}')
+        subcategorias = [
+            Subcategoria.objects.get_or_create(categoria=categoria, nombre=marca)[0]
+            for marca in MARCAS
+        ]
+        categorias[nombre] = (categoria, genero, tallas, subcategorias)
+    return categorias
+
+
+def _imagenes(variantes):
+    """Filas de galería con la URL precalculada (bulk_create no llama a save())."""
+    filas = []
+    for variante in variantes:
+        for orden in range(1, IMAGENES_POR_VARIANTE + 1):
+            imagen = VarianteImagen(
+                variante=variante, orden=orden,
+                imagen=f'productos/seed/{variante.producto_id}/{variante.color.lower()}_{orden}.webp',
+            )
+            imagen.imagen_url_cache = imagen.imagen.url
+            filas.append(imagen)
+    return filas
+
+
+@transaction.atomic
+def generar_catalogo(productos=100, variantes_por=3, ordenes=0, clientes=None, semilla=42):
+    """
+    Agrega `productos` productos con `variantes_por` variantes cada uno y
+    `ordenes` órdenes. Retorna un dict con lo creado por modelo.
+    """
+    rnd = random.Random(semilla)
+    categorias = _categorias()
+    inicio = Producto.objects.filter(categoria__nombre__startswith=PREFIJO).count()
+
+    nuevos = []
+    for i in range(inicio, inicio + productos):
+        nombre_cat = rnd.choice(list(categorias))
+        categoria, genero, _, _ = categorias[nombre_cat]
+        marca = rnd.choice(MARCAS)
+        precio = Decimal(rnd.randrange(899, 4999, 50))
+        nuevos.append(Producto(
+            nombre=f'{marca} {rnd.choice(MODELOS)} {i:05d}',
+            descripcion=f'{marca} modelo sintético #{i} para pruebas de carga.',
+            precio=precio,
+            precio_mayorista=(precio * Decimal('0.7')).quantize(Decimal('1')),
+            categoria=categoria,
+            genero=genero,
+            marca=marca,
+            en_oferta=rnd.random() < 0.15,
+            bodega=rnd.random() < 0.1,
+        ))
+    nuevos = Producto.objects.bulk_create(nuevos, batch_size=LOTE)
+
+    # Subcategorías: la de su marca y a veces otra
+    subs_de = {cat.id: subs for cat, _, _, subs in categorias.values()}
+    Enlace = Producto.subcategorias.through
+    enlaces = []
+    for producto in nuevos:
+        subs = subs_de[producto.categoria_id]
+        elegidas = {next(s for s in subs if s.nombre == producto.marca)}
+        if rnd.random() < 0.3:
+            elegidas.add(rnd.choice(subs))
+        enlaces += [Enlace(producto_id=producto.id, subcategoria_id=s.id) for s in elegidas]
+    Enlace.objects.bulk_create(enlaces, batch_size=LOTE)
+
+    tallas_de = {cat.id: tallas for cat, _, tallas, _ in categorias.values()}
+    variantes = []
+    for producto in nuevos:
+        colores = rnd.sample(COLORES, min(variantes_por, len(COLORES)))
+        for n, color in enumerate(colores):
+            tallas = tallas_de[producto.categoria_id]
+            variantes.append(Variante(
+                producto=producto,
+                color=color,
+                es_variante_principal=n == 0,
+                tallas_stock={t: rnd.randint(0, 12) for t in tallas},
+                precio=producto.precio if rnd.random() < 0.8 else producto.precio + 200,
+                precio_mayorista=producto.precio_mayorista,
+            ))
+    variantes = Variante.objects.bulk_create(variantes, batch_size=LOTE)
+    imagenes = VarianteImagen.objects.bulk_create(_imagenes(variantes), batch_size=LOTE)
+
+    # bulk_create no dispara señales: renovar los fragmentos cacheados del catálogo
+    invalidar_catalogo()
+    creados = {'productos': len(nuevos), 'variantes': len(variantes), 'imagenes': len(imagenes)}
+    if ordenes:
+        creados.update(_generar_ordenes(rnd, ordenes, clientes or max(1, ordenes // 5)))
+    return creados
+
+
+def _generar_ordenes(rnd, ordenes, clientes):
+    """Clientes con wishlist y órdenes de 1-4 piezas en los últimos 180 días."""
+    existentes = Cliente.objects.filter(username__startswith='seed_').count()
+    nuevos = Cliente.objects.bulk_create([
+        Cliente(username=f'seed_{i:06d}', correo=f'seed_{i:06d}@example.com', nombre=f'Cliente {i}',
+                ciudad=rnd.choice(['CDMX', 'Guadalajara', 'Monterrey', 'Puebla']))
+        for i in range(existentes, existentes + clientes)
+    ], batch_size=LOTE)
+    todos = list(Cliente.objects.filter(username__startswith='seed_'))
+
+    catalogo = list(
+        Variante.objects.filter(producto__categoria__nombre__startswith=PREFIJO)
+        .values_list('id', 'producto_id', 'precio', 'tallas_stock', 'producto__nombre')
+    )
+    wishlists = Wishlist.objects.bulk_create([Wishlist(cliente=c) for c in nuevos], batch_size=LOTE)
+    Enlace = Wishlist.productos.through
+    Enlace.objects.bulk_create([
+        Enlace(wishlist_id=w.id, producto_id=producto_id)
+        for w in wishlists
+        for producto_id in {v[1] for v in rnd.sample(catalogo, min(5, len(catalogo)))}
+    ], batch_size=LOTE, ignore_conflicts=True)
+
+    ahora = timezone.now()
+    filas = []
+    for _ in range(ordenes):
+        items = []
+        for variante_id, _, precio, tallas, _ in rnd.sample(catalogo, min(rnd.randint(1, 4), len(catalogo))):
+            items.append((variante_id, rnd.choice(list(tallas) or ['UNICA']), rnd.randint(1, 2), precio))
+        filas.append((
+            Orden(
+                cliente=rnd.choice(todos),
+                total_amount=sum(cantidad * precio for _, _, cantidad, precio in items),
+                status=rnd.choice(STATUS_ORDEN),
+                payment_method=rnd.choice(['stripe', 'transferencia']),
+                total_piezas=sum(cantidad for _, _, cantidad, _ in items),
+                total_lineas=len(items),
+            ),
+            items,
+            ahora - timedelta(days=rnd.uniform(0, 180)),
+        ))
+
+    creadas = Orden.objects.bulk_create([orden for orden, _, _ in filas], batch_size=LOTE)
+
+    # Miniaturas del historial como las deja actualizar_resumen(), sin sus 3 consultas por orden:
+    # primera imagen de cada variante comprada (las líneas de una orden ya son variantes distintas)
+    nombres = {variante_id: nombre for variante_id, _, _, _, nombre in catalogo}
+    portadas = {}
+    for variante_id, archivo, url in (
+        VarianteImagen.objects.filter(variante_id__in={i[0] for _, items, _ in filas for i in items})
+        .order_by('orden', 'id')
+        .values_list('variante_id', 'imagen', 'imagen_url_cache')
+    ):
+        portadas.setdefault(variante_id, (url, archivo))
+
+    # auto_now_add ignora el valor en bulk_create: la fecha se reparte después
+    for orden, items, fecha in filas:
+        orden.created_at = fecha
+        orden.miniaturas = []
+        for variante_id, _, cantidad, _ in items[:Orden.MINIATURAS]:
+            imagen, archivo = portadas.get(variante_id, ('', ''))
+            orden.miniaturas.append({
+                'producto_nombre': nombres[variante_id],
+                'imagen': imagen,
+                'archivo': archivo,
+                'cantidad': cantidad,
+            })
+    Orden.objects.bulk_update(creadas, ['created_at', 'miniaturas'], batch_size=LOTE)
+    detalles = OrdenDetalle.objects.bulk_create([
+        OrdenDetalle(order=orden, variante_id=variante_id, talla=talla, cantidad=cantidad, precio_unitario=precio)
+        for orden, items, _ in filas
+        for variante_id, talla, cantidad, precio in items
+    ], batch_size=LOTE)
+    return {'clientes': len(nuevos), 'ordenes': len(creadas), 'detalles': len(detalles)}
+
+
+def usuario_admin():
+    """Usuario admin del catálogo sintético (para los endpoints del dashboard)."""
+    usuario, _ = Usuario.objects.get_or_create(
+        username=f'{PREFIJO.lower()}_admin', defaults={'password': '!', 'role': 'admin'}
+    )
+    return usuario
+
+
+@transaction.atomic
+def limpiar_catalogo():
+    """Borra todo lo generado (las variantes, imágenes y órdenes caen en cascada)."""
+    ordenes = Orden.objects.filter(cliente__username__startswith='seed_').delete()[0]
+    clientes = Cliente.objects.filter(username__startswith='seed_').delete()[0]
+    categorias = Categoria.objects.filter(nombre__startswith=f'{PREFIJO} ').delete()[0]
+    Usuario.objects.filter(username=f'{PREFIJO.lower()}_admin').delete()
+    return ordenes + clientes + categorias
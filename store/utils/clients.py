@@ -0,0 +1,128 @@
+"""
+Acceso perezoso a SDKs de terceros
+==================================
+
+Stripe, Twilio y boto3 son pesados de importar y ninguno se necesita para
+arrancar un worker o correr la mayoría de los comandos de manage.py. Aquí
+se importan y configuran la primera vez que alguien los pide, y el cliente
+resultante se reutiliza en todo el proceso.
+
+Uso:
+    from store.utils.clients import get_stripe
+    stripe = get_stripe()
+    stripe.checkout.Session.retrieve(session_id)
+
+    # En vistas async (despliegue ASGI)
+    async with stripe_async() as stripe:
+        await stripe.checkout.sessions.retrieve_async(session_id)
+
+`python manage.py startup_profile` verifica que sigan fuera del arranque.
+"""
+import asyncio
+import threading
+import weakref
+from contextlib import asynccontextmanager
+
+from django.conf import settings
+
+_lock = threading.Lock()
+_stripe = None
+_stripe_async = weakref.WeakKeyDictionary()
+_twilio_client = None
+_s3_clients = {}
+
+
+def get_stripe():
+    """Módulo `stripe` con la API key ya configurada."""
+    global _stripe
+    if _stripe is None:
+        with _lock:
+            if _stripe is None:
+                import stripe
+                stripe.api_key = settings.STRIPE_SECRET_KEY
+                # p.ej. http://localhost:12111 para pruebas con stripe-mock
+                if getattr(settings, 'STRIPE_API_BASE', ''):
+                    stripe.api_base = settings.STRIPE_API_BASE
+                _stripe = stripe
+    return _stripe
+
+
+def _nuevo_stripe_async():
+    """(StripeClient, cliente HTTP aiohttp que usa)"""
+    import stripe
+    http = stripe.AIOHTTPClient(timeout=30)
+    base = {'api': settings.STRIPE_API_BASE} if getattr(settings, 'STRIPE_API_BASE', '') else {}
+    return stripe.StripeClient(settings.STRIPE_SECRET_KEY, base_addresses=base, http_client=http), http
+
+
+@asynccontextmanager
+async def stripe_async():
+    """
+    StripeClient con HTTP asíncrono (aiohttp) para las vistas async.
+
+    La sesión de aiohttp pertenece al event loop que la creó. Con
+    GUNICORN_MODO=asgi cada worker uvicorn tiene un solo loop y el cliente se
+    reutiliza (keep-alive hacia Stripe); en WSGI cada vista async corre en un
+    loop que muere con el request, así que el cliente se cierra al salir.
+    """
+    if getattr(settings, 'GUNICORN_MODO', 'wsgi') == 'asgi':
+        loop = asyncio.get_running_loop()
+        if loop not in _stripe_async:
+            _stripe_async[loop] = _nuevo_stripe_async()
+        yield _stripe_async[loop][0]
+        return
+
+    client, http = _nuevo_stripe_async()
+    try:
+        yield client
+    finally:
+        await http.close_async()
+
+
+async def cerrar_stripe_async():
+    """Cierra el cliente reutilizado en el loop actual (modo asgi), si existe."""
+    par = _stripe_async.pop(asyncio.get_running_loop(), None)
+    if par is not None:
+        await par[1].close_async()
+
+
+def get_twilio_client():
+    """Cliente Twilio único por proceso, con pool de conexiones HTTP."""
+    global _twilio_client
+    if _twilio_client is None:
+        with _lock:
+            if _twilio_client is None:
+                from twilio.http.http_client import TwilioHttpClient
+                from twilio.rest import Client
+                _twilio_client = Client(
+                    settings.TWILIO_ACCOUNT_SID,
+                    settings.TWILIO_AUTH_TOKEN,
+                    http_client=TwilioHttpClient(pool_connections=True, timeout=15),
+                )
+    return _twilio_client
+
+
+def get_s3_client(endpoint_url=None, **kwargs):
+    """
+    Cliente boto3 de S3 usando las credenciales de settings (o las del
+    entorno si no hay). `endpoint_url` permite apuntar a un S3 local
+    (MinIO, moto) en desarrollo y pruebas.
+    """
+    key = (endpoint_url, tuple(sorted(kwargs.items())))
+    client = _s3_clients.get(key)
+    if client is None:
+        with _lock:
+            client = _s3_clients.get(key)
+            if client is None:
+                import boto3
+                opciones = {
+                    'region_name': getattr(settings, 'AWS_S3_REGION_NAME', None),
+                    'aws_access_key_id': getattr(settings, 'AWS_ACCESS_KEY_ID', None),
+                    'aws_secret_access_key': getattr(settings, 'AWS_SECRET_ACCESS_KEY', None),
+                }
+                opciones.update(kwargs)
+                if endpoint_url:
+                    opciones['endpoint_url'] = endpoint_url
+                client = boto3.client('s3', **{k: v for k, v in opciones.items() if v})
+                _s3_clients[key] = client
+    return client
@@ -0,0 +1,84 @@
+"""
+Resolución de códigos escaneados en el inventario
+=================================================
+
+Un código leído por el escáner puede ser:
+
+    código de barras  → CodigoBarras (UPC/EAN de una talla concreta)
+    SKU               → Variante.sku (la variante completa, sin talla)
+
+Ambas columnas tienen índice único, así que cada búsqueda es un solo
+acceso por índice con el producto en el mismo JOIN. Se prueba primero el
+código de barras (lo que traen las etiquetas de los proveedores) y luego
+el SKU. No se cachea nada: el stock que se devuelve es el de la base de
+datos en ese momento, que es lo que necesita un conteo.
+
+Lo usan los endpoints /inventario/api/escanear/ y /inventario/api/codigos/.
+"""
+from django.db import IntegrityError, transaction
+
+from store.models import CodigoBarras, Variante
+
+
+class CodigoEnUso(Exception):
+    """El código ya está asignado a otra talla o es el SKU de una variante."""
+
+
+def resolver(codigo):
+    """
+    (variante, talla, tipo) del código, con variante.producto ya cargado.
+    `talla` es None si el código es un SKU. Retorna None si no existe.
+    """
+    codigo = (codigo or '').strip()
+    if not codigo:
+        return None
+    barras = CodigoBarras.objects.select_related('variante__producto').filter(codigo=codigo).first()
+    if barras is not None:
+        return barras.variante, barras.talla, 'codigo_barras'
+    variante = Variante.objects.select_related('producto').filter(sku=codigo).first()
+    if variante is not None:
+        return variante, None, 'sku'
+    return None
+
+
+def escaneo_a_dict(codigo, variante, talla, tipo):
+    """Respuesta JSON del escaneo: lo necesario para contar o recibir mercancía."""
+    producto = variante.producto
+    tallas_stock = variante.tallas_stock or {}
+    return {
+        "codigo": codigo,
+        "tipo": tipo,
+        "producto": {
+            "id": producto.id,
+            "nombre": producto.nombre,
+            "marca": producto.marca or "",
+        },
+        "variante": {
+            "id": variante.id,
+            "sku": variante.sku or "",
+            "color": variante.color or "N/A",
+            "tallas_stock": tallas_stock,
+        },
+        "talla": talla,
+        "stock": tallas_stock.get(talla, 0) if talla is not None else variante.stock_total_variante,
+    }
+
+
+def asignar_codigo(variante, talla, codigo):
+    """
+    Asigna (o reemplaza) el código de barras de una talla de la variante.
+    Lanza CodigoEnUso si el código ya identifica otra cosa.
+    """
+    codigo = codigo.strip()
+    if Variante.objects.filter(sku=codigo).exists():
+        # Con el mismo valor como SKU y como código el escaneo sería ambiguo
+        raise CodigoEnUso(f"{codigo} es el SKU de una variante")
+    try:
+        with transaction.atomic():
+            barras, _ = CodigoBarras.objects.update_or_create(
+                variante=variante, talla=talla, defaults={'codigo': codigo},
+            )
+    except IntegrityError:
+        otro = CodigoBarras.objects.select_related('variante__producto').filter(codigo=codigo).first()
+        raise CodigoEnUso(f"{codigo} ya está asignado a {otro.variante} talla {otro.talla}" if otro else codigo)
+    return barras
@@ -0,0 +1,127 @@
+"""
+Pipeline de archivos estáticos para producción
+==============================================
+
+Storage de `staticfiles` cuando ESTATICOS_MANIFEST=True. En `collectstatic`:
+
+  1. ManifestStaticFilesStorage agrega el hash del contenido al nombre
+     (index.css → index.3f2a9c1b7d4e.css), reescribe url()/@import de los
+     CSS y escribe staticfiles.json, que {% static %} usa en las plantillas.
+  2. Las copias hasheadas de JS y CSS se guardan minificadas (rjsmin / rcssmin).
+  3. Junto a cada archivo hasheado comprimible se escriben `.gz` y `.br`,
+     que nginx sirve tal cual con gzip_static / brotli_static.
+
+Como el nombre cambia con el contenido, nginx los sirve con caché de un año
+`immutable` (ver nginx_nowheremx.conf). Las copias sin hash se conservan
+para las rutas escritas a mano (/static/images/placeholder.png en JS).
+
+Las referencias rotas dentro de un CSS (fuente inexistente, etc.) no detienen
+el deploy: se dejan como estaban y se registran con un warning.
+"""
+import gzip
+import logging
+import os
+import re
+
+from django.contrib.staticfiles.storage import ManifestStaticFilesStorage
+from django.core.files.base import ContentFile
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+try:
+    import rcssmin
+    import rjsmin
+except ImportError:
+    rcssmin = rjsmin = None
+
+logger = logging.getLogger(__name__)
+
+COMPRIMIBLES = ('.css', '.js', '.svg', '.json', '.txt', '.map', '.ttf', '.otf', '.eot', '.ico', '.xml')
+HASHEADO = re.compile(r'\.[0-9a-f]{12}\.(js|css)$')
+# Por debajo de esto la cabecera de compresión cuesta más de lo que ahorra
+MINIMO_COMPRIMIR = 512
+
+
+def minificar(nombre, contenido):
+    """Contenido minificado de un .js/.css (bytes); otros archivos sin cambios."""
+    if rjsmin is None or '.min.' in nombre:
+        return contenido
+    if nombre.endswith('.js'):
+        return rjsmin.jsmin(contenido.decode('utf-8')).encode('utf-8')
+    if nombre.endswith('.css'):
+        return rcssmin.cssmin(contenido.decode('utf-8')).encode('utf-8')
+    return contenido
+
+
+def comprimir(ruta):
+    """Escribe ruta.gz y ruta.br si ahorran algo. Retorna las extensiones escritas."""
+    with open(ruta, 'rb') as fh:
+        datos = fh.read()
+    if len(datos) < MINIMO_COMPRIMIR:
+        return []
+    variantes = {'.gz': gzip.compress(datos, compresslevel=9, mtime=0)}
+    if brotli is not None:
+        variantes['.br'] = brotli.compress(datos, quality=11)
+    escritas = []
+    for extension, comprimido in variantes.items():
+        if len(comprimido) < len(datos) * 0.95:
+            with open(ruta + extension, 'wb') as fh:
+                fh.write(comprimido)
+            escritas.append(extension)
+    return escritas
+
+
+class EstaticosComprimidos(ManifestStaticFilesStorage):
+    """ManifestStaticFilesStorage que minifica JS/CSS y precomprime lo hasheado."""
+
+    def _save(self, name, content):
+        # Solo las copias hasheadas: los hashes se calculan sobre las copias originales
+        if HASHEADO.search(name):
+            content = ContentFile(minificar(name, b''.join(content.chunks())))
+        return super()._save(name, content)
+
+    def hash_key(self, name):
+        # @import url('/static/.../post\\ header.css'): espacio escapado al estilo CSS
+        return super().hash_key(name.replace('\\ ', ' '))
+
+    def hashed_name(self, name, content=None, filename=None):
+        return super().hashed_name(name.replace('\\ ', ' '), content, filename)
+
+    def url_converter(self, name, hashed_files, template=None):
+        convertir = super().url_converter(name, hashed_files, template)
+
+        def converter(matchobj):
+            try:
+                # %20 en vez de espacios: el minificador de CSS los quita dentro de url()
+                return re.sub(r'"[^"]*"', lambda m: m.group(0).replace(' ', '%20'), convertir(matchobj))
+            except ValueError:
+                # post_process hace varias pasadas: avisar una sola vez por referencia
+                if (name, matchobj.group(0)) not in self._sin_resolver:
+                    self._sin_resolver.add((name, matchobj.group(0)))
+                    logger.warning('collectstatic: %s referencia un archivo que no existe: %s',
+                                   name, matchobj.group('url'))
+                return matchobj.group(0)
+
+        return converter
+
+    def post_process(self, paths, dry_run=False, **options):
+        self._sin_resolver = set()
+        yield from super().post_process(paths, dry_run, **options)
+        if dry_run:
+            return
+
+        # Solo los nombres finales del manifest (no los intermedios de cada pasada)
+        hasheados = set(self.hashed_files.values())
+        archivos = {'.gz': 0, '.br': 0}
+        for nombre in hasheados:
+            if nombre.lower().endswith(COMPRIMIBLES) and os.path.exists(self.path(nombre)):
+                for extension in comprimir(self.path(nombre)):
+                    archivos[extension] += 1
+        logger.info(
+            'collectstatic: %d archivos hasheados, %d .gz y %d .br%s',
+            len(hasheados), archivos['.gz'], archivos['.br'],
+            '' if brotli else ' (instalar brotli para generar .br)',
+        )
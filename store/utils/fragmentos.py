@@ -0,0 +1,115 @@
+"""
+Caché de fragmentos de plantilla con sellos de versión
+======================================================
+
+Las tarjetas de producto, las grillas de colección y el header/footer se
+guardan ya renderizados (tag `{% fragmento %}` de store/templatetags).
+En vez de borrar fragmentos, cada clave incluye sellos de versión que se
+renuevan cuando cambia lo que muestran:
+
+    producto:<id>   → save/delete de Producto, Variante o VarianteImagen
+    categorias      → save/delete de Categoria o Subcategoria
+    catalogo        → cualquiera de los anteriores (listas de IDs, store/utils/swr.py)
+    productos       → todas las tarjetas (invalidar_catalogo)
+
+Además toda clave lleva version_plantillas(), que cambia con cada deploy que
+modifique templates/. Los sellos viven en la caché compartida (CACHES) y los renuevan las señales
+de store/signals.py. Las escrituras en bloque (bulk_create, update) no
+disparan señales: quien las haga debe llamar a invalidar_catalogo().
+
+Las grillas se versionan con version_grilla(): sus IDs y las versiones de
+sus tarjetas.
+
+Lo usan las vistas de home y colección y `manage.py precalentar_fragmentos`.
+"""
+import functools
+import hashlib
+import os
+import time
+
+from django.conf import settings
+from django.contrib.staticfiles.storage import staticfiles_storage
+from django.core.cache import cache
+
+PREFIJO = 'frag:v:'
+
+
+def _nuevo_sello():
+    return str(time.time_ns())
+
+
+def sellos(nombres):
+    """{nombre: sello} en una sola consulta; los que falten se crean."""
+    claves = {f'{PREFIJO}{n}': n for n in nombres}
+    encontrados = cache.get_many(list(claves))
+    faltan = [c for c in claves if c not in encontrados]
+    for clave in faltan:
+        cache.add(clave, _nuevo_sello(), None)
+    if faltan:
+        encontrados.update(cache.get_many(faltan))
+    return {claves[c]: v for c, v in encontrados.items()}
+
+
+def invalidar(*nombres):
+    """Renueva los sellos: los fragmentos que los usaban dejan de encontrarse."""
+    cache.set_many({f'{PREFIJO}{n}': _nuevo_sello() for n in nombres}, None)
+
+
+def invalidar_producto(producto_id):
+    invalidar(f'producto:{producto_id}', 'catalogo')
+
+
+def invalidar_catalogo():
+    """Todo el catálogo: para cargas en bloque que no disparan señales."""
+    invalidar('catalogo', 'categorias', 'productos')
+
+
+@functools.cache
+def version_plantillas():
+    """
+    FRAGMENTOS_VERSION o, si no está fijada, la fecha de modificación más
+    reciente de las plantillas: un deploy que las cambie genera claves nuevas.
+    Con ESTATICOS_MANIFEST se agrega el hash del manifest, porque los fragmentos
+    guardan las URLs hasheadas de {% static %}.
+    """
+    version = settings.FRAGMENTOS_VERSION
+    if not version:
+        ultima = 0
+        for directorio in settings.TEMPLATES[0]['DIRS']:
+            for raiz, _, archivos in os.walk(directorio):
+                for archivo in archivos:
+                    ultima = max(ultima, os.stat(os.path.join(raiz, archivo)).st_mtime_ns)
+        version = str(ultima)
+    manifest = getattr(staticfiles_storage, 'manifest_hash', '')
+    return f'{version}.{manifest}' if manifest else version
+
+
+def preparar_tarjetas(productos):
+    """
+    Imagen principal (de la galería ya precargada) y versión de fragmento de
+    cada producto, con una sola lectura de sellos para toda la página.
+    Espera `variantes__imagenes` en prefetch_related.
+    """
+    productos = list(productos)
+    versiones = sellos(['categorias', 'productos', *(f'producto:{p.id}' for p in productos)])
+    for p in productos:
+        variante_principal = p.variante_principal
+        primera_img = next(iter(variante_principal.imagenes.all()), None) if variante_principal else None
+        p.imagen = primera_img.imagen if primera_img else None
+        p.imagen_url = primera_img.imagen_url if primera_img else ''
+        p.imagen_srcset = primera_img.srcset_webp if primera_img else ''
+        p.imagen_srcset_avif = primera_img.srcset_avif if primera_img else ''
+        p.version_fragmento = (
+            f"{versiones[f'producto:{p.id}']}.{versiones['productos']}.{versiones['categorias']}"
+        )
+    return productos
+
+
+def version_grilla(productos):
+    """
+    Versión de una grilla: los IDs que muestra y la versión de cada tarjeta.
+    No depende del sello del catálogo, así que una lista de IDs servida desde
+    caché (store/utils/swr.py) nunca se guarda bajo una versión más nueva.
+    """
+    firma = ','.join(f'{p.id}:{p.version_fragmento}' for p in productos)
+    return hashlib.md5(firma.encode()).hexdigest()
@@ -0,0 +1,138 @@
+"""
+Ingesta de galerías de variantes
+================================
+
+Sube en paralelo las imágenes de una o varias variantes y crea sus
+`VarianteImagen` en bloque:
+
+  1. Valida el límite de MAX_IMAGENES con UNA consulta para todo el lote
+     (en lugar del count() que hace VarianteImagen.save por imagen).
+  2. Sube los archivos al storage con un pool de hilos acotado
+     (GALERIA_UPLOAD_WORKERS). Cada archivo se pasa tal cual al storage,
+     que lo transmite por partes sin cargarlo completo en memoria.
+  3. Genera las renditions (store/utils/renditions.py) en el mismo hilo,
+     reutilizando el archivo del request.
+  4. Crea todas las filas con un solo bulk_create.
+
+Si cualquier subida o el bulk_create falla, se borran los archivos ya
+subidos y se lanza GaleriaError: la vista hace rollback y responde error.
+
+Uso:
+    from store.utils.galeria import ingestar_galerias
+    ingestar_galerias([(variante, request.FILES.getlist('imagenes'), 1)])
+"""
+import logging
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count
+
+from store.utils.renditions import construir_srcsets, eliminar_renditions, generar_renditions
+
+logger = logging.getLogger(__name__)
+
+
+class GaleriaError(Exception):
+    """Fallo al subir o registrar las imágenes de una galería."""
+
+
+class LimiteImagenesError(GaleriaError):
+    """La variante superaría el máximo de imágenes permitido."""
+
+
+def _validar_limites(lotes):
+    from store.models import VarianteImagen
+
+    nuevas = {}
+    for variante, archivos, _ in lotes:
+        nuevas[variante.pk] = nuevas.get(variante.pk, 0) + len(archivos)
+
+    existentes = dict(
+        VarianteImagen.objects.filter(variante_id__in=nuevas)
+        .values('variante_id')
+        .annotate(total=Count('id'))
+        .values_list('variante_id', 'total')
+    )
+    for variante, _, _ in lotes:
+        total = existentes.get(variante.pk, 0) + nuevas[variante.pk]
+        if total > VarianteImagen.MAX_IMAGENES:
+            raise LimiteImagenesError(
+                f"La variante '{variante}' tendría {total} imágenes. "
+                f"Máximo permitido: {VarianteImagen.MAX_IMAGENES}."
+            )
+
+
+def _subir(instancia, nombre, archivo, storage):
+    """Corre en el pool (sin tocar la BD): sube el original y genera sus renditions."""
+    instancia.imagen.name = storage.save(nombre, archivo)
+    try:
+        instancia.renditions = generar_renditions(instancia.imagen.name, storage, archivo)
+    except Exception as e:
+        # Igual que en la subida individual: sin renditions se usa el original
+        logger.warning("No se pudieron generar renditions de %s: %s", instancia.imagen.name, e)
+        instancia.renditions = {}
+    # bulk_create no pasa por save(): precalcular aquí las URLs públicas
+    instancia.imagen_url_cache = storage.url(instancia.imagen.name)
+    instancia.srcsets_cache = construir_srcsets(instancia.renditions, storage)
+    return instancia
+
+
+def _limpiar(instancias, storage):
+    for instancia in instancias:
+        eliminar_renditions(instancia.renditions, storage)
+        if instancia.imagen.name:
+            try:
+                storage.delete(instancia.imagen.name)
+            except Exception as e:
+                logger.warning("Error eliminando %s: %s", instancia.imagen.name, e)
+
+
+def ingestar_galerias(lotes, max_workers=None):
+    """
+    `lotes`: lista de (variante, archivos, orden_inicial). Los archivos de
+    cada variante reciben orden consecutivo desde `orden_inicial`.
+
+    Retorna la lista de VarianteImagen creadas o lanza GaleriaError.
+    """
+    from store.models import VarianteImagen
+
+    lotes = [(v, list(archivos), orden) for v, archivos, orden in lotes if archivos]
+    if not lotes:
+        return []
+
+    _validar_limites(lotes)
+
+    campo = VarianteImagen._meta.get_field('imagen')
+    storage = campo.storage
+    trabajos = []
+    for variante, archivos, orden_inicial in lotes:
+        for orden, archivo in enumerate(archivos, start=orden_inicial):
+            instancia = VarianteImagen(variante=variante, orden=orden)
+            # upload_to lee variante/producto: resolverlo aquí y no en los hilos
+            nombre = campo.generate_filename(instancia, archivo.name)
+            trabajos.append((instancia, nombre, archivo))
+
+    workers = max_workers or getattr(settings, 'GALERIA_UPLOAD_WORKERS', 4)
+    subidas, error = [], None
+    with ThreadPoolExecutor(max_workers=max(1, min(workers, len(trabajos)))) as pool:
+        futuros = [pool.submit(_subir, *trabajo, storage) for trabajo in trabajos]
+        for futuro in futuros:
+            try:
+                subidas.append(futuro.result())
+            except Exception as e:
+                error = error or e
+
+    if error is not None:
+        _limpiar(subidas, storage)
+        raise GaleriaError(f"Error subiendo imágenes: {error}") from error
+
+    try:
+        with transaction.atomic():
+            creadas = VarianteImagen.objects.bulk_create(subidas)
+    except Exception as e:
+        _limpiar(subidas, storage)
+        raise GaleriaError(f"Error registrando imágenes: {e}") from e
+
+    logger.info("Galería: %s imágenes subidas en %s variantes", len(creadas), len(lotes))
+    return creadas
@@ -0,0 +1,462 @@
+"""
+Importación masiva del catálogo desde CSV, JSONL o XLSX
+=======================================================
+
+Una fila por variante (un color de un producto). Columnas:
+
+    sku *            código de la variante: llave del upsert de Variante
+    producto *       nombre del producto; con `marca` es la llave de Producto
+    categoria *      nombre de la categoría (se crea si no existe)
+    precio *         precio base del producto
+    marca, descripcion, genero (H/M/U, Dama/Caballero, Hombre/Mujer/Unisex),
+    precio_mayorista, en_oferta (1/0, si/no), subcategorias ("Nike|Running"),
+    color, tallas ("26:3|27:1", talla:stock), precio_variante, principal (1/0),
+    imagenes ("air-negro-1.jpg|air-negro-2.jpg", relativas al directorio de imágenes)
+
+Los datos del producto se toman de su primera fila. El archivo completo se
+valida antes de escribir nada (ImportacionError con todos los errores).
+Después, por lotes de productos y cada lote en su transacción:
+
+  1. Categorías y subcategorías faltantes con bulk_create (una vez).
+  2. Productos nuevos con bulk_create y existentes con bulk_update (solo
+     los que cambiaron: reimportar el mismo archivo casi no escribe).
+  3. Enlaces producto-subcategoría con un bulk_create (ignore_conflicts);
+     los enlaces existentes no se quitan.
+  4. Variantes nuevas con bulk_create y existentes (mismo SKU) con
+     bulk_update, también solo las que cambiaron.
+  5. Imágenes de las variantes que aún no tienen galería, subidas en
+     paralelo con store/utils/galeria.py.
+
+bulk_create / bulk_update no disparan señales: cada lote evalúa las
+alertas de stock de sus variantes (store/utils/alertas_stock.py) y al
+terminar se llama a invalidar_catalogo() (store/utils/fragmentos.py).
+
+Lo usa `manage.py import_catalog`.
+"""
+import csv
+import json
+import logging
+import time
+from collections import Counter
+from dataclasses import dataclass, field
+from decimal import Decimal, InvalidOperation
+from pathlib import Path
+
+from django.core.files import File
+from django.db import transaction
+
+from store.models import Categoria, Producto, Subcategoria, Variante, VarianteImagen
+from store.utils.alertas_stock import evaluar_variantes
+from store.utils.fragmentos import invalidar_catalogo
+from store.utils.galeria import GaleriaError, ingestar_galerias
+from store.utils.tallas import asegurar
+from store.utils.genero import normalize_genero
+
+logger = logging.getLogger(__name__)
+
+REQUERIDAS = ('sku', 'producto', 'categoria', 'precio')
+FORMATOS = ('.csv', '.jsonl', '.xlsx')
+SEPARADOR = '|'
+LOTE_SQL = 500
+VERDADERO = {'1', 'si', 'sí', 'true', 'x', 'yes'}
+FALSO = {'', '0', 'no', 'false'}
+
+CAMPOS_PRODUCTO = ['descripcion', 'precio', 'precio_mayorista', 'categoria', 'genero', 'en_oferta']
+CAMPOS_VARIANTE = ['producto', 'color', 'tallas_stock', 'precio', 'precio_mayorista', 'es_variante_principal']
+
+
+class ImportacionError(Exception):
+    """El archivo no pasó la validación; `errores` lista cada problema con su línea."""
+
+    def __init__(self, errores):
+        super().__init__(f'{len(errores)} errores en el archivo')
+        self.errores = errores
+
+
+@dataclass
+class VarianteImport:
+    linea: int
+    sku: str
+    color: str
+    tallas_stock: dict
+    precio: Decimal | None
+    precio_mayorista: Decimal
+    principal: bool | None
+    imagenes: list
+
+
+@dataclass
+class ProductoImport:
+    nombre: str
+    marca: str
+    categoria: str
+    descripcion: str
+    precio: Decimal
+    precio_mayorista: Decimal
+    genero: str | None
+    en_oferta: bool
+    subcategorias: set = field(default_factory=set)
+    variantes: list = field(default_factory=list)
+
+    @property
+    def clave(self):
+        return (self.nombre, self.marca)
+
+
+# ───────────────────────────────────────────────
+# Lectura
+# ───────────────────────────────────────────────
+def leer_filas(ruta):
+    """Filas del archivo como dicts con columnas en minúsculas y `_linea`."""
+    ruta = Path(ruta)
+    formato = ruta.suffix.lower()
+    if formato not in FORMATOS:
+        raise ImportacionError([f'formato no soportado: {formato} (usar {", ".join(FORMATOS)})'])
+
+    if formato == '.csv':
+        with open(ruta, newline='', encoding='utf-8-sig') as fh:
+            filas = [(n, fila) for n, fila in enumerate(csv.DictReader(fh), start=2)]
+    elif formato == '.jsonl':
+        filas = []
+        with open(ruta, encoding='utf-8') as fh:
+            for n, linea in enumerate(fh, start=1):
+                if not linea.strip():
+                    continue
+                try:
+                    fila = json.loads(linea)
+                except json.JSONDecodeError as e:
+                    raise ImportacionError([f'línea {n}: JSON inválido ({e.msg})'])
+                if not isinstance(fila, dict):
+                    raise ImportacionError([f'línea {n}: se esperaba un objeto JSON'])
+                filas.append((n, fila))
+    else:
+        try:
+            from openpyxl import load_workbook
+        except ImportError:
+            raise ImportacionError(['para leer .xlsx instala openpyxl (pip install openpyxl)'])
+        hoja = load_workbook(ruta, read_only=True, data_only=True).active
+        valores = hoja.iter_rows(values_only=True)
+        encabezado = [str(c or '').strip() for c in next(valores, [])]
+        filas = [
+            (n, dict(zip(encabezado, fila)))
+            for n, fila in enumerate(valores, start=2)
+            if any(c not in (None, '') for c in fila)
+        ]
+
+    return [
+        {**{str(k).strip().lower(): v for k, v in fila.items() if k}, '_linea': n}
+        for n, fila in filas
+    ]
+
+
+# ───────────────────────────────────────────────
+# Validación
+# ───────────────────────────────────────────────
+def _texto(valor):
+    if valor is None:
+        return ''
+    if isinstance(valor, float) and valor.is_integer():
+        valor = int(valor)
+    return str(valor).strip()
+
+
+def _decimal(valor, campo, opcional=False):
+    texto = _texto(valor).replace('$', '').replace(',', '')
+    if not texto and opcional:
+        return None
+    try:
+        numero = Decimal(texto)
+    except InvalidOperation:
+        raise ValueError(f'{campo} no es un número: {texto!r}')
+    if numero < 0:
+        raise ValueError(f'{campo} no puede ser negativo')
+    return numero.quantize(Decimal('0.01'))
+
+
+def _booleano(valor, campo):
+    texto = _texto(valor).lower()
+    if texto in VERDADERO:
+        return True
+    if texto in FALSO:
+        return False
+    raise ValueError(f'{campo} debe ser 1/0 o si/no: {texto!r}')
+
+
+def _tallas(valor):
+    """'26:3|27:1' → {'26': 3, '27': 1}; una talla sin stock cuenta 0."""
+    tallas = {}
+    for parte in _texto(valor).split(SEPARADOR):
+        if not parte.strip():
+            continue
+        talla, _, stock = parte.partition(':')
+        talla = talla.strip()
+        try:
+            stock = int(stock.strip() or 0)
+        except ValueError:
+            raise ValueError(f'stock inválido para la talla {talla}: {stock!r}')
+        if stock < 0:
+            raise ValueError(f'stock negativo para la talla {talla}')
+        tallas[talla] = stock
+    return tallas
+
+
+def validar(filas, dir_imagenes=None):
+    """
+    Convierte las filas en ProductoImport agrupando por (producto, marca).
+    Lanza ImportacionError con TODOS los errores encontrados.
+    """
+    errores = []
+    productos = {}
+    skus = {}
+    dir_imagenes = Path(dir_imagenes) if dir_imagenes else None
+
+    for fila in filas:
+        linea = fila['_linea']
+        faltan = [c for c in REQUERIDAS if not _texto(fila.get(c))]
+        if faltan:
+            errores.append(f'línea {linea}: faltan {", ".join(faltan)}')
+            continue
+
+        sku = _texto(fila['sku'])
+        if sku in skus:
+            errores.append(f'línea {linea}: SKU {sku} repetido (ya está en la línea {skus[sku]})')
+            continue
+        skus[sku] = linea
+
+        try:
+            genero = None
+            if _texto(fila.get('genero')):
+                genero = normalize_genero(_texto(fila['genero']))
+                if genero not in ('Hombre', 'Mujer', 'Unisex'):
+                    raise ValueError(f'género desconocido: {_texto(fila["genero"])!r}')
+            principal = fila.get('principal')
+            imagenes = [i.strip() for i in _texto(fila.get('imagenes')).split(SEPARADOR) if i.strip()]
+            if imagenes and dir_imagenes is None:
+                raise ValueError('la fila trae imágenes pero no se indicó el directorio de imágenes')
+            for imagen in imagenes:
+                if not (dir_imagenes / imagen).is_file():
+                    raise ValueError(f'no existe la imagen {imagen}')
+            if len(imagenes) > VarianteImagen.MAX_IMAGENES:
+                raise ValueError(f'máximo {VarianteImagen.MAX_IMAGENES} imágenes por variante')
+
+            variante = VarianteImport(
+                linea=linea,
+                sku=sku,
+                color=_texto(fila.get('color')) or 'N/A',
+                tallas_stock=_tallas(fila.get('tallas')),
+                precio=_decimal(fila.get('precio_variante'), 'precio_variante', opcional=True),
+                precio_mayorista=_decimal(fila.get('precio_mayorista'), 'precio_mayorista', opcional=True) or Decimal('0'),
+                principal=None if _texto(principal) == '' else _booleano(principal, 'principal'),
+                imagenes=imagenes,
+            )
+            producto = ProductoImport(
+                nombre=_texto(fila['producto']),
+                marca=_texto(fila.get('marca')),
+                categoria=_texto(fila['categoria']),
+                descripcion=_texto(fila.get('descripcion')),
+                precio=_decimal(fila['precio'], 'precio'),
+                precio_mayorista=variante.precio_mayorista,
+                genero=genero,
+                en_oferta=_booleano(fila.get('en_oferta'), 'en_oferta'),
+            )
+        except ValueError as e:
+            errores.append(f'línea {linea}: {e}')
+            continue
+
+        existente = productos.setdefault(producto.clave, producto)
+        if existente.categoria != producto.categoria:
+            errores.append(
+                f'línea {linea}: {producto.nombre} ya aparece con la categoría {existente.categoria!r}'
+            )
+            continue
+        existente.subcategorias.update(
+            s.strip() for s in _texto(fila.get('subcategorias')).split(SEPARADOR) if s.strip()
+        )
+        existente.variantes.append(variante)
+
+    if errores:
+        raise ImportacionError(errores)
+    return list(productos.values())
+
+
+# ───────────────────────────────────────────────
+# Escritura
+# ───────────────────────────────────────────────
+def _asegurar_categorias(productos):
+    """{nombre: Categoria} y {(categoria_id, nombre): Subcategoria}, creando las que falten."""
+    nombres = {p.categoria for p in productos}
+    categorias = {}
+    for categoria in Categoria.objects.filter(nombre__in=nombres).order_by('id'):
+        categorias.setdefault(categoria.nombre, categoria)
+    nuevas = [Categoria(nombre=n) for n in sorted(nombres - set(categorias))]
+    for categoria in Categoria.objects.bulk_create(nuevas):
+        categorias[categoria.nombre] = categoria
+
+    pedidas = {(categorias[p.categoria].id, s) for p in productos for s in p.subcategorias}
+    subcategorias = {
+        (s.categoria_id, s.nombre): s
+        for s in Subcategoria.objects.filter(categoria_id__in={c for c, _ in pedidas})
+    }
+    nuevas = [
+        Subcategoria(categoria_id=c, nombre=n)
+        for c, n in sorted(pedidas - set(subcategorias))
+    ]
+    for subcategoria in Subcategoria.objects.bulk_create(nuevas):
+        subcategorias[(subcategoria.categoria_id, subcategoria.nombre)] = subcategoria
+    return categorias, subcategorias
+
+
+def _asignar(instancia, valores):
+    """Asigna los campos y dice si alguno cambió (para no reescribir filas iguales)."""
+    cambio = False
+    for campo, valor in valores.items():
+        if getattr(instancia, campo) != valor:
+            setattr(instancia, campo, valor)
+            cambio = True
+    return cambio
+
+
+def _importar_lote(productos, categorias, subcategorias, publicar):
+    """Upsert de un lote de productos con sus variantes. Retorna (conteos, variantes por SKU)."""
+    conteos = Counter()
+    existentes = {}
+    for producto in Producto.objects.filter(nombre__in={p.nombre for p in productos}).order_by('id'):
+        existentes.setdefault((producto.nombre, producto.marca or ''), producto)
+
+    nuevos, cambiados, filas = [], [], {}
+    for datos in productos:
+        producto = existentes.get(datos.clave)
+        valores = {
+            'descripcion': datos.descripcion,
+            'precio': datos.precio,
+            'precio_mayorista': datos.precio_mayorista,
+            'categoria_id': categorias[datos.categoria].id,
+            'en_oferta': datos.en_oferta,
+        }
+        if datos.genero:
+            valores['genero'] = datos.genero
+        if producto is None:
+            producto = Producto(nombre=datos.nombre, marca=datos.marca or None, bodega=not publicar, **valores)
+            nuevos.append(producto)
+        elif _asignar(producto, valores):
+            cambiados.append(producto)
+        filas[datos.clave] = producto
+
+    Producto.objects.bulk_create(nuevos, batch_size=LOTE_SQL)
+    Producto.objects.bulk_update(cambiados, CAMPOS_PRODUCTO, batch_size=LOTE_SQL)
+    conteos.update(
+        productos_creados=len(nuevos),
+        productos_actualizados=len(cambiados),
+        productos_sin_cambios=len(productos) - len(nuevos) - len(cambiados),
+    )
+
+    Enlace = Producto.subcategorias.through
+    enlaces = [
+        Enlace(producto_id=filas[d.clave].id, subcategoria_id=subcategorias[(filas[d.clave].categoria_id, s)].id)
+        for d in productos for s in d.subcategorias
+    ]
+    Enlace.objects.bulk_create(enlaces, batch_size=LOTE_SQL, ignore_conflicts=True)
+
+    skus = [v.sku for d in productos for v in d.variantes]
+    variantes_db = {}
+    for variante in Variante.objects.filter(sku__in=skus).order_by('id'):
+        variantes_db.setdefault(variante.sku, variante)
+    con_principal = set(
+        Variante.objects.filter(
+            producto_id__in=[p.id for p in filas.values()],
+            es_variante_principal=True,
+        )
+        .values_list('producto_id', flat=True)
+    )
+
+    nuevas, cambiadas, por_sku = [], [], {}
+    for datos in productos:
+        producto = filas[datos.clave]
+        for n, v in enumerate(datos.variantes):
+            valores = {
+                'producto_id': producto.id,
+                'color': v.color,
+                'tallas_stock': v.tallas_stock,
+                'precio': v.precio,
+                'precio_mayorista': v.precio_mayorista,
+            }
+            if v.principal is not None:
+                valores['es_variante_principal'] = v.principal
+            variante = variantes_db.get(v.sku)
+            if variante is None:
+                # Sin columna `principal`: la primera variante de un producto sin principal
+                valores.setdefault('es_variante_principal', n == 0 and producto.id not in con_principal)
+                variante = Variante(sku=v.sku, **valores)
+                nuevas.append(variante)
+            elif _asignar(variante, valores):
+                cambiadas.append(variante)
+            por_sku[v.sku] = variante
+
+    Variante.objects.bulk_create(nuevas, batch_size=LOTE_SQL)
+    Variante.objects.bulk_update(cambiadas, CAMPOS_VARIANTE, batch_size=LOTE_SQL)
+    evaluar_variantes(nuevas, creadas=True)
+    evaluar_variantes(cambiadas)
+    asegurar({talla for variante in nuevas + cambiadas for talla in variante.tallas_stock or {}})
+    conteos.update(
+        variantes_creadas=len(nuevas),
+        variantes_actualizadas=len(cambiadas),
+        variantes_sin_cambios=len(por_sku) - len(nuevas) - len(cambiadas),
+    )
+    return conteos, por_sku
+
+
+def _adjuntar_imagenes(productos, por_sku, dir_imagenes, workers):
+    """Sube la galería de las variantes que todavía no tienen imágenes."""
+    pendientes = [v for d in productos for v in d.variantes if v.imagenes]
+    if not pendientes:
+        return 0
+    con_galeria = set(
+        VarianteImagen.objects.filter(variante__in=[por_sku[v.sku] for v in pendientes])
+        .values_list('variante_id', flat=True)
+    )
+    archivos, lotes = [], []
+    try:
+        for v in pendientes:
+            variante = por_sku[v.sku]
+            if variante.id in con_galeria:
+                continue
+            abiertos = [File(open(dir_imagenes / nombre, 'rb'), name=nombre) for nombre in v.imagenes]
+            archivos += abiertos
+            lotes.append((variante, abiertos, 1))
+        return len(ingestar_galerias(lotes, max_workers=workers))
+    finally:
+        for archivo in archivos:
+            archivo.close()
+
+
+def importar(productos, lote=1000, publicar=False, dir_imagenes=None, workers=None, progreso=None):
+    """
+    Escribe los ProductoImport de validar() por lotes de `lote` productos.
+    `progreso(hechos, total, conteos)` se llama al terminar cada lote.
+    """
+    dir_imagenes = Path(dir_imagenes) if dir_imagenes else None
+    totales = Counter()
+    with transaction.atomic():
+        categorias, subcategorias = _asegurar_categorias(productos)
+
+    try:
+        for inicio in range(0, len(productos), lote):
+            bloque = productos[inicio:inicio + lote]
+            t0 = time.perf_counter()
+            with transaction.atomic():
+                conteos, por_sku = _importar_lote(bloque, categorias, subcategorias, publicar)
+            if dir_imagenes:
+                try:
+                    conteos['imagenes'] += _adjuntar_imagenes(bloque, por_sku, dir_imagenes, workers)
+                except GaleriaError as e:
+                    # Los productos del lote ya están guardados: se puede reintentar solo las imágenes
+                    logger.error('Importación: imágenes del lote %s sin subir: %s', inicio // lote + 1, e)
+                    conteos['errores_imagenes'] += 1
+            conteos['segundos'] = time.perf_counter() - t0
+            totales.update(conteos)
+            if progreso:
+                progreso(inicio + len(bloque), len(productos), conteos)
+    finally:
+        # Aunque falle un lote, lo ya escrito debe verse en la tienda
+        invalidar_catalogo()
+    return totales
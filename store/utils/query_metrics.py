@@ -0,0 +1,76 @@
+"""
+Conteo de consultas SQL por request
+===================================
+
+    MetricasQueries   → execute_wrapper que cuenta consultas, duplicadas
+                        (mismo SQL, con cualquier parámetro), exactas
+                        (mismo SQL y parámetros) y tiempo total en BD
+    contar_queries()  → context manager para medir un bloque (tests, shell)
+
+Lo usa QueryMetricsMiddleware (store/middleware/query_metrics.py) junto
+con el decorador @query_budget de store/views/decorators.py.
+
+En tests:
+
+    with contar_queries() as m:
+        response = self.client.get('/api/productos/')
+    self.assertLessEqual(m.total, 6)
+    self.assertEqual(m.duplicadas, 0)
+"""
+import time
+from collections import Counter
+from contextlib import contextmanager
+
+from django.db import connection, connections
+
+
+class PresupuestoQueriesExcedido(AssertionError):
+    """Una vista ejecutó más consultas que su @query_budget (solo en modo estricto)."""
+
+
+class MetricasQueries:
+    def __init__(self):
+        self.total = 0
+        self.tiempo_ms = 0.0
+        self.consultas = Counter()       # por texto SQL: un N+1 repite el SQL con otro id
+        self.con_parametros = Counter()  # por SQL y parámetros
+
+    def __call__(self, execute, sql, params, many, context):
+        inicio = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.tiempo_ms += (time.perf_counter() - inicio) * 1000
+            self.total += 1
+            self.consultas[sql] += 1
+            self.con_parametros[(sql, repr(params))] += 1
+
+    @property
+    def duplicadas(self):
+        """Consultas que repiten un SQL ya ejecutado, con o sin los mismos parámetros (señal típica de N+1)."""
+        return sum(n - 1 for n in self.consultas.values() if n > 1)
+
+    @property
+    def exactas(self):
+        """Consultas repetidas con el mismo SQL y parámetros (resultado que se pudo reutilizar)."""
+        return sum(n - 1 for n in self.con_parametros.values() if n > 1)
+
+    def repetidas(self, minimo=2):
+        """Los SQL ejecutados `minimo` veces o más, del más repetido al menos."""
+        return [(sql, n) for sql, n in self.consultas.most_common() if n >= minimo]
+
+    def server_timing(self):
+        """Valor para la cabecera Server-Timing."""
+        return (
+            f'db;dur={self.tiempo_ms:.1f};'
+            f'desc="{self.total} queries, {self.duplicadas} duplicadas, {self.exactas} exactas"'
+        )
+
+
+@contextmanager
+def contar_queries(using=None):
+    """Cuenta las consultas ejecutadas dentro del bloque (conexión por defecto o `using`)."""
+    metricas = MetricasQueries()
+    conexion = connections[using] if using else connection
+    with conexion.execute_wrapper(metricas):
+        yield metricas
@@ -0,0 +1,159 @@
+"""
+Renditions responsivas de imágenes de galería
+=============================================
+
+Por cada `VarianteImagen` se generan versiones reducidas en anchos fijos y
+en formatos modernos (WebP y, si Pillow lo soporta, AVIF). Se guardan junto
+al original en el mismo storage:
+
+    variantes/var-42-123-negro/imagen-1.jpg          ← original
+    variantes/var-42-123-negro/imagen-1-400w.webp    ← rendition
+
+y sus rutas quedan en `VarianteImagen.renditions`:
+
+    {"webp": {"200": "...-200w.webp", "400": "...", "800": "..."},
+     "avif": {"200": "...-200w.avif", ...}}
+
+AVIF requiere Pillow >= 11.3 o el plugin `pillow-avif-plugin`; si no está
+disponible solo se generan WebP.
+"""
+import io
+import logging
+import os
+
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+
+logger = logging.getLogger(__name__)
+
+RENDITION_WIDTHS = (200, 400, 800)
+RENDITION_FORMATS = ('avif', 'webp')
+CALIDAD = {'webp': 80, 'avif': 60}
+
+
+def formatos_disponibles():
+    """Formatos de RENDITION_FORMATS que este Pillow puede escribir."""
+    from PIL import Image
+    try:
+        import pillow_avif  # noqa: F401  (registra AVIF en Pillow < 11.3)
+    except ImportError:
+        pass
+    Image.init()
+    return [f for f in RENDITION_FORMATS if f.upper() in Image.SAVE]
+
+
+def ruta_rendition(nombre_original, ancho, formato):
+    """variantes/x/imagen-1.jpg → variantes/x/imagen-1-400w.webp"""
+    base, _ = os.path.splitext(nombre_original)
+    return f'{base}-{ancho}w.{formato}'
+
+
+def generar_renditions(nombre, storage=None, contenido=None):
+    """
+    Genera las renditions del archivo `nombre` y las guarda en `storage`.
+
+    `contenido` permite pasar el original cuando ya está a mano (bytes o un
+    archivo abierto, p.ej. el UploadedFile del request) y evita volver a
+    descargarlo de S3 justo después de subirlo.
+    Retorna el dict para `VarianteImagen.renditions`.
+    """
+    from PIL import Image, ImageOps
+
+    storage = storage or default_storage
+    if contenido is None:
+        with storage.open(nombre, 'rb') as fh:
+            contenido = fh.read()
+
+    if hasattr(contenido, 'read'):
+        contenido.seek(0)
+        fuente = contenido
+    else:
+        fuente = io.BytesIO(contenido)
+
+    with Image.open(fuente) as original:
+        original = ImageOps.exif_transpose(original)
+        tiene_alpha = original.mode in ('RGBA', 'LA') or 'transparency' in original.info
+        original = original.convert('RGBA' if tiene_alpha else 'RGB')
+
+        # Nunca se agranda: anchos mayores al original se omiten
+        anchos = [w for w in RENDITION_WIDTHS if w < original.width] or [original.width]
+
+        resultado = {}
+        for formato in formatos_disponibles():
+            resultado[formato] = {}
+            for ancho in anchos:
+                alto = max(1, round(original.height * ancho / original.width))
+                reducida = original.resize((ancho, alto), Image.LANCZOS)
+                buffer = io.BytesIO()
+                reducida.save(buffer, format=formato.upper(), quality=CALIDAD[formato])
+
+                ruta = ruta_rendition(nombre, ancho, formato)
+                # Sobrescribir: con AWS_S3_FILE_OVERWRITE=False el storage
+                # renombraría en lugar de reemplazar
+                storage.delete(ruta)
+                resultado[formato][str(ancho)] = storage.save(ruta, ContentFile(buffer.getvalue()))
+
+    return resultado
+
+
+def generar_renditions_imagen(variante_imagen, contenido=None):
+    """
+    Genera y registra las renditions de una VarianteImagen ya guardada.
+    Un fallo se registra en el log pero no interrumpe la subida del original.
+    """
+    if not variante_imagen.imagen:
+        return {}
+    try:
+        renditions = generar_renditions(
+            variante_imagen.imagen.name, variante_imagen.imagen.storage, contenido
+        )
+    except Exception as e:
+        logger.warning(
+            "No se pudieron generar renditions de VarianteImagen #%s: %s", variante_imagen.pk, e
+        )
+        return {}
+
+    variante_imagen.renditions = renditions
+    variante_imagen.srcsets_cache = construir_srcsets(renditions, variante_imagen.imagen.storage)
+    type(variante_imagen).objects.filter(pk=variante_imagen.pk).update(
+        renditions=renditions, srcsets_cache=variante_imagen.srcsets_cache
+    )
+    return renditions
+
+
+def eliminar_renditions(renditions, storage=None):
+    storage = storage or default_storage
+    for por_ancho in (renditions or {}).values():
+        for ruta in por_ancho.values():
+            try:
+                storage.delete(ruta)
+            except Exception as e:
+                logger.warning("Error eliminando rendition %s: %s", ruta, e)
+
+
+def construir_srcset(renditions, formato='webp', storage=None):
+    """'url-200 200w, url-400 400w, ...' o '' si no hay renditions."""
+    storage = storage or default_storage
+    por_ancho = (renditions or {}).get(formato) or {}
+    return ', '.join(
+        f'{storage.url(ruta)} {ancho}w'
+        for ancho, ruta in sorted(por_ancho.items(), key=lambda kv: int(kv[0]))
+    )
+
+
+def construir_srcsets(renditions, storage=None):
+    """{'webp': srcset, 'avif': srcset} para guardar en VarianteImagen.srcsets_cache"""
+    return {formato: construir_srcset(renditions, formato, storage) for formato in (renditions or {})}
+
+
+def srcsets(variante_imagen):
+    """
+    Campos srcset para las tarjetas de listados (vacíos si no hay imagen o
+    aún no tiene renditions): {'imagen_srcset': webp, 'imagen_srcset_avif': avif}
+    """
+    if not variante_imagen or not variante_imagen.imagen:
+        return {'imagen_srcset': '', 'imagen_srcset_avif': ''}
+    return {
+        'imagen_srcset': variante_imagen.srcset('webp'),
+        'imagen_srcset_avif': variante_imagen.srcset('avif'),
+    }
@@ -0,0 +1,410 @@
+"""
+Replay de carga HTTP con mezclas de tráfico realistas
+=====================================================
+
+Reproduce escenarios ponderados contra un servidor corriendo (gunicorn
+local, staging) con N usuarios virtuales en paralelo, cada uno con su
+propia sesión/cookies, y reporta por endpoint: throughput, histograma de
+latencias, percentiles y tasa de errores.
+
+Fuentes de escenarios:
+    ESCENARIOS_BASE       → recorridos de la tienda (colección, filtros,
+                            producto, carrito y checkout)
+    desde_http()          → colecciones .http (app.http, test_security.http)
+    desde_access_log()    → access log de nginx (formato combined): cada
+                            endpoint pesa según cuántas veces aparece
+
+Las rutas admiten marcadores que se llenan con datos reales del catálogo
+({producto_id}, {talla}, {genero}, {marca}) y con valores guardados de
+respuestas anteriores del mismo usuario ({carrito_id}, {cliente_id}...).
+
+El checkout llama a Stripe desde el servidor: arrancar gunicorn con
+STRIPE_API_BASE apuntando a stripe-mock (http://localhost:12111) para no
+tocar la cuenta real.
+
+Lo usa `manage.py replay_carga`.
+"""
+import json
+import random
+import re
+import threading
+import time
+from collections import Counter, defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from urllib.parse import urlsplit
+
+import requests
+
+# Cubetas del histograma de latencias (ms); la última cubre todo lo demás
+CUBETAS_MS = [10, 25, 50, 100, 250, 500, 1000, 2500, 5000]
+
+METODOS_LECTURA = ('GET', 'HEAD', 'OPTIONS')
+
+
+@dataclass
+class Paso:
+    metodo: str
+    ruta: str
+    json: dict = None
+    headers: dict = None
+    # {variable: clave del JSON de respuesta} para usar en pasos siguientes
+    guardar: dict = None
+    # Rutas concretas entre las que se elige al azar (access log)
+    alternativas: list = None
+    # Nombre del endpoint en el reporte (por defecto la ruta sin ids)
+    endpoint: str = ''
+
+    def nombre(self):
+        return self.endpoint or f'{self.metodo} {normalizar_ruta(self.ruta)}'
+
+
+@dataclass
+class Escenario:
+    nombre: str
+    peso: float
+    pasos: list
+    requiere_login: bool = False
+
+
+ESCENARIOS_BASE = [
+    Escenario('navegar_coleccion', 30, [
+        Paso('GET', '/'),
+        Paso('GET', '/coleccion/{genero}/'),
+        Paso('GET', '/api/productos-filtrados/?genero={genero}&pagina=1'),
+    ]),
+    Escenario('filtrar', 25, [
+        Paso('GET', '/api/filtros-disponibles/?genero={genero}'),
+        Paso('GET', '/api/productos-filtrados/?genero={genero}&tallas={talla}&orden=precio_asc',
+             endpoint='GET /api/productos-filtrados/?tallas'),
+    ]),
+    Escenario('buscar', 10, [
+        Paso('GET', '/api/search/?q={marca}'),
+    ]),
+    Escenario('ver_producto', 25, [
+        Paso('GET', '/producto/{producto_id}/'),
+        Paso('GET', '/api/productos/{producto_id}/'),
+    ]),
+    Escenario('agregar_carrito', 8, [
+        Paso('POST', '/api/carrito/create/0/',
+             json={'producto_id': '{producto_id}', 'cantidad': 1, 'talla': '{talla}'}),
+        Paso('GET', '/api/carrito/guest/'),
+    ]),
+    Escenario('checkout', 2, [
+        Paso('POST', '/api/carrito/create/{cliente_id}/',
+             json={'producto_id': '{producto_id}', 'cantidad': 1, 'talla': '{talla}'},
+             headers={'Authorization': 'Bearer {access}'}, guardar={'carrito_id': 'carrito_id'}),
+        Paso('POST', '/pago/crear-checkout/', json={'carrito_id': '{carrito_id}'},
+             headers={'Authorization': 'Bearer {access}'}),
+    ], requiere_login=True),
+]
+
+
+def normalizar_ruta(ruta):
+    """Ruta sin query string y con los ids numéricos como {id}."""
+    ruta = urlsplit(ruta).path or '/'
+    return re.sub(r'/\d+(?=/|$)', '/{id}', ruta)
+
+
+# ═══════════════════════════════════════════════════════════════
+# FUENTES
+# ═══════════════════════════════════════════════════════════════
+
+def desde_http(texto, incluir_escritura=False):
+    """
+    Escenarios (uno por request, peso 1) de una colección .http estilo
+    REST Client: bloques separados por ###, variables `@nombre = valor`.
+    """
+    variables = dict(re.findall(r'^@(\w+)\s*=\s*(.+?)\s*$', texto, re.M))
+    escenarios = []
+    for bloque in re.split(r'^###.*$', texto, flags=re.M):
+        lineas = [l for l in bloque.strip().splitlines() if not l.startswith(('#', '@', '//'))]
+        if not lineas:
+            continue
+        partes = lineas[0].split()
+        if len(partes) < 2 or partes[0].upper() not in ('GET', 'POST', 'PUT', 'PATCH', 'DELETE', 'HEAD'):
+            continue
+        metodo = partes[0].upper()
+        if metodo not in METODOS_LECTURA and not incluir_escritura:
+            continue
+
+        headers, cuerpo, en_cuerpo = {}, [], False
+        for linea in lineas[1:]:
+            if en_cuerpo:
+                cuerpo.append(linea)
+            elif not linea.strip():
+                en_cuerpo = True
+            elif ':' in linea:
+                nombre, valor = linea.split(':', 1)
+                headers[nombre.strip()] = valor.strip()
+
+        def sustituir(valor):
+            return re.sub(r'\{\{(\w+)\}\}', lambda m: variables.get(m.group(1), m.group(0)), valor)
+
+        url = urlsplit(sustituir(partes[1]))
+        ruta = url.path + (f'?{url.query}' if url.query else '')
+        datos = None
+        if cuerpo:
+            try:
+                datos = json.loads(sustituir('\n'.join(cuerpo)))
+            except ValueError:
+                datos = None
+        headers = {k: sustituir(v) for k, v in headers.items() if k.lower() != 'content-type'}
+        escenarios.append(Escenario(
+            f'http:{metodo} {normalizar_ruta(ruta)}', 1,
+            [Paso(metodo, _escapar(ruta), json=_escapar(datos), headers=_escapar(headers))],
+        ))
+    return escenarios
+
+
+# "GET /ruta HTTP/1.1" status
+_LINEA_LOG = re.compile(r'"(?P<metodo>[A-Z]+) (?P<ruta>\S+) HTTP/[\d.]+" (?P<status>\d{3})')
+
+
+def desde_access_log(lineas, incluir_escritura=False, excluir=('/static/', '/media/'), top=None):
+    """
+    Un escenario por endpoint normalizado, con peso = apariciones en el log
+    y las rutas concretas observadas como alternativas. Las escrituras se
+    omiten por defecto: el log no trae los cuerpos de los requests.
+    """
+    rutas = defaultdict(list)
+    for linea in lineas:
+        m = _LINEA_LOG.search(linea)
+        if not m:
+            continue
+        metodo, ruta = m.group('metodo'), m.group('ruta')
+        if ruta.startswith(excluir) or (metodo not in METODOS_LECTURA and not incluir_escritura):
+            continue
+        rutas[(metodo, normalizar_ruta(ruta))].append(ruta)
+
+    mas_vistos = sorted(rutas.items(), key=lambda kv: -len(kv[1]))[:top]
+    return [
+        Escenario(
+            f'log:{metodo} {patron}', len(observadas),
+            [Paso(metodo, patron, alternativas=[_escapar(r) for r in observadas], endpoint=f'{metodo} {patron}')],
+        )
+        for (metodo, patron), observadas in mas_vistos
+    ]
+
+
+def _escapar(valor):
+    """Rutas y cuerpos tomados tal cual no deben tratarse como plantillas."""
+    if isinstance(valor, dict):
+        return {k: _escapar(v) for k, v in valor.items()}
+    if isinstance(valor, list):
+        return [_escapar(v) for v in valor]
+    if isinstance(valor, str):
+        return valor.replace('{', '{{').replace('}', '}}')
+    return valor
+
+
+# ═══════════════════════════════════════════════════════════════
+# EJECUCIÓN
+# ═══════════════════════════════════════════════════════════════
+
+def cargar_catalogo(base_url, timeout=30):
+    """Productos públicos con stock de /api/productos/ para llenar los marcadores."""
+    response = requests.get(f'{base_url}/api/productos/', timeout=timeout)
+    response.raise_for_status()
+    catalogo = []
+    for producto in response.json():
+        if producto.get('bodega'):
+            continue
+        tallas = [
+            talla for v in producto.get('variantes', [])
+            for talla, stock in (v.get('tallas_stock') or {}).items() if stock
+        ]
+        if tallas:
+            catalogo.append({
+                'producto_id': producto['id'],
+                'tallas': tallas,
+                'marca': (producto['nombre'].split() or [''])[0],
+            })
+    return catalogo
+
+
+class Estadisticas:
+    """Acumulador thread-safe de latencias y códigos por endpoint."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.latencias = defaultdict(list)
+        self.codigos = defaultdict(Counter)
+        self.inicio = time.monotonic()
+        self.fin = None
+
+    def registrar(self, endpoint, ms, codigo):
+        with self._lock:
+            self.latencias[endpoint].append(ms)
+            self.codigos[endpoint][codigo] += 1
+
+    def reporte(self):
+        duracion = (self.fin or time.monotonic()) - self.inicio
+        endpoints = {}
+        for endpoint, latencias in sorted(self.latencias.items()):
+            endpoints[endpoint] = _resumen(latencias, self.codigos[endpoint], duracion)
+        todas = [ms for lat in self.latencias.values() for ms in lat]
+        codigos = sum(self.codigos.values(), Counter())
+        return {
+            'duracion_s': round(duracion, 2),
+            'total': _resumen(todas, codigos, duracion) if todas else {},
+            'endpoints': endpoints,
+        }
+
+
+def _resumen(latencias, codigos, duracion):
+    ordenadas = sorted(latencias)
+
+    def percentil(p):
+        return round(ordenadas[min(len(ordenadas) - 1, int(len(ordenadas) * p / 100))], 1)
+
+    histograma = Counter()
+    for ms in ordenadas:
+        cubeta = next((f'<={c}' for c in CUBETAS_MS if ms <= c), f'>{CUBETAS_MS[-1]}')
+        histograma[cubeta] += 1
+
+    errores = sum(n for codigo, n in codigos.items() if codigo == 'error' or str(codigo).startswith('5'))
+    rechazados = sum(n for codigo, n in codigos.items() if str(codigo).startswith('4'))
+    return {
+        'requests': len(ordenadas),
+        'rps': round(len(ordenadas) / duracion, 1) if duracion else 0,
+        'p50_ms': percentil(50),
+        'p90_ms': percentil(90),
+        'p99_ms': percentil(99),
+        'max_ms': round(ordenadas[-1], 1),
+        'errores_pct': round(100 * errores / len(ordenadas), 2),
+        'http_4xx': rechazados,
+        'codigos': {str(k): v for k, v in codigos.items()},
+        'histograma': {
+            c: histograma[c] for c in [f'<={c}' for c in CUBETAS_MS] + [f'>{CUBETAS_MS[-1]}'] if histograma[c]
+        },
+    }
+
+
+class UsuarioVirtual:
+    """Sesión HTTP propia (cookies, carrito de invitado, login) que recorre escenarios."""
+
+    def __init__(self, base_url, catalogo, estadisticas, rnd, timeout=30):
+        self.base_url = base_url
+        self.catalogo = catalogo
+        self.estadisticas = estadisticas
+        self.rnd = rnd
+        self.timeout = timeout
+        self.http = requests.Session()
+        self.variables = {}
+
+    def login(self, username, password):
+        """Login de cliente: deja sesión Django y guarda {access} y {cliente_id}."""
+        datos = self._pedir(Paso('POST', '/auth/login_client/'), {'username': username, 'password': password}) or {}
+        if 'access' not in datos:
+            return False
+        self.variables['access'] = datos['access']
+        cliente = self._pedir(
+            Paso('GET', f'/api/cliente_id/{username}/', endpoint='GET /api/cliente_id/{username}/'),
+            headers={'Authorization': f"Bearer {datos['access']}"},
+        ) or {}
+        self.variables['cliente_id'] = cliente.get('id', 0)
+        return bool(cliente.get('id'))
+
+    def contexto(self):
+        producto = self.rnd.choice(self.catalogo) if self.catalogo else {'producto_id': 0, 'tallas': [''], 'marca': ''}
+        return {
+            'producto_id': producto['producto_id'],
+            'talla': self.rnd.choice(producto['tallas']),
+            'marca': producto['marca'],
+            'genero': self.rnd.choice(['dama', 'caballero']),
+            **self.variables,
+        }
+
+    def recorrer(self, escenario):
+        ctx = self.contexto()
+        for paso in escenario.pasos:
+            ruta = self.rnd.choice(paso.alternativas) if paso.alternativas else paso.ruta
+            try:
+                ruta = ruta.format(**ctx)
+                cuerpo = _formatear(paso.json, ctx)
+                headers = _formatear(paso.headers, ctx)
+            except (KeyError, IndexError, ValueError):
+                self.estadisticas.registrar(paso.nombre(), 0, 'error')
+                return
+            datos = self._pedir(paso, cuerpo, headers, ruta)
+            if datos is None and paso.guardar:
+                return
+            for variable, clave in (paso.guardar or {}).items():
+                if isinstance(datos, dict) and clave in datos:
+                    ctx[variable] = datos[clave]
+
+    def _pedir(self, paso, cuerpo=None, headers=None, ruta=None):
+        ruta = ruta or paso.ruta
+        inicio = time.perf_counter()
+        try:
+            response = self.http.request(
+                paso.metodo, f'{self.base_url}{ruta}', json=cuerpo, headers=headers,
+                timeout=self.timeout, allow_redirects=False,
+            )
+        except requests.RequestException:
+            self.estadisticas.registrar(paso.nombre(), (time.perf_counter() - inicio) * 1000, 'error')
+            return None
+        self.estadisticas.registrar(paso.nombre(), (time.perf_counter() - inicio) * 1000, response.status_code)
+        if response.status_code >= 400:
+            return None
+        try:
+            return response.json()
+        except ValueError:
+            return {}
+
+
+def _formatear(valor, ctx):
+    """Llena marcadores en dicts/listas/strings; '{x}' solo se vuelve el valor tal cual (int, etc.)."""
+    if valor is None:
+        return None
+    if isinstance(valor, dict):
+        return {k: _formatear(v, ctx) for k, v in valor.items()}
+    if isinstance(valor, list):
+        return [_formatear(v, ctx) for v in valor]
+    if isinstance(valor, str):
+        m = re.fullmatch(r'\{(\w+)\}', valor)
+        return ctx[m.group(1)] if m else valor.format(**ctx)
+    return valor
+
+
+def ejecutar(base_url, escenarios, usuarios=10, duracion=30, iteraciones=None,
+             pausa=0.0, login=None, semilla=None, progreso=None):
+    """
+    Corre `usuarios` usuarios virtuales eligiendo escenarios según su peso,
+    durante `duracion` segundos (o `iteraciones` escenarios por usuario).
+    `login` = (username, password) habilita los escenarios que lo requieren.
+    Retorna el reporte de Estadisticas.
+    """
+    base_url = base_url.rstrip('/')
+    if not login:
+        escenarios = [e for e in escenarios if not e.requiere_login]
+    if not escenarios:
+        raise ValueError('No hay escenarios que ejecutar')
+
+    catalogo = cargar_catalogo(base_url)
+    estadisticas = Estadisticas()
+    pesos = [e.peso for e in escenarios]
+    limite = time.monotonic() + duracion
+    base_semilla = semilla if semilla is not None else random.randrange(1 << 30)
+
+    def usuario(n):
+        rnd = random.Random(base_semilla + n)
+        vu = UsuarioVirtual(base_url, catalogo, estadisticas, rnd)
+        disponibles, pesos_vu = escenarios, pesos
+        if login and not vu.login(*login):
+            disponibles = [e for e in escenarios if not e.requiere_login]
+            pesos_vu = [e.peso for e in disponibles]
+        hechos = 0
+        while disponibles and (hechos < iteraciones if iteraciones else time.monotonic() < limite):
+            vu.recorrer(rnd.choices(disponibles, weights=pesos_vu)[0])
+            hechos += 1
+            if pausa:
+                time.sleep(rnd.uniform(0, 2 * pausa))
+        if progreso:
+            progreso(n, hechos)
+
+    with ThreadPoolExecutor(max_workers=usuarios) as pool:
+        list(pool.map(usuario, range(usuarios)))
+    estadisticas.fin = time.monotonic()
+    return estadisticas.reporte()
@@ -0,0 +1,287 @@
+"""
+Sincronización incremental de media entre S3 y disco local
+==========================================================
+
+Motor usado por `python manage.py sync_media` (y por descargar_s3_local.py).
+
+    pull: bucket/prefijo  →  carpeta local   (clonar media de producción)
+    push: carpeta local   →  bucket/prefijo  (sembrar un bucket nuevo)
+
+Solo se transfiere lo que cambió. Un archivo se omite si existe en el
+destino con el mismo tamaño y:
+  - su fecha de modificación es igual o posterior a la del origen, o
+  - con `checksum=True`, su MD5 coincide con el ETag de S3 (solo ETags
+    simples; los de subidas multiparte "xxx-N" se comparan por fecha).
+
+Las descargas se escriben en `<archivo>.part` y se renombran al terminar;
+si una corrida se interrumpe, la siguiente continúa con un GET por rango
+desde donde quedó. Al terminar se ajusta la fecha local a LastModified
+para que las corridas siguientes puedan comparar por fecha.
+
+Funciona con cualquier cliente compatible con S3 (boto3 contra AWS, MinIO
+o moto vía `endpoint_url`).
+"""
+import hashlib
+import logging
+import mimetypes
+import os
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass, field
+from pathlib import Path
+
+logger = logging.getLogger(__name__)
+
+SUFIJO_PARCIAL = '.part'
+CHUNK = 1024 * 1024
+BORRADO_POR_LOTE = 1000  # máximo de delete_objects
+
+
+@dataclass
+class Objeto:
+    """Archivo en uno de los dos lados; `ruta` es relativa al prefijo/carpeta."""
+    ruta: str
+    tamano: int
+    mtime: float
+    etag: str = ''
+
+
+@dataclass
+class Plan:
+    copiar: list = field(default_factory=list)
+    borrar: list = field(default_factory=list)
+    omitidos: int = 0
+
+    @property
+    def bytes_a_copiar(self):
+        return sum(obj.tamano for obj in self.copiar)
+
+
+@dataclass
+class Resultado:
+    copiados: int = 0
+    bytes_copiados: int = 0
+    reanudados: int = 0
+    borrados: int = 0
+    errores: list = field(default_factory=list)
+
+
+# ═══════════════════════════════════════════════════════════════
+# LISTADOS
+# ═══════════════════════════════════════════════════════════════
+
+def _prefijo(prefijo):
+    prefijo = (prefijo or '').strip('/')
+    return f'{prefijo}/' if prefijo else ''
+
+
+def listar_remoto(client, bucket, prefijo):
+    prefijo = _prefijo(prefijo)
+    objetos = {}
+    paginator = client.get_paginator('list_objects_v2')
+    for pagina in paginator.paginate(Bucket=bucket, Prefix=prefijo):
+        for obj in pagina.get('Contents', []):
+            clave = obj['Key']
+            if clave.endswith('/'):
+                continue  # "directorio"
+            ruta = clave[len(prefijo):]
+            objetos[ruta] = Objeto(
+                ruta=ruta,
+                tamano=obj['Size'],
+                mtime=obj['LastModified'].timestamp(),
+                etag=obj.get('ETag', '').strip('"'),
+            )
+    return objetos
+
+
+def listar_local(raiz):
+    raiz = Path(raiz)
+    objetos = {}
+    if not raiz.exists():
+        return objetos
+    for dirpath, _, archivos in os.walk(raiz):
+        for nombre in archivos:
+            if nombre.endswith(SUFIJO_PARCIAL):
+                continue
+            completa = Path(dirpath) / nombre
+            ruta = completa.relative_to(raiz).as_posix()
+            stat = completa.stat()
+            objetos[ruta] = Objeto(ruta=ruta, tamano=stat.st_size, mtime=stat.st_mtime)
+    return objetos
+
+
+def md5_archivo(path):
+    md5 = hashlib.md5()
+    with open(path, 'rb') as fh:
+        for bloque in iter(lambda: fh.read(CHUNK), b''):
+            md5.update(bloque)
+    return md5.hexdigest()
+
+
+def _etag_simple(etag):
+    return bool(etag) and '-' not in etag
+
+
+# ═══════════════════════════════════════════════════════════════
+# PLAN
+# ═══════════════════════════════════════════════════════════════
+
+def _igual(origen, destino, ruta_local, checksum):
+    if destino is None or destino.tamano != origen.tamano:
+        return False
+    remoto = origen if origen.etag else destino
+    if checksum and _etag_simple(remoto.etag):
+        return md5_archivo(ruta_local) == remoto.etag
+    # Tolerancia de 1s: S3 guarda LastModified con precisión de segundos
+    return destino.mtime + 1 >= origen.mtime
+
+
+def planear(remotos, locales, raiz, direccion='pull', borrar=False, checksum=False):
+    """Compara ambos listados y decide qué copiar y qué borrar."""
+    origen, destino = (remotos, locales) if direccion == 'pull' else (locales, remotos)
+    raiz = Path(raiz)
+    plan = Plan()
+    for ruta, obj in sorted(origen.items()):
+        if _igual(obj, destino.get(ruta), raiz / ruta, checksum):
+            plan.omitidos += 1
+        else:
+            plan.copiar.append(obj)
+    if borrar:
+        plan.borrar = sorted(ruta for ruta in destino if ruta not in origen)
+    return plan
+
+
+# ═══════════════════════════════════════════════════════════════
+# TRANSFERENCIAS
+# ═══════════════════════════════════════════════════════════════
+
+def descargar(client, bucket, clave, obj, destino):
+    """
+    Descarga `clave` a `destino` pasando por `destino.part`. Retorna
+    (bytes transferidos, reanudado).
+    """
+    destino = Path(destino)
+    destino.parent.mkdir(parents=True, exist_ok=True)
+    parcial = destino.with_name(destino.name + SUFIJO_PARCIAL)
+
+    inicio = parcial.stat().st_size if parcial.exists() else 0
+    if inicio > obj.tamano:
+        parcial.unlink()
+        inicio = 0
+
+    md5 = hashlib.md5()
+    if inicio and _etag_simple(obj.etag):
+        with open(parcial, 'rb') as fh:
+            for bloque in iter(lambda: fh.read(CHUNK), b''):
+                md5.update(bloque)
+
+    transferidos = 0
+    if inicio < obj.tamano:
+        kwargs = {'Bucket': bucket, 'Key': clave}
+        if inicio:
+            kwargs['Range'] = f'bytes={inicio}-'
+        respuesta = client.get_object(**kwargs)
+        cuerpo = respuesta['Body']
+        with open(parcial, 'ab' if inicio else 'wb') as fh:
+            for bloque in iter(lambda: cuerpo.read(CHUNK), b''):
+                fh.write(bloque)
+                md5.update(bloque)
+                transferidos += len(bloque)
+    elif not parcial.exists():
+        parcial.touch()  # archivo vacío
+
+    if parcial.stat().st_size != obj.tamano:
+        raise IOError(f'{clave}: tamaño incompleto ({parcial.stat().st_size}/{obj.tamano})')
+    if _etag_simple(obj.etag) and md5.hexdigest() != obj.etag:
+        parcial.unlink()
+        raise IOError(f'{clave}: el MD5 no coincide con el ETag')
+
+    os.replace(parcial, destino)
+    os.utime(destino, (obj.mtime, obj.mtime))
+    return transferidos, inicio > 0
+
+
+def subir(client, bucket, clave, origen):
+    """Sube un archivo local (upload_file hace multiparte si es grande)."""
+    tipo, _ = mimetypes.guess_type(str(origen))
+    extra = {'ContentType': tipo} if tipo else {}
+    client.upload_file(str(origen), bucket, clave, ExtraArgs=extra)
+    return Path(origen).stat().st_size
+
+
+def _borrar_remotos(client, bucket, claves):
+    for i in range(0, len(claves), BORRADO_POR_LOTE):
+        lote = claves[i:i + BORRADO_POR_LOTE]
+        client.delete_objects(
+            Bucket=bucket,
+            Delete={'Objects': [{'Key': clave} for clave in lote], 'Quiet': True},
+        )
+
+
+def _borrar_locales(raiz, rutas):
+    raiz = Path(raiz)
+    for ruta in rutas:
+        completa = raiz / ruta
+        completa.unlink(missing_ok=True)
+        completa.with_name(completa.name + SUFIJO_PARCIAL).unlink(missing_ok=True)
+    # Limpiar directorios que quedaron vacíos
+    for dirpath, dirnames, archivos in os.walk(raiz, topdown=False):
+        if dirpath != str(raiz) and not dirnames and not archivos:
+            try:
+                os.rmdir(dirpath)
+            except OSError:
+                pass
+
+
+def ejecutar(client, bucket, prefijo, raiz, plan, direccion='pull', workers=16, progreso=None):
+    """Aplica un Plan con un pool de `workers` hilos."""
+    prefijo = _prefijo(prefijo)
+    raiz = Path(raiz)
+    resultado = Resultado()
+
+    def copiar(obj):
+        clave = prefijo + obj.ruta
+        if direccion == 'pull':
+            return descargar(client, bucket, clave, obj, raiz / obj.ruta)
+        return subir(client, bucket, clave, raiz / obj.ruta), False
+
+    if plan.copiar:
+        with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+            futuros = {pool.submit(copiar, obj): obj for obj in plan.copiar}
+            for futuro in as_completed(futuros):
+                obj = futuros[futuro]
+                try:
+                    transferidos, reanudado = futuro.result()
+                except Exception as e:
+                    logger.warning('Error sincronizando %s: %s', obj.ruta, e)
+                    resultado.errores.append((obj.ruta, str(e)))
+                    continue
+                resultado.copiados += 1
+                resultado.bytes_copiados += transferidos
+                resultado.reanudados += int(reanudado)
+                if progreso:
+                    progreso(resultado, len(plan.copiar))
+
+    if plan.borrar:
+        if direccion == 'pull':
+            _borrar_locales(raiz, plan.borrar)
+        else:
+            _borrar_remotos(client, bucket, [prefijo + ruta for ruta in plan.borrar])
+        resultado.borrados = len(plan.borrar)
+
+    return resultado
+
+
+def sincronizar(client, bucket, prefijo, raiz, direccion='pull', workers=16,
+                borrar=False, checksum=False, dry_run=False, progreso=None):
+    """
+    Lista ambos lados, arma el plan y (salvo dry_run) lo ejecuta.
+    Retorna (plan, resultado); resultado es None en dry_run.
+    """
+    if direccion not in ('pull', 'push'):
+        raise ValueError("direccion debe ser 'pull' o 'push'")
+    remotos = listar_remoto(client, bucket, prefijo)
+    locales = listar_local(raiz)
+    plan = planear(remotos, locales, raiz, direccion, borrar, checksum)
+    if dry_run:
+        return plan, None
+    return plan, ejecutar(client, bucket, prefijo, raiz, plan, direccion, workers, progreso)
@@ -11,14 +11,14 @@ def serializar_producto_completo(producto):
     variantes = []
     for v in producto.variantes.all():
         # Obtener imágenes de galería
-        imagenes = [img.imagen.url for img in v.imagenes.all().order_by('orden') if img.imagen]
+        imagenes = [img.imagen_url for img in v.imagenes.all().order_by('orden') if img.imagen]
         variantes.append({
             'id': v.id,
             'sku': v.sku,
             'color': v.color,
             'tallas_stock': v.tallas_stock or {},
             'otros': v.otros,
-            'imagen': imagenes[0] if imagenes else (v.imagen.url if v.imagen else None),
+            'imagen': imagenes[0] if imagenes else (v.imagen_url or None),
             'imagenes': imagenes,
             'precio': float(v.precio or producto.precio),
             'precio_mayorista': float(v.precio_mayorista or producto.precio_mayorista),
@@ -29,7 +29,7 @@ def serializar_producto_completo(producto):
     variante_principal = producto.variante_principal
     galeria = []
     if variante_principal:
-        galeria = [img.imagen.url for img in variante_principal.imagenes.all().order_by('orden') if img.imagen]
+        galeria = [img.imagen_url for img in variante_principal.imagenes.all().order_by('orden') if img.imagen]
 
     return {
         'id': producto.id,
@@ -51,7 +51,7 @@ def serializar_variante_con_imagen(variante):
     """
     Serializa una variante individual con su imagen.
     """
-    imagenes = [img.imagen.url for img in variante.imagenes.all().order_by('orden') if img.imagen]
+    imagenes = [img.imagen_url for img in variante.imagenes.all().order_by('orden') if img.imagen]
     return {
         'id': variante.id,
         'producto_id': variante.producto.id,
@@ -60,7 +60,7 @@ def serializar_variante_con_imagen(variante):
         'color': variante.color,
         'tallas_stock': variante.tallas_stock or {},
         'otros': variante.otros,
-        'imagen': imagenes[0] if imagenes else (variante.imagen.url if variante.imagen else None),
+        'imagen': imagenes[0] if imagenes else (variante.imagen_url or None),
         'imagenes': imagenes,
         'precio': float(variante.precio or variante.producto.precio),
         'precio_mayorista': float(variante.precio_mayorista or variante.producto.precio_mayorista),
@@ -75,7 +75,7 @@ def obtener_imagen_variante(variante):
     """
     primera_img = variante.imagenes.all().order_by('orden').first()
     if primera_img and primera_img.imagen:
-        return primera_img.imagen.url
+        return primera_img.imagen_url
     if variante.imagen:
-        return variante.imagen.url
+        return variante.imagen_url
     return None
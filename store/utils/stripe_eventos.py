@@ -0,0 +1,262 @@
+"""
+Procesamiento de eventos de Stripe (bandeja de entrada)
+=======================================================
+
+Flujo:
+    webhook_stripe  → verifica firma → registrar_evento() → 200
+    procesar_eventos_stripe (worker) → procesar_pendientes() → handlers
+
+Garantías:
+  - Idempotencia: `StripeEvento.event_id` es único; un reintento de Stripe
+    del mismo evento no se vuelve a aplicar.
+  - Orden: los eventos de una misma `clave_orden` se aplican por fecha de
+    creación en Stripe; si uno falla, los siguientes de esa clave esperan.
+  - Reintentos con backoff exponencial (STRIPE_EVENTOS_BACKOFF) y estado
+    'muerto' al superar STRIPE_EVENTOS_MAX_INTENTOS. Un evento muerto ya no
+    bloquea a los demás de su clave; se reprocesa con --reintentar-muertos.
+"""
+import logging
+from collections import Counter
+from datetime import datetime, timedelta, timezone as dt_timezone
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from store.models import Orden, StripeEvento
+
+logger = logging.getLogger('stripe_payments')
+
+ESTADOS_ABIERTOS = ('pendiente', 'error')
+
+
+# ═══════════════════════════════════════════════════════════════
+# REGISTRO (webhook)
+# ═══════════════════════════════════════════════════════════════
+
+def clave_de_orden(event):
+    """PaymentIntent del evento (o el id de la Session si aún no tiene)."""
+    obj = event['data']['object']
+    if event['type'].startswith('payment_intent.'):
+        return obj.get('id', '')
+    return obj.get('payment_intent') or obj.get('id', '')
+
+
+def registrar_evento(event):
+    """
+    Guarda el evento en la bandeja. Retorna (evento, creado); `creado` es
+    False si Stripe ya lo había enviado antes.
+    """
+    creado = event.get('created')
+    creado_stripe = datetime.fromtimestamp(creado, tz=dt_timezone.utc) if creado else timezone.now()
+    return StripeEvento.objects.get_or_create(
+        event_id=event['id'],
+        defaults={
+            'tipo': event['type'],
+            'clave_orden': clave_de_orden(event) or '',
+            'payload': event,
+            'creado_stripe': creado_stripe,
+        },
+    )
+
+
+# ═══════════════════════════════════════════════════════════════
+# HANDLERS
+# ═══════════════════════════════════════════════════════════════
+
+def _enviar_confirmacion(orden):
+    from store.views.payment import _enviar_email_confirmacion
+    # Solo tras el commit: si la transacción se revierte no se avisa al cliente
+    transaction.on_commit(lambda: _enviar_email_confirmacion(orden))
+
+
+def checkout_completado(data):
+    session_id = data['id']
+    payment_intent_id = data.get('payment_intent', '')
+    payment_status = data.get('payment_status', '')
+    logger.info(f"Session: {session_id} | PI: {payment_intent_id} | Status: {payment_status}")
+
+    try:
+        # Bloqueada hasta el fin del savepoint del handler (igual en los demás):
+        # stock_reducido se lee con el lock tomado y otro worker espera
+        orden = Orden.objects.select_for_update().get(stripe_session_id=session_id)
+    except Orden.DoesNotExist:
+        logger.warning(f"Orden no encontrada para session: {session_id}")
+        return
+
+    stock_reducido = False
+    if payment_status == 'paid':
+        orden.status = 'procesando'
+        # 🔥 REDUCIR STOCK cuando el pago es confirmado (False si otro evento ya lo hizo)
+        stock_reducido = orden.reducir_stock_orden()
+    else:
+        orden.status = 'pendiente_pago'
+
+    if payment_intent_id:
+        orden.stripe_payment_intent = payment_intent_id
+
+    orden.save(update_fields=['status', 'stripe_payment_intent', 'updated_at'])
+    logger.info(f"Orden #{orden.id} actualizada → {orden.status}")
+
+    # Enviar email de confirmación solo la primera vez que se confirma el pago
+    if stock_reducido:
+        _enviar_confirmacion(orden)
+
+
+def pago_exitoso(data):
+    pi_id = data['id']
+    logger.info(f"PaymentIntent exitoso: {pi_id}")
+
+    try:
+        orden = Orden.objects.select_for_update().get(stripe_payment_intent=pi_id)
+    except Orden.DoesNotExist:
+        logger.warning(f"Orden no encontrada para PI: {pi_id}")
+        return
+
+    orden.status = 'pagado'
+    # 🔥 REDUCIR STOCK cuando el pago es confirmado (False si otro evento ya lo hizo)
+    stock_reducido = orden.reducir_stock_orden()
+    orden.save(update_fields=['status', 'updated_at'])
+    logger.info(f"Orden #{orden.id} → pagado")
+    if stock_reducido:
+        _enviar_confirmacion(orden)
+
+
+def pago_fallido(data):
+    pi_id = data['id']
+    error_msg = (data.get('last_payment_error') or {}).get('message', '')
+    logger.warning(f"PaymentIntent fallido: {pi_id} | Error: {error_msg}")
+
+    try:
+        orden = Orden.objects.select_for_update().get(stripe_payment_intent=pi_id)
+    except Orden.DoesNotExist:
+        logger.warning(f"Orden no encontrada para PI fallido: {pi_id}")
+        return
+
+    orden.status = 'rechazado'
+    orden.save(update_fields=['status', 'updated_at'])
+    logger.info(f"Orden #{orden.id} → rechazado")
+
+
+def reembolso(data):
+    pi_id = data.get('payment_intent', '')
+    logger.info(f"Reembolso para PI: {pi_id}")
+
+    try:
+        orden = Orden.objects.select_for_update().get(stripe_payment_intent=pi_id)
+    except Orden.DoesNotExist:
+        logger.warning(f"Orden no encontrada para reembolso PI: {pi_id}")
+        return
+
+    orden.status = 'reembolsado'
+    orden.save(update_fields=['status', 'updated_at'])
+    logger.info(f"Orden #{orden.id} → reembolsado")
+
+
+HANDLERS = {
+    'checkout.session.completed': checkout_completado,
+    'payment_intent.succeeded': pago_exitoso,
+    'payment_intent.payment_failed': pago_fallido,
+    'charge.refunded': reembolso,
+}
+
+
+# ═══════════════════════════════════════════════════════════════
+# WORKER
+# ═══════════════════════════════════════════════════════════════
+
+def _max_intentos():
+    return max(1, int(getattr(settings, 'STRIPE_EVENTOS_MAX_INTENTOS', 8)))
+
+
+def _backoff(intentos):
+    base = float(getattr(settings, 'STRIPE_EVENTOS_BACKOFF', 30))
+    return timedelta(seconds=base * (2 ** (intentos - 1)))
+
+
+def procesar_evento(evento_id):
+    """
+    Aplica un evento. Retorna 'procesado', 'error', 'muerto' u 'ocupado'
+    (otro worker lo tiene bloqueado).
+    """
+    with transaction.atomic():
+        evento = (
+            StripeEvento.objects.select_for_update(skip_locked=True)
+            .filter(pk=evento_id, estado__in=ESTADOS_ABIERTOS)
+            .first()
+        )
+        if evento is None:
+            return 'ocupado'
+
+        evento.intentos += 1
+        handler = HANDLERS.get(evento.tipo)
+        try:
+            # Savepoint: si el handler falla se revierte solo su trabajo,
+            # no el registro del intento
+            with transaction.atomic():
+                if handler is None:
+                    logger.info(f"Evento no manejado: {evento.tipo}")
+                else:
+                    handler(evento.payload['data']['object'])
+        except Exception as e:
+            evento.ultimo_error = f'{type(e).__name__}: {e}'
+            if evento.intentos >= _max_intentos():
+                evento.estado = 'muerto'
+                evento.proximo_intento = None
+                logger.error(
+                    f"Evento {evento.event_id} ({evento.tipo}) muerto tras {evento.intentos} intentos: {e}",
+                    exc_info=True,
+                )
+            else:
+                evento.estado = 'error'
+                evento.proximo_intento = timezone.now() + _backoff(evento.intentos)
+                logger.warning(
+                    f"Evento {evento.event_id} ({evento.tipo}) falló (intento {evento.intentos}), "
+                    f"reintento {evento.proximo_intento:%H:%M:%S}: {e}"
+                )
+        else:
+            evento.estado = 'procesado'
+            evento.procesado_at = timezone.now()
+            evento.ultimo_error = ''
+            evento.proximo_intento = None
+
+        evento.save(update_fields=[
+            'estado', 'intentos', 'ultimo_error', 'proximo_intento', 'procesado_at',
+        ])
+        return evento.estado
+
+
+def procesar_pendientes(limite=100):
+    """
+    Procesa hasta `limite` eventos abiertos respetando el orden por clave.
+    Retorna un Counter con los resultados.
+    """
+    ahora = timezone.now()
+    abiertos = list(
+        StripeEvento.objects.filter(estado__in=ESTADOS_ABIERTOS)
+        .order_by('creado_stripe', 'id')
+        .values_list('id', 'clave_orden', 'proximo_intento')
+    )
+
+    resultados = Counter()
+    bloqueadas = set()
+    procesados = 0
+    for evento_id, clave, proximo in abiertos:
+        if procesados >= limite:
+            break
+        if clave and clave in bloqueadas:
+            resultados['en_espera'] += 1
+            continue
+        if proximo and proximo > ahora:
+            # Aún en backoff: los eventos posteriores de su clave esperan
+            bloqueadas.add(clave)
+            resultados['en_espera'] += 1
+            continue
+
+        resultado = procesar_evento(evento_id)
+        resultados[resultado] += 1
+        procesados += 1
+        if resultado in ('error', 'ocupado'):
+            bloqueadas.add(clave)
+
+    return resultados
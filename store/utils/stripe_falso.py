@@ -0,0 +1,96 @@
+"""
+Servidor falso de la API de Stripe
+==================================
+
+Responde lo mínimo que usa la tienda (crear y consultar Checkout Sessions,
+consultar PaymentIntents) con una latencia fija, para medir cómo se portan
+los workers mientras esperan a Stripe sin levantar stripe-mock ni tocar la
+cuenta real. Lo usan `manage.py bench_asgi` y los tests de las vistas async.
+
+    with ServidorStripeFalso(latencia=0.3) as falso:
+        # arrancar el servidor de Django con STRIPE_API_BASE=falso.url
+        ...
+"""
+import json
+import re
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+def _session(session_id, payment_status='unpaid'):
+    return {
+        'id': session_id,
+        'object': 'checkout.session',
+        'client_secret': f'{session_id}_secret_falso',
+        'status': 'complete' if payment_status == 'paid' else 'open',
+        'payment_status': payment_status,
+        'payment_intent': None,
+        'metadata': {},
+    }
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def log_message(self, *args):
+        pass
+
+    def _responder(self, status, datos):
+        cuerpo = json.dumps(datos).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(cuerpo)))
+        self.end_headers()
+        self.wfile.write(cuerpo)
+
+    def do_POST(self):
+        servidor = self.server.falso
+        largo = int(self.headers.get('Content-Length') or 0)
+        self.rfile.read(largo)
+        servidor.registrar(self.path)
+        time.sleep(servidor.latencia)
+        if self.path.rstrip('/') == '/v1/checkout/sessions':
+            session_id = f'cs_test_{uuid.uuid4().hex[:24]}'
+            servidor.sesiones[session_id] = _session(session_id)
+            return self._responder(200, servidor.sesiones[session_id])
+        self._responder(404, {'error': {'type': 'invalid_request_error', 'message': 'ruta no soportada'}})
+
+    def do_GET(self):
+        servidor = self.server.falso
+        servidor.registrar(self.path)
+        time.sleep(servidor.latencia)
+        ruta = self.path.split('?')[0]
+        if m := re.fullmatch(r'/v1/checkout/sessions/([\w-]+)', ruta):
+            return self._responder(200, servidor.sesiones.get(m.group(1)) or _session(m.group(1)))
+        if m := re.fullmatch(r'/v1/payment_intents/([\w-]+)', ruta):
+            return self._responder(200, {'id': m.group(1), 'object': 'payment_intent', 'status': 'processing'})
+        self._responder(404, {'error': {'type': 'invalid_request_error', 'message': 'ruta no soportada'}})
+
+
+class ServidorStripeFalso:
+    """Servidor HTTP en un hilo daemon; `url` sirve como STRIPE_API_BASE."""
+
+    def __init__(self, latencia=0.0, host='127.0.0.1', puerto=0):
+        self.latencia = latencia
+        self.sesiones = {}
+        self.peticiones = []
+        self._lock = threading.Lock()
+        self._httpd = ThreadingHTTPServer((host, puerto), _Handler)
+        self._httpd.daemon_threads = True
+        self._httpd.falso = self
+        host, puerto = self._httpd.server_address[:2]
+        self.url = f'http://{host}:{puerto}'
+
+    def registrar(self, ruta):
+        with self._lock:
+            self.peticiones.append(ruta)
+
+    def __enter__(self):
+        threading.Thread(target=self._httpd.serve_forever, daemon=True).start()
+        return self
+
+    def __exit__(self, *exc):
+        self._httpd.shutdown()
+        self._httpd.server_close()
@@ -0,0 +1,217 @@
+"""
+Reconciliación de órdenes con Stripe
+====================================
+
+Corrige en lote las órdenes cuyo webhook nunca llegó (o falló): consulta
+sus Checkout Sessions / PaymentIntents en Stripe y aplica el estado que
+corresponde, reduciendo stock de las que quedaron pagadas.
+
+    consultar_stripe()  → trae los objetos de Stripe (pool de hilos acotado
+                          o la API de listado paginada)
+    consultar_orden_async() → lo mismo para una orden, desde una vista async
+    reconciliar()       → calcula las transiciones y las aplica en bloque
+
+Lo usan `manage.py reconcile_stripe` y el endpoint admin
+`sincronizar_orden_stripe`. Con STRIPE_API_BASE apuntando a stripe-mock
+(http://localhost:12111) se puede probar sin tocar la cuenta real.
+"""
+import logging
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from datetime import timedelta
+
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from store.models import Orden
+from store.utils.clients import get_stripe
+
+logger = logging.getLogger('stripe_payments')
+
+
+# Checkout Session pagada → mismo estado que pone el webhook
+STATUS_SESSION = {
+    'paid': 'procesando',
+    'no_payment_required': 'procesando',
+    'unpaid': 'pendiente_pago',
+}
+
+STATUS_PAYMENT_INTENT = {
+    'succeeded': 'pagado',
+    'processing': 'procesando',
+    'requires_payment_method': 'pendiente_pago',
+    'requires_action': 'pendiente_pago',
+    'canceled': 'cancelado',
+}
+
+SESSION_PAGADA = ('paid', 'no_payment_required')
+
+
+@dataclass
+class Cambio:
+    orden_id: int
+    anterior: str
+    nuevo: str
+    payment_intent: str = ''
+    reducir_stock: bool = False
+
+
+# ═══════════════════════════════════════════════════════════════
+# CONSULTA
+# ═══════════════════════════════════════════════════════════════
+
+def ordenes_atascadas(minutos=30, limite=None):
+    """
+    Órdenes con IDs de Stripe que siguen sin confirmar tras `minutos`:
+    en pendiente_pago, o en procesando sin que se haya reducido su stock.
+    """
+    qs = (
+        Orden.objects.filter(
+            Q(status='pendiente_pago') | Q(status='procesando', stock_reducido=False),
+            Q(stripe_session_id__gt='') | Q(stripe_payment_intent__gt=''),
+            created_at__lte=timezone.now() - timedelta(minutes=minutos),
+        )
+        .order_by('created_at')
+    )
+    return list(qs[:limite] if limite else qs)
+
+
+def _listar_sesiones(stripe, desde):
+    """Todas las sesiones creadas desde `desde` con la API de listado (100 por página)."""
+    sesiones = {}
+    pagina = stripe.checkout.Session.list(created={'gte': int(desde.timestamp())}, limit=100)
+    for session in pagina.auto_paging_iter():
+        sesiones[session['id']] = session
+    return sesiones
+
+
+def consultar_stripe(ordenes, workers=8, listar=False):
+    """
+    Retorna {orden_id: ('session' | 'payment_intent', objeto)}. Las órdenes
+    cuya consulta falla se omiten (se registran en el log).
+    """
+    stripe = get_stripe()
+    resultado = {}
+
+    sesiones = {}
+    con_session = [o for o in ordenes if o.stripe_session_id]
+    if listar and con_session:
+        desde = min(o.created_at for o in con_session) - timedelta(minutes=5)
+        sesiones = _listar_sesiones(stripe, desde)
+
+    def consultar(orden):
+        if orden.stripe_session_id:
+            session = sesiones.get(orden.stripe_session_id)
+            if session is None:
+                session = stripe.checkout.Session.retrieve(orden.stripe_session_id)
+            return 'session', session
+        return 'payment_intent', stripe.PaymentIntent.retrieve(orden.stripe_payment_intent)
+
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+        futuros = {orden.id: pool.submit(consultar, orden) for orden in ordenes}
+        for orden_id, futuro in futuros.items():
+            try:
+                resultado[orden_id] = futuro.result()
+            except Exception as e:
+                logger.warning(f"[RECONCILE] Orden #{orden_id}: error consultando Stripe: {e}")
+    return resultado
+
+
+async def consultar_orden_async(orden, stripe):
+    """
+    consultar_stripe() de una sola orden con un StripeClient asíncrono
+    (store.utils.clients.stripe_async), para las vistas async.
+    """
+    if orden.stripe_session_id:
+        return 'session', await stripe.checkout.sessions.retrieve_async(orden.stripe_session_id)
+    return 'payment_intent', await stripe.payment_intents.retrieve_async(orden.stripe_payment_intent)
+
+
+# ═══════════════════════════════════════════════════════════════
+# TRANSICIONES
+# ═══════════════════════════════════════════════════════════════
+
+def calcular_cambio(orden, tipo, objeto):
+    """Cambio a aplicar a `orden` según el objeto de Stripe (None si no cambia)."""
+    pi_id = ''
+    if tipo == 'session':
+        pagada = objeto.get('payment_status') in SESSION_PAGADA
+        nuevo = STATUS_SESSION.get(objeto.get('payment_status', ''), orden.status)
+        # Sesión expirada sin pagar: ya no se puede completar
+        if objeto.get('status') == 'expired' and nuevo == 'pendiente_pago':
+            nuevo = 'cancelado'
+        pi_id = objeto.get('payment_intent') or ''
+        if pi_id == orden.stripe_payment_intent:
+            pi_id = ''
+    else:
+        pagada = objeto.get('status') == 'succeeded'
+        nuevo = STATUS_PAYMENT_INTENT.get(objeto.get('status', ''), orden.status)
+
+    reducir = pagada and not orden.stock_reducido
+    if nuevo == orden.status and not pi_id and not reducir:
+        return None
+    return Cambio(orden.id, orden.status, nuevo, pi_id, reducir)
+
+
+def reconciliar(ordenes, datos, dry_run=False):
+    """
+    Aplica en bloque los cambios de `ordenes` según `datos` (salida de
+    consultar_stripe). Retorna la lista de Cambio.
+    """
+    por_id = {orden.id: orden for orden in ordenes}
+    cambios = [
+        cambio for orden_id, (tipo, objeto) in datos.items()
+        if (cambio := calcular_cambio(por_id[orden_id], tipo, objeto))
+    ]
+    if dry_run or not cambios:
+        return cambios
+
+    from store.views.payment import _enviar_email_confirmacion
+
+    with transaction.atomic():
+        # Filas bloqueadas: el worker de eventos (procesar_eventos_stripe) pudo
+        # cambiarlas desde que se leyeron; esos cambios ya no se aplican
+        bloqueadas = (
+            Orden.objects.select_for_update(of=('self',))
+            .select_related('cliente')
+            .in_bulk([cambio.orden_id for cambio in cambios])
+        )
+        vigentes = []
+        for cambio in cambios:
+            orden = bloqueadas.get(cambio.orden_id)
+            if orden is None or orden.status != cambio.anterior:
+                logger.info(f"[RECONCILE] Orden #{cambio.orden_id}: cambió durante la consulta, se omite")
+                continue
+            vigentes.append(cambio)
+        cambios = vigentes
+
+        # Un UPDATE por transición; el filtro por estado anterior evita pisar otra escritura
+        por_transicion = defaultdict(list)
+        for cambio in cambios:
+            if cambio.nuevo != cambio.anterior:
+                por_transicion[(cambio.anterior, cambio.nuevo)].append(cambio.orden_id)
+        for (anterior, nuevo), ids in por_transicion.items():
+            Orden.objects.filter(pk__in=ids, status=anterior).update(status=nuevo, updated_at=timezone.now())
+
+        con_pi = [
+            Orden(pk=cambio.orden_id, stripe_payment_intent=cambio.payment_intent)
+            for cambio in cambios if cambio.payment_intent
+        ]
+        if con_pi:
+            Orden.objects.bulk_update(con_pi, ['stripe_payment_intent'])
+
+        # El stock es por variante/talla: se reduce orden por orden. Correo solo
+        # si esta reconciliación redujo el stock (si no, ya lo mandó quien lo hizo)
+        for cambio in cambios:
+            if not cambio.reducir_stock:
+                continue
+            orden = bloqueadas[cambio.orden_id]
+            orden.status = cambio.nuevo
+            if orden.reducir_stock_orden():
+                transaction.on_commit(lambda o=orden: _enviar_email_confirmacion(o))
+
+    for cambio in cambios:
+        logger.info(f"[RECONCILE] Orden #{cambio.orden_id}: {cambio.anterior} → {cambio.nuevo}")
+    return cambios
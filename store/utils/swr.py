@@ -0,0 +1,201 @@
+"""
+Caché stale-while-revalidate con cálculo único por clave
+========================================================
+
+Para cálculos caros del catálogo (filtros disponibles, páginas de colección)
+que, al expirar, no deben recalcularse en todos los workers a la vez:
+
+    fresco    → se sirve tal cual
+    obsoleto  → pasó el TTL suave o cambió un sello del catálogo
+                (store/utils/fragmentos.py): se sirve el valor viejo y UN solo
+                worker lo recalcula en segundo plano
+    fallo     → no hay valor (TTL duro vencido o clave nueva): calcula quien
+                obtiene el lock; los demás esperan hasta SWR_ESPERA segundos
+                a que aparezca antes de calcularlo ellos mismos
+
+El lock es un `cache.add` en la caché compartida (CACHES). Solo hay un
+cálculo por clave en todo el cluster si ese add es atómico entre procesos:
+Redis, Memcached o DatabaseCache. Con locmem el lock es por proceso (un
+cálculo por worker) y con FileBasedCache el add no es atómico (dos workers
+pueden calcular a la vez); comprobar_backend() lo avisa al arrancar. Cada
+evento suma un contador en la misma caché: `manage.py metricas_swr` los
+muestra.
+
+Uso:
+    @cache_swr('coleccion', suave=60, dura=900)
+    def ids_pagina(genero, filtros, pagina): ...
+
+Los argumentos forman la clave (deben tener un repr estable). Para vistas
+JSON completas ver @swr_cache en store/views/decorators.py.
+"""
+import hashlib
+import logging
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from functools import wraps
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connections
+
+from store.utils.fragmentos import sellos as leer_sellos
+
+logger = logging.getLogger(__name__)
+
+PREFIJO = 'swr:'
+EVENTOS = ('fresco', 'obsoleto', 'fallo', 'recalculo', 'espera', 'error')
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def _executor():
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ThreadPoolExecutor(max_workers=settings.SWR_WORKERS, thread_name_prefix='swr')
+    return _pool
+
+
+# Backends cuyo cache.add no sirve de lock entre procesos
+BACKENDS_SIN_LOCK = {
+    'django.core.cache.backends.locmem.LocMemCache': 'el lock es por proceso',
+    'django.core.cache.backends.filebased.FileBasedCache': 'cache.add no es atómico entre procesos',
+}
+
+
+def comprobar_backend():
+    """Aviso si la caché por omisión no garantiza un solo cálculo por clave en el cluster (None si sí)."""
+    backend = settings.CACHES['default']['BACKEND']
+    motivo = BACKENDS_SIN_LOCK.get(backend)
+    if motivo is None:
+        return None
+    return (
+        f'SWR: con {backend.rsplit(".", 1)[-1]} {motivo}; cada worker puede recalcular la misma clave. '
+        f'Para un solo cálculo por clave usar Redis, Memcached o DatabaseCache'
+    )
+
+
+def _contar(nombre, evento):
+    clave = f'{PREFIJO}m:{nombre}:{evento}'
+    cache.add(clave, 0, None)
+    try:
+        cache.incr(clave)
+    except ValueError:
+        # Expulsada entre add e incr (locmem lleno): se pierde un evento
+        pass
+
+
+def metricas(nombres):
+    """{nombre: {evento: total}} desde la caché compartida."""
+    claves = {f'{PREFIJO}m:{n}:{e}': (n, e) for n in nombres for e in EVENTOS}
+    valores = cache.get_many(list(claves))
+    resultado = {n: dict.fromkeys(EVENTOS, 0) for n in nombres}
+    for clave, total in valores.items():
+        nombre, evento = claves[clave]
+        resultado[nombre][evento] = total
+    return resultado
+
+
+def reiniciar_metricas(nombres):
+    cache.delete_many([f'{PREFIJO}m:{n}:{e}' for n in nombres for e in EVENTOS])
+
+
+def _guardar(clave, valor, suave, dura, version):
+    cache.set(clave, {'valor': valor, 'fresco_hasta': time.time() + suave, 'sellos': version}, dura)
+
+
+def _recalcular(nombre, clave, calcular, suave, dura, sellos, token):
+    """Calcula y guarda el valor; libera el lock aunque falle."""
+    try:
+        # Sellos leídos ANTES de calcular: un cambio durante el cálculo lo deja obsoleto
+        version = leer_sellos(sellos) if sellos else {}
+        valor = calcular()
+        _guardar(clave, valor, suave, dura, version)
+        _contar(nombre, 'recalculo')
+        return valor
+    finally:
+        if cache.get(f'{clave}:lock') == token:
+            cache.delete(f'{clave}:lock')
+
+
+def _refrescar(*args):
+    """Recalcula un valor obsoleto: si falla se sigue sirviendo el anterior."""
+    try:
+        _recalcular(*args)
+    except Exception:
+        logger.exception('SWR: error recalculando %s', args[1])
+        _contar(args[0], 'error')
+
+
+def _refrescar_en_hilo(*args):
+    try:
+        _refrescar(*args)
+    finally:
+        # Conexiones de este hilo del pool: no dejarlas abiertas entre tareas
+        connections.close_all()
+
+
+def obtener(nombre, clave, calcular, suave=None, dura=None, sellos=('catalogo',)):
+    """
+    Valor cacheado de `clave`, calculado con `calcular()` según la política
+    descrita arriba. Retorna (valor, estado) con estado fresco|obsoleto|fallo.
+    """
+    suave = settings.SWR_SUAVE if suave is None else suave
+    dura = settings.SWR_DURO if dura is None else dura
+    clave = f'{PREFIJO}{nombre}:{clave}'
+    lock = f'{clave}:lock'
+    token = uuid.uuid4().hex
+
+    entrada = cache.get(clave)
+    if entrada is not None:
+        vigente = entrada['fresco_hasta'] > time.time()
+        if vigente and sellos:
+            vigente = entrada['sellos'] == leer_sellos(sellos)
+        if vigente:
+            _contar(nombre, 'fresco')
+            return entrada['valor'], 'fresco'
+
+        _contar(nombre, 'obsoleto')
+        if cache.add(lock, token, settings.SWR_LOCK_TTL):
+            args = (nombre, clave, calcular, suave, dura, sellos, token)
+            if settings.SWR_SEGUNDO_PLANO:
+                _executor().submit(_refrescar_en_hilo, *args)
+            else:
+                _refrescar(*args)
+        return entrada['valor'], 'obsoleto'
+
+    _contar(nombre, 'fallo')
+    if not cache.add(lock, token, settings.SWR_LOCK_TTL):
+        # Otro worker lo está calculando: esperar su resultado
+        _contar(nombre, 'espera')
+        limite = time.monotonic() + settings.SWR_ESPERA
+        while time.monotonic() < limite:
+            time.sleep(0.05)
+            entrada = cache.get(clave)
+            if entrada is not None:
+                return entrada['valor'], 'fallo'
+        logger.warning('SWR: %s sin resultado tras %ss de espera; se calcula localmente', clave, settings.SWR_ESPERA)
+        token = None
+    return _recalcular(nombre, clave, calcular, suave, dura, sellos, token), 'fallo'
+
+
+def clave_args(*args, **kwargs):
+    """Hash estable de los argumentos (repr) para usar como clave."""
+    return hashlib.md5(repr((args, sorted(kwargs.items()))).encode()).hexdigest()
+
+
+def cache_swr(nombre, suave=None, dura=None, sellos=('catalogo',)):
+    """Decorador de funciones: cachea el resultado por argumentos con obtener()."""
+    def decorator(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            valor, _ = obtener(
+                nombre, clave_args(*args, **kwargs), lambda: func(*args, **kwargs),
+                suave=suave, dura=dura, sellos=sellos,
+            )
+            return valor
+        return wrapper
+    return decorator
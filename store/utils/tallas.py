@@ -0,0 +1,121 @@
+"""
+Diccionario canónico de tallas
+==============================
+
+Las claves de Variante.tallas_stock son texto libre ("25.5", "25,5", "xl",
+"CH", "UNICA"...). clasificar() las traduce una sola vez por proceso a:
+
+    etiqueta  → forma normalizada ("25.5", "XL", "S", "Única")
+    sistema   → 'calzado_mx' | 'ropa' | 'unica' | 'otro'
+    rango     → entero para ordenar: calzado < ropa < única < otro
+
+    calzado_mx  10000 + talla × 10      ("22" → 10220, "25.5" → 10255)
+    ropa        20000 + posición × 10   (XXS, XS, S, M, L, XL, XXL...)
+    unica       30000
+    otro        40000                   (empates: por etiqueta)
+
+Las vistas de detalle, búsqueda, filtros y wishlist ordenan con
+ordenar_tallas(); búsqueda, filtros y la colección comparan ?tallas= con
+etiquetas(). Ninguna parsea la clave en el request. El modelo Talla guarda el mismo diccionario en la
+base: la señal post_save de Variante (store/signals.py) y las cargas en
+bloque llaman a asegurar() con las claves nuevas.
+"""
+import functools
+import re
+import unicodedata
+from dataclasses import dataclass
+
+from store.models import Talla
+
+BASE_CALZADO = 10000
+BASE_ROPA = 20000
+RANGO_UNICA = 30000
+RANGO_OTRO = 40000
+
+CLAVE_MAX = Talla._meta.get_field('clave').max_length
+
+# Orden de las tallas de ropa y equivalencias (letras MX: CH/M/G/EG)
+ROPA = ('XXS', 'XS', 'S', 'M', 'L', 'XL', 'XXL', 'XXXL', 'XXXXL')
+ALIAS_ROPA = {
+    'CH': 'S', 'CHICA': 'S', 'MED': 'M', 'MEDIANA': 'M', 'G': 'L', 'GRANDE': 'L',
+    'EG': 'XL', 'XG': 'XL', 'EEG': 'XXL', 'XXG': 'XXL',
+    '2XL': 'XXL', '3XL': 'XXXL', '4XL': 'XXXXL',
+}
+UNICAS = {'', 'UNICA', 'TALLA UNICA', 'UNITALLA', 'U', 'OS', 'ONE SIZE', 'N/A', 'NA'}
+
+_NUMERICA = re.compile(r'^(\d{1,2}(?:\.\d{1,2})?)(?:\s*(?:MX|CM))?$')
+
+
+@dataclass(frozen=True)
+class Clasificacion:
+    etiqueta: str
+    sistema: str
+    rango: int
+
+
+def _texto(clave):
+    """' talla única ' → 'TALLA UNICA'"""
+    texto = unicodedata.normalize('NFKD', str(clave))
+    texto = ''.join(c for c in texto if not unicodedata.combining(c))
+    return ' '.join(texto.upper().split())
+
+
+@functools.lru_cache(maxsize=4096)
+def clasificar(clave):
+    """Etiqueta, sistema y rango de una clave cruda de tallas_stock."""
+    texto = _texto(clave)
+    if texto in UNICAS:
+        return Clasificacion('Única', 'unica', RANGO_UNICA)
+
+    numero = _NUMERICA.match(texto.replace(',', '.'))
+    if numero:
+        valor = float(numero.group(1))
+        return Clasificacion(f'{valor:g}', 'calzado_mx', BASE_CALZADO + round(valor * 10))
+
+    letra = ALIAS_ROPA.get(texto, texto)
+    if letra in ROPA:
+        return Clasificacion(letra, 'ropa', BASE_ROPA + ROPA.index(letra) * 10)
+
+    return Clasificacion(texto[:CLAVE_MAX], 'otro', RANGO_OTRO)
+
+
+def _orden(clave):
+    talla = clasificar(clave)
+    return talla.rango, talla.etiqueta, clave
+
+
+def ordenar_tallas(claves):
+    """Claves sin repetir, de la más chica a la más grande."""
+    return sorted(set(claves), key=_orden)
+
+
+def etiquetas(claves):
+    """Etiquetas canónicas: '25,5' y '25.5' o 'ch' y 'S' son la misma talla."""
+    return {clasificar(c).etiqueta for c in claves}
+
+
+def es_unica(clave):
+    return clasificar(clave).sistema == 'unica'
+
+
+# ───────────────────────────────────────────────
+# Diccionario en la base (modelo Talla)
+# ───────────────────────────────────────────────
+
+# Claves que este proceso ya sabe registradas: guardar una variante con
+# tallas conocidas no consulta la base.
+_registradas = set()
+
+
+def asegurar(claves):
+    """Registra en Talla las claves que falten. Retorna cuántas eran nuevas para este proceso."""
+    nuevas = {c for c in claves if c not in _registradas and 0 < len(c) <= CLAVE_MAX}
+    if not nuevas:
+        return 0
+    Talla.objects.bulk_create(
+        [Talla(clave=c, **vars(clasificar(c))) for c in nuevas],
+        ignore_conflicts=True,
+    )
+    _registradas.update(nuevas)
+    return len(nuevas)
+
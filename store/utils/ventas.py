@@ -0,0 +1,175 @@
+"""
+Rollups diarios de ventas
+=========================
+
+Mantiene VentaDiaria: unidades, ingresos y órdenes por día local, variante,
+talla y estado de la orden (producto y categoría desnormalizados). Los días
+se cortan en VENTAS_ZONA_HORARIA (America/Mexico_City por defecto), no en
+UTC: una orden de las 21:00 en CDMX es de ese día aunque en UTC ya sea el
+siguiente.
+
+El agregado es incremental por marca de agua (MarcaAgregacion):
+
+    1. Órdenes con updated_at ≥ marca − VENTAS_MARGEN_SEGUNDOS
+       (el margen cubre transacciones que confirmaron tarde)
+    2. Los días locales de esas órdenes se recalculan COMPLETOS con un
+       GROUP BY sobre OrdenDetalle: así un cambio de estado mueve las
+       unidades de un estado a otro sin restas ni dobles conteos
+    3. DELETE + bulk_create de esos días y la marca pasa al inicio de la corrida
+
+Todo en una transacción con la marca bloqueada (dos corridas a la vez se
+serializan). Las órdenes borradas no dejan rastro en updated_at: tras
+borrar órdenes antiguas, recalcular con `agregar_ventas --desde`.
+
+Lo usan `manage.py agregar_ventas` y, para leer, store/views/ventas.py.
+"""
+import logging
+from dataclasses import dataclass
+from datetime import datetime, time, timedelta
+from zoneinfo import ZoneInfo
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count, DecimalField, F, Q, Sum
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+from store.models import MarcaAgregacion, Orden, OrdenDetalle, VentaDiaria
+
+logger = logging.getLogger(__name__)
+
+MARCA = 'ventas_diarias'
+# Días recalculados por consulta de agregación
+DIAS_POR_LOTE = 31
+LOTE_INSERT = 1000
+
+# Estados que cuentan como venta en el dashboard (el resto se guarda igual)
+ESTADOS_VENTA = ('pagado', 'procesando', 'proces', 'enviado', 'entregado')
+
+
+@dataclass
+class ResultadoAgregacion:
+    ordenes: int
+    dias: int
+    filas: int
+    procesado_hasta: datetime
+
+
+def zona():
+    return ZoneInfo(getattr(settings, 'VENTAS_ZONA_HORARIA', 'America/Mexico_City'))
+
+
+def hoy_local():
+    return timezone.now().astimezone(zona()).date()
+
+
+def rango_utc(desde, hasta):
+    """[inicio, fin) del rango de días locales `desde`..`hasta` (inclusive)."""
+    tz = zona()
+    return (
+        datetime.combine(desde, time.min, tzinfo=tz),
+        datetime.combine(hasta + timedelta(days=1), time.min, tzinfo=tz),
+    )
+
+
+def _tramos(dias):
+    """Agrupa días ordenados en tramos consecutivos [(desde, hasta), ...]."""
+    tramos = []
+    for dia in dias:
+        if tramos and dia - tramos[-1][1] == timedelta(days=1):
+            tramos[-1][1] = dia
+        else:
+            tramos.append([dia, dia])
+    return tramos
+
+
+def _dias_de(ordenes):
+    return set(
+        ordenes.annotate(dia=TruncDate('created_at', tzinfo=zona()))
+        .values_list('dia', flat=True).distinct().order_by()
+    )
+
+
+def recalcular_dias(dias):
+    """Reemplaza las filas de esos días por el agregado actual. Retorna filas escritas."""
+    dias = sorted(dias)
+    filas = 0
+    for inicio in range(0, len(dias), DIAS_POR_LOTE):
+        lote = dias[inicio:inicio + DIAS_POR_LOTE]
+        rango = Q()
+        for desde, hasta in _tramos(lote):
+            inicio_utc, fin_utc = rango_utc(desde, hasta)
+            rango |= Q(order__created_at__gte=inicio_utc, order__created_at__lt=fin_utc)
+
+        grupos = (
+            OrdenDetalle.objects.filter(rango)
+            .annotate(dia=TruncDate('order__created_at', tzinfo=zona()))
+            .values(
+                'dia', 'variante_id', 'variante__producto_id', 'variante__producto__categoria_id',
+                'talla', 'order__status',
+            )
+            .annotate(
+                unidades=Sum('cantidad'),
+                ingresos=Sum(
+                    F('cantidad') * F('precio_unitario'),
+                    output_field=DecimalField(max_digits=14, decimal_places=2),
+                ),
+                ordenes=Count('order_id', distinct=True),
+            )
+            .order_by()
+        )
+        nuevas = [
+            VentaDiaria(
+                dia=g['dia'],
+                producto_id=g['variante__producto_id'],
+                variante_id=g['variante_id'],
+                talla=g['talla'],
+                categoria_id=g['variante__producto__categoria_id'],
+                status=g['order__status'],
+                unidades=g['unidades'],
+                ingresos=round(g['ingresos'], 2),
+                ordenes=g['ordenes'],
+            )
+            for g in grupos
+        ]
+        VentaDiaria.objects.filter(dia__in=lote).delete()
+        VentaDiaria.objects.bulk_create(nuevas, batch_size=LOTE_INSERT)
+        filas += len(nuevas)
+    return filas
+
+
+def agregar(desde=None, completo=False):
+    """
+    Actualiza los rollups. Sin argumentos procesa lo modificado desde la
+    marca (la primera vez, todo). `desde` (date local) recalcula a partir de
+    ese día; `completo` vacía la tabla y la reconstruye.
+    """
+    inicio = timezone.now()
+    margen = timedelta(seconds=getattr(settings, 'VENTAS_MARGEN_SEGUNDOS', 300))
+
+    with transaction.atomic():
+        MarcaAgregacion.objects.get_or_create(nombre=MARCA)
+        marca = MarcaAgregacion.objects.select_for_update().get(nombre=MARCA)
+
+        if completo or (desde is None and marca.procesado_hasta is None):
+            VentaDiaria.objects.all().delete()
+            ordenes = Orden.objects.all()
+        elif desde is not None:
+            VentaDiaria.objects.filter(dia__gte=desde).delete()
+            ordenes = Orden.objects.filter(created_at__gte=rango_utc(desde, desde)[0])
+        else:
+            ordenes = Orden.objects.filter(updated_at__gte=marca.procesado_hasta - margen)
+
+        total_ordenes = ordenes.count()
+        dias = _dias_de(ordenes)
+        filas = recalcular_dias(dias)
+
+        marca.procesado_hasta = inicio
+        marca.save(update_fields=['procesado_hasta', 'actualizado_at'])
+
+    logger.info(f"Ventas diarias: {total_ordenes} órdenes, {len(dias)} días, {filas} filas")
+    return ResultadoAgregacion(total_ordenes, len(dias), filas, inicio)
+
+
+def procesado_hasta():
+    return MarcaAgregacion.objects.filter(nombre=MARCA).values_list('procesado_hasta', flat=True).first()
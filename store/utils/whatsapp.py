@@ -0,0 +1,234 @@
+"""
+Despacho asíncrono de notificaciones por WhatsApp
+=================================================
+
+Las vistas solo encolan el mensaje; el envío a Twilio ocurre en hilos de
+fondo con concurrencia acotada, reintentos con backoff exponencial y un
+único cliente Twilio (con su sesión HTTP) reutilizado por proceso.
+
+Configuración (settings):
+    WHATSAPP_TRANSPORT      Clase de transporte (default: TwilioTransport)
+    WHATSAPP_ASYNC          False → envía en el mismo hilo (útil en tests)
+    WHATSAPP_MAX_WORKERS    Hilos de envío simultáneos por proceso
+    WHATSAPP_QUEUE_SIZE     Mensajes máximos en espera
+    WHATSAPP_MAX_RETRIES    Reintentos por mensaje tras el primer intento
+    WHATSAPP_RETRY_BACKOFF  Segundos base del backoff (1s, 2s, 4s...)
+
+Uso:
+    from store.utils.whatsapp import enviar_whatsapp
+    enviar_whatsapp(settings.TWILIO_ADMIN_PHONE, body=texto, interactive=payload)
+
+En tests:
+    @override_settings(WHATSAPP_TRANSPORT='store.utils.whatsapp.LocmemTransport',
+                       WHATSAPP_ASYNC=False)
+    ...
+    LocmemTransport.outbox  → lista de mensajes "enviados"
+"""
+import logging
+import os
+import queue
+import threading
+import time
+from dataclasses import dataclass, field
+
+from django.conf import settings
+from django.utils.module_loading import import_string
+
+from store.utils.clients import get_twilio_client
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_TRANSPORT = 'store.utils.whatsapp.TwilioTransport'
+
+
+@dataclass
+class WhatsAppMessage:
+    """Mensaje pendiente de envío."""
+    to: str
+    body: str = ''
+    interactive: dict = None
+    intentos: int = field(default=0, compare=False)
+
+
+# ═══════════════════════════════════════════════════════════════
+# TRANSPORTES
+# ═══════════════════════════════════════════════════════════════
+
+class TwilioTransport:
+    """
+    Envía mensajes con la API de Twilio usando el cliente único del proceso
+    (ver store.utils.clients), que reutiliza su pool de conexiones HTTP.
+    """
+
+    def get_client(self):
+        return get_twilio_client()
+
+    def send(self, message):
+        client = self.get_client()
+        from_ = settings.TWILIO_WHATSAPP_FROM
+
+        if message.interactive:
+            try:
+                msg = client.messages.create(
+                    from_=from_, to=message.to, interactive=message.interactive
+                )
+                return msg.sid
+            except Exception as e:
+                # Si falla (p.ej. plantilla no aprobada), usa texto plano
+                logger.warning("Interactive message falló, usando texto plano. Motivo: %s", e)
+
+        msg = client.messages.create(from_=from_, to=message.to, body=message.body)
+        return msg.sid
+
+
+class LocmemTransport:
+    """
+    Transporte falso para tests y desarrollo local: guarda los mensajes en
+    memoria (igual que el backend de email locmem de Django).
+    """
+    outbox = []
+
+    def send(self, message):
+        LocmemTransport.outbox.append(message)
+        return f"SMlocmem{len(LocmemTransport.outbox):06d}"
+
+
+_transports = {}
+_transports_lock = threading.Lock()
+
+
+def get_transport(path=None):
+    """Devuelve la instancia (única por proceso) del transporte configurado."""
+    path = path or getattr(settings, 'WHATSAPP_TRANSPORT', DEFAULT_TRANSPORT)
+    transport = _transports.get(path)
+    if transport is None:
+        with _transports_lock:
+            transport = _transports.get(path)
+            if transport is None:
+                transport = import_string(path)()
+                _transports[path] = transport
+    return transport
+
+
+# ═══════════════════════════════════════════════════════════════
+# DISPATCHER
+# ═══════════════════════════════════════════════════════════════
+
+class WhatsAppDispatcher:
+    """
+    Cola en memoria atendida por un número fijo de hilos daemon.
+
+    Los hilos se arrancan en el primer `enqueue` de cada proceso: con
+    `preload_app = True` gunicorn importa la app antes de hacer fork, y los
+    hilos creados en el maestro no sobreviven en los workers.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._pid = None
+        self._queue = None
+        self._threads = []
+
+    # ── Configuración ─────────────────────────────────────────
+    @property
+    def max_workers(self):
+        return max(1, int(getattr(settings, 'WHATSAPP_MAX_WORKERS', 2)))
+
+    @property
+    def max_retries(self):
+        return max(0, int(getattr(settings, 'WHATSAPP_MAX_RETRIES', 3)))
+
+    @property
+    def backoff(self):
+        return float(getattr(settings, 'WHATSAPP_RETRY_BACKOFF', 1.0))
+
+    # ── Ciclo de vida ─────────────────────────────────────────
+    def _ensure_workers(self):
+        if self._pid == os.getpid() and self._threads:
+            return
+        with self._lock:
+            if self._pid == os.getpid() and self._threads:
+                return
+            self._pid = os.getpid()
+            self._queue = queue.Queue(maxsize=int(getattr(settings, 'WHATSAPP_QUEUE_SIZE', 1000)))
+            self._threads = []
+            for idx in range(self.max_workers):
+                t = threading.Thread(
+                    target=self._worker, name=f"whatsapp-{idx}", daemon=True
+                )
+                t.start()
+                self._threads.append(t)
+
+    def _worker(self):
+        q = self._queue
+        while True:
+            message = q.get()
+            try:
+                self.deliver(message)
+            finally:
+                q.task_done()
+
+    # ── API ───────────────────────────────────────────────────
+    def enqueue(self, message):
+        """
+        Encola un mensaje. Retorna True si quedó encolado (o enviado, en modo
+        síncrono) y False si la cola está llena.
+        """
+        if not getattr(settings, 'WHATSAPP_ASYNC', True):
+            return self.deliver(message) is not None
+
+        self._ensure_workers()
+        try:
+            self._queue.put_nowait(message)
+        except queue.Full:
+            logger.error("Cola de WhatsApp llena, mensaje a %s descartado", message.to)
+            return False
+        return True
+
+    def deliver(self, message):
+        """Envía con reintentos. Retorna el SID o None si se agotaron los intentos."""
+        transport = get_transport()
+        while True:
+            message.intentos += 1
+            try:
+                sid = transport.send(message)
+                logger.info("WhatsApp enviado. SID: %s", sid)
+                return sid
+            except Exception as e:
+                if message.intentos > self.max_retries:
+                    logger.error(
+                        "Error al enviar WhatsApp a %s tras %s intentos: %s",
+                        message.to, message.intentos, e, exc_info=True
+                    )
+                    return None
+                espera = self.backoff * (2 ** (message.intentos - 1))
+                logger.warning(
+                    "Fallo enviando WhatsApp (intento %s), reintento en %.1fs: %s",
+                    message.intentos, espera, e
+                )
+                time.sleep(espera)
+
+    def flush(self, timeout=None):
+        """
+        Espera a que la cola se vacíe (tests / apagado ordenado).
+        Retorna True si se vació dentro del timeout.
+        """
+        q = self._queue
+        if q is None or self._pid != os.getpid():
+            return True
+        limite = None if timeout is None else time.monotonic() + timeout
+        with q.all_tasks_done:
+            while q.unfinished_tasks:
+                restante = None if limite is None else limite - time.monotonic()
+                if restante is not None and restante <= 0:
+                    return False
+                q.all_tasks_done.wait(restante)
+        return True
+
+
+dispatcher = WhatsAppDispatcher()
+
+
+def enviar_whatsapp(to, body='', interactive=None):
+    """Atajo: encola un mensaje de WhatsApp para `to`."""
+    return dispatcher.enqueue(WhatsAppMessage(to=to, body=body, interactive=interactive))
@@ -4,8 +4,12 @@ API endpoints para obtener opciones de filtros dinámicos
 from django.http import JsonResponse
 from django.db.models import Min, Max, Count, Q
 from ..models import Producto, Variante, Categoria, Subcategoria
+from store.utils.renditions import srcsets
+from store.utils.tallas import es_unica, etiquetas, ordenar_tallas
+from .decorators import swr_cache
 
 
+@swr_cache('filtros')
 def get_filtros_disponibles(request):
     """
     Retorna todas las opciones de filtros disponibles para una página de colección.
@@ -69,17 +73,11 @@ def get_filtros_disponibles(request):
     tallas = []
     for v in variantes_qs:
         for talla_key, stock_val in v.tallas_stock.items():
-            if stock_val > 0 and talla_key not in ('UNICA', 'N/A', ''):
+            if stock_val > 0 and not es_unica(talla_key):
                 tallas.append(talla_key)
     
-    # Intentar ordenar numéricamente
-    def talla_sort_key(t):
-        try:
-            return (0, float(t))
-        except (ValueError, TypeError):
-            return (1, t)
-    
-    tallas = sorted(set(tallas), key=talla_sort_key)
+    # Rango del diccionario de tallas: calzado, luego ropa (XS < S < M...)
+    tallas = ordenar_tallas(tallas)
     
     # Obtener colores únicos (solo de variantes con stock)
     colores_set = set()
@@ -196,7 +194,7 @@ def get_productos_filtrados(request):
     
     # Query base
     qs = Producto.objects.select_related('categoria').prefetch_related(
-        'subcategorias', 'imagenes', 'variantes'
+        'subcategorias', 'variantes__imagenes'
     )
     
     # Filtro: Género
@@ -221,7 +219,7 @@ def get_productos_filtrados(request):
     # Se filtrará post-query ya que tallas están en JSONField
     tallas_filter = []
     if tallas:
-        tallas_filter = [t.strip() for t in tallas if t.strip()]
+        tallas_filter = etiquetas(t.strip() for t in tallas if t.strip())
     
     # Filtro: Colores
     if colores:
@@ -291,9 +289,10 @@ def get_productos_filtrados(request):
     for p in productos_pagina:
         variante_principal = p.variante_principal
         if variante_principal:
-            primera_img = variante_principal.imagenes.all().order_by('orden').first()
-            imagen_url = primera_img.imagen.url if primera_img else None
+            primera_img = next(iter(variante_principal.imagenes.all()), None)
+            imagen_url = primera_img.imagen_url if primera_img else None
         else:
+            primera_img = None
             imagen_url = None
         
         # Verificar si tiene stock (de tallas_stock JSONField)
@@ -307,11 +306,9 @@ def get_productos_filtrados(request):
         if tallas_filter:
             tiene_talla = False
             for v in p.variantes.all():
-                for t in tallas_filter:
-                    if v.stock_de_talla(t) > 0:
-                        tiene_talla = True
-                        break
-                if tiene_talla:
+                con_stock = [t for t, stock in v.tallas_stock.items() if stock > 0]
+                if etiquetas(con_stock) & tallas_filter:
+                    tiene_talla = True
                     break
             if not tiene_talla:
                 continue
@@ -321,6 +318,7 @@ def get_productos_filtrados(request):
             'nombre': p.nombre,
             'precio': float(p.precio),
             'imagen': imagen_url,
+            **srcsets(primera_img),
             'categoria': p.categoria.nombre if p.categoria else None,
             'marca': p.marca,
             'en_oferta': p.en_oferta,
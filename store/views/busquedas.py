@@ -0,0 +1,58 @@
+import logging
+from datetime import timedelta
+
+from django.conf import settings
+from django.http import JsonResponse
+from django.utils import timezone
+from django.views.decorators.http import require_GET
+from django.views.decorators.csrf import csrf_exempt
+
+from ..utils import busquedas
+from .decorators import admin_required_hybrid, query_budget
+logger = logging.getLogger(__name__)
+
+TOP_MAX = 100
+
+
+# ───────────────────────────────────────────────
+# API ADMIN - Analítica de búsquedas
+# ───────────────────────────────────────────────
+
+def _periodo(request):
+    """(desde, dias, n) de ?dias=30&n=20, o ValueError con el mensaje para el 400."""
+    try:
+        dias = int(request.GET.get('dias', 30))
+        n = int(request.GET.get('n', 20))
+    except ValueError:
+        raise ValueError('dias y n deben ser enteros')
+    if not 1 <= dias <= settings.BUSQUEDAS_RETENCION_DIAS:
+        raise ValueError(f'dias debe estar entre 1 y {settings.BUSQUEDAS_RETENCION_DIAS} (retención)')
+    if not 1 <= n <= TOP_MAX:
+        raise ValueError(f'n debe estar entre 1 y {TOP_MAX}')
+    return timezone.now() - timedelta(days=dias), dias, n
+
+
+@csrf_exempt
+@admin_required_hybrid()
+@query_budget(3)
+@require_GET
+def busquedas_top(request):
+    """API: Consultas más buscadas con resultados promedio, latencia y CTR (clics / búsquedas)."""
+    try:
+        desde, dias, n = _periodo(request)
+    except ValueError as e:
+        return JsonResponse({'success': False, 'error': str(e)}, status=400)
+    return JsonResponse({'success': True, 'dias': dias, 'consultas': busquedas.top_consultas(desde, n)})
+
+
+@csrf_exempt
+@admin_required_hybrid()
+@query_budget(3)
+@require_GET
+def busquedas_sin_resultados(request):
+    """API: Consultas que no devolvieron productos, las más repetidas primero."""
+    try:
+        desde, dias, n = _periodo(request)
+    except ValueError as e:
+        return JsonResponse({'success': False, 'error': str(e)}, status=400)
+    return JsonResponse({'success': True, 'dias': dias, 'consultas': busquedas.sin_resultados(desde, n)})
@@ -8,7 +8,7 @@ from django.db.models            import Sum
 from django.views.decorators.http import require_http_methods
 from django.views.decorators.csrf import csrf_exempt
 from django.conf import settings
-from store.views.decorators      import login_required_client, jwt_role_required
+from store.views.decorators      import login_required_client, jwt_role_required, query_budget
 from store.utils.jwt_helpers import _get_jwt_secret
 from store.views.orden import crear_orden_desde_payload
 from ..models import (
@@ -23,14 +23,14 @@ import jwt
 import json
 from decimal import Decimal
 from django.http import JsonResponse, HttpResponseBadRequest
-from twilio.rest import Client
 from django.conf import settings
+from store.utils.whatsapp import enviar_whatsapp
+from store.utils.renditions import srcsets
 from django.shortcuts import redirect
 from django.urls import reverse
 
 signer = TimestampSigner()
 logger = logging.getLogger(__name__)
-twilio_client = Client(settings.TWILIO_ACCOUNT_SID, settings.TWILIO_AUTH_TOKEN)
 
 # ───────────────────────────────────────────────────────────────
 # Validación JWT Helper
@@ -104,6 +104,7 @@ def get_carrito_by_session(session_key):
 # -----------------------------------------------------------------
 @csrf_exempt
 @require_http_methods(["GET"])
+@query_budget(4)
 def detalle_carrito_session(request):
     carrito = get_carrito_by_session(request.session.session_key)
     if not carrito:
@@ -289,9 +290,10 @@ def _build_detalle_response(carrito):
         
         # Galería de imágenes de la variante principal del producto
         variante_principal = prod.variante_principal
-        galeria = []
+        imagenes = []
         if variante_principal:
-            galeria = [img.imagen.url for img in variante_principal.imagenes.all() if img.imagen]
+            imagenes = [img for img in variante_principal.imagenes.all() if img.imagen]
+        galeria = [img.imagen_url for img in imagenes]
         
         items.append({
             "producto_id"    : prod.id,
@@ -308,6 +310,7 @@ def _build_detalle_response(carrito):
             "subtotal"       : round(precio_unit * cp.cantidad, 2),
             "variante_id"    : var.id,
             "imagen"         : galeria[0] if galeria else None,
+            **srcsets(imagenes[0] if imagenes else None),
             "imagenes_galeria": galeria,
         })
 
@@ -531,9 +534,10 @@ def _carrito_to_template(carrito):
         )
         # Galería de imágenes de la variante principal del producto
         variante_principal = prod.variante_principal
-        galeria = []
+        imagenes = []
         if variante_principal:
-            galeria = [img.imagen.url for img in variante_principal.imagenes.all() if img.imagen]
+            imagenes = [img for img in variante_principal.imagenes.all() if img.imagen]
+        galeria = [img.imagen_url for img in imagenes]
         items.append({
             "nombre"          : prod.nombre,
             "precio"          : precio_unit,
@@ -541,6 +545,7 @@ def _carrito_to_template(carrito):
             "talla"           : it.talla or "Única",
             "color"           : var.color,
             "imagen"          : galeria[0] if galeria else None,
+            **srcsets(imagenes[0] if imagenes else None),
             "variante_id"     : var.id,
             "precio_mayorista": float(
                 var.precio_mayorista if var.precio_mayorista > 0 else prod.precio_mayorista
@@ -692,11 +697,8 @@ def finalizar_compra(request, carrito_id):
         reverse('procesar_por_link', args=[token])
     )
 
-    # ───── Enviar WhatsApp ─────────────────────────────────────────
+    # ───── Encolar WhatsApp (se envía en segundo plano) ────────────
     try:
-        from twilio.rest import Client
-        twilio_client = Client(settings.TWILIO_ACCOUNT_SID, settings.TWILIO_AUTH_TOKEN)
-
         raw_tel  = cliente.telefono or ""
         cleaned  = "".join(filter(str.isdigit, raw_tel))
         if cleaned.startswith("1"):
@@ -761,28 +763,11 @@ def finalizar_compra(request, carrito_id):
             }
         }
 
-        try:
-            # Enviar interactivo
-            msg = twilio_client.messages.create(
-                from_=settings.TWILIO_WHATSAPP_FROM,
-                to=to_whatsapp,
-                interactive=interactive_body
-            )
-        except Exception as e:
-            # Si falla (p.ej. plantilla no aprobada), usa texto plano
-            logger.warning("Interactive message falló, usando texto plano. Motivo: %s", e)
-            msg = twilio_client.messages.create(
-                from_=settings.TWILIO_WHATSAPP_FROM,
-                to=to_whatsapp,
-                body=fallback_body
-            )
-
-        logger.info("WhatsApp enviado. SID: %s", msg.sid)
-
-    except ImportError as e:
-        logger.warning("Twilio no está instalado: %s", e)
+        # El dispatcher intenta el interactivo y cae a texto plano si falla
+        enviar_whatsapp(to_whatsapp, body=fallback_body, interactive=interactive_body)
+
     except Exception as e:
-        logger.error("Error al enviar WhatsApp: %s", e, exc_info=True)
+        logger.error("Error al encolar WhatsApp: %s", e, exc_info=True)
         # No retornar error 500, continuar con el flujo
 
     # Vaciar carrito (siempre, independiente de si se envió WhatsApp)
@@ -836,9 +821,10 @@ def mostrar_confirmacion_compra(request, carrito_id):
         subtotal = precio * it.cantidad
         # Galería de imágenes de la variante principal del producto
         variante_principal = prod.variante_principal
-        galeria = []
+        imagenes = []
         if variante_principal:
-            galeria = [img.imagen.url for img in variante_principal.imagenes.all() if img.imagen]
+            imagenes = [img for img in variante_principal.imagenes.all() if img.imagen]
+        galeria = [img.imagen_url for img in imagenes]
         imagen = galeria[0] if galeria else "/static/img/no-image.jpg"
 
         items.append({
@@ -910,9 +896,10 @@ def mostrar_formulario_confirmacion(request, carrito_id):
         subtotal = precio * it.cantidad
         # Galería de imágenes de la variante principal del producto
         variante_principal = prod.variante_principal
-        galeria = []
+        imagenes = []
         if variante_principal:
-            galeria = [img.imagen.url for img in variante_principal.imagenes.all() if img.imagen]
+            imagenes = [img for img in variante_principal.imagenes.all() if img.imagen]
+        galeria = [img.imagen_url for img in imagenes]
         imagen = galeria[0] if galeria else "/static/img/no-image.jpg"
 
         items.append({
@@ -1021,10 +1008,6 @@ def enviar_ticket_whatsapp(request, carrito_id):
                 "error": "Twilio no está configurado en el servidor"
             }, status=503)
         
-        # Enviar WhatsApp
-        from twilio.rest import Client
-        twilio_client = Client(settings.TWILIO_ACCOUNT_SID, settings.TWILIO_AUTH_TOKEN)
-        
         # Formatear teléfono
         raw_tel = cliente.telefono or ""
         cleaned = "".join(filter(str.isdigit, raw_tel))
@@ -1070,22 +1053,18 @@ def enviar_ticket_whatsapp(request, carrito_id):
         
         message_body = "\n".join(body_lines)
         
-        msg = twilio_client.messages.create(
-            from_=settings.TWILIO_WHATSAPP_FROM,
-            to=cleaned,
-            body=message_body
-        )
+        # El envío real ocurre en segundo plano (store.utils.whatsapp)
+        if not enviar_whatsapp(cleaned, body=message_body):
+            return JsonResponse({
+                "error": "Servicio de WhatsApp saturado, intenta más tarde"
+            }, status=503)
         
         return JsonResponse({
             "success": True,
-            "message": "Ticket enviado por WhatsApp exitosamente",
-            "sid": msg.sid
-        }, status=200)
+            "message": "Ticket en camino por WhatsApp",
+            "queued": True
+        }, status=202)
         
-    except ImportError:
-        return JsonResponse({
-            "error": "Twilio no está instalado en el servidor"
-        }, status=503)
     except Exception as e:
         import traceback
         traceback.print_exc()
@@ -1,7 +1,7 @@
 from django.shortcuts import redirect, get_object_or_404, render
 from django.http import JsonResponse
 from django.views.decorators.http import require_http_methods, require_GET
-from ..models import Cliente, ContactoCliente, Orden, OrdenDetalle
+from ..models import Cliente, ContactoCliente
 from .decorators import login_required_user, login_required_client, jwt_role_required, admin_required, auth_required_hybrid
 from django.db.models import Prefetch
 from django.contrib.auth.hashers import make_password
@@ -34,61 +34,6 @@ def mis_pedidos(request):
     return render(request, 'public/cliente/mis_pedidos.html')
 
 
-# ========= API: OBTENER ÓRDENES DEL CLIENTE ========= #
-@csrf_exempt
-@jwt_role_required(['cliente'])
-@require_GET
-def get_ordenes_cliente(request):
-    """API para obtener las órdenes del cliente autenticado"""
-    try:
-        cliente_id = request.user_id
-        cliente = get_object_or_404(Cliente, id=cliente_id)
-        
-        ordenes = Orden.objects.filter(cliente=cliente).order_by('-created_at').prefetch_related(
-            'detalles__variante__producto'
-        )
-        
-        data = []
-        for orden in ordenes:
-            items = []
-            for detalle in orden.detalles.all():
-                variante = detalle.variante
-                producto = variante.producto
-                
-                items.append({
-                    'producto_id': producto.id,
-                    'producto_nombre': producto.nombre,
-                    'producto_imagen': producto.imagen.url if producto.imagen else None,
-                    'variante_id': variante.id,
-                    'talla': detalle.talla,
-                    'color': variante.color,
-                    'cantidad': detalle.cantidad,
-                    'precio_unitario': float(detalle.precio_unitario),
-                    'subtotal': float(detalle.precio_unitario * detalle.cantidad)
-                })
-            
-            data.append({
-                'id': orden.id,
-                'status': orden.status,
-                'status_display': get_status_display(orden.status),
-                'total_amount': float(orden.total_amount),
-                'payment_method': orden.payment_method,
-                'created_at': orden.created_at.strftime('%d/%m/%Y %H:%M'),
-                'items': items,
-                'total_items': sum(item['cantidad'] for item in items)
-            })
-        
-        return JsonResponse({
-            'success': True,
-            'ordenes': data,
-            'total': len(data)
-        })
-        
-    except Exception as e:
-        logger.exception(f'Error en get_ordenes_cliente: {e}')
-        return JsonResponse({'success': False, 'error': 'Error interno del servidor'}, status=500)
-
-
 def get_status_display(status):
     """Convierte el código de estado a texto legible"""
     status_map = {
@@ -1,11 +1,13 @@
 # store/views/decorators.py
 from functools import wraps
+from asgiref.sync import iscoroutinefunction, sync_to_async
 from django.shortcuts import redirect
-from django.http import JsonResponse
+from django.http import HttpResponse, JsonResponse
 from ..models import Usuario, Cliente
 import jwt
 from django.conf import settings
 from store.utils.jwt_helpers import _get_jwt_secret
+from store.utils.swr import clave_args, obtener
 import logging
 
 logger = logging.getLogger(__name__)
@@ -68,6 +70,19 @@ def jwt_role_required(allowed_roles=None):
         @jwt_role_required(['admin', 'user'])  # Admin o user
     """
     def decorator(view_func):
+        if iscoroutinefunction(view_func):
+            # Vista async: la validación (consulta a BD) corre en un hilo y,
+            # si pasa, la vista se espera en el event loop
+            verificar = decorator(lambda request, *args, **kwargs: None)
+
+            @wraps(view_func)
+            async def async_wrapped_view(request, *args, **kwargs):
+                respuesta = await sync_to_async(verificar)(request, *args, **kwargs)
+                if respuesta is not None:
+                    return respuesta
+                return await view_func(request, *args, **kwargs)
+            return async_wrapped_view
+
         @wraps(view_func)
         def wrapped_view(request, *args, **kwargs):
             auth_header = request.headers.get('Authorization')
@@ -443,3 +458,62 @@ def auth_required_hybrid(allowed_roles=None):
         return wrapped_view
     return decorator
 
+
+
+# ───────────────────────────────────────────────
+# Presupuesto de consultas SQL
+# ───────────────────────────────────────────────
+def query_budget(max_queries):
+    """
+    Declara el máximo de consultas SQL que debe ejecutar la vista
+    (incluye auth y sesión). QueryMetricsMiddleware lo verifica: WARNING en
+    producción, PresupuestoQueriesExcedido con QUERY_BUDGET_ESTRICTO (tests).
+    Se puede poner en cualquier posición de la pila: wraps copia el atributo.
+    """
+    def decorator(view_func):
+        view_func.query_budget = max_queries
+        return view_func
+    return decorator
+
+
+# ───────────────────────────────────────────────
+# Caché stale-while-revalidate de respuestas
+# ───────────────────────────────────────────────
+def swr_cache(nombre, suave=None, dura=None, sellos=('catalogo',)):
+    """
+    Cachea las respuestas GET 200 de una vista pública (sin sesión ni
+    cookies) por URL completa con store/utils/swr.py: sirve la copia vieja
+    mientras un solo worker la recalcula. Cabecera X-Cache-SWR con el estado.
+    """
+    def decorator(view_func):
+        @wraps(view_func)
+        def _wrapped(request, *args, **kwargs):
+            if request.method != 'GET':
+                return view_func(request, *args, **kwargs)
+
+            def calcular():
+                response = view_func(request, *args, **kwargs)
+                if response.status_code != 200 or response.cookies:
+                    raise _NoCacheable(response)
+                return response.status_code, response['Content-Type'], response.content
+
+            try:
+                (status, content_type, content), estado = obtener(
+                    nombre, clave_args(request.get_full_path()), calcular,
+                    suave=suave, dura=dura, sellos=sellos,
+                )
+            except _NoCacheable as exc:
+                return exc.response
+            response = HttpResponse(content, status=status, content_type=content_type)
+            response['X-Cache-SWR'] = estado
+            return response
+        return _wrapped
+    return decorator
+
+
+class _NoCacheable(Exception):
+    """La vista respondió algo que no se debe compartir (error o cookies)."""
+
+    def __init__(self, response):
+        super().__init__(response.status_code)
+        self.response = response
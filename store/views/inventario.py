@@ -8,15 +8,20 @@ import json
 from functools import wraps
 
 from django.contrib.auth.hashers import check_password
-from django.db.models import Prefetch
+from django.db import transaction
+from django.db.models import Count, Prefetch
 from django.http import JsonResponse
 from django.shortcuts import redirect, render
 from django.views.decorators.csrf import csrf_exempt
 from django.views.decorators.http import require_http_methods, require_GET
 
 from ..models import (
-    Categoria, Producto, Subcategoria, Usuario, Variante, VarianteImagen
+    AlertaStock, Categoria, Producto, Subcategoria, Usuario, Variante, VarianteImagen
 )
+from store.utils.alertas_stock import alerta_a_dict, evaluar_variantes
+from store.utils.escaneo import CodigoEnUso, asignar_codigo, escaneo_a_dict, resolver
+from store.utils.fragmentos import invalidar
+from store.utils.tallas import asegurar
 from store.utils.jwt_helpers import generate_access_token, generate_refresh_token
 
 import logging
@@ -153,7 +158,7 @@ def inventario_panel(request):
         if variante_principal:
             primera_img = variante_principal.imagenes.all().order_by("orden").first()
             if primera_img and primera_img.imagen:
-                imagen_url = primera_img.imagen.url
+                imagen_url = primera_img.imagen_url
 
         for variante in producto.variantes.all():
             tallas_stock = variante.tallas_stock or {}
@@ -161,7 +166,7 @@ def inventario_panel(request):
 
             # Imagen propia de la variante (si tiene)
             var_img = variante.imagenes.all().order_by("orden").first()
-            var_imagen_url = var_img.imagen.url if var_img and var_img.imagen else imagen_url
+            var_imagen_url = var_img.imagen_url if var_img and var_img.imagen else imagen_url
 
             inventario_data.append({
                 "producto_id": producto.id,
@@ -270,6 +275,308 @@ def inventario_api_update_stock(request, variante_id):
     })
 
 
+# ───────────────────────────────────────────────
+# API: Actualizar stock en lote (conteo físico)
+# ───────────────────────────────────────────────
+STOCK_LOTE_MAX = 1000
+
+
+def _leer_entrada_stock(entrada):
+    """Valida una entrada del lote. Retorna (variante_id, talla, modo, valor)."""
+    if not isinstance(entrada, dict):
+        raise ValueError("Cada entrada debe ser un objeto")
+    try:
+        variante_id = int(entrada.get("variante_id"))
+    except (ValueError, TypeError):
+        raise ValueError("variante_id inválido")
+    talla = str(entrada.get("talla") or "").strip()
+    if not talla:
+        raise ValueError("talla es requerida")
+    if ("stock" in entrada) == ("delta" in entrada):
+        raise ValueError("Indica stock (fijar) o delta (ajustar), no ambos")
+    modo = "stock" if "stock" in entrada else "delta"
+    valor = entrada[modo]
+    if isinstance(valor, bool) or not isinstance(valor, (int, str)):
+        raise ValueError(f"{modo} debe ser un número entero")
+    try:
+        valor = int(valor)
+    except ValueError:
+        raise ValueError(f"{modo} debe ser un número entero")
+    if modo == "stock" and valor < 0:
+        raise ValueError(f"Stock negativo no permitido para talla {talla}")
+    return variante_id, talla, modo, valor
+
+
+@csrf_exempt
+@require_http_methods(["POST"])
+def inventario_api_update_stock_lote(request):
+    """
+    Actualiza el stock de muchas tallas en una sola transacción.
+
+    Body: {"entradas": [{"variante_id": 1, "talla": "26", "stock": 4},
+                        {"variante_id": 2, "talla": "27", "delta": -1}, ...],
+           "parcial": false}
+
+    `stock` fija la cantidad (la talla se crea si no existe) y `delta` la
+    ajusta sobre el valor actual; las entradas se aplican en orden. Las
+    variantes se leen con select_for_update en una sola consulta y se
+    guardan con un bulk_update. Con "parcial": false (default) cualquier
+    entrada inválida cancela todo el lote; con true se aplican las válidas.
+    """
+    user_id = request.session.get("inventario_user_id")
+    if not user_id:
+        return JsonResponse({"error": "No autenticado"}, status=401)
+    try:
+        user = Usuario.objects.get(id=user_id)
+        if user.role not in INVENTARIO_ALLOWED_ROLES:
+            return JsonResponse({"error": "Sin permisos"}, status=403)
+    except Usuario.DoesNotExist:
+        return JsonResponse({"error": "Usuario no encontrado"}, status=404)
+
+    try:
+        data = json.loads(request.body or "{}")
+    except json.JSONDecodeError:
+        return JsonResponse({"error": "JSON inválido"}, status=400)
+    entradas = data.get("entradas") if isinstance(data, dict) else None
+    if not isinstance(entradas, list) or not entradas:
+        return JsonResponse({"error": "entradas es requerido (lista no vacía)"}, status=400)
+    if len(entradas) > STOCK_LOTE_MAX:
+        return JsonResponse({"error": f"Máximo {STOCK_LOTE_MAX} entradas por lote"}, status=400)
+    parcial = bool(data.get("parcial", False))
+
+    resultados, validas = [], []
+    for indice, entrada in enumerate(entradas):
+        try:
+            validas.append((indice, *_leer_entrada_stock(entrada)))
+            resultados.append(None)
+        except ValueError as e:
+            resultados.append({"indice": indice, "ok": False, "error": str(e)})
+
+    with transaction.atomic():
+        variantes = Variante.objects.select_for_update().only("id", "producto_id", "tallas_stock", "umbrales_stock").in_bulk(
+            {variante_id for _, variante_id, _, _, _ in validas}
+        )
+        modificadas = {}
+        for indice, variante_id, talla, modo, valor in validas:
+            variante = variantes.get(variante_id)
+            if variante is None:
+                resultados[indice] = {"indice": indice, "ok": False, "error": "Variante no encontrada"}
+                continue
+            tallas = modificadas.setdefault(variante_id, dict(variante.tallas_stock or {}))
+            if modo == "delta" and talla not in tallas:
+                resultados[indice] = {"indice": indice, "ok": False, "error": f"La variante no tiene la talla {talla}"}
+                continue
+            anterior = tallas.get(talla, 0)
+            nuevo = valor if modo == "stock" else anterior + valor
+            if nuevo < 0:
+                resultados[indice] = {
+                    "indice": indice, "ok": False,
+                    "error": f"El ajuste dejaría stock negativo en talla {talla} (hay {anterior})",
+                }
+                continue
+            tallas[talla] = nuevo
+            resultados[indice] = {
+                "indice": indice, "ok": True, "variante_id": variante_id,
+                "talla": talla, "anterior": anterior, "stock": nuevo,
+            }
+
+        errores = sum(1 for r in resultados if not r["ok"])
+        if errores and not parcial:
+            return JsonResponse({
+                "success": False,
+                "error": f"{errores} entradas inválidas; no se aplicó ningún cambio",
+                "aplicadas": 0,
+                "resultados": resultados,
+            }, status=400)
+
+        cambiadas = []
+        for variante_id, tallas in modificadas.items():
+            variante = variantes[variante_id]
+            if tallas != variante.tallas_stock:
+                variante.tallas_stock = tallas
+                cambiadas.append(variante)
+        Variante.objects.bulk_update(cambiadas, ["tallas_stock"])
+        # bulk_update no dispara señales: alertas y diccionario de las tallas tocadas
+        evaluar_variantes(cambiadas)
+        asegurar({talla for variante in cambiadas for talla in variante.tallas_stock})
+
+    # bulk_update no dispara señales: renovar las tarjetas de los productos tocados
+    if cambiadas:
+        invalidar(*{f"producto:{v.producto_id}" for v in cambiadas}, "catalogo")
+
+    return JsonResponse({
+        "success": errores == 0,
+        "aplicadas": len(resultados) - errores,
+        "errores": errores,
+        "resultados": resultados,
+    }, status=200 if len(resultados) > errores else 400)
+
+
+# ───────────────────────────────────────────────
+# API: Escáner de códigos de barras / SKU
+# ───────────────────────────────────────────────
+@require_GET
+def inventario_api_escanear(request):
+    """
+    Resuelve un código escaneado (?codigo=...) a producto, variante, talla
+    y stock actual. Ver store/utils/escaneo.py.
+    """
+    user_id = request.session.get("inventario_user_id")
+    if not user_id:
+        return JsonResponse({"error": "No autenticado"}, status=401)
+    try:
+        user = Usuario.objects.get(id=user_id)
+        if user.role not in INVENTARIO_ALLOWED_ROLES:
+            return JsonResponse({"error": "Sin permisos"}, status=403)
+    except Usuario.DoesNotExist:
+        return JsonResponse({"error": "Usuario no encontrado"}, status=404)
+
+    codigo = request.GET.get("codigo", "").strip()
+    if not codigo:
+        return JsonResponse({"error": "codigo es requerido"}, status=400)
+
+    encontrado = resolver(codigo)
+    if encontrado is None:
+        return JsonResponse({"error": "Código no encontrado", "codigo": codigo}, status=404)
+    return JsonResponse({"success": True, **escaneo_a_dict(codigo, *encontrado)})
+
+
+@csrf_exempt
+@require_http_methods(["POST"])
+def inventario_api_asignar_codigo(request):
+    """
+    Asigna un código de barras a una talla de una variante.
+    Body: {"codigo": "7501234567890", "variante_id": 1, "talla": "26"}
+    """
+    user_id = request.session.get("inventario_user_id")
+    if not user_id:
+        return JsonResponse({"error": "No autenticado"}, status=401)
+    try:
+        user = Usuario.objects.get(id=user_id)
+        if user.role not in INVENTARIO_ALLOWED_ROLES:
+            return JsonResponse({"error": "Sin permisos"}, status=403)
+    except Usuario.DoesNotExist:
+        return JsonResponse({"error": "Usuario no encontrado"}, status=404)
+
+    try:
+        data = json.loads(request.body or "{}")
+    except json.JSONDecodeError:
+        return JsonResponse({"error": "JSON inválido"}, status=400)
+    codigo = str(data.get("codigo") or "").strip()
+    talla = str(data.get("talla") or "").strip()
+    if not codigo or not talla:
+        return JsonResponse({"error": "codigo y talla son requeridos"}, status=400)
+
+    try:
+        variante = Variante.objects.select_related("producto").get(id=data.get("variante_id"))
+    except (Variante.DoesNotExist, ValueError, TypeError):
+        return JsonResponse({"error": "Variante no encontrada"}, status=404)
+    if talla not in (variante.tallas_stock or {}):
+        return JsonResponse({"error": f"La variante no tiene la talla {talla}"}, status=400)
+
+    try:
+        asignar_codigo(variante, talla, codigo)
+    except CodigoEnUso as e:
+        return JsonResponse({"error": f"Código en uso: {e}"}, status=409)
+    return JsonResponse({"success": True, **escaneo_a_dict(codigo, variante, talla, "codigo_barras")})
+
+
+# ───────────────────────────────────────────────
+# API: Alertas de stock bajo / agotado
+# ───────────────────────────────────────────────
+ALERTAS_LIMITE_MAX = 500
+
+
+@require_GET
+def inventario_api_alertas(request):
+    """
+    Tallas agotadas o en su umbral de reorden, agotadas primero.
+    Query: ?estado=agotado|bajo&limite=100
+    """
+    user_id = request.session.get("inventario_user_id")
+    if not user_id:
+        return JsonResponse({"error": "No autenticado"}, status=401)
+    try:
+        user = Usuario.objects.get(id=user_id)
+        if user.role not in INVENTARIO_ALLOWED_ROLES:
+            return JsonResponse({"error": "Sin permisos"}, status=403)
+    except Usuario.DoesNotExist:
+        return JsonResponse({"error": "Usuario no encontrado"}, status=404)
+
+    estado = request.GET.get("estado", "")
+    if estado and estado not in dict(AlertaStock.ESTADOS):
+        return JsonResponse({"error": "estado debe ser agotado o bajo"}, status=400)
+    try:
+        limite = min(int(request.GET.get("limite", 100)), ALERTAS_LIMITE_MAX)
+    except ValueError:
+        return JsonResponse({"error": "limite inválido"}, status=400)
+
+    totales = dict(AlertaStock.objects.values_list("estado").annotate(n=Count("id")).order_by())
+    alertas = AlertaStock.objects.select_related("variante__producto").order_by("estado", "stock", "creada_at")
+    if estado:
+        alertas = alertas.filter(estado=estado)
+
+    return JsonResponse({
+        "success": True,
+        "totales": {clave: totales.get(clave, 0) for clave, _ in AlertaStock.ESTADOS},
+        "alertas": [alerta_a_dict(a) for a in alertas[:max(limite, 0)]],
+    })
+
+
+@csrf_exempt
+@require_http_methods(["POST"])
+def inventario_api_umbrales(request, variante_id):
+    """
+    Fija el stock mínimo por talla antes de alertar.
+    Body: {"umbrales": {"26": 3, "27": null}}  (null = volver a STOCK_UMBRAL_DEFAULT)
+    """
+    user_id = request.session.get("inventario_user_id")
+    if not user_id:
+        return JsonResponse({"error": "No autenticado"}, status=401)
+    try:
+        user = Usuario.objects.get(id=user_id)
+        if user.role not in INVENTARIO_ALLOWED_ROLES:
+            return JsonResponse({"error": "Sin permisos"}, status=403)
+    except Usuario.DoesNotExist:
+        return JsonResponse({"error": "Usuario no encontrado"}, status=404)
+
+    try:
+        variante = Variante.objects.get(id=variante_id)
+    except Variante.DoesNotExist:
+        return JsonResponse({"error": "Variante no encontrada"}, status=404)
+
+    try:
+        data = json.loads(request.body or "{}")
+    except json.JSONDecodeError:
+        return JsonResponse({"error": "JSON inválido"}, status=400)
+    umbrales = data.get("umbrales") if isinstance(data, dict) else None
+    if not isinstance(umbrales, dict):
+        return JsonResponse({"error": "umbrales debe ser un objeto {talla: minimo}"}, status=400)
+
+    nuevos = dict(variante.umbrales_stock or {})
+    for talla, minimo in umbrales.items():
+        talla = str(talla)
+        if talla not in (variante.tallas_stock or {}):
+            return JsonResponse({"error": f"La variante no tiene la talla {talla}"}, status=400)
+        if minimo is None:
+            nuevos.pop(talla, None)
+            continue
+        if isinstance(minimo, bool) or not isinstance(minimo, int) or minimo < 0:
+            return JsonResponse({"error": f"Umbral inválido para talla {talla} (entero >= 0)"}, status=400)
+        nuevos[talla] = minimo
+
+    variante.umbrales_stock = nuevos
+    # post_save reevalúa las alertas de las tallas cuyo umbral cambió
+    variante.save(update_fields=["umbrales_stock"])
+
+    return JsonResponse({
+        "success": True,
+        "variante_id": variante.id,
+        "umbrales_stock": variante.umbrales_stock,
+        "alertas": [alerta_a_dict(a) for a in variante.alertas_stock.select_related("variante__producto")],
+    })
+
+
 # ───────────────────────────────────────────────
 # API: Eliminar variante
 # ───────────────────────────────────────────────
@@ -348,6 +655,7 @@ def inventario_api_data(request):
             Q(nombre__icontains=search) |
             Q(marca__icontains=search) |
             Q(variantes__sku__icontains=search) |
+            Q(variantes__codigos__codigo=search) |
             Q(variantes__color__icontains=search)
         ).distinct()
 
@@ -364,7 +672,7 @@ def inventario_api_data(request):
         if variante_principal:
             primera_img = variante_principal.imagenes.all().order_by("orden").first()
             if primera_img and primera_img.imagen:
-                imagen_url = primera_img.imagen.url
+                imagen_url = primera_img.imagen_url
 
         for variante in producto.variantes.all():
             tallas_stock = variante.tallas_stock or {}
@@ -377,7 +685,7 @@ def inventario_api_data(request):
                 continue
 
             var_img = variante.imagenes.all().order_by("orden").first()
-            var_imagen_url = var_img.imagen.url if var_img and var_img.imagen else imagen_url
+            var_imagen_url = var_img.imagen_url if var_img and var_img.imagen else imagen_url
 
             result.append({
                 "producto_id": producto.id,
@@ -422,7 +730,7 @@ def inventario_api_producto_detalle(request, producto_id):
         imagenes_variante = [
             {
                 "id": img.id,
-                "url": img.imagen.url,
+                "url": img.imagen_url,
                 "orden": img.orden
             }
             for img in variante.imagenes.all().order_by('orden')
@@ -1,6 +1,8 @@
 
+import base64
 import json
 import logging
+from datetime import datetime
 from django.forms import model_to_dict
 from django.http import JsonResponse, Http404
 from django.shortcuts import get_object_or_404, render
@@ -8,7 +10,8 @@ from ..models import  Carrito, Orden, OrdenDetalle, Variante, Cliente
 from django.db import models, transaction
 from django.views.decorators.http import require_http_methods, require_GET
 from django.views.decorators.csrf import csrf_exempt
-from .decorators import jwt_role_required, admin_required, login_required_user, admin_required_hybrid
+from .decorators import jwt_role_required, admin_required, login_required_user, admin_required_hybrid, query_budget
+from .client import get_status_display
 logger = logging.getLogger(__name__)
 
 
@@ -24,6 +27,7 @@ def dashboard_ordenes(request):
 
 @csrf_exempt
 @admin_required_hybrid()
+@query_budget(9)
 @require_GET
 def get_all_ordenes(request):
     """API: Obtener todas las órdenes con filtros opcionales"""
@@ -35,7 +39,7 @@ def get_all_ordenes(request):
         fecha_hasta = request.GET.get('hasta', '')
         
         ordenes = Orden.objects.all().select_related('cliente').prefetch_related(
-            'detalles__variante__producto'
+            'detalles__variante__producto__variantes__imagenes'
         ).order_by('-created_at')
         
         # Aplicar filtros
@@ -62,14 +66,16 @@ def get_all_ordenes(request):
                 variante = detalle.variante
                 producto = variante.producto
                 variante_principal = producto.variante_principal
-                galeria = []
+                imagenes = []
                 if variante_principal:
-                    galeria = [img.imagen.url for img in variante_principal.imagenes.all() if img.imagen]
+                    imagenes = [img for img in variante_principal.imagenes.all() if img.imagen]
+                galeria = [img.imagen_url for img in imagenes]
                 
                 items.append({
                     'producto_id': producto.id,
                     'producto_nombre': producto.nombre,
                     'producto_imagen': galeria[0] if galeria else None,
+                    'producto_imagen_srcset': imagenes[0].srcset_webp if imagenes else '',
                     'variante_id': variante.id,
                     'talla': detalle.talla,
                     'color': variante.color,
@@ -98,14 +104,14 @@ def get_all_ordenes(request):
             })
         
         # Estadísticas
-        stats = {
-            'total': Orden.objects.count(),
-            'pendientes': Orden.objects.filter(status__iexact='pendiente').count(),
-            'procesando': Orden.objects.filter(status__in=['procesando', 'proces']).count(),
-            'enviados': Orden.objects.filter(status__iexact='enviado').count(),
-            'entregados': Orden.objects.filter(status__iexact='entregado').count(),
-            'cancelados': Orden.objects.filter(status__iexact='cancelado').count(),
-        }
+        stats = Orden.objects.aggregate(
+            total=models.Count('id'),
+            pendientes=models.Count('id', filter=models.Q(status__iexact='pendiente')),
+            procesando=models.Count('id', filter=models.Q(status__in=['procesando', 'proces'])),
+            enviados=models.Count('id', filter=models.Q(status__iexact='enviado')),
+            entregados=models.Count('id', filter=models.Q(status__iexact='entregado')),
+            cancelados=models.Count('id', filter=models.Q(status__iexact='cancelado')),
+        )
         
         return JsonResponse({
             'success': True,
@@ -145,7 +151,7 @@ def cambiar_estado_orden(request, id):
             if stock_reducido:
                 logger.info(f"[ADMIN] Orden #{id}: Stock reducido al cambiar a '{nuevo_estado}'")
         
-        orden.save(update_fields=['status'])
+        orden.save(update_fields=['status', 'updated_at'])
         
         return JsonResponse({
             'success': True,
@@ -167,7 +173,7 @@ def cambiar_estado_orden(request, id):
 @require_http_methods(["GET"])
 def get_orden(request, id):
     # 1. Recuperar la orden o devolver 404
-    orden = get_object_or_404(Orden, id=id)
+    orden = get_object_or_404(Orden.objects.select_related("cliente"), id=id)
 
     # 2. Verificar autorización horizontal (el cliente solo ve sus propias órdenes)
     if getattr(request, 'user_role', 'cliente') != 'admin':
@@ -183,8 +189,8 @@ def get_orden(request, id):
             "correo": orden.cliente.correo or "no proporcionado",
             "telefono": getattr(orden.cliente, "telefono", None),
         },
-        "carrito_id":    orden.carrito.id,
-        "total_piezas":  sum(det.cantidad for det in orden.detalles.all()),
+        "carrito_id":    orden.carrito_id,
+        "total_piezas":  orden.total_piezas,
         "total_amount":  float(orden.total_amount),
         "status":        orden.status,
         "payment_method":orden.payment_method,
@@ -193,10 +199,13 @@ def get_orden(request, id):
     }
 
     # 3. Recorrer cada OrdenDetalle para poblar "items"
-    for det in orden.detalles.select_related("variante", "variante__producto"):
+    detalles = orden.detalles.select_related("variante", "variante__producto").prefetch_related("variante__imagenes")
+    for det in detalles:
         variante = det.variante
+        imagen = next((img for img in variante.imagenes.all() if img.imagen), None)
         data["items"].append({
             "producto":        variante.producto.nombre,
+            "producto_imagen": imagen.imagen_url if imagen else None,
             "variante_id":     variante.id,
             "talla":           det.talla,
             "color":           variante.color,
@@ -236,16 +245,25 @@ def crear_orden_desde_payload(payload):
             payment_method = payment_method,
         )
 
-        # 3. Crear los detalles
-        for item in payload["items"]:
-            variante = get_object_or_404(Variante, id=item["variante_id"])
-            OrdenDetalle.objects.create(
+        # 3. Crear los detalles: las variantes se validan en una consulta y las
+        #    líneas se insertan con un solo bulk_create. Los precios son los del
+        #    payload, calculados en una sola lectura del carrito (finalizar_compra)
+        ids = {item["variante_id"] for item in payload["items"]}
+        existentes = set(Variante.objects.filter(id__in=ids).values_list("id", flat=True))
+        if ids - existentes:
+            raise Http404(f"Variantes no encontradas: {sorted(ids - existentes)}")
+
+        OrdenDetalle.objects.bulk_create([
+            OrdenDetalle(
                 order           = orden,
-                variante        = variante,
+                variante_id     = item["variante_id"],
                 cantidad        = item["cantidad"],
                 precio_unitario = item["precio_unitario"],
                 talla           = item.get("talla", "UNICA"),
             )
+            for item in payload["items"]
+        ])
+        orden.actualizar_resumen()
 
         # 4. (Opcional) Actualizar el estado del carrito
         carrito.save()
@@ -259,7 +277,7 @@ def crear_orden_desde_payload(payload):
 def update_status(request, id):
     orden = get_object_or_404(Orden, id=id)
     orden.status = 'proces'
-    orden.save(update_fields=["status"]) #Reducir tráfico SQL realizando el update solo a es epar de columnas
+    orden.save(update_fields=["status", "updated_at"]) #Reducir tráfico SQL realizando el update solo a es epar de columnas
     return JsonResponse({"mensaje":"en proceso"})
 
 
@@ -287,7 +305,7 @@ def procesar_por_link(request, token):
 
     # POST — modificar estado
     orden.status = 'procesando'
-    orden.save(update_fields=['status'])
+    orden.save(update_fields=['status', 'updated_at'])
     return HttpResponse("✅ ¡Tu orden ha sido actualizada a 'procesando'!")
 
 
@@ -295,78 +313,94 @@ def procesar_por_link(request, token):
 # API CLIENTE - Obtener sus propias órdenes  
 # ───────────────────────────────────────────────
 
+HISTORIAL_POR_PAGINA = 10
+HISTORIAL_MAX_POR_PAGINA = 50
+
+
+def _cursor_historial(orden):
+    """Cursor opaco con la posición (created_at, id) de la última orden de la página."""
+    crudo = f"{orden.created_at.isoformat()}|{orden.id}"
+    return base64.urlsafe_b64encode(crudo.encode()).decode()
+
+
+def _leer_cursor_historial(cursor):
+    fecha, _, orden_id = base64.urlsafe_b64decode(cursor.encode()).decode().partition("|")
+    return datetime.fromisoformat(fecha), int(orden_id)
+
+
 @csrf_exempt
 @jwt_role_required()
+@query_budget(3)
 @require_GET
 def get_ordenes_cliente(request):
-    """API: Obtener órdenes del cliente autenticado (JWT)"""
+    """
+    API: historial de órdenes del cliente autenticado (JWT), paginado por cursor.
+
+    ?cursor=<siguiente de la página anterior>&limite=10 (máx. 50)
+
+    Usa el resumen guardado en cada orden (Orden.actualizar_resumen): una
+    página es una sola consulta por el índice (cliente, -created_at, -id),
+    sin importar cuántas líneas tengan las órdenes. El detalle completo de
+    una orden se pide a /orden/<id>/.
+    """
     try:
         # El decorador jwt_role_required ya validó el token y agregó request.user_id
         cliente_id = request.user_id
         
         if not cliente_id:
             return JsonResponse({'error': 'Cliente no encontrado'}, status=404)
-        
-        # Obtener órdenes del cliente
-        ordenes = Orden.objects.filter(
-            cliente_id=cliente_id
-        ).select_related('cliente').prefetch_related(
-            'detalles__variante__producto__variantes__imagenes'
-        ).order_by('-created_at')
-        
+
+        try:
+            limite = min(max(int(request.GET.get('limite', HISTORIAL_POR_PAGINA)), 1), HISTORIAL_MAX_POR_PAGINA)
+        except ValueError:
+            return JsonResponse({'success': False, 'error': 'limite inválido'}, status=400)
+
+        ordenes = Orden.objects.filter(cliente_id=cliente_id).only(
+            'id', 'status', 'total_amount', 'payment_method', 'created_at',
+            'total_piezas', 'total_lineas', 'miniaturas',
+        ).order_by('-created_at', '-id')
+
+        cursor = request.GET.get('cursor')
+        if cursor:
+            try:
+                fecha, orden_id = _leer_cursor_historial(cursor)
+            except (ValueError, UnicodeDecodeError):
+                return JsonResponse({'success': False, 'error': 'cursor inválido'}, status=400)
+            ordenes = ordenes.filter(
+                models.Q(created_at__lt=fecha) | models.Q(created_at=fecha, id__lt=orden_id)
+            )
+
+        pagina = list(ordenes[:limite + 1])
+        siguiente = _cursor_historial(pagina[limite - 1]) if len(pagina) > limite else None
+
         data = []
-        for orden in ordenes:
-            items = []
-            for detalle in orden.detalles.all():
-                variante = detalle.variante
-                producto = variante.producto
-                variante_principal = producto.variante_principal
-                galeria = []
-                if variante_principal:
-                    galeria = [img.imagen.url for img in variante_principal.imagenes.all() if img.imagen]
-                
-                items.append({
-                    'producto_id': producto.id,
-                    'producto_nombre': producto.nombre,
-                    'producto_imagen': galeria[0] if galeria else None,
-                    'variante_id': variante.id,
-                    'talla': detalle.talla,
-                    'color': variante.color,
-                    'cantidad': detalle.cantidad,
-                    'precio_unitario': float(detalle.precio_unitario),
-                    'subtotal': float(detalle.precio_unitario * detalle.cantidad)
-                })
-            
-            # Mapear estado a Display
-            status_map = {
-                'pendiente': {'text': 'Pendiente', 'color': '#FFA500', 'icon': 'clock'},
-                'procesando': {'text': 'Procesando', 'color': '#4169E1', 'icon': 'settings'},
-                'enviado': {'text': 'Enviado', 'color': '#32CD32', 'icon': 'truck'},
-                'entregado': {'text': 'Entregado', 'color': '#228B22', 'icon': 'check'},
-                'cancelado': {'text': 'Cancelado', 'color': '#DC143C', 'icon': 'x'},
-                'reembolso': {'text': 'Reembolso', 'color': '#FF6347', 'icon': 'info'}
-            }
-            status_display = status_map.get(orden.status.lower(), {
-                'text': orden.status.capitalize(),
-                'color': '#808080',
-                'icon': 'info'
-            })
-            
+        for orden in pagina[:limite]:
             data.append({
                 'id': orden.id,
                 'status': orden.status,
-                'status_display': status_display,
+                'status_display': get_status_display(orden.status),
                 'total_amount': float(orden.total_amount),
                 'payment_method': orden.payment_method,
                 'created_at': orden.created_at.strftime('%d/%m/%Y %H:%M'),
                 'created_at_iso': orden.created_at.isoformat(),
-                'items': items,
-                'total_items': sum(item['cantidad'] for item in items)
+                # Miniaturas de los primeros productos; el detalle va en /orden/<id>/
+                'items': [
+                    {
+                        'producto_nombre': m['producto_nombre'],
+                        'producto_imagen': m['imagen'] or None,
+                        'cantidad': m['cantidad'],
+                    }
+                    for m in orden.miniaturas
+                ],
+                'imagen_portada': orden.imagen_portada or None,
+                'total_items': orden.total_piezas,
+                'total_lineas': orden.total_lineas,
             })
         
         return JsonResponse({
             'success': True,
-            'ordenes': data
+            'ordenes': data,
+            'siguiente': siguiente,
         }, status=200)
         
     except Exception as e:
@@ -410,6 +444,7 @@ def eliminar_producto(request, orden_id, producto_id):
     det = qs.first()
     if det:
         det.delete()
+        orden.save(update_fields=['updated_at'])
         return JsonResponse(
 
         {"mensaje": f"Orden {qs.first().variante_id} eliminada correctamente."},
@@ -5,10 +5,11 @@ Pasarela de pagos internacional - Stripe Checkout Embebido + Webhooks
 import json
 import logging
 import threading
-import stripe
 from decimal import Decimal
+from asgiref.sync import sync_to_async
+from django.db import transaction
 from django.http import JsonResponse
-from django.shortcuts import get_object_or_404, render
+from django.shortcuts import aget_object_or_404, get_object_or_404, render
 from django.views.decorators.http import require_http_methods, require_POST
 from django.views.decorators.csrf import csrf_exempt
 from django.conf import settings
@@ -18,6 +19,9 @@ from django.template.loader import render_to_string
 from ..models import Carrito, Orden, OrdenDetalle, Cliente
 from store.views.decorators import admin_required
 from store.views.carrito import validate_jwt_token
+from store.utils.clients import get_stripe, stripe_async
+from store.utils.stripe_eventos import registrar_evento
+from store.utils.stripe_reconciliacion import consultar_orden_async, reconciliar
 
 # ───────────────────────────────────────────────────────────────
 # Logger
@@ -32,8 +36,9 @@ if not logger.handlers:
     handler.setFormatter(formatter)
     logger.addHandler(handler)
 
-# Configurar Stripe
-stripe.api_key = settings.STRIPE_SECRET_KEY
+# Stripe se importa y configura en el primer uso (store.utils.clients.get_stripe).
+# Las vistas que esperan a Stripe (checkout, estado de sesión, sincronizar) son
+# async y usan stripe_async(): con GUNICORN_MODO=asgi no bloquean el worker.
 # ───────────────────────────────────────────────────────────────
 # Helpers
 # ───────────────────────────────────────────────────────────────
@@ -198,26 +203,47 @@ def _crear_orden_local(carrito, cliente, total_centavos, items_detalle,
                        status='pendiente_pago'):
     """
     Crea la Orden y sus OrdenDetalle en la BD local.
+    Los precios vienen de items_detalle (_calcular_items_carrito): la misma
+    lectura del carrito con la que se cobró en Stripe. Todas las líneas se
+    insertan con un solo bulk_create.
     """
-    orden = Orden.objects.create(
-        cliente=cliente,
-        carrito=None,   # Sin vincular para permitir múltiples órdenes
-        total_amount=Decimal(str(total_centavos / 100)),
-        status=status,
-        payment_method='stripe',
-        stripe_session_id=stripe_session_id,
-        stripe_payment_intent=stripe_payment_intent,
-    )
-
-    for item in items_detalle:
-        OrdenDetalle.objects.create(
-            order=orden,
-            variante=item['variante'],
-            cantidad=item['cantidad'],
-            precio_unitario=item['precio_unitario'],
-            talla=item.get('talla', 'UNICA'),
+    with transaction.atomic():
+        orden = Orden.objects.create(
+            cliente=cliente,
+            carrito=None,   # Sin vincular para permitir múltiples órdenes
+            total_amount=Decimal(str(total_centavos / 100)),
+            status=status,
+            payment_method='stripe',
+            stripe_session_id=stripe_session_id,
+            stripe_payment_intent=stripe_payment_intent,
         )
 
+        OrdenDetalle.objects.bulk_create([
+            OrdenDetalle(
+                order=orden,
+                variante=item['variante'],
+                cantidad=item['cantidad'],
+                precio_unitario=item['precio_unitario'],
+                talla=item.get('talla', 'UNICA'),
+            )
+            for item in items_detalle
+        ])
+        orden.actualizar_resumen()
+
+    return orden
+
+
+@transaction.atomic
+def _registrar_checkout(carrito, cliente, total_centavos, items_detalle, stripe_session_id):
+    """Orden local pendiente de pago para la sesión de Stripe y carrito vaciado."""
+    orden = _crear_orden_local(
+        carrito, cliente, total_centavos, items_detalle,
+        stripe_session_id=stripe_session_id,
+        status='pendiente_pago',
+    )
+    carrito.items.all().delete()
+    carrito.status = 'vacio'
+    carrito.save()
     return orden
 
 
@@ -226,7 +252,7 @@ def _crear_orden_local(carrito, cliente, total_centavos, items_detalle,
 # ───────────────────────────────────────────────────────────────
 @csrf_exempt
 @require_POST
-def crear_checkout_stripe(request):
+async def crear_checkout_stripe(request):
     """
     Crea una Stripe Checkout Session en modo embebido.
     Retorna el client_secret para montar el Embedded Checkout
@@ -235,10 +261,11 @@ def crear_checkout_stripe(request):
     """
     logger.info("=" * 80)
     logger.info("[CREAR_CHECKOUT_STRIPE] INICIANDO")
+    stripe = get_stripe()
 
     # ── Autenticación ──
     token_user_id, token_user_role = validate_jwt_token(request)
-    session_cliente_id = request.session.get('cliente_id')
+    session_cliente_id = await request.session.aget('cliente_id')
     if not token_user_id and not session_cliente_id:
         return JsonResponse({'success': False, 'error': 'Autenticación requerida'}, status=401)
 
@@ -252,7 +279,7 @@ def crear_checkout_stripe(request):
                 'error': 'carrito_id requerido'
             }, status=400)
 
-        carrito = get_object_or_404(Carrito, id=carrito_id)
+        carrito = await aget_object_or_404(Carrito.objects.select_related('cliente'), id=carrito_id)
         cliente = carrito.cliente
 
         if not cliente:
@@ -269,7 +296,7 @@ def crear_checkout_stripe(request):
         logger.info(f"Carrito #{carrito_id} | Cliente: {cliente.username} ({cliente.correo})")
 
         # Calcular items
-        line_items, total_centavos, items_detalle, mayoreo = _calcular_items_carrito(carrito)
+        line_items, total_centavos, items_detalle, mayoreo = await sync_to_async(_calcular_items_carrito)(carrito)
 
         if not line_items:
             return JsonResponse({
@@ -289,52 +316,46 @@ def crear_checkout_stripe(request):
                 'error': f'El monto total del carrito (${total_mxn:.2f} MXN) es menor al mínimo permitido por Stripe ($10.00 MXN). Agrega más productos para continuar.'
             }, status=400)
 
-        # Verificar que stripe.api_key esté configurado
-        if not stripe.api_key:
-            logger.error("❌ stripe.api_key está VACÍO")
+        # Verificar que la API key de Stripe esté configurada
+        if not settings.STRIPE_SECRET_KEY:
+            logger.error("❌ STRIPE_SECRET_KEY está VACÍO")
             return JsonResponse({'success': False, 'error': 'Error de configuración: API key de Stripe no configurada'}, status=500)
         else:
-            logger.info("✅ stripe.api_key configurado")
+            logger.info("✅ STRIPE_SECRET_KEY configurado")
 
         # URL de retorno después del pago (Stripe redirige aquí)
         base_url = request.build_absolute_uri('/')[:-1]
         return_url = f"{base_url}/pago/exitoso/?session_id={{CHECKOUT_SESSION_ID}}"
 
         # ─── Crear Stripe Checkout Session (embebido) ───
-        session = stripe.checkout.Session.create(
-            ui_mode='embedded',
-            payment_method_types=['card'],
-            line_items=line_items,
-            mode='payment',
-            return_url=return_url,
-            customer_email=cliente.correo,
-            metadata={
-                'carrito_id': str(carrito.id),
-                'cliente_id': str(cliente.id),
-            },
-            payment_intent_data={
+        async with stripe_async() as cliente_stripe:
+            session = await cliente_stripe.checkout.sessions.create_async(params={
+                'ui_mode': 'embedded',
+                'payment_method_types': ['card'],
+                'line_items': line_items,
+                'mode': 'payment',
+                'return_url': return_url,
+                'customer_email': cliente.correo,
                 'metadata': {
                     'carrito_id': str(carrito.id),
                     'cliente_id': str(cliente.id),
                 },
-            },
-        )
+                'payment_intent_data': {
+                    'metadata': {
+                        'carrito_id': str(carrito.id),
+                        'cliente_id': str(cliente.id),
+                    },
+                },
+            })
 
         logger.info(f"Stripe Session creada: {session.id}")
         logger.info(f"Client Secret: {session.client_secret[:30]}...")
 
-        # Crear orden local pendiente de pago
-        orden = _crear_orden_local(
-            carrito, cliente, total_centavos, items_detalle,
-            stripe_session_id=session.id,
-            status='pendiente_pago',
+        # Crear orden local pendiente de pago y vaciar carrito
+        orden = await sync_to_async(_registrar_checkout)(
+            carrito, cliente, total_centavos, items_detalle, session.id
         )
         logger.info(f"Orden local #{orden.id} creada (pendiente_pago)")
-
-        # Vaciar carrito
-        carrito.items.all().delete()
-        carrito.status = 'vacio'
-        carrito.save()
         logger.info(f"Carrito #{carrito.id} vaciado")
 
         return JsonResponse({
@@ -413,7 +434,7 @@ def mostrar_formulario_pago_stripe(request, carrito_id):
             variante_principal = producto.variante_principal
             galeria = []
             if variante_principal:
-                galeria = [img.imagen.url for img in variante_principal.imagenes.all() if img.imagen]
+                galeria = [img.imagen_url for img in variante_principal.imagenes.all() if img.imagen]
             imagen = galeria[0] if galeria else "/static/images/no-image.jpg"
 
             items_detalle.append({
@@ -447,8 +468,8 @@ def mostrar_formulario_pago_stripe(request, carrito_id):
 @require_POST
 def webhook_stripe(request):
     """
-    Recibe eventos de Stripe y actualiza el estado de la orden.
-    Eventos manejados:
+    Recibe eventos de Stripe y los guarda en la bandeja StripeEvento.
+    Eventos manejados (en store/utils/stripe_eventos.py):
       - checkout.session.completed
       - payment_intent.succeeded
       - payment_intent.payment_failed
@@ -457,6 +478,7 @@ def webhook_stripe(request):
     logger.info("=" * 80)
     logger.info("[WEBHOOK_STRIPE] EVENTO RECIBIDO")
 
+    stripe = get_stripe()
     payload = request.body
     sig_header = request.headers.get('Stripe-Signature', '')
 
@@ -480,89 +502,19 @@ def webhook_stripe(request):
         logger.error("Firma de webhook inválida")
         return JsonResponse({'error': 'Firma inválida'}, status=401)
 
-    event_type = event['type']
-    event_data = event['data']['object']
-    logger.info(f"Evento: {event_type} | ID: {event_data.get('id', 'N/A')}")
-
-    # ── checkout.session.completed ──
-    if event_type == 'checkout.session.completed':
-        session_id = event_data['id']
-        payment_intent_id = event_data.get('payment_intent', '')
-        payment_status = event_data.get('payment_status', '')
-
-        logger.info(f"Session: {session_id} | PI: {payment_intent_id} | Status: {payment_status}")
-
-        try:
-            orden = Orden.objects.get(stripe_session_id=session_id)
-
-            if payment_status == 'paid':
-                orden.status = 'procesando'
-                # 🔥 REDUCIR STOCK cuando el pago es confirmado
-                orden.reducir_stock_orden()
-            else:
-                orden.status = 'pendiente_pago'
-
-            if payment_intent_id:
-                orden.stripe_payment_intent = payment_intent_id
-
-            orden.save()
-            logger.info(f"Orden #{orden.id} actualizada → {orden.status}")
-
-            # Enviar email de confirmación si el pago fue exitoso
-            if payment_status == 'paid':
-                _enviar_email_confirmacion(orden, request=request)
+    # Solo se registra: el procesamiento lo hace `manage.py procesar_eventos_stripe`
+    # (ver store/utils/stripe_eventos.py). Responder rápido evita timeouts y
+    # reintentos de Stripe; un evento repetido no se vuelve a encolar.
+    if not isinstance(event, dict):
+        event = json.loads(payload)
+    try:
+        evento, creado = registrar_evento(event)
+    except (KeyError, TypeError):
+        logger.error("Evento sin id/type")
+        return JsonResponse({'error': 'Payload inválido'}, status=400)
 
-        except Orden.DoesNotExist:
-            logger.warning(f"Orden no encontrada para session: {session_id}")
-
-    # ── payment_intent.succeeded ──
-    elif event_type == 'payment_intent.succeeded':
-        pi_id = event_data['id']
-        logger.info(f"PaymentIntent exitoso: {pi_id}")
-
-        try:
-            orden = Orden.objects.get(stripe_payment_intent=pi_id)
-            orden.status = 'pagado'
-            # 🔥 REDUCIR STOCK cuando el pago es confirmado
-            orden.reducir_stock_orden()
-            orden.save()
-            logger.info(f"Orden #{orden.id} → pagado")
-            # Enviar email de confirmación
-            _enviar_email_confirmacion(orden, request=request)
-        except Orden.DoesNotExist:
-            logger.warning(f"Orden no encontrada para PI: {pi_id}")
-
-    # ── payment_intent.payment_failed ──
-    elif event_type == 'payment_intent.payment_failed':
-        pi_id = event_data['id']
-        error_msg = event_data.get('last_payment_error', {}).get('message', '')
-        logger.warning(f"PaymentIntent fallido: {pi_id} | Error: {error_msg}")
-
-        try:
-            orden = Orden.objects.get(stripe_payment_intent=pi_id)
-            orden.status = 'rechazado'
-            orden.save()
-            logger.info(f"Orden #{orden.id} → rechazado")
-        except Orden.DoesNotExist:
-            logger.warning(f"Orden no encontrada para PI fallido: {pi_id}")
-
-    # ── charge.refunded ──
-    elif event_type == 'charge.refunded':
-        pi_id = event_data.get('payment_intent', '')
-        logger.info(f"Reembolso para PI: {pi_id}")
-
-        try:
-            orden = Orden.objects.get(stripe_payment_intent=pi_id)
-            orden.status = 'reembolsado'
-            orden.save()
-            logger.info(f"Orden #{orden.id} → reembolsado")
-        except Orden.DoesNotExist:
-            logger.warning(f"Orden no encontrada para reembolso PI: {pi_id}")
-
-    else:
-        logger.info(f"Evento no manejado: {event_type}")
-
-    return JsonResponse({'success': True, 'event': event_type})
+    logger.info(f"Evento: {evento.tipo} | ID: {evento.event_id} | {'encolado' if creado else 'duplicado'}")
+    return JsonResponse({'success': True, 'event': evento.tipo, 'duplicado': not creado})
 
 
 # ───────────────────────────────────────────────────────────────
@@ -570,14 +522,15 @@ def webhook_stripe(request):
 # ───────────────────────────────────────────────────────────────
 @csrf_exempt
 @require_http_methods(["GET"])
-def verificar_orden_creada(request):
+async def verificar_orden_creada(request):
     """
     Verifica si la orden fue creada y su estado actual.
     Acepta: session_id o orden_id como query param.
     Requiere autenticación.
+    El frontend lo consulta en polling tras el pago: usa el ORM async.
     """
     token_user_id, token_user_role = validate_jwt_token(request)
-    session_cliente_id = request.session.get('cliente_id')
+    session_cliente_id = await request.session.aget('cliente_id')
     if not token_user_id and not session_cliente_id:
         return JsonResponse({'success': False, 'error': 'Autenticación requerida'}, status=401)
 
@@ -586,9 +539,9 @@ def verificar_orden_creada(request):
 
     try:
         if session_id:
-            orden = Orden.objects.get(stripe_session_id=session_id)
+            orden = await Orden.objects.aget(stripe_session_id=session_id)
         elif orden_id:
-            orden = Orden.objects.get(id=orden_id)
+            orden = await Orden.objects.aget(id=orden_id)
         else:
             return JsonResponse({
                 'success': False,
@@ -606,7 +559,7 @@ def verificar_orden_creada(request):
             'status': orden.status,
             'total_amount': str(orden.total_amount),
             'created_at': orden.created_at.isoformat() if orden.created_at else None,
-            'detalles_count': orden.detalles.count(),
+            'detalles_count': await orden.detalles.acount(),
         })
 
     except Orden.DoesNotExist:
@@ -625,7 +578,7 @@ def verificar_orden_creada(request):
 @csrf_exempt
 @admin_required()
 @require_http_methods(["POST"])
-def sincronizar_orden_stripe(request):
+async def sincronizar_orden_stripe(request):
     """
     Consulta el estado de un PaymentIntent o Session en Stripe
     y actualiza la BD local. Solo accesible para admins.
@@ -639,65 +592,43 @@ def sincronizar_orden_stripe(request):
         }, status=400)
 
     try:
-        orden = Orden.objects.get(id=orden_id)
-        status_anterior = orden.status
-
-        if orden.stripe_session_id:
-            session = stripe.checkout.Session.retrieve(orden.stripe_session_id)
-            payment_status = session.get('payment_status', '')
-            pi_id = session.get('payment_intent', '')
-
-            if pi_id and not orden.stripe_payment_intent:
-                orden.stripe_payment_intent = pi_id
-
-            status_map = {
-                'paid': 'pagado',
-                'unpaid': 'pendiente_pago',
-                'no_payment_required': 'pagado',
-            }
-            orden.status = status_map.get(payment_status, orden.status)
-
-        elif orden.stripe_payment_intent:
-            pi = stripe.PaymentIntent.retrieve(orden.stripe_payment_intent)
-            pi_status = pi.get('status', '')
-
-            status_map = {
-                'succeeded': 'pagado',
-                'processing': 'procesando',
-                'requires_payment_method': 'pendiente_pago',
-                'requires_action': 'pendiente_pago',
-                'canceled': 'cancelado',
-            }
-            orden.status = status_map.get(pi_status, orden.status)
-
-        else:
-            return JsonResponse({
-                'success': False,
-                'error': 'Orden sin IDs de Stripe asociados'
-            }, status=400)
-
-        orden.save()
-        logger.info(f"[SYNC] Orden #{orden.id}: {status_anterior} → {orden.status}")
-
-        return JsonResponse({
-            'success': True,
-            'orden_id': orden.id,
-            'status_anterior': status_anterior,
-            'status_nuevo': orden.status,
-        })
-
-    except Orden.DoesNotExist:
+        orden = await Orden.objects.aget(id=orden_id)
+    except (Orden.DoesNotExist, ValueError):
         return JsonResponse({
             'success': False,
             'error': f'Orden #{orden_id} no encontrada'
         }, status=404)
-    except stripe.error.StripeError as e:
-        logger.error(f"[SYNC] Stripe Error: {e}")
+
+    if not orden.stripe_session_id and not orden.stripe_payment_intent:
+        return JsonResponse({
+            'success': False,
+            'error': 'Orden sin IDs de Stripe asociados'
+        }, status=400)
+
+    # Misma lógica que `manage.py reconcile_stripe`, para una sola orden
+    try:
+        async with stripe_async() as cliente_stripe:
+            datos = {orden.id: await consultar_orden_async(orden, cliente_stripe)}
+    except Exception as e:
+        logger.warning(f"[SYNC] Orden #{orden.id}: error consultando Stripe: {e}")
         return JsonResponse({'success': False, 'error': 'Error al sincronizar con Stripe'}, status=400)
+
+    try:
+        cambios = await sync_to_async(reconciliar)([orden], datos)
     except Exception as e:
         logger.exception(f"[SYNC] Error: {e}")
         return JsonResponse({'success': False, 'error': 'Error interno del servidor'}, status=500)
 
+    status_nuevo = cambios[0].nuevo if cambios else orden.status
+    logger.info(f"[SYNC] Orden #{orden.id}: {orden.status} → {status_nuevo}")
+
+    return JsonResponse({
+        'success': True,
+        'orden_id': orden.id,
+        'status_anterior': orden.status,
+        'status_nuevo': status_nuevo,
+    })
+
 
 # ───────────────────────────────────────────────────────────────
 # 6. Páginas de resultado
@@ -716,22 +647,9 @@ def pago_exitoso(request):
             try:
                 orden = Orden.objects.get(stripe_session_id=session_id)
 
-                # Si la orden aún está pendiente, sincronizar con Stripe
-                if orden.status == 'pendiente_pago':
-                    try:
-                        session = stripe.checkout.Session.retrieve(session_id)
-                        if session.payment_status == 'paid':
-                            orden.status = 'procesando'
-                            orden.stripe_payment_intent = session.payment_intent or ''
-                            # 🔥 REDUCIR STOCK cuando se confirma el pago
-                            orden.reducir_stock_orden()
-                            orden.save()
-                            logger.info(f"[PAGO_EXITOSO] Orden #{orden.id} sincronizada → procesando")
-                            # Enviar email de confirmación
-                            _enviar_email_confirmacion(orden, request=request)
-                    except stripe.error.StripeError as e:
-                        logger.warning(f"[PAGO_EXITOSO] Error sincronizando: {e}")
-
+                # Si aún está pendiente no se consulta Stripe aquí: la actualizan el
+                # worker de eventos (procesar_eventos_stripe) o `reconcile_stripe`,
+                # y la plantilla muestra "Orden Registrada" mientras tanto.
             except Orden.DoesNotExist:
                 logger.warning(f"[PAGO_EXITOSO] Orden no encontrada para session={session_id}")
 
@@ -764,7 +682,7 @@ def pago_cancelado(request):
 # 7. API - Estado de sesión de Stripe (para polling del frontend)
 # ───────────────────────────────────────────────────────────────
 @require_http_methods(["GET"])
-def session_status(request):
+async def session_status(request):
     """
     El frontend puede consultar este endpoint para verificar el estado
     de la sesión de Stripe Checkout.
@@ -772,7 +690,7 @@ def session_status(request):
     """
     # ── Autenticación ──
     token_user_id, token_user_role = validate_jwt_token(request)
-    session_cliente_id = request.session.get('cliente_id')
+    session_cliente_id = await request.session.aget('cliente_id')
     if not token_user_id and not session_cliente_id:
         return JsonResponse({'success': False, 'error': 'Autenticación requerida'}, status=401)
 
@@ -784,8 +702,10 @@ def session_status(request):
             'error': 'session_id requerido'
         }, status=400)
 
+    stripe = get_stripe()
     try:
-        session = stripe.checkout.Session.retrieve(session_id)
+        async with stripe_async() as cliente_stripe:
+            session = await cliente_stripe.checkout.sessions.retrieve_async(session_id)
 
         return JsonResponse({
             'success': True,
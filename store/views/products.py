@@ -3,18 +3,21 @@ from django.shortcuts import render,get_object_or_404
 from django.http import JsonResponse
 from django.views.decorators.http import require_http_methods, require_GET
 from ..models import Producto, Categoria, Variante, Subcategoria
-from .decorators import login_required_user, login_required_client, jwt_role_required, admin_required, inventory_manager_required
+from .decorators import login_required_user, login_required_client, jwt_role_required, admin_required, inventory_manager_required, query_budget
 from django.db.models import Prefetch, Q
-from django.db import models
+from django.db import models, transaction
 from decimal import Decimal, InvalidOperation
 import json
 from django.views.decorators.csrf import csrf_exempt
 from ..utils.serializers import serializar_producto_completo
 import os  # Importar os para operaciones de archivo
 from store.models import VarianteImagen
+from store.utils.galeria import GaleriaError, LimiteImagenesError, ingestar_galerias
+from store.utils.tallas import ordenar_tallas
 import logging
 logger = logging.getLogger(__name__)
 
+@query_budget(4)
 def detalle_producto(request, id):
     producto = get_object_or_404(
         Producto.objects.prefetch_related("variantes", "variantes__imagenes"),
@@ -34,7 +37,7 @@ def detalle_producto(request, id):
             colores.add(v.color)
 
         # Obtener imágenes de la variante
-        imagenes_variante = [img.imagen.url for img in v.imagenes.all().order_by('orden') if img.imagen]
+        imagenes_variante = [img.imagen_url for img in v.imagenes.all() if img.imagen]
         
         variantes_serializadas.append({
             "id"          : v.id,
@@ -49,7 +52,7 @@ def detalle_producto(request, id):
     variante_principal = producto.variante_principal
     imagenes_producto = []
     if variante_principal:
-        imagenes_producto = [img.imagen.url for img in variante_principal.imagenes.all().order_by('orden') if img.imagen]
+        imagenes_producto = [img.imagen_url for img in variante_principal.imagenes.all() if img.imagen]
 
     # lee el origen para el <a volver>
     origen_raw = request.GET.get("from", "")
@@ -61,7 +64,7 @@ def detalle_producto(request, id):
         {
             "producto"       : producto,
             "origen"         : origen,
-            "tallas"         : sorted(tallas, key=lambda x: (len(x), x)),
+            "tallas"         : ordenar_tallas(tallas),
             "colores"        : sorted(colores),
             "imagenes_producto": imagenes_producto,
             "variantes_json" : variantes_serializadas,
@@ -72,15 +75,16 @@ def detalle_producto(request, id):
 
 #@jwt_role_required()  # Público - Ver detalles de producto
 @require_GET
+@query_budget(3)
 def get_all_products(request):
 
-    productos = Producto.objects.prefetch_related('variantes', 'variantes__imagenes')
+    productos = Producto.objects.select_related('categoria').prefetch_related('variantes', 'variantes__imagenes')
     data = []
     for p in productos:
         variantes = []
         for v in p.variantes.all():
             # Obtener imágenes de la galería de la variante
-            imagenes_variante = [img.imagen.url for img in v.imagenes.all().order_by('orden') if img.imagen]
+            imagenes_variante = [img.imagen_url for img in v.imagenes.all() if img.imagen]
             
             variantes.append({
                 'id': v.id,
@@ -99,7 +103,7 @@ def get_all_products(request):
         variante_principal = p.variante_principal
         galeria = []
         if variante_principal:
-            galeria = [img.imagen.url for img in variante_principal.imagenes.all().order_by('orden') if img.imagen]
+            galeria = [img.imagen_url for img in variante_principal.imagenes.all() if img.imagen]
         
         # La imagen principal siempre es la primera de la galería
         # Esto asegura consistencia: no hay imágenes duplicadas
@@ -126,6 +130,7 @@ def get_all_products(request):
 @csrf_exempt
 @inventory_manager_required()
 @require_http_methods(["POST"])
+@transaction.atomic
 def create_product(request):
 
     # Detecta si el request viene en JSON o multipart/form-data ( si trae una imagen o no)
@@ -248,6 +253,7 @@ def create_product(request):
             color_variants[color]['tallas_stock'][talla] = stock
 
         # Crear una variante por color
+        galerias = []
         is_first = True
         for color, cv_data in color_variants.items():
             variante = Variante.objects.create(
@@ -262,37 +268,23 @@ def create_product(request):
                 primera_variante_precio = variante.precio
                 primera_variante_creada = True
             
-            # 🖼️ PROCESAR IMÁGENES DE ESTA VARIANTE
+            # 🖼️ IMÁGENES DE ESTA VARIANTE (se suben todas juntas al final)
             # Buscar imágenes por el índice original de la primera talla de este color
-            try:
-                from store.models import VarianteImagen
-                import os
-                
-                img_idx = cv_data['idx']
-                imagenes_variante = request.FILES.getlist(f'variante_imagen_temp_{img_idx}')
-                
-                if imagenes_variante:
-                    
-                    for img_order, imagen_file in enumerate(imagenes_variante, start=1):
-                        if img_order > 5:
-                            break
-                        try:
-                            ext = os.path.splitext(imagen_file.name)[1]
-                            nombre_canonico = f'imagen-{img_order}{ext}'
-                            imagen_file.name = nombre_canonico
-                            
-                            variante_imagen = VarianteImagen(
-                                variante=variante,
-                                imagen=imagen_file,
-                                orden=img_order
-                            )
-                            variante_imagen.save()
-                        except Exception as e:
-                            pass
-            except Exception as e:
-                pass
+            imagenes_variante = request.FILES.getlist(f'variante_imagen_temp_{cv_data["idx"]}')
+            imagenes_variante = imagenes_variante[:VarianteImagen.MAX_IMAGENES]
+            for img_order, imagen_file in enumerate(imagenes_variante, start=1):
+                ext = os.path.splitext(imagen_file.name)[1]
+                imagen_file.name = f'imagen-{img_order}{ext}'
+            galerias.append((variante, imagenes_variante, 1))
             is_first = False
 
+        try:
+            ingestar_galerias(galerias)
+        except GaleriaError as e:
+            transaction.set_rollback(True)
+            status = 400 if isinstance(e, LimiteImagenesError) else 502
+            return JsonResponse({"error": str(e)}, status=status)
+
     # Variante simple (stock único)
     else:
         stock_unico = data.get("stock") if request.content_type.startswith("application/json") else request.POST.get("stock")
@@ -340,6 +332,7 @@ def create_product(request):
 @csrf_exempt
 @inventory_manager_required()
 @require_http_methods(["POST", "PUT"])
+@transaction.atomic
 def update_productos(request, id):
     try:
         producto = get_object_or_404(Producto, id=id)
@@ -441,56 +434,45 @@ def update_productos(request, id):
                     pass
         
         # Procesar cada grupo de imágenes por variante
+        galerias = []
         for variante_id, imagenes_list in variante_imagenes.items():
             try:
                 variante = producto.variantes.get(id=variante_id)
-                
-                # IMPORTANTE: Después de las eliminaciones, recompactar los órdenes de las imágenes restantes
-                # para evitar huecos en la numeración (1, 2, 3... en vez de 1, 3, 5...)
-                imagenes_existentes = list(variante.imagenes.all().order_by('orden'))
-                
-                # Renumerar las imágenes existentes secuencialmente
-                for nuevo_orden, img_existente in enumerate(imagenes_existentes, start=1):
-                    if img_existente.orden != nuevo_orden:
-                        img_existente.orden = nuevo_orden
-                        img_existente.save()
-                
-                # Ahora calcular cuántas imágenes tenemos y cuántas podemos agregar
-                current_count = len(imagenes_existentes)
-                espacios_disponibles = 5 - current_count
-                
-                if current_count + len(imagenes_list) > 5:
-                    continue
-                
-                # Agregar las nuevas imágenes en orden secuencial
-                next_orden = current_count + 1
-                
-                for idx, imagen_file in enumerate(imagenes_list):
-                    numero_orden = next_orden + idx
-                    
-                    # Generar nombre canónico
-                    ext = os.path.splitext(imagen_file.name)[1]
-                    nombre_canonico = f'imagen-{numero_orden}{ext}'
-                    imagen_file.name = nombre_canonico
-                    
-                    # Crear VarianteImagen
-                    variante_imagen = VarianteImagen(
-                        variante=variante,
-                        imagen=imagen_file,
-                        orden=numero_orden
-                    )
-                    variante_imagen.save()
             except Variante.DoesNotExist:
-                pass
-            except Exception:
-                pass
+                continue
+
+            # IMPORTANTE: Después de las eliminaciones, recompactar los órdenes de las imágenes restantes
+            # para evitar huecos en la numeración (1, 2, 3... en vez de 1, 3, 5...)
+            imagenes_existentes = list(variante.imagenes.all().order_by('orden'))
+
+            # Renumerar las imágenes existentes secuencialmente
+            for nuevo_orden, img_existente in enumerate(imagenes_existentes, start=1):
+                if img_existente.orden != nuevo_orden:
+                    VarianteImagen.objects.filter(pk=img_existente.pk).update(orden=nuevo_orden)
+
+            # Las nuevas imágenes van a continuación, en orden secuencial
+            next_orden = len(imagenes_existentes) + 1
+            for idx, imagen_file in enumerate(imagenes_list):
+                ext = os.path.splitext(imagen_file.name)[1]
+                imagen_file.name = f'imagen-{next_orden + idx}{ext}'
+            galerias.append((variante, imagenes_list, next_orden))
+
+        # El límite de imágenes se valida una vez por variante dentro de ingestar_galerias
+        ingestar_galerias(galerias)
 
         return JsonResponse(
             {'mensaje': f'Producto {producto.id} actualizado correctamente'},
             status=200
         )
     
+    except LimiteImagenesError as e:
+        transaction.set_rollback(True)
+        return JsonResponse({'error': str(e)}, status=400)
+    except GaleriaError as e:
+        transaction.set_rollback(True)
+        return JsonResponse({'error': str(e)}, status=502)
     except Exception as e:
+        transaction.set_rollback(True)
         return JsonResponse(
             {'error': f'Error al actualizar producto: {str(e)}'},
             status=500
@@ -499,6 +481,7 @@ def update_productos(request, id):
 @csrf_exempt
 @inventory_manager_required()
 @require_http_methods(["POST"])
+@transaction.atomic
 def create_variant(request):
     """
     POST /api/variantes/create/
@@ -560,25 +543,13 @@ def create_variant(request):
         )
         
         # Manejar imágenes de la variante (formato: imagenes_0, imagenes_1, etc.)
-        imagenes_guardadas = 0
-        for key in request.FILES.keys():
-            if key.startswith('imagenes_'):
-                imagen_file = request.FILES[key]
-                try:
-                    # Generar nombre canónico
-                    nombre_canonico = variante._generate_image_key(imagen_file.name)
-                    
-                    # Crear VarianteImagen
-                    variante_imagen = VarianteImagen(
-                        variante=variante,
-                        imagen=imagen_file,
-                        orden=imagenes_guardadas
-                    )
-                    variante_imagen.imagen.name = nombre_canonico
-                    variante_imagen.save()
-                    imagenes_guardadas += 1
-                except Exception as e:
-                    logger.warning(f"Error al guardar imagen para variante {variante.id}: {e}")
+        imagenes = [
+            request.FILES[key] for key in request.FILES.keys() if key.startswith('imagenes_')
+        ]
+        for imagen_file in imagenes:
+            # Generar nombre canónico
+            imagen_file.name = variante._generate_image_key(imagen_file.name)
+        imagenes_guardadas = len(ingestar_galerias([(variante, imagenes, 0)]))
         
         return JsonResponse({
             'id': variante.id,
@@ -586,7 +557,15 @@ def create_variant(request):
             'imagenes_guardadas': imagenes_guardadas
         }, status=201)
     
+    except LimiteImagenesError as e:
+        transaction.set_rollback(True)
+        return JsonResponse({'error': str(e)}, status=400)
+    except GaleriaError as e:
+        transaction.set_rollback(True)
+        logger.warning(f"Error al guardar imágenes de la variante: {e}")
+        return JsonResponse({'error': str(e)}, status=502)
     except Exception as e:
+        transaction.set_rollback(True)
         logger.warning(f"Error al crear variante: {e}")
         return JsonResponse({'error': str(e)}, status=500)
 
@@ -628,7 +607,10 @@ def update_variant(request, variante_id):
     if 'precio_mayorista' in request.POST:
         variante.precio_mayorista = request.POST['precio_mayorista']
     if 'sku' in request.POST:
-        variante.sku = request.POST['sku']
+        sku = request.POST['sku'].strip() or None
+        if sku and Variante.objects.filter(sku=sku).exclude(id=variante.id).exists():
+            return JsonResponse({'error': f'El SKU {sku} ya pertenece a otra variante'}, status=400)
+        variante.sku = sku
     if 'color' in request.POST:
         variante.color = request.POST['color']
     
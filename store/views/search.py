@@ -2,12 +2,26 @@
 Vista de búsqueda y filtrado de productos
 """
 from django.shortcuts import render
-from django.http import JsonResponse
-from django.views.decorators.http import require_GET
+from django.http import HttpResponse, JsonResponse
+from django.views.decorators.csrf import csrf_exempt
+from django.views.decorators.http import require_GET, require_POST
 from django.db.models import Q, Min, Max, Prefetch, Count
 from ..models import Producto, Categoria, Variante, Subcategoria
+from store.utils import busquedas
+from store.utils.renditions import srcsets
+from store.utils.tallas import es_unica, etiquetas, ordenar_tallas
 from decimal import Decimal, InvalidOperation
 import json
+import time
+
+# Filtros que se guardan junto a cada búsqueda registrada
+FILTROS_REGISTRADOS = (
+    'categoria', 'subcategoria', 'marca', 'genero', 'precio_min', 'precio_max',
+    'en_oferta', 'tallas', 'colores', 'ordenar',
+)
+
+# Mayor id de Producto (BigAutoField): uno fuera de rango tumbaría el INSERT en lote de los clics
+PRODUCTO_ID_MAX = 2 ** 63 - 1
 
 
 @require_GET
@@ -29,7 +43,9 @@ def search_products(request):
     - ordenar: precio_asc, precio_desc, nombre_asc, nombre_desc, nuevo, popular
     - page: Número de página (opcional)
     - per_page: Productos por página (default: 20)
+    - origen: api, overlay, busqueda (solo para la analítica de búsquedas)
     """
+    inicio = time.perf_counter()
     
     # Iniciar queryset con prefetch para optimizar
     productos = Producto.objects.prefetch_related(
@@ -118,6 +134,8 @@ def search_products(request):
     tallas_filter_list = []
     if tallas:
         tallas_filter_list = [t.strip() for t in tallas.split(',') if t.strip()]
+    # 'm' pide lo mismo que 'M' y 'ch' lo mismo que 'S'
+    tallas_filtro = etiquetas(tallas_filter_list)
     
     # ============ FILTRO: Colores disponibles (nuevo) ============
     colores = request.GET.get('colores', '').strip()
@@ -190,7 +208,7 @@ def search_products(request):
         
         # Filtrar por tallas si se solicitó
         if tallas_filter_list:
-            if not tallas_disponibles.intersection(set(tallas_filter_list)):
+            if not etiquetas(tallas_disponibles) & tallas_filtro:
                 continue
         
         # Filtrar por stock
@@ -199,9 +217,10 @@ def search_products(request):
         
         # Galería de imágenes de la variante principal
         variante_principal = p.variante_principal
-        galeria = []
+        imagenes = []
         if variante_principal:
-            galeria = [img.imagen.url for img in variante_principal.imagenes.all() if img.imagen]
+            imagenes = [img for img in variante_principal.imagenes.all() if img.imagen]
+        galeria = [img.imagen_url for img in imagenes]
         
         data.append({
             'id': p.id,
@@ -216,8 +235,9 @@ def search_products(request):
             'genero': p.genero,
             'en_oferta': p.en_oferta,
             'imagen': galeria[0] if galeria else '',
+            **srcsets(imagenes[0] if imagenes else None),
             'imagenes_galeria': galeria,
-            'tallas_disponibles': sorted(list(tallas_disponibles), key=lambda x: (float(x) if x.replace('.','').isdigit() else float('inf'), x)),
+            'tallas_disponibles': ordenar_tallas(tallas_disponibles),
             'colores_disponibles': sorted(list(colores_disponibles)),
             'stock_total': sum(v['stock_total'] for v in variantes_data),
             'variantes': variantes_data,
@@ -233,6 +253,17 @@ def search_products(request):
         'has_next': end < total,
         'has_prev': page > 1,
     }
+
+    # ============ ANALÍTICA (buffer, sin INSERT en el request) ============
+    if q and page == 1:
+        origen = request.GET.get('origen', 'api')
+        response['busqueda_id'] = busquedas.registrar(
+            q,
+            resultados=total if data else 0,
+            latencia_ms=(time.perf_counter() - inicio) * 1000,
+            filtros=busquedas.filtros_de(request.GET, FILTROS_REGISTRADOS),
+            origen=origen if origen in busquedas.ORIGENES else 'api',
+        )
     
     return JsonResponse(response, safe=False)
 
@@ -277,13 +308,10 @@ def get_filter_options(request):
     tallas_set = set()
     for v in variantes_con_stock:
         for talla_key, stock_val in v.tallas_stock.items():
-            if stock_val > 0 and talla_key not in ('UNICA', 'N/A', ''):
+            if stock_val > 0 and not es_unica(talla_key):
                 tallas_set.add(talla_key)
     
-    tallas = sorted(
-        list(tallas_set),
-        key=lambda x: (float(x) if x.replace('.','').isdigit() else float('inf'), x)
-    )
+    tallas = ordenar_tallas(tallas_set)
     
     # Colores disponibles
     colores_queryset = Variante.objects.filter(
@@ -328,3 +356,28 @@ def search_page(request):
         from urllib.parse import urlencode
         url += '?' + urlencode({'q': q})
     return _redir(url)
+
+
+@csrf_exempt
+@require_POST
+def registrar_clic_busqueda(request):
+    """
+    Beacon (navigator.sendBeacon) al abrir un resultado de búsqueda.
+    Form: busqueda_id (el de /api/search/), producto_id, posicion (opcional).
+    Solo va al buffer de store/utils/busquedas.py: responde 204 sin tocar la BD.
+    """
+    token = request.POST.get('busqueda_id', '')
+    try:
+        producto_id = int(request.POST.get('producto_id', ''))
+        posicion = int(request.POST['posicion']) if request.POST.get('posicion') else None
+    except ValueError:
+        return JsonResponse({'error': 'producto_id y posicion deben ser enteros'}, status=400)
+    if len(token) != 32 or not all(c in '0123456789abcdef' for c in token):
+        return JsonResponse({'error': 'busqueda_id inválido'}, status=400)
+    if not 1 <= producto_id <= PRODUCTO_ID_MAX:
+        return JsonResponse({'error': 'producto_id fuera de rango'}, status=400)
+    if posicion is not None and not 0 <= posicion < 1000:
+        posicion = None
+
+    busquedas.registrar_clic(token, producto_id, posicion)
+    return HttpResponse(status=204)
@@ -46,7 +46,7 @@ def get_subcategorias(request):
             'descripcion': sc.descripcion,
             'categoria_id': sc.categoria.id,
             'categoria_nombre': sc.categoria.nombre,
-            'imagen': sc.imagen.url if sc.imagen else None,
+            'imagen': sc.imagen_url or None,
             'orden': sc.orden,
             'activa': sc.activa,
             'created_at': sc.created_at.isoformat(),
@@ -126,7 +126,7 @@ def create_subcategoria(request):
             'categoria_id': subcategoria.categoria.id,
             'categoria_nombre': subcategoria.categoria.nombre,
             'descripcion': subcategoria.descripcion,
-            'imagen': subcategoria.imagen.url if subcategoria.imagen else None,
+            'imagen': subcategoria.imagen_url or None,
             'orden': subcategoria.orden,
             'activa': subcategoria.activa,
             'created_at': subcategoria.created_at.isoformat(),
@@ -201,7 +201,7 @@ def update_subcategoria(request, id):
         'categoria_id': subcategoria.categoria.id,
         'categoria_nombre': subcategoria.categoria.nombre,
         'descripcion': subcategoria.descripcion,
-        'imagen': subcategoria.imagen.url if subcategoria.imagen else None,
+        'imagen': subcategoria.imagen_url or None,
         'orden': subcategoria.orden,
         'activa': subcategoria.activa,
         'updated_at': subcategoria.updated_at.isoformat(),
@@ -251,7 +251,7 @@ def get_subcategorias_por_categoria(request, categoria_id):
             'id': sc.id,
             'nombre': sc.nombre,
             'descripcion': sc.descripcion,
-            'imagen': sc.imagen.url if sc.imagen else None,
+            'imagen': sc.imagen_url or None,
             'orden': sc.orden,
             'activa': sc.activa,
             'productos_count': sc.productos.count(),
@@ -301,7 +301,7 @@ def subcategorias_por_categoria_query(request):
             'id': sc.id,
             'nombre': sc.nombre,
             'descripcion': sc.descripcion,
-            'imagen': sc.imagen.url if sc.imagen else None,
+            'imagen': sc.imagen_url or None,
             'orden': sc.orden,
         })
     
@@ -0,0 +1,152 @@
+import logging
+from datetime import date, timedelta
+
+from django.http import JsonResponse
+from django.db.models import Sum
+from django.views.decorators.http import require_GET
+from django.views.decorators.csrf import csrf_exempt
+
+from ..models import VentaDiaria
+from ..utils.ventas import ESTADOS_VENTA, hoy_local, procesado_hasta, zona
+from .decorators import admin_required_hybrid, query_budget
+logger = logging.getLogger(__name__)
+
+DIAS_DEFAULT = 30
+RANGO_MAX_DIAS = 366
+TOP_MAX = 100
+
+# Dimensión del top → columnas que se agrupan (la primera es la clave)
+DIMENSIONES = {
+    'producto': ('producto_id', 'producto__nombre'),
+    'variante': ('variante_id', 'producto__nombre', 'variante__color', 'variante__sku'),
+    'talla': ('talla',),
+    'categoria': ('categoria_id', 'categoria__nombre'),
+}
+
+
+# ───────────────────────────────────────────────
+# API ADMIN - Analítica de ventas (rollups diarios)
+# ───────────────────────────────────────────────
+
+def _filtrar(request):
+    """
+    Rango de días locales y filtros comunes. Retorna (queryset, desde, hasta)
+    o lanza ValueError con el mensaje para el 400.
+    """
+    hasta = request.GET.get('hasta')
+    desde = request.GET.get('desde')
+    try:
+        hasta = date.fromisoformat(hasta) if hasta else hoy_local()
+        desde = date.fromisoformat(desde) if desde else hasta - timedelta(days=DIAS_DEFAULT - 1)
+    except ValueError:
+        raise ValueError('Fechas en formato YYYY-MM-DD')
+    if desde > hasta:
+        raise ValueError('desde debe ser anterior a hasta')
+    if (hasta - desde).days >= RANGO_MAX_DIAS:
+        raise ValueError(f'Rango máximo de {RANGO_MAX_DIAS} días')
+
+    ventas = VentaDiaria.objects.filter(dia__gte=desde, dia__lte=hasta)
+
+    status = request.GET.get('status', '')
+    if status != 'todos':
+        ventas = ventas.filter(status__in=status.split(',') if status else ESTADOS_VENTA)
+
+    for campo in ('producto', 'variante', 'categoria'):
+        valor = request.GET.get(campo)
+        if valor:
+            if not valor.isdigit():
+                raise ValueError(f'{campo} inválido')
+            ventas = ventas.filter(**{f'{campo}_id': int(valor)})
+    if request.GET.get('talla'):
+        ventas = ventas.filter(talla=request.GET['talla'])
+
+    return ventas, desde, hasta
+
+
+def _rango_json(desde, hasta):
+    marca = procesado_hasta()
+    return {
+        'zona_horaria': str(zona()),
+        'desde': desde.isoformat(),
+        'hasta': hasta.isoformat(),
+        'procesado_hasta': marca.isoformat() if marca else None,
+    }
+
+
+@csrf_exempt
+@admin_required_hybrid()
+@query_budget(4)
+@require_GET
+def ventas_serie(request):
+    """
+    API: Serie diaria de unidades e ingresos (días sin ventas en cero).
+    Filtros: desde, hasta, producto, variante, categoria, talla,
+    status (lista separada por comas, 'todos'; default: estados de venta).
+    """
+    try:
+        ventas, desde, hasta = _filtrar(request)
+    except ValueError as e:
+        return JsonResponse({'success': False, 'error': str(e)}, status=400)
+
+    por_dia = {
+        fila['dia']: fila
+        for fila in ventas.values('dia').annotate(unidades=Sum('unidades'), ingresos=Sum('ingresos')).order_by()
+    }
+    serie = []
+    dia = desde
+    while dia <= hasta:
+        fila = por_dia.get(dia)
+        serie.append({
+            'dia': dia.isoformat(),
+            'unidades': fila['unidades'] if fila else 0,
+            'ingresos': float(fila['ingresos']) if fila else 0.0,
+        })
+        dia += timedelta(days=1)
+
+    return JsonResponse({
+        'success': True,
+        **_rango_json(desde, hasta),
+        'serie': serie,
+        'totales': {
+            'unidades': sum(p['unidades'] for p in serie),
+            'ingresos': round(sum(p['ingresos'] for p in serie), 2),
+        },
+    })
+
+
+@csrf_exempt
+@admin_required_hybrid()
+@query_budget(4)
+@require_GET
+def ventas_top(request):
+    """
+    API: Top-N por producto, variante, talla o categoría.
+    Parámetros: por (default: producto), n (default: 10, máx. TOP_MAX),
+    orden=ingresos|unidades, más los filtros de ventas_serie.
+    """
+    por = request.GET.get('por', 'producto')
+    orden = request.GET.get('orden', 'ingresos')
+    if por not in DIMENSIONES:
+        return JsonResponse({'success': False, 'error': f'por debe ser uno de: {", ".join(DIMENSIONES)}'}, status=400)
+    if orden not in ('ingresos', 'unidades'):
+        return JsonResponse({'success': False, 'error': 'orden debe ser ingresos o unidades'}, status=400)
+    try:
+        n = int(request.GET.get('n', 10))
+        if not 1 <= n <= TOP_MAX:
+            raise ValueError
+    except ValueError:
+        return JsonResponse({'success': False, 'error': f'n debe estar entre 1 y {TOP_MAX}'}, status=400)
+    try:
+        ventas, desde, hasta = _filtrar(request)
+    except ValueError as e:
+        return JsonResponse({'success': False, 'error': str(e)}, status=400)
+
+    desempate = 'unidades' if orden == 'ingresos' else 'ingresos'
+    filas = (
+        ventas.values(*DIMENSIONES[por])
+        .annotate(unidades=Sum('unidades'), ingresos=Sum('ingresos'))
+        .order_by(f'-{orden}', f'-{desempate}', DIMENSIONES[por][0])[:n]
+    )
+    top = [{**fila, 'ingresos': float(fila['ingresos'])} for fila in filas]
+
+    return JsonResponse({'success': True, **_rango_json(desde, hasta), 'por': por, 'orden': orden, 'top': top})
@@ -1,4 +1,5 @@
 import json
+import time
 from django.contrib.auth.hashers import check_password, make_password
 from django.db import transaction
 from django.db.models import Prefetch
@@ -14,6 +15,10 @@ from store.models import BlacklistedToken
 from ..models import Categoria, Cliente, Producto, Usuario, Variante
 from store.utils.jwt_helpers import generate_access_token, generate_refresh_token, decode_jwt
 from store.utils.genero import normalize_genero, get_genero_filter, get_seccion, GENERO_FILTER_MAP
+from store.utils import busquedas
+from store.utils.fragmentos import preparar_tarjetas, version_grilla
+from store.utils.swr import cache_swr
+from store.utils.tallas import etiquetas
 from .decorators import jwt_role_required, login_required_user, admin_required, admin_required_hybrid
 
 import logging
@@ -42,14 +47,8 @@ def index(request):
         .order_by('?')[:4]
     )
     
-    # Agregar primera imagen (galería) a cada producto desde variante principal
-    for p in cab_home + dama_home:
-        variante_principal = p.variante_principal
-        if variante_principal:
-            primera_img = variante_principal.imagenes.all().order_by('orden').first()
-            p.imagen = primera_img.imagen if primera_img else None
-        else:
-            p.imagen = None
+    # Primera imagen (galería) y versión de fragmento de cada tarjeta
+    preparar_tarjetas(cab_home + dama_home)
 
     # ── Imágenes para tarjetas de categorías generales ──
     def _get_hero_image(genero_list):
@@ -61,9 +60,9 @@ def index(request):
         if prod:
             vp = prod.variante_principal
             if vp:
-                img = vp.imagenes.all().order_by('orden').first()
+                img = next(iter(vp.imagenes.all()), None)
                 if img and img.imagen:
-                    return img.imagen.url
+                    return img.imagen_url
         return None
 
     cat_img_dama = _get_hero_image(["Mujer", "Unisex"])
@@ -91,57 +90,22 @@ def registrarse(request):
 # ───────────────────────────────────────────────
 # Catálogo por género
 # ───────────────────────────────────────────────
-def genero_view(request, genero):
+@cache_swr('coleccion')
+def _pagina_coleccion(genero_cod, categoria_id, subcategoria_id, tallas, colores, marcas,
+                      precio_min, precio_max, en_oferta, busqueda, orden, pagina):
     """
-    Vista de colección por género con filtros completos.
-    URL: /coleccion/<genero>/?categoria=<id>&subcategoria=<id>&tallas=7,8&precio_min=500&...
-    
-    Soporta filtros de:
-    - Categoría y Subcategoría
-    - Tallas (múltiples)
-    - Colores (múltiples)
-    - Marcas (múltiples)
-    - Rango de precio
-    - En oferta
-    - Ordenamiento
-    - Paginación
+    (ids de la página, total de productos, número de página) de una colección
+    con sus filtros. Cacheada por argumentos: se vuelve obsoleta al cambiar
+    el catálogo (sello 'catalogo') o tras SWR_SUAVE segundos.
     """
     from django.core.paginator import Paginator
     from django.db.models import Q
-    
-    genero_cod = normalize_genero(genero)
-    if not genero_cod:
-        return HttpResponseNotFound("Género no válido")
-
-    # Obtener filtros de query params
-    categoria_id = request.GET.get('categoria')
-    subcategoria_id = request.GET.get('subcategoria')
-    
-    # Parsear tallas (pueden venir como "39,40" o como múltiples params "tallas=39&tallas=40")
-    tallas_raw = request.GET.get('tallas', '')
-    tallas = [t.strip() for t in tallas_raw.split(',') if t.strip()] if tallas_raw else []
-    
-    # Parsear colores
-    colores_raw = request.GET.get('colores', '')
-    colores = [c.strip() for c in colores_raw.split(',') if c.strip()] if colores_raw else []
-    
-    # Parsear marcas
-    marcas_raw = request.GET.get('marcas', '')
-    marcas = [m.strip() for m in marcas_raw.split(',') if m.strip()] if marcas_raw else []
-    
-    precio_min = request.GET.get('precio_min')
-    precio_max = request.GET.get('precio_max')
-    en_oferta = request.GET.get('en_oferta') == '1'
-    busqueda = request.GET.get('q', '').strip()
-    orden = request.GET.get('orden', 'nuevo')
-    pagina = request.GET.get('pagina', 1)
 
     # Base query: cuando genero_cod es 'Todo' se muestran todos los productos (excepto bodega)
     if genero_cod == 'Todo':
         qs = Producto.objects.filter(bodega=False)
     else:
         qs = Producto.objects.filter(genero__in=[genero_cod, "Unisex"], bodega=False)
-    qs = qs.select_related("categoria").prefetch_related("subcategorias", "variantes__imagenes", "variantes")
     
     # Filtrar por categoría
     if categoria_id:
@@ -196,13 +160,13 @@ def genero_view(request, genero):
     # Solo productos con stock (filtrado post-query)
     qs = qs.distinct()
 
-    # Filtrar por tallas (post-query, JSONField)
+    # Filtrar por tallas (post-query, JSONField); por etiqueta canónica: 'ch' encuentra 'S'
     if tallas_filter:
-        tallas_set = set(tallas_filter)
+        tallas_set = etiquetas(tallas_filter)
         qs_ids = []
         for p in qs.prefetch_related('variantes'):
             for v in p.variantes.all():
-                if v.tallas_stock and tallas_set & set(v.tallas_stock.keys()):
+                if v.tallas_stock and tallas_set & etiquetas(v.tallas_stock):
                     qs_ids.append(p.id)
                     break
         qs = qs.filter(id__in=qs_ids)
@@ -217,20 +181,75 @@ def genero_view(request, genero):
     qs = qs.order_by(orden_map.get(orden, '-created_at'))
     
     # Paginación (24 productos por página)
-    paginator = Paginator(qs, 24)
+    paginator = Paginator(qs.values_list('id', flat=True), 24)
     try:
-        productos_pag = paginator.get_page(pagina)
+        pagina_ids = paginator.get_page(pagina)
     except (ValueError, TypeError):
-        productos_pag = paginator.get_page(1)
-    
-    # Agregar primera imagen a cada producto de la página actual
-    for p in productos_pag:
-        variante_principal = p.variante_principal
-        if variante_principal:
-            primera_img = variante_principal.imagenes.all().order_by('orden').first()
-            p.imagen = primera_img.imagen if primera_img else None
-        else:
-            p.imagen = None
+        pagina_ids = paginator.get_page(1)
+    return list(pagina_ids), paginator.count, pagina_ids.number
+
+
+def genero_view(request, genero):
+    """
+    Vista de colección por género con filtros completos.
+    URL: /coleccion/<genero>/?categoria=<id>&subcategoria=<id>&tallas=7,8&precio_min=500&...
+    
+    Soporta filtros de:
+    - Categoría y Subcategoría
+    - Tallas (múltiples)
+    - Colores (múltiples)
+    - Marcas (múltiples)
+    - Rango de precio
+    - En oferta
+    - Ordenamiento
+    - Paginación
+    """
+    from django.core.paginator import Page, Paginator
+    
+    inicio = time.perf_counter()
+    genero_cod = normalize_genero(genero)
+    if not genero_cod:
+        return HttpResponseNotFound("Género no válido")
+
+    # Obtener filtros de query params
+    categoria_id = request.GET.get('categoria')
+    subcategoria_id = request.GET.get('subcategoria')
+    
+    # Parsear tallas (pueden venir como "39,40" o como múltiples params "tallas=39&tallas=40")
+    tallas_raw = request.GET.get('tallas', '')
+    tallas = [t.strip() for t in tallas_raw.split(',') if t.strip()] if tallas_raw else []
+    
+    # Parsear colores
+    colores_raw = request.GET.get('colores', '')
+    colores = [c.strip() for c in colores_raw.split(',') if c.strip()] if colores_raw else []
+    
+    # Parsear marcas
+    marcas_raw = request.GET.get('marcas', '')
+    marcas = [m.strip() for m in marcas_raw.split(',') if m.strip()] if marcas_raw else []
+    
+    precio_min = request.GET.get('precio_min')
+    precio_max = request.GET.get('precio_max')
+    en_oferta = request.GET.get('en_oferta') == '1'
+    busqueda = request.GET.get('q', '').strip()
+    orden = request.GET.get('orden', 'nuevo')
+    pagina = request.GET.get('pagina', 1)
+
+    # IDs de la página (cálculo caro: filtros por tallas en Python, count, orden)
+    # cacheados con stale-while-revalidate; los productos se cargan por ID
+    ids, total, numero = _pagina_coleccion(
+        genero_cod, categoria_id, subcategoria_id, tuple(tallas), tuple(colores), tuple(marcas),
+        precio_min, precio_max, en_oferta, busqueda, orden, str(pagina),
+    )
+    paginator = Paginator(range(total), 24)
+    # bodega=False otra vez: los IDs pueden venir de la caché y el producto haberse ocultado
+    productos = (Producto.objects.filter(id__in=ids, bodega=False)
+                 .select_related("categoria")
+                 .prefetch_related("subcategorias", "variantes__imagenes", "variantes")
+                 .in_bulk())
+    productos_pag = Page([productos[i] for i in ids if i in productos], numero, paginator)
+    
+    # Primera imagen y versión de fragmento de cada producto de la página actual
+    preparar_tarjetas(productos_pag)
     
     # Obtener categorías únicas (solo de la página actual para eficiencia)
     categorias = sorted({p.categoria.nombre for p in productos_pag if p.categoria})
@@ -264,13 +283,24 @@ def genero_view(request, genero):
         'q': busqueda,
         'orden': orden
     }
+
+    # Analítica de búsquedas: solo la primera página (store/utils/busquedas.py, sin INSERT aquí)
+    busqueda_id = None
+    if busqueda and productos_pag.number == 1:
+        busqueda_id = busquedas.registrar(
+            busqueda,
+            resultados=paginator.count,
+            latencia_ms=(time.perf_counter() - inicio) * 1000,
+            filtros={'genero': genero_cod, **{k: v for k, v in filtros_activos.items() if v and k != 'q'}},
+            origen='coleccion',
+        )
     
     # Si es petición AJAX, devolver JSON
     if request.headers.get('X-Requested-With') == 'XMLHttpRequest' or request.GET.get('ajax'):
         productos_data = []
         for p in productos_pag:
             # Obtener URL de imagen (ya está asignada en el for anterior)
-            imagen_url = p.imagen.url if hasattr(p, 'imagen') and p.imagen else None
+            imagen_url = getattr(p, 'imagen_url', None) or None
             
             productos_data.append({
                 'id': p.id,
@@ -279,6 +309,8 @@ def genero_view(request, genero):
                 'precio_mayorista': str(p.precio_mayorista) if p.precio_mayorista else None,
                 'en_oferta': p.en_oferta,
                 'imagen': imagen_url,
+                'imagen_srcset': getattr(p, 'imagen_srcset', ''),
+                'imagen_srcset_avif': getattr(p, 'imagen_srcset_avif', ''),
                 'marca': p.marca or ''
             })
         
@@ -286,6 +318,7 @@ def genero_view(request, genero):
             'success': True,
             'productos': productos_data,
             'total': paginator.count,
+            'busqueda_id': busqueda_id,
             'paginacion': {
                 'pagina_actual': productos_pag.number,
                 'total_paginas': paginator.num_pages,
@@ -303,6 +336,8 @@ def genero_view(request, genero):
         "productos": productos_pag,
         "filtros_activos": filtros_activos,
         "total_productos": paginator.count,
+        "version_grilla": version_grilla(productos_pag),
+        "busqueda_id": busqueda_id,
     })
 
 
@@ -387,20 +422,15 @@ def catalogo_view(request):
     # Obtener categorías únicas de los productos filtrados
     categorias = sorted({p.categoria.nombre for p in qs if p.categoria})
     
-    # Agregar primera imagen (galería) a cada producto
-    for p in qs:
-        variante_principal = p.variante_principal
-        if variante_principal:
-            primera_img = variante_principal.imagenes.all().order_by('orden').first()
-            p.imagen = primera_img.imagen if primera_img else None
-        else:
-            p.imagen = None
+    # Agregar primera imagen (galería) y versión de fragmento a cada producto
+    productos = preparar_tarjetas(qs)
     
     return render(request, "public/catalogo/productos_genero.html", {
         "seccion": seccion,
         "titulo": titulo,
         "categorias": categorias,
-        "productos": qs,
+        "productos": productos,
+        "version_grilla": version_grilla(productos),
     })
 
 
@@ -605,7 +635,7 @@ def categorias_por_genero(request):
         "categorias": [{
             "id": cat.id,
             "nombre": cat.nombre,
-            "imagen": cat.imagen.url if cat.imagen else ''
+            "imagen": cat.imagen_url
         } for cat in categorias]
     }
     
@@ -662,7 +692,7 @@ def producto_aleatorio_subcategoria(request):
         imagen_url = None
         variante_principal = producto.variante_principal
         if variante_principal and variante_principal.imagenes.exists():
-            imagen_url = variante_principal.imagenes.first().imagen.url
+            imagen_url = variante_principal.imagenes.first().imagen_url
         
         data = {
             "producto": {
@@ -690,7 +720,7 @@ def get_categorias(request):
     data = [{
         "id": cat.id,
         "nombre": cat.nombre,
-        "imagen": cat.imagen.url if cat.imagen else ''
+        "imagen": cat.imagen_url
     } for cat in categorias]
     return JsonResponse(data, safe=False)
 
@@ -715,7 +745,7 @@ def create_categoria(request):
         return JsonResponse({
             "id": categoria.id,
             "nombre": categoria.nombre,
-            "imagen": categoria.imagen.url if categoria.imagen else ''
+            "imagen": categoria.imagen_url
         }, status=201)
     except Exception as e:
         return JsonResponse({"error": str(e)}, status=400)
@@ -740,7 +770,7 @@ def update_categoria(request, id):
         categoria.save()
         return JsonResponse({
             "mensaje": "Categoría actualizada",
-            "imagen": categoria.imagen.url if categoria.imagen else ''
+            "imagen": categoria.imagen_url
         }, status=200)
     except Exception as e:
         return JsonResponse({"error": str(e)}, status=400)
@@ -9,10 +9,12 @@ from django.views.decorators.csrf  import csrf_exempt
 from django.views.decorators.http  import require_http_methods
 from django.utils.decorators       import method_decorator
 from django.conf import settings
-from .decorators import jwt_role_required
+from .decorators import jwt_role_required, query_budget
 from store.utils.jwt_helpers import _get_jwt_secret
 
 from ..models import Cliente, Wishlist, Producto, Variante
+from store.utils.renditions import srcsets
+from store.utils.tallas import ordenar_tallas
 
 logger = logging.getLogger(__name__)
 
@@ -47,6 +49,7 @@ def get_cliente_id(request, username):
 # ─────────────────────────────────────────────────────────────
 @csrf_exempt
 @require_http_methods(['GET', 'POST', 'DELETE'])
+@query_budget(8)
 def wishlist_detail(request, id_cliente):
     """
     GET/POST/DELETE /wishlist/<id_cliente>/
@@ -112,11 +115,10 @@ def wishlist_detail(request, id_cliente):
         for p in Producto.objects.filter(id__in=ids, bodega=False).prefetch_related('variantes__imagenes'):
             # Galerías de imágenes de la variante principal
             variante_principal = p.variante_principal
-            galeria = []
+            imagenes = []
             if variante_principal:
-                for img in variante_principal.imagenes.all():
-                    if img.imagen:
-                        galeria.append(img.imagen.url)
+                imagenes = [img for img in variante_principal.imagenes.all() if img.imagen]
+            galeria = [img.imagen_url for img in imagenes]
             
             # Imagen principal (la primera de la galería)
             imagen_principal = galeria[0] if galeria else None
@@ -126,6 +128,7 @@ def wishlist_detail(request, id_cliente):
                 'nombre': p.nombre,
                 'precio': str(p.precio),
                 'imagen': imagen_principal,
+                **srcsets(imagenes[0] if imagenes else None),
                 'imagenes_galeria': galeria
             })
         return JsonResponse({'productos': productos})
@@ -232,7 +235,7 @@ def producto_tallas(request, id_producto):
             if stock_val > 0 and talla_key:
                 tallas_set.add(talla_key)
 
-    tallas = sorted(tallas_set) or ["Única"]
+    tallas = ordenar_tallas(tallas_set) or ["Única"]
     return JsonResponse({"tallas": tallas})
 
 
@@ -257,9 +260,10 @@ def productos_por_ids(request):
     for p in Producto.objects.filter(id__in=id_list, bodega=False).prefetch_related('variantes__imagenes'):
         # Galería de imágenes de la variante principal
         variante_principal = p.variante_principal
-        galeria = []
+        imagenes = []
         if variante_principal:
-            galeria = [img.imagen.url for img in variante_principal.imagenes.all().order_by('orden') if img.imagen]
+            imagenes = [img for img in variante_principal.imagenes.all().order_by('orden') if img.imagen]
+        galeria = [img.imagen_url for img in imagenes]
         # La imagen principal es siempre la primera de la galería
         imagen_principal = galeria[0] if galeria else None
         
@@ -268,6 +272,7 @@ def productos_por_ids(request):
             "nombre": p.nombre,
             "precio": f"{p.precio.normalize():f}",
             "imagen": imagen_principal,
+            **srcsets(imagenes[0] if imagenes else None),
             "imagenes_galeria": galeria
         })
 